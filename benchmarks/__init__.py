@@ -0,0 +1,3 @@
+"""
+Benchmark scripts, run from the project root with ``python -m benchmarks.<name>``
+"""
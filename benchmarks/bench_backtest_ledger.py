@@ -0,0 +1,85 @@
+"""
+Compares BackTest.run_backtest with the write-through trade booking (query and
+rewrite trade_booking on every rebalance) against the in-memory PositionLedger
+with a single flush at the end, on a file-backed SQLite database.
+
+The rebalances use the greedy allocation instead of the CVXPY optimizer so that
+the timings reflect trade booking rather than solver time.
+
+Usage: python -m benchmarks.bench_backtest_ledger [n_tickers] [n_rebalances]
+"""
+
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.back_test.back_test import BackTest, BackTestData
+from src.data_access.schemas import UniverseSpec
+from src.data_access.sqllite_db_manager import DatabaseManager, EngineRegistry
+from src.data_prep.synthetic_data.generate_synthetic_data import (
+    BENCHMARK_TICKER, TRADING_DAYS_PER_YEAR, SyntheticDataSpec,
+    generate_synthetic_data)
+
+STRATEGY = "BenchStrategy"
+
+
+def make_backtest_data(
+    n_tickers, n_rebalances, seed=0, allocator="greedy", score_persistence=0.0
+):
+    """
+    Synthetic BackTestData: daily factor-model prices, weekly books of a tenth of
+    the universe per side and a varying AUM/leverage schedule.
+    """
+    spec = SyntheticDataSpec(
+        n_tickers=n_tickers,
+        # Five business days per weekly rebalance
+        n_years=n_rebalances * 5 / TRADING_DAYS_PER_YEAR,
+        strategies=(STRATEGY,),
+        top_n=max(n_tickers // 10, 1),
+        score_persistence=score_persistence,
+        risk_model_weeks=0,
+        seed=seed,
+    )
+    data = generate_synthetic_data(spec)
+    prices = data.prices[data.prices["ticker"] != BENCHMARK_TICKER]
+    return BackTestData(
+        strategy_name=STRATEGY,
+        univ_spec=UniverseSpec("SP500"),
+        start_date=data.rebalance_dates[0],
+        end_date=data.rebalance_dates[-1],
+        aum_leverage_df=data.aum_leverage_changes(STRATEGY),
+        alpha_scores_df=data.alpha_scores,
+        price_history_df=prices[["date", "ticker", "value"]].reset_index(drop=True),
+        allocator=allocator,
+    )
+
+
+def _time_run(backtest_data, write_through, db_path):
+    engine = EngineRegistry.get_engine(db_path)
+    with EngineRegistry.use_engine(engine):
+        DatabaseManager(db_path).create_trade_booking_table()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            BackTest(backtest_data, write_through=write_through).run_backtest()
+        return time.perf_counter() - start
+
+
+def run_benchmark(n_tickers=500, n_rebalances=52):
+    backtest_data = make_backtest_data(n_tickers, n_rebalances)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        write_through = _time_run(backtest_data, True, Path(tmp_dir) / "wt.db")
+        ledger = _time_run(backtest_data, False, Path(tmp_dir) / "ledger.db")
+        EngineRegistry.dispose_all()
+
+    print(f"Backtest: {n_tickers} tickers, {n_rebalances} rebalances")
+    print(f"Write-through booking : {write_through:8.2f} s")
+    print(f"In-memory ledger      : {ledger:8.2f} s")
+    print(f"Speed-up              : {write_through / ledger:8.1f}x")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    run_benchmark(*args)
@@ -0,0 +1,37 @@
+"""
+Measures how BackTest.run_backtest scales with the number of rebalances (ledger
+mode, in-memory database, greedy allocation). With the per-date indexes the time
+per rebalance should stay flat as the history grows.
+
+Usage: python -m benchmarks.bench_backtest_scaling [n_tickers]
+"""
+
+import contextlib
+import io
+import sys
+import time
+
+from benchmarks.bench_backtest_ledger import make_backtest_data
+from src.back_test.back_test import BackTest
+from src.data_access.sqllite_db_manager import DatabaseManager, EngineRegistry
+
+
+def run_benchmark(n_tickers=500, rebalance_counts=(26, 52, 104, 208)):
+    print(f"Backtest scaling, {n_tickers} tickers")
+    print(f"{'rebalances':>10} {'total s':>9} {'ms/rebalance':>13}")
+    for n_rebalances in rebalance_counts:
+        backtest_data = make_backtest_data(n_tickers, n_rebalances)
+        with EngineRegistry.use_engine():
+            DatabaseManager().create_trade_booking_table()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                BackTest(backtest_data).run_backtest()
+            elapsed = time.perf_counter() - start
+        print(
+            f"{n_rebalances:>10} {elapsed:>9.2f} "
+            f"{elapsed / n_rebalances * 1e3:>13.1f}"
+        )
+
+
+if __name__ == "__main__":
+    run_benchmark(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,76 @@
+"""
+Per-solve latency of the integer allocation over a year of weekly long and
+short books from the synthetic generator: building a new cvxpy problem for
+every solve (as before) against re-solving the cached parametrized problem.
+
+Usage: python -m benchmarks.bench_cvx_optimizer [n_tickers] [top_n] [n_years]
+"""
+
+import statistics
+import sys
+import time
+
+from src.data_prep.synthetic_data.generate_synthetic_data import (
+    SyntheticDataSpec, generate_synthetic_data)
+from src.portfolio_construction.optimizers.cvxpy_optimizer import (
+    CvxAllocationProblem, get_allocation_problem)
+
+CAPITAL = 50_000_000
+
+
+def make_books(n_tickers, top_n, n_years):
+    spec = SyntheticDataSpec(
+        n_tickers=n_tickers,
+        n_years=n_years,
+        strategies=("Mom_RoC",),
+        top_n=top_n,
+        risk_model_weeks=0,
+    )
+    data = generate_synthetic_data(spec)
+    prices = data.prices.set_index(["date", "ticker"])["value"]
+    books = []
+    for (date, _), book in data.alpha_scores.groupby(["date", "trade_direction"]):
+        books.append(
+            (
+                prices.loc[date].reindex(book["ticker"]).to_numpy(),
+                CAPITAL * book["weight"].to_numpy(),
+            )
+        )
+    return books
+
+
+def _time_solves(books, get_problem):
+    """Wall time and cvxpy compilation time of every solve."""
+    latencies, compile_times = [], []
+    for prices, dollar_target in books:
+        start = time.perf_counter()
+        allocation = get_problem(len(prices))
+        status, _ = allocation.solve(prices, dollar_target, CAPITAL)
+        latencies.append(time.perf_counter() - start)
+        compile_times.append(allocation.problem.compilation_time)
+        assert status == "optimal", status
+    return latencies, compile_times
+
+
+def run_benchmark(n_tickers=500, top_n=25, n_years=1):
+    books = make_books(n_tickers, top_n, n_years)
+    rebuilt = _time_solves(books, CvxAllocationProblem)
+    cached = _time_solves(books, get_allocation_problem)
+
+    print(f"{len(books)} solves of {top_n} names")
+    print(
+        f"{'':24} {'mean ms':>10} {'median ms':>10} {'compile ms':>11} {'total s':>10}"
+    )
+    for label, (latencies, compile_times) in (
+        ("New problem per solve", rebuilt),
+        ("Cached DPP problem", cached),
+    ):
+        print(
+            f"{label:24} {statistics.mean(latencies) * 1e3:10.1f}"
+            f" {statistics.median(latencies) * 1e3:10.1f}"
+            f" {statistics.mean(compile_times) * 1e3:11.1f} {sum(latencies):10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    run_benchmark(*[int(arg) for arg in sys.argv[1:4]])
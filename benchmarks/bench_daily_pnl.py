@@ -0,0 +1,79 @@
+"""
+Times the daily mark-to-market P&L engine on weekly long/short books over a
+business-day price panel (defaults: 10 years x 500 names, 3 strategies of 50
+longs and 50 shorts each).
+
+Usage: python -m benchmarks.bench_daily_pnl [n_years] [n_tickers] [n_strategies]
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.analytics.daily_pnl import compute_daily_pnl
+from src.data_access.price_matrix import PriceMatrix
+from src.data_prep.synthetic_data.generate_synthetic_data import (
+    BENCHMARK_TICKER, SyntheticDataSpec, generate_synthetic_data)
+
+
+def make_trades(price_matrix, strategy_name, book_size, rng):
+    prices = price_matrix.to_frame()
+    rebalances = prices.index[prices.index.dayofweek == 4]
+    closes = rebalances[1:].append(rebalances[-1:])
+    frames = []
+    for open_date, close_date in zip(rebalances, closes):
+        tickers = rng.choice(price_matrix.tickers, 2 * book_size, replace=False)
+        signs = np.repeat([1, -1], book_size)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "strategy_name": strategy_name,
+                    "trade_open_date": open_date,
+                    "ticker": tickers,
+                    "shares": signs * rng.integers(10, 1000, len(tickers)),
+                    "trade_open_price": prices.loc[open_date, tickers].to_numpy(),
+                    "direction": np.where(signs > 0, "Long", "Short"),
+                    "trade_close_date": close_date,
+                    "trade_close_price": prices.loc[close_date, tickers].to_numpy(),
+                }
+            )
+        )
+    return pd.concat(frames, ignore_index=True)
+
+
+def run_benchmark(n_years=10, n_tickers=500, n_strategies=3, book_size=50):
+    rng = np.random.default_rng(0)
+    spec = SyntheticDataSpec(n_tickers=n_tickers, n_years=n_years, risk_model_weeks=0)
+    prices = generate_synthetic_data(spec).prices
+    price_matrix = PriceMatrix.from_long_frame(
+        prices[prices["ticker"] != BENCHMARK_TICKER], "px_last"
+    )
+    trades_df = pd.concat(
+        [
+            make_trades(price_matrix, f"Strategy{i}", book_size, rng)
+            for i in range(n_strategies)
+        ],
+        ignore_index=True,
+    )
+
+    start = time.perf_counter()
+    daily_pnl_df = compute_daily_pnl(trades_df, price_matrix)
+    elapsed = time.perf_counter() - start
+
+    booked = (
+        trades_df["shares"]
+        * (trades_df["trade_close_price"] - trades_df["trade_open_price"])
+    ).sum()
+    print(
+        f"Panel: {price_matrix.shape[0]} dates x {n_tickers} tickers, {len(trades_df)} trades"
+    )
+    print(f"Daily P&L     : {elapsed * 1e3:10.1f} ms for {n_strategies} strategies")
+    print(f"Rows          : {len(daily_pnl_df):10d}")
+    print(f"P&L check     : {daily_pnl_df['net_pnl'].sum() - booked:10.4f}")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:4]]
+    run_benchmark(*args)
@@ -0,0 +1,49 @@
+"""
+Compares building a new engine per call (the previous get_db_engine behaviour)
+with the process-wide engine registry, for engine startup and per-query latency.
+
+Usage: python -m benchmarks.bench_db_engine [n_queries]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from src.data_access.sqllite_db_manager import EngineRegistry
+
+
+def _time_queries(get_engine, n_queries):
+    query = text("SELECT value FROM prices WHERE ticker = 'T1'")
+    start = time.perf_counter()
+    for _ in range(n_queries):
+        with get_engine().connect() as conn:
+            conn.execute(query).fetchall()
+    return (time.perf_counter() - start) / n_queries
+
+
+def run_benchmark(n_queries=500):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = Path(tmp_dir) / "bench.db"
+        url = f"sqlite:///{db_path.as_posix()}"
+        prices = pd.DataFrame(
+            {"ticker": [f"T{i % 50}" for i in range(5_000)], "value": 1.0}
+        )
+        # Created through the registry, so it starts at the latest schema version
+        prices.to_sql("prices", EngineRegistry.get_engine(db_path), index=False)
+
+        per_call = _time_queries(lambda: create_engine(url), n_queries)
+        registry = _time_queries(lambda: EngineRegistry.get_engine(db_path), n_queries)
+        EngineRegistry.dispose_all()
+
+    print(f"Queries per mode: {n_queries}")
+    print(f"New engine per call : {per_call * 1e3:8.3f} ms/query")
+    print(f"Engine registry     : {registry * 1e3:8.3f} ms/query")
+    print(f"Speed-up            : {per_call / registry:8.1f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,65 @@
+"""
+Times greedy_allocation and linear_optimization against the previous
+row-by-row pandas implementation (apply + iterrows) for a large book.
+
+Usage: python -m benchmarks.bench_greedy_allocation [n_names] [repeats]
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.portfolio_construction.optimizers.greedy_allocation import (
+    greedy_allocation, linear_optimization)
+
+
+def _row_by_row_greedy_allocation(tickers, prices, weights_target, capital):
+    df = pd.DataFrame(
+        {"ticker": tickers, "price": prices, "target_weight": weights_target}
+    )
+    df = df.sort_values("target_weight", ascending=False)
+    df["target_dollars"] = capital * df["target_weight"]
+    df["shares"] = df.apply(
+        lambda row: (
+            int(min(row["target_dollars"] // row["price"], capital // row["price"]))
+            if row["price"] > 0
+            else 0
+        ),
+        axis=1,
+    )
+    for idx, row in df.iterrows():
+        df.at[idx, "value"] = row["shares"] * row["price"]
+    return df
+
+
+def _time(func, args, repeats):
+    func(*args)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func(*args)
+    return (time.perf_counter() - start) / repeats
+
+
+def run_benchmark(n_names=10_000, repeats=20):
+    rng = np.random.default_rng(0)
+    args = (
+        [f"T{i}" for i in range(n_names)],
+        rng.uniform(5, 500, n_names),
+        rng.dirichlet(np.ones(n_names)),
+        100_000_000,
+    )
+
+    row_by_row = _time(_row_by_row_greedy_allocation, args, max(repeats // 10, 1))
+    greedy = _time(greedy_allocation, args, repeats)
+    linear = _time(linear_optimization, args, repeats)
+
+    print(f"Book of {n_names} names")
+    print(f"Row by row greedy      : {row_by_row * 1e3:10.1f} ms")
+    print(f"greedy_allocation      : {greedy * 1e3:10.1f} ms")
+    print(f"linear_optimization    : {linear * 1e3:10.1f} ms")
+
+
+if __name__ == "__main__":
+    run_benchmark(*[int(arg) for arg in sys.argv[1:3]])
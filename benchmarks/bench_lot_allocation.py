@@ -0,0 +1,73 @@
+"""
+Compares lot_allocation with the GLPK_MI integer program of cvx_optimizer on
+speed and objective (L1 distance to the dollar targets) from 25 to 5,000 names.
+GLPK gets a time limit per solve; a solve stopped by it reports its incumbent
+(status optimal_inaccurate), and
+one without any integer solution by then is reported as failed.
+
+Usage: python -m benchmarks.bench_lot_allocation [glpk_time_limit_s] [n_names ...]
+"""
+
+import contextlib
+import io
+import sys
+import time
+import warnings
+
+import cvxpy as cp
+import numpy as np
+
+from src.portfolio_construction.optimizers.cvxpy_optimizer import \
+    CvxAllocationProblem
+from src.portfolio_construction.optimizers.lot_allocation import lot_allocation
+
+CAPITAL = 50_000_000
+SIZES = (25, 100, 500, 1_000, 5_000)
+
+
+def run_benchmark(glpk_time_limit=20, sizes=SIZES):
+    rng = np.random.default_rng(0)
+    print(
+        f"{'names':>6} {'lot ms':>9} {'GLPK s':>8} {'GLPK status':>19}"
+        f" {'lot L1':>10} {'GLPK L1':>10} {'LP bound':>10} {'lot gap':>8}"
+    )
+    for n_names in sizes:
+        tickers = [f"T{i}" for i in range(n_names)]
+        prices = rng.uniform(5, 800, n_names)
+        dollar_target = CAPITAL * rng.dirichlet(np.ones(n_names))
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = lot_allocation(tickers, prices, dollar_target / CAPITAL, CAPITAL)
+        lot_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            try:
+                status, shares = CvxAllocationProblem(n_names).solve(
+                    prices, dollar_target, CAPITAL, tm_lim=int(glpk_time_limit * 1e3)
+                )
+            except cp.error.SolverError:
+                # No integer solution within the time limit
+                status, shares = "failed", None
+        glpk_seconds = time.perf_counter() - start
+        glpk_objective = (
+            np.abs(np.floor(shares) * prices - dollar_target).sum()
+            if shares is not None
+            else np.nan
+        )
+
+        print(
+            f"{n_names:>6} {lot_seconds * 1e3:>9.2f} {glpk_seconds:>8.2f} {status:>19}"
+            f" {result.attrs['objective']:>10.0f} {glpk_objective:>10.0f}"
+            f" {result.attrs['lower_bound']:>10.0f}"
+            f" {result.attrs['optimality_gap'] / result.attrs['objective']:>8.2%}"
+        )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    time_limit = float(args[0]) if args else 20
+    sizes = tuple(int(arg) for arg in args[1:]) or SIZES
+    run_benchmark(time_limit, sizes)
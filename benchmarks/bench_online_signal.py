@@ -0,0 +1,87 @@
+"""
+Times a daily signal refresh: recomputing compute_roc_signal and
+compute_min_vol_signal over the full price history for each new day, against
+updating RocSignalState and MinVolSignalState with that day's price vector.
+The states are built from the history first, and the new rows are checked
+against the batch signals.
+
+Usage: python -m benchmarks.bench_online_signal [n_days] [n_new_days]
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.strategy.min_vol.min_vol import (MinVolSignalState,
+                                          compute_min_vol_signal)
+from src.strategy.momentum.roc_momentum import (RocSignalState,
+                                                compute_roc_signal)
+
+TICKER_COUNTS = (500, 5000)
+
+
+def make_prices(n_days, n_tickers, seed=0):
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0, 0.02, (n_days, n_tickers + 1))
+    px_df = pd.DataFrame(
+        100 * np.exp(np.cumsum(returns, axis=0)),
+        index=pd.bdate_range("2023-09-01", periods=n_days),
+        columns=[f"T{i:05d}" for i in range(n_tickers)] + ["SP500"],
+    )
+    px_df[rng.random(px_df.shape) < 0.01] = np.nan
+    px_df["SP500"] = px_df["SP500"].ffill()
+    return px_df
+
+
+def run_benchmark(n_days=390, n_new_days=5):
+    print(f"{n_days} days of history, {n_new_days} new days (per-day times)")
+    print(
+        f"{'tickers':>8} {'signal':>8} {'batch ms':>9} {'online ms':>10}"
+        f" {'speedup':>8} {'max abs diff':>13}"
+    )
+    for n_tickers in TICKER_COUNTS:
+        px_df = make_prices(n_days + n_new_days, n_tickers)
+        history, new_days = px_df.iloc[:n_days], px_df.iloc[n_days:]
+        stock_px_df, benchmark_px_df = px_df.drop(columns="SP500"), px_df[["SP500"]]
+
+        cases = (
+            (
+                "RoC",
+                RocSignalState.from_history(history.drop(columns="SP500")),
+                new_days.drop(columns="SP500"),
+                lambda end: compute_roc_signal(stock_px_df.loc[:end]).iloc[-1],
+            ),
+            (
+                "MinVol",
+                MinVolSignalState.from_history(history, benchmark_ticker="SP500"),
+                new_days,
+                lambda end: compute_min_vol_signal(
+                    stock_px_df.loc[:end], benchmark_px_df.loc[:end]
+                ).iloc[-1],
+            ),
+        )
+        for name, state, updates, batch_row in cases:
+            batch, online, max_diff = 0.0, 0.0, 0.0
+            for date, prices in updates.iterrows():
+                start = time.perf_counter()
+                expected = batch_row(date)
+                batch += time.perf_counter() - start
+
+                start = time.perf_counter()
+                row = state.update(date, prices)
+                online += time.perf_counter() - start
+
+                diff = np.abs(row.reindex(expected.index) - expected).max()
+                max_diff = max(max_diff, diff)
+            batch_ms = 1e3 * batch / len(updates)
+            online_ms = 1e3 * online / len(updates)
+            print(
+                f"{n_tickers:>8} {name:>8} {batch_ms:>9.1f} {online_ms:>10.2f}"
+                f" {batch_ms / online_ms:>7.0f}x {max_diff:>13.1e}"
+            )
+
+
+if __name__ == "__main__":
+    run_benchmark(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,56 @@
+"""
+Compares running several strategy backtests one after another with the shared
+memory process pool of run_backtest_batch (no database writes in either case).
+
+Usage: python -m benchmarks.bench_parallel_backtests [n_strategies] [n_tickers] [n_rebalances]
+"""
+
+import contextlib
+import io
+import sys
+import time
+
+from benchmarks.bench_backtest_ledger import make_backtest_data
+from src.back_test.back_test import BackTest
+from src.back_test.backtest_runner import run_backtest_batch
+from src.back_test.position_ledger import PositionLedger
+from src.data_access.price_matrix import PriceMatrix
+
+
+def run_benchmark(n_strategies=4, n_tickers=100, n_rebalances=12):
+    backtest_data_list = [
+        make_backtest_data(n_tickers, n_rebalances, seed=seed)
+        for seed in range(n_strategies)
+    ]
+    for seed, backtest_data in enumerate(backtest_data_list):
+        backtest_data.strategy_name = f"Strategy{seed}"
+        backtest_data.alpha_scores_df["strategy_name"] = backtest_data.strategy_name
+        # Same price history for every strategy, as in a real run
+        backtest_data.price_history_df = backtest_data_list[0].price_history_df
+    price_matrix = PriceMatrix.from_long_frame(
+        backtest_data_list[0].price_history_df, "px_last"
+    )
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for backtest_data in backtest_data_list:
+            ledger = PositionLedger(backtest_data.strategy_name)
+            BackTest(backtest_data, ledger=ledger, flush=False).run_backtest()
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        run_backtest_batch(
+            backtest_data_list,
+            price_matrix,
+            [PositionLedger(data.strategy_name) for data in backtest_data_list],
+        )
+        parallel = time.perf_counter() - start
+
+    print(f"{n_strategies} strategies, {n_tickers} tickers, {n_rebalances} rebalances")
+    print(f"Sequential          : {sequential:8.2f} s")
+    print(f"Process pool (shm)  : {parallel:8.2f} s")
+    print(f"Per strategy (seq.) : {sequential / n_strategies:8.2f} s")
+
+
+if __name__ == "__main__":
+    run_benchmark(*[int(arg) for arg in sys.argv[1:4]])
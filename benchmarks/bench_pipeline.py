@@ -0,0 +1,269 @@
+"""
+Scale benchmark suite for the full pipeline on synthetic data.
+
+Each size fills a scratch SQLite database with the synthetic generator and then
+times and memory-profiles the stages in order: data generation, RocSignal,
+construct_portfolio_weights, cvx_optimizer (one side of a rebalance, top_n
+names), BackTest (first strategy, all rebalances) and RiskFactorAttributions
+(last book with P&L). Each stage is timed on a plain run; the peak traced memory
+comes from a second run under tracemalloc.
+
+Results are written as JSON. With --compare they are checked against the
+baseline of the same size in benchmarks/baselines/ and any stage slower or
+larger than the baseline by more than the tolerance is flagged (exit status 1).
+Baselines are machine specific; refresh them with --save-baseline.
+
+Usage: python -m benchmarks.bench_pipeline [--sizes small medium large]
+           [--tickers N --years Y] [--stages ...] [--compare] [--save-baseline]
+           [--tolerance 0.25] [--output results.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from src.analytics.risk_attributions import RiskFactorAttributions
+from src.back_test.back_test import BackTest, create_backtest_data
+from src.data_access.risk_model import RiskModelDataUtil
+from src.data_access.schemas import UniverseSpec
+from src.data_access.sqllite_db_manager import EngineRegistry
+from src.data_access.trade_booking import get_trade_and_sec_master_data
+from src.data_prep.synthetic_data.generate_synthetic_data import (
+    SyntheticDataSpec, create_synthetic_db)
+from src.portfolio_construction.optimizers.create_portfolio_weights import \
+    construct_portfolio_weights
+from src.portfolio_construction.optimizers.cvxpy_optimizer import cvx_optimizer
+from src.strategy.momentum.roc_momentum import RocSignal
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+DEFAULT_TOLERANCE = 0.25
+# Regressions below these absolute differences are treated as noise
+MIN_SECONDS_DELTA = 0.05
+MIN_MB_DELTA = 1.0
+
+# name -> (tickers, years)
+SIZES = {
+    "small": (500, 1),
+    "medium": (2_000, 5),
+    "large": (5_000, 20),
+}
+STAGES = [
+    "generate",
+    "roc_signal",
+    "construct_portfolio_weights",
+    "cvx_optimizer",
+    "backtest",
+    "risk_attributions",
+]
+
+
+class PipelineStages:
+    """Runs the stages in order on one scratch database, passing results along."""
+
+    def __init__(self, spec, db_path):
+        self.spec = spec
+        self.db_path = db_path
+        self.data = None
+        self.engine = None
+        self.signal_df = None
+        self.strategy_name = spec.strategies[0]
+
+    def generate(self):
+        self.data, self.engine = create_synthetic_db(self.spec, db_path=self.db_path)
+
+    def roc_signal(self):
+        univ_spec = UniverseSpec(
+            "SP500",
+            self.data.start_date.strftime("%Y-%m-%d"),
+            self.data.end_date.strftime("%Y-%m-%d"),
+        )
+        self.signal_df = RocSignal(univ_spec).calculate_signal_scores()
+
+    def construct_portfolio_weights(self):
+        construct_portfolio_weights(self.signal_df, "Mom_RoC", top_n=self.spec.top_n)
+
+    def cvx_optimizer(self):
+        # Integer allocation of one side of a rebalance
+        n_names = self.spec.top_n
+        prices = self.data.prices
+        last_day = prices[prices["date"] == self.data.end_date].head(n_names)
+        weights = np.random.default_rng(self.spec.seed).dirichlet(np.ones(n_names))
+        cvx_optimizer(
+            last_day["ticker"].tolist(),
+            last_day["value"].to_numpy(),
+            weights,
+            capital=100_000_000,
+        )
+
+    def backtest(self):
+        backtest_data = create_backtest_data(
+            self.strategy_name, self.data.start_date, self.data.end_date
+        )
+        BackTest(backtest_data).run_backtest()
+
+    def risk_attributions(self):
+        # The last book is closed at its own prices; the one before has P&L
+        rebalance_date = self.data.rebalance_dates[-2:][0]
+        trade_data = get_trade_and_sec_master_data(
+            self.strategy_name, rebalance_date, rebalance_date
+        )
+        risk_model = RiskModelDataUtil.fetch_risk_model(rebalance_date)
+        RiskFactorAttributions(trade_data, risk_model).compute_all_factor_attributions()
+
+
+def _run_stage(stages, stage, trace):
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        getattr(stages, stage)()
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if trace:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def run_size(n_tickers, n_years, stages=STAGES, seed=0):
+    """
+    Times every stage for one size.
+
+    Returns:
+        dict of stage -> {"seconds": wall time, "peak_mb": peak traced memory}
+    """
+    spec = SyntheticDataSpec(n_tickers=n_tickers, n_years=n_years, seed=seed)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        runs = {}
+        # Stages build on each other, so the earlier ones always run
+        last = max(STAGES.index(stage) for stage in stages)
+        for trace in (False, True):
+            pipeline = PipelineStages(spec, Path(tmp_dir) / f"synthetic_{trace}.db")
+            with contextlib.ExitStack() as stack:
+                for stage in STAGES[: last + 1]:
+                    runs.setdefault(stage, {})[trace] = _run_stage(
+                        pipeline, stage, trace
+                    )
+                    if stage == "generate":
+                        stack.enter_context(EngineRegistry.use_engine(pipeline.engine))
+        EngineRegistry.dispose_all()
+
+    for stage in stages:
+        results[stage] = {
+            "seconds": round(runs[stage][False][0], 4),
+            "peak_mb": round(runs[stage][True][1], 2),
+        }
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Stages whose time or peak memory exceeds the baseline by more than the
+    tolerance (relative) and the noise floor (absolute).
+
+    Returns:
+        list of (stage, metric, baseline value, current value)
+    """
+    regressions = []
+    floors = {"seconds": MIN_SECONDS_DELTA, "peak_mb": MIN_MB_DELTA}
+    for stage, metrics in results.items():
+        base_metrics = baseline.get("stages", {}).get(stage)
+        if base_metrics is None:
+            continue
+        for metric, floor in floors.items():
+            current, base = metrics[metric], base_metrics[metric]
+            if current > base * (1 + tolerance) and current - base > floor:
+                regressions.append((stage, metric, base, current))
+    return regressions
+
+
+def run_benchmark(
+    sizes=("small",),
+    custom=None,
+    stages=STAGES,
+    compare=False,
+    save_baseline=False,
+    tolerance=DEFAULT_TOLERANCE,
+    output=None,
+):
+    size_configs = {name: SIZES[name] for name in sizes}
+    if custom is not None:
+        size_configs[f"{custom[0]}x{custom[1]}y"] = custom
+
+    report = {}
+    regressions = []
+    for name, (n_tickers, n_years) in size_configs.items():
+        stage_results = run_size(n_tickers, n_years, stages)
+        report[name] = {
+            "tickers": n_tickers,
+            "years": n_years,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "stages": stage_results,
+        }
+
+        print(f"\n{name}: {n_tickers} tickers x {n_years} years")
+        print(f"{'stage':<30} {'seconds':>10} {'peak MB':>10}")
+        for stage, metrics in stage_results.items():
+            print(
+                f"{stage:<30} {metrics['seconds']:>10.3f} {metrics['peak_mb']:>10.1f}"
+            )
+
+        baseline_path = BASELINE_DIR / f"{name}.json"
+        if compare and baseline_path.exists():
+            baseline = json.loads(baseline_path.read_text())
+            for stage, metric, base, current in compare_to_baseline(
+                stage_results, baseline, tolerance
+            ):
+                regressions.append((name, stage, metric, base, current))
+                print(f"REGRESSION {name}/{stage} {metric}: {base} -> {current}")
+        elif compare:
+            print(f"No baseline for {name} at {baseline_path}")
+
+        if save_baseline:
+            BASELINE_DIR.mkdir(exist_ok=True)
+            baseline_path.write_text(json.dumps(report[name], indent=2) + "\n")
+            print(f"Saved baseline {baseline_path}")
+
+    if output:
+        Path(output).write_text(json.dumps(report, indent=2) + "\n")
+    return report, regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", nargs="*", choices=list(SIZES))
+    parser.add_argument("--tickers", type=int)
+    parser.add_argument("--years", type=float)
+    parser.add_argument("--stages", nargs="*", default=STAGES, choices=STAGES)
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    custom = (args.tickers, args.years) if args.tickers and args.years else None
+    if args.sizes is None:
+        args.sizes = [] if custom else ["small"]
+    _, found = run_benchmark(
+        sizes=args.sizes,
+        custom=custom,
+        stages=args.stages,
+        compare=args.compare,
+        save_baseline=args.save_baseline,
+        tolerance=args.tolerance,
+        output=args.output,
+    )
+    sys.exit(1 if found else 0)
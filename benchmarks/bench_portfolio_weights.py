@@ -0,0 +1,128 @@
+"""
+Times construct_portfolio_weights, which ranks every date of the signal matrix
+at once, against the previous implementation that looped over the dates with
+iterrows, sorting each row and building two DataFrames per date. Both run on a
+daily synthetic signal with missing values, and their outputs are checked for
+equality.
+
+Usage: python -m benchmarks.bench_portfolio_weights [n_days] [top_n]
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.portfolio_construction.optimizers.create_portfolio_weights import (
+    ALPHA_SCORES_COLUMNS, construct_portfolio_weights)
+
+TICKER_COUNTS = (500, 5000)
+
+
+def _row_by_row_portfolio_weights(signal_df, strategy_name, top_n=25):
+    ls_trade_list = []
+    min_assets = max(2, top_n)
+    for date, row in signal_df.iterrows():
+        valid_scores = row.dropna()
+        if len(valid_scores) == 1:
+            ls_trade_list.append(
+                pd.DataFrame(
+                    {
+                        "date": date,
+                        "trade_direction": "Long",
+                        "ticker": valid_scores.index,
+                        "alpha_score": valid_scores.values,
+                        "weight": [1.0],
+                    }
+                )
+            )
+            continue
+        if len(valid_scores) < min_assets:
+            continue
+
+        sorted_indices = valid_scores.abs().sort_values(ascending=False).index
+        sorted_scores = valid_scores[sorted_indices]
+        n_assets = min(top_n, len(sorted_scores) // 2)
+        if n_assets == 0:
+            continue
+        top_scores = sorted_scores.iloc[:n_assets]
+        bottom_scores = sorted_scores.iloc[-n_assets:]
+        if all(sorted_scores < 0):
+            long_scores, short_scores = bottom_scores, top_scores
+        else:
+            long_scores, short_scores = top_scores, bottom_scores
+        if long_scores.abs().sum() == 0 and short_scores.abs().sum() == 0:
+            continue
+
+        long_weights = np.zeros(len(long_scores))
+        short_weights = np.zeros(len(short_scores))
+        if long_scores.abs().sum() != 0:
+            long_weights = np.abs(long_scores.values) / np.abs(long_scores).sum()
+        if short_scores.abs().sum() != 0:
+            short_weights = np.abs(short_scores.values) / np.abs(short_scores).sum()
+        for direction, scores, weights in (
+            ("Long", long_scores, long_weights),
+            ("Short", short_scores, short_weights),
+        ):
+            ls_trade_list.append(
+                pd.DataFrame(
+                    {
+                        "date": date,
+                        "trade_direction": direction,
+                        "ticker": scores.index,
+                        "alpha_score": scores.values,
+                        "weight": weights,
+                    }
+                )
+            )
+
+    if not ls_trade_list:
+        return pd.DataFrame(columns=ALPHA_SCORES_COLUMNS)
+    ls_trades_df = pd.concat(ls_trade_list, ignore_index=True)
+    ls_trades_df.sort_values(by=["date", "trade_direction", "ticker"], inplace=True)
+    ls_trades_df["strategy_name"] = strategy_name
+    ls_trades_df.reset_index(drop=True, inplace=True)
+    return ls_trades_df
+
+
+def make_signal(n_days, n_tickers, seed=0):
+    """Daily scores with tickers entering the universe over time."""
+    rng = np.random.default_rng(seed)
+    scores = rng.normal(0, 1, (n_days, n_tickers))
+    listed = rng.integers(0, n_days // 2, n_tickers)
+    scores[np.arange(n_days)[:, None] < listed] = np.nan
+    scores[rng.random(scores.shape) < 0.02] = np.nan
+    return pd.DataFrame(
+        scores,
+        index=pd.bdate_range("2005-01-03", periods=n_days),
+        columns=[f"T{i:05d}" for i in range(n_tickers)],
+    )
+
+
+def _time(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def run_benchmark(n_days=1260, top_n=25):
+    print(f"{n_days} daily rows, top_n {top_n}")
+    print(f"{'tickers':>8} {'row by row s':>13} {'vectorized s':>13} {'speedup':>8}")
+    for n_tickers in TICKER_COUNTS:
+        signal_df = make_signal(n_days, n_tickers)
+        expected, row_by_row = _time(
+            _row_by_row_portfolio_weights, signal_df, "Bench", top_n
+        )
+        result, vectorized = _time(
+            construct_portfolio_weights, signal_df, "Bench", top_n
+        )
+        pd.testing.assert_frame_equal(result, expected)
+        print(
+            f"{n_tickers:>8} {row_by_row:>13.2f} {vectorized:>13.3f}"
+            f" {row_by_row / vectorized:>7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    run_benchmark(*[int(arg) for arg in sys.argv[1:3]])
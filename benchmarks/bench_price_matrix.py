@@ -0,0 +1,70 @@
+"""
+Compares the pivot query used by the signals (long rows -> pivot -> asfreq/ffill)
+with opening the memory-mapped PriceMatrix for a dates x tickers panel.
+
+Usage: python -m benchmarks.bench_price_matrix [n_dates] [n_tickers]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import text
+
+from src.data_access.crud_util import DataAccessUtil
+from src.data_access.price_matrix import PriceMatrix, refresh_price_matrices
+from src.data_access.sqllite_db_manager import EngineRegistry
+from src.data_prep.synthetic_data.generate_synthetic_data import (
+    TRADING_DAYS_PER_YEAR, SyntheticDataSpec, generate_synthetic_data)
+
+
+def _pivot_query(engine):
+    stmt = text(
+        "SELECT date, ticker, value FROM sp500_ts_data "
+        "WHERE key = 'px_last' AND ticker NOT IN ('SP500')"
+    )
+    df = DataAccessUtil.fetch_data_from_db(stmt, engine=engine)
+    return df.pivot(index="date", columns="ticker", values="value").asfreq("B").ffill()
+
+
+def _mmap_load(directory):
+    px = PriceMatrix.load("px_last", directory).drop(["SP500"])
+    # Touch the last row, as a rebalance lookup would
+    return px.row(px.dates[-1])
+
+
+def run_benchmark(n_dates=500, n_tickers=2000):
+    spec = SyntheticDataSpec(
+        n_tickers=n_tickers,
+        n_years=n_dates / TRADING_DAYS_PER_YEAR,
+        risk_model_weeks=0,
+    )
+    long_df = DataAccessUtil.normalize_date_columns(
+        generate_synthetic_data(spec).prices
+    )
+
+    engine = EngineRegistry.create_in_memory_engine()
+    long_df.to_sql("sp500_ts_data", engine, index=False)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        directory = Path(tmp_dir)
+        refresh_price_matrices(["px_last"], directory=directory, engine=engine)
+
+        start = time.perf_counter()
+        _pivot_query(engine)
+        pivot_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        _mmap_load(directory)
+        mmap_time = time.perf_counter() - start
+
+    print(f"Panel: {n_dates} dates x {n_tickers} tickers")
+    print(f"Pivot query   : {pivot_time * 1e3:10.1f} ms")
+    print(f"Mmap load     : {mmap_time * 1e3:10.1f} ms")
+    print(f"Speed-up      : {pivot_time / mmap_time:10.1f}x")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    run_benchmark(*args)
@@ -0,0 +1,104 @@
+"""
+Times IndustryFactorRiskModel.estimate_exposures, which solves the stocks
+sharing a missing-day pattern in one lstsq, against the previous
+implementation that fitted a LinearRegression per stock and wrote the results
+into object DataFrames with .loc. Both run on one weekly model's window of
+synthetic returns (full histories plus late listings and scattered gaps), and
+their exposures, specific risk and residuals are checked for equality.
+
+Usage: python -m benchmarks.bench_risk_model_exposures [n_stocks] [n_days]
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+from src.data_prep.riskmodel_creation.fama_french_risk_model_5_weekly_only_ind_factors import \
+    IndustryFactorRiskModel
+
+N_FACTORS = 12
+
+
+def _per_stock_exposures(stock_returns, industry_factors):
+    industry_exposures = pd.DataFrame(
+        index=stock_returns.columns, columns=industry_factors.columns
+    )
+    specific_risk = pd.Series(index=stock_returns.columns)
+    residuals = pd.DataFrame(index=stock_returns.index, columns=stock_returns.columns)
+
+    for stock in stock_returns.columns:
+        if stock_returns[stock].isna().sum() > len(stock_returns) * 0.25:
+            continue
+        y = stock_returns[stock].dropna()
+        X = industry_factors.loc[y.index].values
+        X = np.column_stack([np.ones(X.shape[0]), X])
+        model = LinearRegression(fit_intercept=False)
+        model.fit(X, y.values.reshape(-1, 1))
+        betas = model.coef_.flatten()[1:]
+        industry_exposures.loc[stock] = betas
+        pred = model.predict(X).flatten()
+        residuals.loc[y.index, stock] = y.values - pred
+        specific_risk[stock] = np.std(y.values - pred)
+
+    return industry_exposures, specific_risk, residuals.loc[[residuals.index[-1]]]
+
+
+def make_returns(n_stocks, n_days, seed=0):
+    """About 90% full histories, the rest listed late or with gaps."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2024-01-02", periods=n_days, name="Date")
+    industry_factors = pd.DataFrame(
+        rng.normal(0, 0.01, (n_days, N_FACTORS)),
+        index=dates,
+        columns=[f"Ind{i}" for i in range(N_FACTORS)],
+    )
+    returns = industry_factors.to_numpy() @ rng.normal(
+        1, 0.5, (N_FACTORS, n_stocks)
+    ) / N_FACTORS + rng.normal(0, 0.02, (n_days, n_stocks))
+    ragged = rng.random(n_stocks) < 0.1
+    late = ragged & (rng.random(n_stocks) < 0.5)
+    listing_day = rng.integers(1, n_days // 4, n_stocks)
+    returns[np.arange(n_days)[:, None] < np.where(late, listing_day, 0)] = np.nan
+    returns[(rng.random(returns.shape) < 0.02) & (ragged & ~late)] = np.nan
+    stock_returns = pd.DataFrame(
+        returns,
+        index=dates,
+        columns=pd.Index([f"S{i:04d}" for i in range(n_stocks)], name="Ticker"),
+    )
+    return stock_returns, industry_factors
+
+
+def run_benchmark(n_stocks=500, n_days=252):
+    stock_returns, industry_factors = make_returns(n_stocks, n_days)
+    model = IndustryFactorRiskModel(as_of_date=stock_returns.index[-1])
+    model.stock_returns, model.industry_factors = stock_returns, industry_factors
+
+    start = time.perf_counter()
+    expected = _per_stock_exposures(stock_returns, industry_factors)
+    per_stock = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model.estimate_exposures()
+    batched = time.perf_counter() - start
+
+    pd.testing.assert_frame_equal(
+        model.industry_exposures, expected[0].astype(float), rtol=1e-10
+    )
+    pd.testing.assert_series_equal(
+        model.specific_risk, expected[1].astype(float), rtol=1e-10
+    )
+    pd.testing.assert_frame_equal(
+        model.residuals, expected[2].astype(float), rtol=1e-10
+    )
+
+    n_patterns = len(np.unique(stock_returns.notna().T.to_numpy(), axis=0))
+    print(f"{n_stocks} stocks x {n_days} days, {n_patterns} missing-day patterns")
+    print(f"{'per stock s':>12} {'batched s':>10} {'speedup':>8}")
+    print(f"{per_stock:>12.2f} {batched:>10.3f} {per_stock / batched:>7.0f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark(*[int(arg) for arg in sys.argv[1:3]])
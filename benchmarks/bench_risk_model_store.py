@@ -0,0 +1,186 @@
+"""
+Times loading a year of weekly risk models into SQLite. The baseline is the
+previous three store scripts: each one re-read every pickle, melted its part
+of the model to long format and ran executemany with a commit per file. It is
+compared with store_risk_models, which reads each file once for the three
+tables inside one transaction, on the same pickles and on .npz artifacts.
+Every run writes to a fresh database file, and all runs store the same
+non-null values.
+
+Usage: python -m benchmarks.bench_risk_model_store [n_stocks] [n_weeks] [workers]
+"""
+
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+
+from src.data_prep.riskmodel_creation.fama_french_risk_model_5_weekly_only_ind_factors import (
+    LOOKBACK_DAYS, build_weekly_risk_models, risk_model_dates)
+from src.data_prep.riskmodel_creation.risk_model_artifacts import \
+    RiskModelArtifact
+from src.data_prep.riskmodel_creation.store_risk_models_in_database import (
+    RISK_MODEL_TABLE_DDL, store_risk_models)
+
+N_FACTORS = 12
+
+
+def _three_script_store(pickle_paths, db_path):
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    for ddl in RISK_MODEL_TABLE_DDL:
+        cursor.execute(ddl)
+
+    # store_risk_factor_exposure_in_database.py
+    for file_path in pickle_paths:
+        data = pd.read_pickle(file_path)
+        as_of_date = pd.to_datetime(data["as_of_date"]).strftime("%Y-%m-%d")
+        df = (
+            data["industry_exposures"]
+            .reset_index()
+            .melt(id_vars="Ticker", var_name="factor", value_name="exposure")
+        )
+        df["date"] = as_of_date
+        df = df[["date", "Ticker", "factor", "exposure"]]
+        cursor.executemany(
+            "INSERT OR REPLACE INTO factor_exposures (date, ticker, factor, exposure)"
+            " VALUES (?, ?, ?, ?)",
+            df.values.tolist(),
+        )
+        conn.commit()
+
+    # store_risk_factor_covariance_in_database.py
+    for file_path in pickle_paths:
+        data = pd.read_pickle(file_path)
+        as_of_date = pd.to_datetime(data["as_of_date"]).strftime("%Y-%m-%d")
+        cov_df = data["factor_covariance"]
+        cov_long = cov_df.reset_index().melt(
+            id_vars=cov_df.index.name or "index",
+            var_name="factor_2",
+            value_name="covariance",
+        )
+        cov_long.rename(
+            columns={cov_df.index.name or "index": "factor_1"}, inplace=True
+        )
+        cov_long["date"] = as_of_date
+        cov_long = cov_long[["date", "factor_1", "factor_2", "covariance"]]
+        cursor.executemany(
+            "INSERT OR REPLACE INTO factor_covariance"
+            " (date, factor_1, factor_2, covariance) VALUES (?, ?, ?, ?)",
+            cov_long.values.tolist(),
+        )
+        conn.commit()
+
+    # store_spcrisk_residuals_in_database.py
+    for file_path in pickle_paths:
+        data = pd.read_pickle(file_path)
+        as_of_date = pd.to_datetime(data["as_of_date"]).strftime("%Y-%m-%d")
+        sr_df = data["specific_risk"].to_frame(name="specific_risk")
+        res_df = data["residuals"].T
+        res_df.columns = ["residual"]
+        merged = sr_df.join(res_df, how="inner").reset_index()
+        merged["date"] = as_of_date
+        merged = merged[["date", "Ticker", "specific_risk", "residual"]]
+        cursor.executemany(
+            "INSERT OR REPLACE INTO sprisk_residuals"
+            " (date, ticker, specific_risk, residual) VALUES (?, ?, ?, ?)",
+            merged.values.tolist(),
+        )
+        conn.commit()
+    conn.close()
+
+
+def _stored_values(db_path):
+    """Non-null stored values, sorted, for comparing the runs."""
+    conn = sqlite3.connect(db_path)
+    values = [
+        pd.read_sql(query, conn).sort_values(list(columns)).reset_index(drop=True)
+        for query, columns in (
+            (
+                "SELECT * FROM factor_exposures WHERE exposure IS NOT NULL",
+                ("date", "ticker", "factor"),
+            ),
+            ("SELECT * FROM factor_covariance", ("date", "factor_1", "factor_2")),
+            (
+                "SELECT * FROM sprisk_residuals WHERE specific_risk IS NOT NULL",
+                ("date", "ticker"),
+            ),
+        )
+    ]
+    conn.close()
+    return values
+
+
+def make_models(n_stocks, n_weeks, seed=0):
+    rng = np.random.default_rng(seed)
+    n_days = LOOKBACK_DAYS * 5 // 7 + 5 * n_weeks + 5
+    dates = pd.bdate_range("2023-01-02", periods=n_days, name="Date")
+    industry_factors = pd.DataFrame(
+        rng.normal(0, 0.01, (n_days, N_FACTORS)),
+        index=dates,
+        columns=[f"Ind{i}" for i in range(N_FACTORS)],
+    )
+    returns = rng.normal(0, 0.02, (n_days, n_stocks))
+    returns[:, : n_stocks // 50] = np.nan
+    stock_returns = pd.DataFrame(
+        returns,
+        index=dates,
+        columns=pd.Index([f"S{i:04d}" for i in range(n_stocks)], name="Ticker"),
+    )
+    first_model = dates[0] + pd.Timedelta(days=LOOKBACK_DAYS)
+    as_of_dates = risk_model_dates(dates, first_model, dates[-1])[:n_weeks]
+    return build_weekly_risk_models(stock_returns, industry_factors, as_of_dates)
+
+
+def run_benchmark(n_stocks=500, n_weeks=52, workers=4):
+    models = make_models(n_stocks, n_weeks)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        pickle_paths, artifact_paths = [], []
+        for date, model in models.items():
+            pickle_paths.append(tmp / f"risk_model_{date:%Y-%m-%d}.pkl")
+            model.serialize_risk_model(str(pickle_paths[-1]))
+            artifact_paths.append(
+                RiskModelArtifact.from_model(model).save(
+                    tmp / f"risk_model_{date:%Y-%m-%d}.npz"
+                )
+            )
+
+        print(f"{len(models)} models, {n_stocks} stocks, {N_FACTORS} factors")
+        for suffix, paths in (("pickles", pickle_paths), ("npz", artifact_paths)):
+            size = sum(path.stat().st_size for path in paths) / 1e6
+            print(f"{suffix:>8}: {size:.1f} MB")
+        print(f"{'loader':>28} {'seconds':>8} {'rows/s':>10}")
+        db_path = tmp / "three_scripts.db"
+        start = time.perf_counter()
+        _three_script_store(pickle_paths, db_path)
+        baseline = time.perf_counter() - start
+        expected = _stored_values(db_path)
+        n_rows = sum(len(table) for table in expected)
+        print(
+            f"{'three scripts (pickles)':>28} {baseline:>8.2f} {n_rows / baseline:>10,.0f}"
+        )
+
+        for label, paths, n_workers in (
+            ("single pass (pickles)", pickle_paths, 1),
+            ("single pass (npz)", artifact_paths, 1),
+            (f"single pass (npz, {workers} readers)", artifact_paths, workers),
+        ):
+            db_path = tmp / f"{label.replace(' ', '_')}.db"
+            engine = create_engine(f"sqlite:///{db_path.as_posix()}")
+            report = store_risk_models(paths, engine=engine, workers=n_workers)
+            engine.dispose()
+            for table, expected_table in zip(_stored_values(db_path), expected):
+                pd.testing.assert_frame_equal(table, expected_table)
+            print(
+                f"{label:>28} {report.seconds:>8.2f} {report.rows_per_second:>10,.0f}"
+            )
+
+
+if __name__ == "__main__":
+    run_benchmark(*[int(arg) for arg in sys.argv[1:4]])
@@ -0,0 +1,98 @@
+"""
+Per-rebalance latency of the long/short side modes of allocate_sides over a
+year of weekly synthetic books: the two sides solved one after the other, on
+two threads, and as one joint problem (gross cap and a dollar neutral band).
+The L1 column is the summed distance of both sides to their dollar targets;
+the joint mode pays for its neutrality constraint there. GLPK solves are
+serialized, so the concurrent mode only overlaps the problem setup.
+
+Usage: python -m benchmarks.bench_side_modes [n_tickers] [top_n] [n_years]
+"""
+
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+
+from src.data_prep.synthetic_data.generate_synthetic_data import (
+    SyntheticDataSpec, generate_synthetic_data)
+from src.portfolio_construction.optimizers.solver_chain import (SIDE_MODES,
+                                                                allocate_sides)
+
+SIDE_CAPITAL = 25_000_000
+
+
+def make_rebalances(n_tickers, top_n, n_years):
+    """dict of direction -> (tickers, prices, weights_target) per rebalance date."""
+    spec = SyntheticDataSpec(
+        n_tickers=n_tickers,
+        n_years=n_years,
+        strategies=("Mom_RoC",),
+        top_n=top_n,
+        risk_model_weeks=0,
+    )
+    data = generate_synthetic_data(spec)
+    prices = data.prices.set_index(["date", "ticker"])["value"]
+    rebalances = []
+    for date, alpha_df in data.alpha_scores.groupby("date"):
+        rebalances.append(
+            {
+                direction: (
+                    book["ticker"].to_numpy(),
+                    prices.loc[date].reindex(book["ticker"]).to_numpy(),
+                    book["weight"].to_numpy(),
+                )
+                for direction, book in alpha_df.groupby("trade_direction")
+            }
+        )
+    return rebalances
+
+
+def _time_rebalances(rebalances, side_mode):
+    latencies, l1_errors, fallbacks = [], [], 0
+    for books in rebalances:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            allocations = allocate_sides(books, SIDE_CAPITAL, side_mode=side_mode)
+        latencies.append(time.perf_counter() - start)
+        selected = [
+            attempt
+            for _, attempts in allocations.values()
+            for attempt in attempts
+            if attempt["selected"]
+        ]
+        l1_errors.append(sum(attempt["objective"] for attempt in selected))
+        fallbacks += side_mode == "joint" and not selected[0]["solver"].startswith(
+            "joint"
+        )
+    return latencies, l1_errors, fallbacks
+
+
+def run_benchmark(n_tickers=500, top_n=25, n_years=1):
+    rebalances = make_rebalances(n_tickers, top_n, n_years)
+    # Compile each mode's problems once before timing
+    for side_mode in SIDE_MODES:
+        _time_rebalances(rebalances[:1], side_mode)
+
+    print(
+        f"{len(rebalances)} rebalances of {top_n} + {top_n} names,"
+        f" {os.cpu_count()} CPUs"
+    )
+    print(
+        f"{'mode':12} {'mean ms':>9} {'median ms':>10} {'max ms':>9}"
+        f" {'mean L1':>10} {'fallbacks':>10}"
+    )
+    for side_mode in SIDE_MODES:
+        latencies, l1_errors, fallbacks = _time_rebalances(rebalances, side_mode)
+        print(
+            f"{side_mode:12} {statistics.mean(latencies) * 1e3:9.1f}"
+            f" {statistics.median(latencies) * 1e3:10.1f}"
+            f" {max(latencies) * 1e3:9.1f} {statistics.mean(l1_errors):10.0f}"
+            f" {fallbacks:>10}"
+        )
+
+
+if __name__ == "__main__":
+    run_benchmark(*[int(arg) for arg in sys.argv[1:4]])
@@ -0,0 +1,93 @@
+"""
+Times a year of weekly IndustryFactorRiskModel builds with each
+build_weekly_risk_models mode: serial (every Friday refitted from scratch),
+parallel (Fridays fanned out across a process pool) and rolling (the OLS
+sufficient statistics slid one week at a time). The parallel and rolling
+models are checked against the serial ones.
+
+Usage: python -m benchmarks.bench_weekly_risk_models [n_stocks] [n_weeks] [max_workers]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.data_prep.riskmodel_creation.fama_french_risk_model_5_weekly_only_ind_factors import (
+    LOOKBACK_DAYS, build_weekly_risk_models, risk_model_dates)
+
+N_FACTORS = 12
+
+
+def make_returns(n_stocks, n_days, seed=0):
+    """Correlated industry factors, with a few late listings and gaps."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2023-01-02", periods=n_days, name="Date")
+    market = rng.normal(0, 0.008, (n_days, 1))
+    industry_factors = pd.DataFrame(
+        market + rng.normal(0, 0.004, (n_days, N_FACTORS)),
+        index=dates,
+        columns=[f"Ind{i}" for i in range(N_FACTORS)],
+    )
+    returns = industry_factors.to_numpy() @ rng.normal(
+        1, 0.5, (N_FACTORS, n_stocks)
+    ) / N_FACTORS + rng.normal(0, 0.02, (n_days, n_stocks))
+    listing_day = np.where(
+        rng.random(n_stocks) < 0.05, rng.integers(0, n_days, n_stocks), 0
+    )
+    returns[np.arange(n_days)[:, None] < listing_day] = np.nan
+    returns[rng.random(returns.shape) < 0.002] = np.nan
+    stock_returns = pd.DataFrame(
+        returns,
+        index=dates,
+        columns=pd.Index([f"S{i:04d}" for i in range(n_stocks)], name="Ticker"),
+    )
+    return stock_returns, industry_factors
+
+
+def _max_scaled_diff(models, expected):
+    """Largest exposure difference relative to the largest exposure."""
+    return max(
+        np.nanmax(
+            np.abs(
+                models[date].industry_exposures - expected[date].industry_exposures
+            ).to_numpy()
+        )
+        / np.nanmax(np.abs(expected[date].industry_exposures.to_numpy()))
+        for date in expected
+    )
+
+
+def run_benchmark(n_stocks=500, n_weeks=52, max_workers=None):
+    max_workers = max_workers or os.cpu_count() or 1
+    n_days = LOOKBACK_DAYS * 5 // 7 + 5 * n_weeks + 5
+    stock_returns, industry_factors = make_returns(n_stocks, n_days)
+    first_model = stock_returns.index[0] + pd.Timedelta(days=LOOKBACK_DAYS)
+    as_of_dates = risk_model_dates(
+        stock_returns.index, first_model, stock_returns.index[-1]
+    )[:n_weeks]
+
+    print(f"{n_stocks} stocks, {len(as_of_dates)} weekly models, {max_workers} workers")
+    print(f"{'mode':>9} {'total s':>8} {'per model ms':>13} {'max diff':>9}")
+    expected = None
+    for mode in ("serial", "parallel", "rolling"):
+        start = time.perf_counter()
+        models = build_weekly_risk_models(
+            stock_returns,
+            industry_factors,
+            as_of_dates,
+            mode=mode,
+            max_workers=max_workers,
+        )
+        elapsed = time.perf_counter() - start
+        expected = expected or models
+        print(
+            f"{mode:>9} {elapsed:>8.2f} {1e3 * elapsed / len(models):>13.1f}"
+            f" {_max_scaled_diff(models, expected):>9.1e}"
+        )
+
+
+if __name__ == "__main__":
+    run_benchmark(*[int(arg) for arg in sys.argv[1:4]])
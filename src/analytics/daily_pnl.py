@@ -0,0 +1,312 @@
+import logging
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import inspect, text
+
+from src.data_access.crud_util import DataAccessUtil
+from src.data_access.price_matrix import PriceMatrix, load_price_matrix
+from src.data_access.sqllite_db_manager import TableNames, get_db_engine
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DAILY_PNL_COLUMNS = [
+    "date",
+    "strategy_name",
+    "long_pnl",
+    "short_pnl",
+    "net_pnl",
+    "long_exposure",
+    "short_exposure",
+    "gross_exposure",
+    "net_exposure",
+    "long_return",
+    "short_return",
+    "net_return",
+]
+
+
+def _side_pnl_exposure(shares, cols, open_rows, close_rows, trades, prices, dp):
+    """
+    Daily P&L and end-of-day exposure of one side (long or short) of a book.
+
+    Holdings are built as a delta matrix (+shares on the open row, -shares on the
+    close row) and a cumulative sum, so a position is held from the close of its
+    open date to the close of its close date. The P&L of day t is the row-wise
+    dot product of the holdings at t-1 with the price change of day t; the entry
+    and exit are adjusted from the matrix prices to the booked trade prices, so
+    the daily P&L of a trade adds up to its booked P&L.
+    """
+    n_dates, n_tickers = prices.shape
+    deltas = np.zeros((n_dates + 1, n_tickers))
+    np.add.at(deltas, (open_rows, cols), shares)
+    np.add.at(deltas, (close_rows, cols), -shares)
+    holdings = np.cumsum(deltas[:-1], axis=0)
+
+    pnl = np.zeros(n_dates)
+    pnl[1:] = np.einsum("ij,ij->i", holdings[:-1], dp[1:])
+
+    open_adj = shares * (prices[open_rows, cols] - trades["trade_open_price"])
+    np.add.at(pnl, open_rows, np.nan_to_num(open_adj))
+    closed = close_rows < n_dates
+    close_adj = shares[closed] * (
+        trades["trade_close_price"][closed] - prices[close_rows[closed], cols[closed]]
+    )
+    np.add.at(pnl, close_rows[closed], np.nan_to_num(close_adj))
+
+    exposure = np.einsum("ij,ij->i", holdings, np.nan_to_num(prices))
+    return pnl, exposure
+
+
+def _returns(pnl, exposure):
+    """P&L over the previous day's absolute exposure (0 when nothing was held)."""
+    base = np.zeros_like(exposure)
+    base[1:] = np.abs(exposure[:-1])
+    return np.divide(pnl, base, out=np.zeros_like(pnl), where=base != 0)
+
+
+def compute_strategy_daily_pnl(trades_df, price_matrix: PriceMatrix) -> pd.DataFrame:
+    """
+    Daily mark-to-market P&L of one strategy's trades.
+
+    Args:
+        trades_df: trade_booking rows of a single strategy
+        price_matrix: Business-day px_last panel covering the holding periods
+
+    Returns:
+        DataFrame with DAILY_PNL_COLUMNS, one row per price date from the first
+        trade opening to the last closing. Exposures are end of day (shorts
+        negative); returns are P&L over the previous day's exposure.
+    """
+    strategy_name = trades_df["strategy_name"].iloc[0]
+    known = trades_df["ticker"].isin(price_matrix.tickers)
+    if not known.all():
+        logger.warning(
+            f"{strategy_name}: no prices for {sorted(trades_df.loc[~known, 'ticker'].unique())}"
+        )
+        trades_df = trades_df[known]
+
+    open_dates = pd.to_datetime(trades_df["trade_open_date"]).to_numpy("datetime64[D]")
+    close_dates = pd.to_datetime(trades_df["trade_close_date"]).to_numpy(
+        "datetime64[D]"
+    )
+    # Open positions are marked to the end of the panel
+    last_date = None if np.isnat(close_dates).any() else close_dates.max()
+    panel = price_matrix.date_slice(open_dates.min(), last_date)
+
+    tickers = pd.unique(trades_df["ticker"])
+    panel = panel.select(tickers)
+    prices = pd.DataFrame(panel.values).ffill().to_numpy()
+    dp = np.nan_to_num(np.diff(prices, axis=0, prepend=prices[:1]))
+
+    cols = pd.Index(tickers).get_indexer(trades_df["ticker"])
+    open_rows = np.searchsorted(panel.dates, open_dates, "left")
+    close_rows = np.where(
+        np.isnat(close_dates),
+        len(panel.dates),
+        np.searchsorted(panel.dates, close_dates, "left"),
+    )
+    shares = trades_df["shares"].to_numpy(dtype=float)
+    booked = {
+        "trade_open_price": trades_df["trade_open_price"].to_numpy(dtype=float),
+        "trade_close_price": trades_df["trade_close_price"].to_numpy(dtype=float),
+    }
+
+    sides = {}
+    for side, mask in (("long", shares > 0), ("short", shares < 0)):
+        sides[side] = _side_pnl_exposure(
+            shares[mask],
+            cols[mask],
+            open_rows[mask],
+            close_rows[mask],
+            {name: values[mask] for name, values in booked.items()},
+            prices,
+            dp,
+        )
+
+    long_pnl, long_exposure = sides["long"]
+    short_pnl, short_exposure = sides["short"]
+    net_pnl = long_pnl + short_pnl
+    gross_exposure = long_exposure - short_exposure
+    return pd.DataFrame(
+        {
+            "date": pd.DatetimeIndex(panel.dates.astype("datetime64[ns]")),
+            "strategy_name": strategy_name,
+            "long_pnl": long_pnl,
+            "short_pnl": short_pnl,
+            "net_pnl": net_pnl,
+            "long_exposure": long_exposure,
+            "short_exposure": short_exposure,
+            "gross_exposure": gross_exposure,
+            "net_exposure": long_exposure + short_exposure,
+            "long_return": _returns(long_pnl, long_exposure),
+            "short_return": _returns(short_pnl, short_exposure),
+            "net_return": _returns(net_pnl, gross_exposure),
+        }
+    )
+
+
+def compute_daily_pnl(trades_df, price_matrix: PriceMatrix) -> pd.DataFrame:
+    """
+    Daily mark-to-market P&L, exposure and returns for every strategy in
+    trades_df (see compute_strategy_daily_pnl).
+    """
+    if trades_df.empty:
+        return pd.DataFrame(columns=DAILY_PNL_COLUMNS)
+    return pd.concat(
+        [
+            compute_strategy_daily_pnl(strategy_trades, price_matrix)
+            for _, strategy_trades in trades_df.groupby("strategy_name", sort=True)
+        ],
+        ignore_index=True,
+    )
+
+
+def store_daily_pnl(daily_pnl_df, engine=None):
+    """
+    Writes daily P&L rows in one transaction, replacing the stored rows of each
+    strategy over the dates being written.
+
+    Returns:
+        int: Number of rows written
+    """
+    if daily_pnl_df.empty:
+        return 0
+    if engine is None:
+        engine = get_db_engine()
+
+    table_name = TableNames.DAILY_PNL.value
+    delete_stmt = text(
+        f"DELETE FROM {table_name} WHERE strategy_name = :strategy_name "
+        "AND date >= :start_date AND date <= :end_date"
+    )
+    date_ranges = daily_pnl_df.groupby("strategy_name")["date"].agg(["min", "max"])
+    delete_params = [
+        {
+            "strategy_name": strategy_name,
+            "start_date": DataAccessUtil.to_db_date(row["min"]),
+            "end_date": DataAccessUtil.to_db_date(row["max"]),
+        }
+        for strategy_name, row in date_ranges.iterrows()
+    ]
+
+    with engine.begin() as conn:
+        if inspect(conn).has_table(table_name):
+            conn.execute(delete_stmt, delete_params)
+        DataAccessUtil.normalize_date_columns(daily_pnl_df.copy()).to_sql(
+            table_name, conn, if_exists="append", index=False, chunksize=100_000
+        )
+    return len(daily_pnl_df)
+
+
+def fetch_daily_pnl(strategy_name, start_date=None, end_date=None, engine=None):
+    """
+    Stored daily P&L of a strategy (empty frame if none has been computed).
+    """
+    if engine is None:
+        engine = get_db_engine()
+    table_name = TableNames.DAILY_PNL.value
+    if not inspect(engine).has_table(table_name):
+        return pd.DataFrame(columns=DAILY_PNL_COLUMNS)
+
+    query = f"SELECT * FROM {table_name} WHERE strategy_name = :strategy_name"
+    params = {"strategy_name": strategy_name}
+    if start_date:
+        query += " AND date >= :start_date"
+        params["start_date"] = DataAccessUtil.to_db_date(start_date)
+    if end_date:
+        query += " AND date <= :end_date"
+        params["end_date"] = DataAccessUtil.to_db_date(end_date)
+    query += " ORDER BY date"
+    return DataAccessUtil.fetch_data_from_db(text(query), params, engine=engine)
+
+
+def refresh_daily_pnl(
+    strategies, start_date=None, end_date=None, price_matrix=None, engine=None
+):
+    """
+    Recomputes and stores the daily P&L of strategies from start_date onward,
+    from their trades in trade_booking held on or after start_date and opened by
+    end_date. Books opened before start_date still count on the days they are
+    held, so rows from start_date on match a refresh of the whole history.
+
+    Args:
+        strategies: Strategy names
+        start_date: First date to rewrite (all history if None)
+        end_date: Last trade_open_date to include
+        price_matrix: px_last panel (defaults to the stored price matrix)
+        engine: SQLAlchemy database engine (optional, will use default if None)
+
+    Returns:
+        DataFrame with the rows written
+    """
+    strategies = list(strategies)
+    query = (
+        f"SELECT * FROM {TableNames.TRADE_BOOKING.value} "
+        f"WHERE strategy_name IN ({', '.join(f':s{i}' for i in range(len(strategies)))})"
+    )
+    params = {f"s{i}": strategy for i, strategy in enumerate(strategies)}
+    if start_date:
+        query += " AND (trade_close_date IS NULL OR trade_close_date >= :start_date)"
+        params["start_date"] = DataAccessUtil.to_db_date(start_date)
+    if end_date:
+        query += " AND trade_open_date <= :end_date"
+        params["end_date"] = DataAccessUtil.to_db_date(end_date)
+    trades_df = DataAccessUtil.fetch_data_from_db(text(query), params, engine=engine)
+
+    if price_matrix is None:
+        price_matrix = load_price_matrix("px_last", engine=engine)
+    daily_pnl_df = compute_daily_pnl(trades_df, price_matrix)
+    if start_date:
+        daily_pnl_df = daily_pnl_df[
+            daily_pnl_df["date"] >= pd.Timestamp(start_date)
+        ].reset_index(drop=True)
+    rows_written = store_daily_pnl(daily_pnl_df, engine=engine)
+    logger.info(
+        f"Stored {rows_written} daily P&L rows for {len(strategies)} strategies"
+    )
+    return daily_pnl_df
+
+
+def get_daily_pnl_exposure_time_series(daily_pnl_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Daily counterpart of trade_summary.get_pnl_exposure_time_series: the same
+    columns (keyed by trade_open_date so the dashboard charts can plot either),
+    built from stored daily P&L rows.
+    """
+    df = daily_pnl_df.sort_values("date")
+    result = pd.DataFrame(
+        {
+            "trade_open_date": pd.to_datetime(df["date"]).to_numpy(),
+            "long_exposure": df["long_exposure"].to_numpy(),
+            "short_exposure": df["short_exposure"].to_numpy(),
+            "long_pnl": df["long_pnl"].to_numpy(),
+            "short_pnl": df["short_pnl"].to_numpy(),
+            "total_exposure": df["gross_exposure"].to_numpy(),
+            "net_exposure": df["net_exposure"].to_numpy(),
+            "total_pnl": df["net_pnl"].to_numpy(),
+            "long_pnl_pct": df["long_return"].to_numpy(),
+            "short_pnl_pct": df["short_return"].to_numpy(),
+            "net_pnl_pct": df["net_return"].to_numpy(),
+        }
+    )
+    result["cumulative_long_pnl"] = result["long_pnl"].cumsum()
+    result["cumulative_short_pnl"] = result["short_pnl"].cumsum()
+    result["cumulative_total_pnl"] = result["total_pnl"].cumsum()
+    result["daily_long_return"] = result["long_pnl_pct"]
+    result["daily_short_return"] = result["short_pnl_pct"]
+    result["daily_total_return"] = result["net_pnl_pct"]
+    result["cumulative_long_pnl_pct"] = (1 + result["daily_long_return"]).cumprod() - 1
+    result["cumulative_short_pnl_pct"] = (
+        1 + result["daily_short_return"]
+    ).cumprod() - 1
+    result["cumulative_total_pnl_pct"] = (
+        1 + result["daily_total_return"]
+    ).cumprod() - 1
+    return result
+
+
+if __name__ == "__main__":
+    daily = refresh_daily_pnl(["MinVol", "Mom_RoC", "AggregatedFund"])
+    print(daily.groupby("strategy_name")["net_pnl"].sum())
@@ -5,15 +5,23 @@ import numpy as np
 import pandas as pd
 from sqlalchemy import text
 
-from src.back_test.create_aggregated_fund_trades import \
-    create_aggregated_fund_trades
+from src.back_test.backtest_checkpoint import (BackTestCheckpoint,
+                                               BackTestCheckpointUtil)
+from src.back_test.position_ledger import PositionLedger
 from src.data_access.crud_util import DataAccessUtil
+from src.data_access.optimizer_log import store_optimizer_log
+from src.data_access.price_matrix import PriceMatrix
 from src.data_access.prices import PriceDataFetcher
 from src.data_access.schemas import UniverseSpec
 from src.data_access.sqllite_db_manager import TableNames
 from src.data_access.trade_booking import update_trades
-from src.rebalance.rebalance_portfolio import (RebalancePortfolio,
-                                               RebalanceUtil,
+from src.rebalance.rebalance_portfolio import (DEFAULT_ALLOCATOR,
+                                               DEFAULT_REBALANCE_MODE,
+                                               DEFAULT_SIDE_MODE,
+                                               DEFAULT_TURNOVER_COSTS,
+                                               REBALANCE_MODES,
+                                               RebalancePortfolio,
+                                               RebalanceUtil, TurnoverCosts,
                                                create_rebalance_data)
 
 
@@ -26,10 +34,34 @@ class BackTestData:
     aum_leverage_df: pd.DataFrame = None
     alpha_scores_df: pd.DataFrame = None
     price_history_df: pd.DataFrame = None
+    # Optional dates x tickers panel used instead of price_history_df (e.g. a panel
+    # shared between processes by the multi-strategy runner)
+    price_matrix: PriceMatrix = None
+    # Share allocator of the rebalances, a key of solver_chain.ALLOCATORS, or an
+    # explicit chain of SolverSteps
+    allocator: str = DEFAULT_ALLOCATOR
+    solver_chain: tuple = None
+    # Long/short solve mode of the rebalances, one of solver_chain.SIDE_MODES
+    side_mode: str = DEFAULT_SIDE_MODE
+    # "full" reopens the whole book at every rebalance, "delta" trades from the
+    # open positions weighing turnover_costs (see REBALANCE_MODES)
+    rebalance_mode: str = DEFAULT_REBALANCE_MODE
+    turnover_costs: TurnoverCosts = DEFAULT_TURNOVER_COSTS
     # Create instance with the required datasets
 
 
-def create_backtest_data(strategy_name, start_date, end_date):
+PRICE_COLUMNS = ["date", "ticker", "value"]
+
+
+def create_backtest_data(
+    strategy_name,
+    start_date,
+    end_date,
+    allocator=DEFAULT_ALLOCATOR,
+    side_mode=DEFAULT_SIDE_MODE,
+    rebalance_mode=DEFAULT_REBALANCE_MODE,
+    turnover_costs=DEFAULT_TURNOVER_COSTS,
+):
     # Initialize universe specification and fetch required datasets
     univ_spec = UniverseSpec("SP500", start_date, end_date)
     price_history_df = PriceDataFetcher.get_price_data(univ_spec)
@@ -49,6 +81,10 @@ def create_backtest_data(strategy_name, start_date, end_date):
         aum_leverage_df=aum_leverage_df,
         alpha_scores_df=alpha_scores_df,
         price_history_df=price_history_df,
+        allocator=allocator,
+        side_mode=side_mode,
+        rebalance_mode=rebalance_mode,
+        turnover_costs=turnover_costs,
     )
 
 
@@ -65,7 +101,7 @@ class BackTestUtil:
         WHERE trade_open_date = (
             SELECT MAX(trade_open_date)
             FROM {table_name}
-            WHERE date(trade_open_date) < date(:rebalance_date)
+            WHERE trade_open_date < :rebalance_date
             AND strategy_name = :strategy_name
         )
         AND strategy_name = :strategy_name
@@ -73,7 +109,7 @@ class BackTestUtil:
 
         # Initialize parameters dictionary
         params = {
-            "rebalance_date": str(pd.Timestamp(rebalance_date).date()),
+            "rebalance_date": DataAccessUtil.to_db_date(rebalance_date),
             "strategy_name": strategy_name,
         }
 
@@ -86,6 +122,157 @@ class BackTestUtil:
         df = DataAccessUtil.fetch_data_from_db(stmt, params)
         return df
 
+    @staticmethod
+    def get_open_trades(strategy_name, rebalance_date):
+        """Trades opened before rebalance_date that have not been closed."""
+        table_name = TableNames.TRADE_BOOKING.value
+        stmt = text(
+            f"""
+            SELECT *
+            FROM {table_name}
+            WHERE strategy_name = :strategy_name
+            AND trade_open_date < :rebalance_date
+            AND trade_close_date IS NULL
+            """
+        )
+        params = {
+            "rebalance_date": DataAccessUtil.to_db_date(rebalance_date),
+            "strategy_name": strategy_name,
+        }
+        df = DataAccessUtil.fetch_data_from_db(stmt, params)
+        if not df.empty:
+            # The NULL closing columns come back as objects
+            df["trade_close_date"] = pd.to_datetime(df["trade_close_date"])
+            df["trade_close_price"] = df["trade_close_price"].astype(float)
+        return df
+
+    @staticmethod
+    def get_open_books(strategy_name, rebalance_date):
+        """
+        Every trade opened on the dates before rebalance_date that still have
+        open trades, including the trades of those dates that have been closed.
+        A ledger seeded with these rows holds complete books for the open dates
+        it flushes.
+        """
+        table_name = TableNames.TRADE_BOOKING.value
+        stmt = text(
+            f"""
+            SELECT *
+            FROM {table_name}
+            WHERE strategy_name = :strategy_name
+            AND trade_open_date IN (
+                SELECT DISTINCT trade_open_date
+                FROM {table_name}
+                WHERE strategy_name = :strategy_name
+                AND trade_open_date < :rebalance_date
+                AND trade_close_date IS NULL
+            )
+            """
+        )
+        params = {
+            "rebalance_date": DataAccessUtil.to_db_date(rebalance_date),
+            "strategy_name": strategy_name,
+        }
+        df = DataAccessUtil.fetch_data_from_db(stmt, params)
+        if not df.empty:
+            df["trade_close_date"] = pd.to_datetime(df["trade_close_date"])
+            df["trade_close_price"] = df["trade_close_price"].astype(float)
+        return df
+
+    @staticmethod
+    def book_delta_trades(marked_trades_df, target_df):
+        """
+        Trade bookings that move the open positions to a target book.
+
+        Positions (ticker and direction) already at their target are left open.
+        A position that grows gets a new trade for the added shares. Any other
+        change closes all of its trades and, if shares remain, opens one trade
+        with the remaining shares at the rebalance price (a trade_booking row
+        can not be partially closed).
+
+        Args:
+            marked_trades_df: Open trades with the rebalance closing prices
+                filled in (fill_trade_closing_prices)
+            target_df: New book from RebalancePortfolio (signed shares)
+
+        Returns:
+            Tuple of (closed trades, opened trades, trades left open)
+        """
+        keys = ["ticker", "direction"]
+        held = marked_trades_df.groupby(keys)["shares"].sum()
+        if target_df.empty:
+            target = pd.Series(0, index=held.index[:0])
+        else:
+            target = target_df[target_df["shares"] != 0].groupby(keys)["shares"].sum()
+        held, target = held.align(target, fill_value=0)
+
+        changed = held != target
+        grows = changed & (held * target > 0) & (target.abs() > held.abs())
+        closing = pd.MultiIndex.from_frame(marked_trades_df[keys]).isin(
+            held.index[changed & ~grows & (held != 0)]
+        )
+        closed_df = marked_trades_df[closing]
+        # Without the price date merged in by fill_trade_closing_prices
+        still_open_df = marked_trades_df[~closing].drop(columns="date", errors="ignore")
+        still_open_df["trade_close_date"] = pd.NaT
+        still_open_df["trade_close_price"] = np.nan
+
+        opened_shares = target.where(~grows, target - held)[changed & (target != 0)]
+        opened_df = (
+            target_df.set_index(keys)
+            .loc[opened_shares.index]
+            .assign(shares=opened_shares.astype(int))
+            .reset_index()[target_df.columns]
+            if len(opened_shares)
+            else target_df.iloc[:0]
+        )
+        return closed_df, opened_df, still_open_df
+
+    @staticmethod
+    def group_by_date(df):
+        """
+        Splits a long (date, ticker, ...) frame into per-date frames, keyed by
+        Timestamp, so the rebalance loop slices one date instead of masking the
+        whole history on every iteration.
+        """
+        if df.empty:
+            return {}
+        return {
+            pd.Timestamp(date): group
+            for date, group in df.groupby(pd.to_datetime(df["date"]), sort=False)
+        }
+
+    @staticmethod
+    def matrix_by_date(price_matrix, dates):
+        """
+        Long (date, ticker, value) frames for the given dates taken from a price
+        matrix; tickers without a price on a date are left out, as in the table.
+        """
+        frames_by_date = {}
+        for date_val in dates:
+            date_ts = pd.Timestamp(date_val)
+            try:
+                row = price_matrix.row(date_ts)
+            except KeyError:
+                continue
+            priced = ~np.isnan(row)
+            frames_by_date[date_ts] = pd.DataFrame(
+                {
+                    "date": date_ts,
+                    "ticker": price_matrix.tickers[priced],
+                    "value": row[priced],
+                }
+            )
+        return frames_by_date
+
+    @staticmethod
+    def select_date_tickers(frames_by_date, rebalance_date, tickers, columns):
+        """Rows of one date restricted to the given tickers (empty frame if none)."""
+        day_df = frames_by_date.get(pd.Timestamp(rebalance_date))
+        if day_df is None:
+            return pd.DataFrame(columns=columns)
+        return day_df[day_df["ticker"].isin(tickers)]
+
     @staticmethod
     def fill_trade_closing_prices(
         previous_rebal_trades_df, trade_closing_prices_df, rebalance_date
@@ -103,9 +290,50 @@ class BackTestUtil:
 
 
 class BackTest:
-    def __init__(self, backtest_data):
+    def __init__(
+        self,
+        backtest_data,
+        write_through=False,
+        ledger=None,
+        flush=True,
+        initial_rebalance_date=None,
+    ):
         # Store the backtest_data in the instance
         self.backtest_data = backtest_data
+        # write_through=True reads and writes trade_booking on every rebalance (the
+        # original behaviour). By default positions are carried in a PositionLedger
+        # and written once at the end of the run. A pre-seeded ledger can be passed
+        # in, and flush=False leaves writing it to the caller.
+        self.write_through = write_through
+        self.ledger = ledger
+        self.flush = flush
+        # Only the initial rebalance is sized from the AUM. A resumed run passes the
+        # original one so its first (new) rebalance is sized from the carried book.
+        self.initial_rebalance_date = initial_rebalance_date
+
+    def _get_previous_rebalance_data(self, strategy_name, rebalance_date):
+        if self.write_through:
+            return BackTestUtil.get_previous_rebalance_data(
+                strategy_name, rebalance_date
+            )
+        return self.ledger.get_previous_rebalance_data(rebalance_date)
+
+    def _get_open_trades(self, strategy_name, rebalance_date):
+        if self.write_through:
+            return BackTestUtil.get_open_trades(strategy_name, rebalance_date)
+        return self.ledger.get_open_trades(rebalance_date)
+
+    def _record_trades(self, trades_df):
+        if self.write_through:
+            update_trades(trades_df)
+        else:
+            self.ledger.record_trades(trades_df)
+
+    def _record_optimizer_log(self, rows):
+        if self.write_through:
+            store_optimizer_log(pd.DataFrame(rows))
+        else:
+            self.ledger.record_optimizer_log(rows)
 
     def run_backtest(self):
         # Extract required data items from the BackTestData object
@@ -118,9 +346,43 @@ class BackTest:
         if alpha_scores_df.empty:
             print(" No Alpha scores for this strategy and for given dates.")
             return
+        if backtest_data.rebalance_mode not in REBALANCE_MODES:
+            raise ValueError(
+                f"Unknown rebalance mode '{backtest_data.rebalance_mode}', "
+                f"expected one of {REBALANCE_MODES}"
+            )
+        delta_mode = backtest_data.rebalance_mode == "delta"
 
         unique_dates = np.sort(alpha_scores_df["date"].unique())
-        initial_rebalance_date = unique_dates[0]
+        initial_rebalance_date = pd.Timestamp(
+            unique_dates[0]
+            if self.initial_rebalance_date is None
+            else self.initial_rebalance_date
+        )
+
+        # Index the inputs by date once; each rebalance then only touches its own rows
+        if backtest_data.price_matrix is not None:
+            prices_by_date = BackTestUtil.matrix_by_date(
+                backtest_data.price_matrix, unique_dates
+            )
+        else:
+            prices_by_date = BackTestUtil.group_by_date(price_history)
+        alpha_scores_by_date = BackTestUtil.group_by_date(alpha_scores_df)
+        capital_schedule = RebalanceUtil.build_capital_schedule(aum_leverage_df)
+
+        if not self.write_through and self.ledger is None:
+            # Seed the ledger with the book open before the backtest window
+            self.ledger = PositionLedger(strategy_name)
+            self.ledger.record_trades(
+                BackTestUtil.get_open_books(strategy_name, unique_dates[0])
+                if delta_mode
+                else BackTestUtil.get_previous_rebalance_data(
+                    strategy_name, unique_dates[0]
+                )
+            )
+        if delta_mode:
+            # The open positions are carried from one rebalance to the next
+            open_trades_df = self._get_open_trades(strategy_name, unique_dates[0])
 
         for rebalance_date in unique_dates:
             print(rebalance_date)
@@ -130,25 +392,36 @@ class BackTest:
             ):
                 print(rebalance_date)
 
-            prev_rebalance_trade_data = BackTestUtil.get_previous_rebalance_data(
-                strategy_name, rebalance_date
+            prev_rebalance_trade_data = (
+                open_trades_df
+                if delta_mode
+                else self._get_previous_rebalance_data(strategy_name, rebalance_date)
             )
             prev_rebalance_tickers = np.unique(prev_rebalance_trade_data["ticker"])
-            current_rebalance_alpha_scores_df = alpha_scores_df[
-                alpha_scores_df["date"] == rebalance_date
+            alpha_scores_current_rebalance_df = alpha_scores_by_date[
+                pd.Timestamp(rebalance_date)
             ]
             current_rebalance_tickers = np.unique(
-                current_rebalance_alpha_scores_df["ticker"]
+                alpha_scores_current_rebalance_df["ticker"]
             )
+            if delta_mode:
+                # Held names leaving the book are priced to be sold
+                current_rebalance_tickers = np.union1d(
+                    current_rebalance_tickers, prev_rebalance_tickers
+                )
 
-            prev_rebalance_closing_prices = price_history[
-                price_history["date"].isin([rebalance_date])
-                & price_history["ticker"].isin(prev_rebalance_tickers)
-            ]
-            new_rebalance_opening_prices = price_history[
-                price_history["date"].isin([rebalance_date])
-                & price_history["ticker"].isin(current_rebalance_tickers)
-            ]
+            prev_rebalance_closing_prices = BackTestUtil.select_date_tickers(
+                prices_by_date,
+                rebalance_date,
+                prev_rebalance_tickers,
+                PRICE_COLUMNS,
+            )
+            new_rebalance_opening_prices = BackTestUtil.select_date_tickers(
+                prices_by_date,
+                rebalance_date,
+                current_rebalance_tickers,
+                PRICE_COLUMNS,
+            )
 
             closed_trades_df = BackTestUtil.fill_trade_closing_prices(
                 prev_rebalance_trade_data, prev_rebalance_closing_prices, rebalance_date
@@ -161,50 +434,78 @@ class BackTest:
             )
 
             new_notional = RebalanceUtil.get_new_portfolio_notional(
-                aum_leverage_df,
+                capital_schedule,
                 rebalance_date,
                 closing_value_prev_rebal,
-                initial_rebalance_date == rebalance_date,
+                initial_rebalance_date == pd.Timestamp(rebalance_date),
             )
 
-            alpha_scores_current_rebalance_df = alpha_scores_df[
-                alpha_scores_df["date"] == rebalance_date
-            ]
-
             rebalance_data = create_rebalance_data(
                 strategy_name,
                 rebalance_date,
                 alpha_scores_current_rebalance_df,
                 new_rebalance_opening_prices,
                 new_notional,
+                backtest_data.allocator,
+                backtest_data.solver_chain,
+                backtest_data.side_mode,
+                prev_rebalance_trade_data if delta_mode else None,
+                backtest_data.turnover_costs,
             )
 
             rb = RebalancePortfolio(rebalance_data)
             new_portfolio = rb.rebalance_portfolio()
+            self._record_optimizer_log(rb.optimizer_log)
 
-            update_trades(closed_trades_df)
-            update_trades(new_portfolio)
+            if delta_mode:
+                closed_trades_df, new_portfolio, open_trades_df = (
+                    BackTestUtil.book_delta_trades(closed_trades_df, new_portfolio)
+                )
+                open_trades_df = pd.concat(
+                    [open_trades_df, new_portfolio], ignore_index=True
+                )
+            self._record_trades(closed_trades_df)
+            self._record_trades(new_portfolio)
         else:
             # Close the last rebalance trades (as its back test it can't have opened trades).
-            prev_rebalance_closing_prices = price_history[
-                price_history["date"].isin([rebalance_date])
-                & price_history["ticker"].isin(current_rebalance_tickers)
-            ]
+            if delta_mode:
+                new_portfolio = open_trades_df
+                current_rebalance_tickers = np.unique(open_trades_df["ticker"])
+            prev_rebalance_closing_prices = BackTestUtil.select_date_tickers(
+                prices_by_date,
+                rebalance_date,
+                current_rebalance_tickers,
+                PRICE_COLUMNS,
+            )
             closed_trades_df = BackTestUtil.fill_trade_closing_prices(
                 new_portfolio, prev_rebalance_closing_prices, rebalance_date
             )
             closed_trades_df["trade_close_date"] = rebalance_date
-            update_trades(closed_trades_df)
+            self._record_trades(closed_trades_df)
+
+        if not self.write_through and self.flush:
+            rows_written = self.ledger.flush()
+            print(f"Stored {rows_written} trades for {strategy_name}")
+            # A delta book spans several open dates; resuming it is not supported
+            if not delta_mode:
+                BackTestCheckpointUtil.save_checkpoints(
+                    [
+                        BackTestCheckpoint.from_ledger(
+                            self.ledger,
+                            backtest_data.start_date,
+                            initial_rebalance_date,
+                        )
+                    ]
+                )
 
 
 if __name__ == "__main__":
+    from src.back_test.backtest_runner import run_backtests
+
     list_of_strategies = ["MinVol", "Mom_RoC"]
     start_date, end_date = "2024-01-01", "2025-01-15"
-    for strategy in list_of_strategies:
-        back_test_data = create_backtest_data(strategy, start_date, end_date)
-        bt = BackTest(back_test_data)
-        bt.run_backtest()
-
-    # Finally create the aggregated fund trades by aggregating all trades as part of "AggregatedFund"
+    # The strategies run in parallel on a shared price panel and their trades are
+    # written in one batch. The aggregated fund trades are then created by
+    # aggregating all trades as part of "AggregatedFund"
     # This is simplification for the purpose of building dashboard (choice between data duplication vs simplicity)
-    create_aggregated_fund_trades()
+    run_backtests(list_of_strategies, start_date, end_date)
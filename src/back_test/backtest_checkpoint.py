@@ -0,0 +1,232 @@
+import logging
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import inspect, text
+
+from src.data_access.crud_util import DataAccessUtil
+from src.data_access.sqllite_db_manager import TableNames, get_db_engine
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Relative tolerance when comparing a restored book with its checkpoint
+NOTIONAL_RTOL = 1e-9
+
+
+def book_gross_notional(book_df):
+    """Gross value of a book at its opening prices."""
+    if book_df.empty:
+        return 0.0
+    return float(
+        np.nansum(
+            np.abs(book_df["shares"].to_numpy(dtype=float))
+            * book_df["trade_open_price"].to_numpy(dtype=float)
+        )
+    )
+
+
+@dataclass
+class BackTestCheckpoint:
+    """
+    State needed to resume a strategy's backtest after its last rebalance.
+
+    The book opened on last_rebalance_date stays in trade_booking (closed at its
+    own opening prices, as every backtest leaves it); n_positions and
+    gross_notional identify it, so a resumed run can check it restored the same
+    positions before closing them at the next rebalance's prices.
+    initial_rebalance_date is the rebalance that was sized from the AUM rather
+    than from the previous book, and start_date the start of the original run
+    (the AUM flows are differenced from there).
+    """
+
+    strategy_name: str
+    start_date: pd.Timestamp
+    initial_rebalance_date: pd.Timestamp
+    last_rebalance_date: pd.Timestamp
+    n_positions: int
+    gross_notional: float
+
+    @classmethod
+    def from_ledger(cls, ledger, start_date, initial_rebalance_date):
+        """Checkpoint after the last book held by a PositionLedger."""
+        last_rebalance_date = ledger.open_dates[-1]
+        book_df = ledger.book(last_rebalance_date)
+        return cls(
+            strategy_name=ledger.strategy_name,
+            start_date=pd.Timestamp(start_date),
+            initial_rebalance_date=pd.Timestamp(initial_rebalance_date),
+            last_rebalance_date=pd.Timestamp(last_rebalance_date),
+            n_positions=len(book_df),
+            gross_notional=book_gross_notional(book_df),
+        )
+
+    def matches_book(self, book_df):
+        """True if book_df holds the positions this checkpoint was taken from."""
+        return len(book_df) == self.n_positions and np.isclose(
+            book_gross_notional(book_df), self.gross_notional, rtol=NOTIONAL_RTOL
+        )
+
+
+class BackTestCheckpointUtil:
+
+    @staticmethod
+    def save_checkpoints(checkpoints, engine=None):
+        """
+        Stores checkpoints, replacing the previous one of each strategy, in a
+        single transaction.
+
+        Args:
+            checkpoints: Iterable of BackTestCheckpoint
+            engine: SQLAlchemy database engine (optional, will use default if None)
+
+        Returns:
+            int: Number of checkpoints written
+        """
+        checkpoints = list(checkpoints)
+        if not checkpoints:
+            return 0
+        if engine is None:
+            engine = get_db_engine()
+
+        table_name = TableNames.BACKTEST_CHECKPOINTS.value
+        checkpoint_df = DataAccessUtil.normalize_date_columns(
+            pd.DataFrame([vars(checkpoint) for checkpoint in checkpoints])
+        )
+        checkpoint_df["updated_at"] = pd.Timestamp.now().isoformat(timespec="seconds")
+
+        with engine.begin() as conn:
+            if inspect(conn).has_table(table_name):
+                conn.execute(
+                    text(
+                        f"DELETE FROM {table_name} WHERE strategy_name = :strategy_name"
+                    ),
+                    [
+                        {"strategy_name": checkpoint.strategy_name}
+                        for checkpoint in checkpoints
+                    ],
+                )
+            checkpoint_df.to_sql(table_name, conn, if_exists="append", index=False)
+        return len(checkpoint_df)
+
+    @staticmethod
+    def load_checkpoint(strategy_name, engine=None):
+        """
+        The stored checkpoint of a strategy, or None if it has never been saved.
+        """
+        if engine is None:
+            engine = get_db_engine()
+        table_name = TableNames.BACKTEST_CHECKPOINTS.value
+        if not inspect(engine).has_table(table_name):
+            return None
+
+        stmt = text(
+            f"""
+            SELECT strategy_name, start_date, initial_rebalance_date,
+                   last_rebalance_date, n_positions, gross_notional
+            FROM {table_name}
+            WHERE strategy_name = :strategy_name
+            """
+        )
+        df = DataAccessUtil.fetch_data_from_db(
+            stmt, {"strategy_name": strategy_name}, engine=engine
+        )
+        if df.empty:
+            return None
+
+        row = df.iloc[0]
+        return BackTestCheckpoint(
+            strategy_name=row["strategy_name"],
+            start_date=pd.Timestamp(row["start_date"]),
+            initial_rebalance_date=pd.Timestamp(row["initial_rebalance_date"]),
+            last_rebalance_date=pd.Timestamp(row["last_rebalance_date"]),
+            n_positions=int(row["n_positions"]),
+            gross_notional=float(row["gross_notional"]),
+        )
+
+    @staticmethod
+    def get_last_closed_rebalance_date(strategy_name, engine=None):
+        """
+        Latest trade_open_date of a strategy whose trades all have a closing
+        price, or None if the strategy has no closed book.
+        """
+        if engine is None:
+            engine = get_db_engine()
+        table_name = TableNames.TRADE_BOOKING.value
+        if not inspect(engine).has_table(table_name):
+            return None
+
+        stmt = text(
+            f"""
+            SELECT trade_open_date
+            FROM {table_name}
+            WHERE strategy_name = :strategy_name
+            GROUP BY trade_open_date
+            HAVING COUNT(trade_close_price) = COUNT(*)
+            ORDER BY trade_open_date DESC
+            LIMIT 1
+            """
+        )
+        with engine.connect() as conn:
+            last_date = conn.execute(stmt, {"strategy_name": strategy_name}).scalar()
+        return None if last_date is None else pd.Timestamp(last_date)
+
+    @staticmethod
+    def get_book(strategy_name, open_date, engine=None):
+        """Trades of a strategy opened on open_date, as stored in trade_booking."""
+        stmt = text(
+            f"""
+            SELECT *
+            FROM {TableNames.TRADE_BOOKING.value}
+            WHERE strategy_name = :strategy_name
+            AND trade_open_date = :open_date
+            """
+        )
+        params = {
+            "strategy_name": strategy_name,
+            "open_date": DataAccessUtil.to_db_date(open_date),
+        }
+        return DataAccessUtil.fetch_data_from_db(stmt, params, engine=engine)
+
+    @staticmethod
+    def restore_book(strategy_name, engine=None):
+        """
+        Restores the state saved by the last run of a strategy.
+
+        The checkpoint is only used when it still describes the last fully closed
+        rebalance in trade_booking and the book stored for that date has the
+        checkpointed positions; otherwise (no checkpoint, trades rewritten by a
+        run that did not checkpoint, partial writes) None is returned and the
+        caller has to replay the backtest.
+
+        Returns:
+            (BackTestCheckpoint, book DataFrame), or None
+        """
+        checkpoint = BackTestCheckpointUtil.load_checkpoint(strategy_name, engine)
+        if checkpoint is None:
+            logger.info(f"No backtest checkpoint stored for {strategy_name}")
+            return None
+
+        last_closed = BackTestCheckpointUtil.get_last_closed_rebalance_date(
+            strategy_name, engine
+        )
+        if last_closed != checkpoint.last_rebalance_date:
+            logger.warning(
+                f"Checkpoint of {strategy_name} is at {checkpoint.last_rebalance_date:%Y-%m-%d} "
+                f"but the last closed rebalance in trade_booking is {last_closed}"
+            )
+            return None
+
+        book_df = BackTestCheckpointUtil.get_book(
+            strategy_name, checkpoint.last_rebalance_date, engine
+        )
+        if not checkpoint.matches_book(book_df):
+            logger.warning(
+                f"Book of {strategy_name} on {checkpoint.last_rebalance_date:%Y-%m-%d} "
+                f"({len(book_df)} positions, {book_gross_notional(book_df):,.2f} gross) "
+                f"does not match its checkpoint ({checkpoint.n_positions} positions, "
+                f"{checkpoint.gross_notional:,.2f} gross)"
+            )
+            return None
+        return checkpoint, book_df
@@ -0,0 +1,370 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from multiprocessing.shared_memory import SharedMemory
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from src.analytics.daily_pnl import refresh_daily_pnl
+from src.back_test.back_test import (BackTest, BackTestData, BackTestUtil,
+                                     create_backtest_data)
+from src.back_test.backtest_checkpoint import (BackTestCheckpoint,
+                                               BackTestCheckpointUtil)
+from src.back_test.create_aggregated_fund_trades import \
+    create_aggregated_fund_trades
+from src.back_test.position_ledger import PositionLedger
+from src.data_access.price_matrix import PriceMatrix
+from src.data_access.prices import PriceDataFetcher
+from src.data_access.schemas import UniverseSpec
+from src.rebalance.rebalance_portfolio import (DEFAULT_ALLOCATOR,
+                                               DEFAULT_REBALANCE_MODE,
+                                               DEFAULT_SIDE_MODE,
+                                               DEFAULT_TURNOVER_COSTS,
+                                               RebalanceUtil)
+
+# Price history fetched before the first re-processed rebalance when refreshing
+# the daily P&L after an incremental run (a week always holds a price date)
+DAILY_PNL_LOOKBACK = pd.Timedelta(days=7)
+
+
+@dataclass
+class SharedPriceMatrix:
+    """
+    Handle to a price panel stored in a multiprocessing.shared_memory block. Only
+    the block name and the (small) index arrays are pickled to the workers; the
+    values are mapped in place.
+    """
+
+    shm_name: str
+    shape: tuple
+    dates: np.ndarray
+    tickers: np.ndarray
+    key: str = "px_last"
+
+    def attach(self):
+        """Returns (shared memory block, PriceMatrix over it). Close the block when done."""
+        shm = SharedMemory(name=self.shm_name)
+        values = np.ndarray(self.shape, dtype=np.float64, buffer=shm.buf)
+        return shm, PriceMatrix(self.key, values, self.dates, self.tickers)
+
+
+@dataclass
+class StrategyTask:
+    backtest_data: BackTestData
+    ledger: PositionLedger
+    shared_prices: SharedPriceMatrix
+
+
+def _run_strategy(task: StrategyTask) -> PositionLedger:
+    """Process pool entry point: runs one strategy against the shared price panel."""
+    shm, price_matrix = task.shared_prices.attach()
+    try:
+        task.backtest_data.price_matrix = price_matrix
+        BackTest(task.backtest_data, ledger=task.ledger, flush=False).run_backtest()
+        return task.ledger
+    finally:
+        # Views into the block have to be released before it can be closed
+        task.backtest_data.price_matrix = None
+        del price_matrix
+        shm.close()
+
+
+def _seed_ledger(backtest_data):
+    ledger = PositionLedger(backtest_data.strategy_name)
+    alpha_scores_df = backtest_data.alpha_scores_df
+    if alpha_scores_df is not None and not alpha_scores_df.empty:
+        # Delta runs flush whole books for every open date they carry
+        get_trades = (
+            BackTestUtil.get_open_books
+            if backtest_data.rebalance_mode == "delta"
+            else BackTestUtil.get_previous_rebalance_data
+        )
+        ledger.record_trades(
+            get_trades(backtest_data.strategy_name, alpha_scores_df["date"].min())
+        )
+    return ledger
+
+
+def run_backtest_batch(
+    backtest_data_list: List[BackTestData],
+    price_matrix: PriceMatrix,
+    ledgers: List[PositionLedger],
+    workers: int = None,
+) -> List[PositionLedger]:
+    """
+    Runs several strategies in a process pool against one price panel placed in
+    shared memory. Nothing is written to the database.
+
+    Args:
+        backtest_data_list: One BackTestData per strategy (alpha scores and AUM)
+        price_matrix: Dates x tickers price panel used by every strategy
+        ledgers: Seeded PositionLedger per strategy, in the same order
+        workers: Number of worker processes (defaults to one per strategy, capped
+            at the CPU count)
+
+    Returns:
+        list of PositionLedger holding each strategy's trades
+    """
+    if workers is None:
+        workers = min(len(backtest_data_list), os.cpu_count() or 1)
+
+    shm = SharedMemory(create=True, size=max(price_matrix.values.nbytes, 1))
+    try:
+        shared_values = np.ndarray(price_matrix.shape, dtype=np.float64, buffer=shm.buf)
+        shared_values[:] = price_matrix.values
+        shared_prices = SharedPriceMatrix(
+            shm.name, price_matrix.shape, price_matrix.dates, price_matrix.tickers
+        )
+        # The panel travels through shared memory, not with the pickled task
+        tasks = [
+            StrategyTask(
+                replace(backtest_data, price_matrix=None, price_history_df=None),
+                ledger,
+                shared_prices,
+            )
+            for backtest_data, ledger in zip(backtest_data_list, ledgers)
+        ]
+
+        # spawn keeps SQLite connections and engine pools out of the children
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            return list(pool.map(_run_strategy, tasks))
+    finally:
+        del shared_values
+        shm.close()
+        shm.unlink()
+
+
+def run_backtests(
+    strategies,
+    start_date,
+    end_date,
+    workers=None,
+    aggregate=True,
+    allocator=DEFAULT_ALLOCATOR,
+    side_mode=DEFAULT_SIDE_MODE,
+    rebalance_mode=DEFAULT_REBALANCE_MODE,
+    turnover_costs=DEFAULT_TURNOVER_COSTS,
+):
+    """
+    Backtests several strategies in parallel. The price history is loaded once,
+    shared with the workers through shared memory, and all trades are written in
+    a single batch before the aggregated fund trades and the daily P&L are
+    rebuilt.
+
+    Args:
+        strategies: Strategy names
+        start_date: Backtest start date
+        end_date: Backtest end date
+        workers: Number of worker processes (see run_backtest_batch)
+        aggregate: Rebuild the AggregatedFund trades afterwards
+        allocator: Share allocator of the rebalances (see BackTestData)
+        side_mode: Long/short solve mode of the rebalances
+        rebalance_mode: "full" or "delta" (see REBALANCE_MODES)
+        turnover_costs: TurnoverCosts weighed by delta rebalances
+
+    Returns:
+        dict of strategy name -> PositionLedger
+    """
+    univ_spec = UniverseSpec("SP500", start_date, end_date)
+    price_history_df = PriceDataFetcher.get_price_data(univ_spec)
+    price_matrix = PriceMatrix.from_long_frame(price_history_df, "px_last")
+
+    backtest_data_list = [
+        BackTestData(
+            strategy_name=strategy,
+            univ_spec=univ_spec,
+            start_date=start_date,
+            end_date=end_date,
+            aum_leverage_df=RebalanceUtil.get_aum_leverage_data(
+                strategy, start_date, end_date
+            ),
+            alpha_scores_df=RebalanceUtil.get_alpha_scores(
+                strategy, start_date, end_date
+            ),
+            allocator=allocator,
+            side_mode=side_mode,
+            rebalance_mode=rebalance_mode,
+            turnover_costs=turnover_costs,
+        )
+        for strategy in strategies
+    ]
+    ledgers = [_seed_ledger(backtest_data) for backtest_data in backtest_data_list]
+
+    ledgers = run_backtest_batch(backtest_data_list, price_matrix, ledgers, workers)
+
+    rows_written = PositionLedger.flush_many(ledgers)
+    print(f"Stored {rows_written} trades for {len(ledgers)} strategies")
+    BackTestCheckpointUtil.save_checkpoints(
+        BackTestCheckpoint.from_ledger(
+            ledger, start_date, backtest_data.alpha_scores_df["date"].min()
+        )
+        for backtest_data, ledger in zip(backtest_data_list, ledgers)
+        if len(ledger)
+    )
+
+    daily_pnl_strategies = list(strategies)
+    if aggregate:
+        create_aggregated_fund_trades()
+        daily_pnl_strategies.append("AggregatedFund")
+    refresh_daily_pnl(daily_pnl_strategies, start_date, end_date, price_matrix)
+    return {ledger.strategy_name: ledger for ledger in ledgers}
+
+
+def _refresh_after_incremental_run(ledger, end_date, aggregate):
+    """
+    Rebuilds the AggregatedFund trades and the daily P&L from the first rebalance
+    an incremental run wrote onward, as run_backtests does after a full run.
+    """
+    start_date = ledger.open_dates[0]
+    # Books held into start_date only need a price date before it: whatever they
+    # made earlier lands on the panel's first row, which is not rewritten
+    price_history_df = PriceDataFetcher.get_price_data(
+        UniverseSpec("SP500", start_date - DAILY_PNL_LOOKBACK, end_date)
+    )
+    price_matrix = PriceMatrix.from_long_frame(price_history_df, "px_last")
+
+    daily_pnl_strategies = [ledger.strategy_name]
+    if aggregate:
+        create_aggregated_fund_trades()
+        daily_pnl_strategies.append("AggregatedFund")
+    refresh_daily_pnl(daily_pnl_strategies, start_date, end_date, price_matrix)
+
+
+def run_incremental_backtest(strategy_name, end_date, start_date=None, aggregate=True):
+    """
+    Brings a strategy's backtest up to end_date, processing only the rebalance
+    dates after its last checkpoint.
+
+    The book of the last fully closed rebalance is restored from trade_booking
+    and checked against the checkpoint; it is then closed at the next rebalance's
+    prices and the run continues exactly as the full backtest would. Without a
+    usable checkpoint the backtest is replayed from start_date (or from the
+    checkpoint's start date). The AggregatedFund trades and the daily P&L are
+    then rebuilt from the first re-processed rebalance onward.
+
+    Args:
+        strategy_name: Strategy to update
+        end_date: Last rebalance date to process
+        start_date: Start of the full replay when no checkpoint can be used
+        aggregate: Rebuild the AggregatedFund trades afterwards
+
+    Returns:
+        PositionLedger with the trades written by this run
+    """
+    restored = BackTestCheckpointUtil.restore_book(strategy_name)
+    if restored is None:
+        checkpoint = BackTestCheckpointUtil.load_checkpoint(strategy_name)
+        if start_date is None and checkpoint is None:
+            raise ValueError(
+                f"No backtest checkpoint for {strategy_name}, a start_date is "
+                "needed to run the full backtest"
+            )
+        start_date = start_date or checkpoint.start_date
+        print(f"Running full backtest of {strategy_name} from {start_date}")
+        backtest = BackTest(create_backtest_data(strategy_name, start_date, end_date))
+        backtest.run_backtest()
+        if len(backtest.ledger):
+            _refresh_after_incremental_run(backtest.ledger, end_date, aggregate)
+        return backtest.ledger
+
+    checkpoint, book_df = restored
+    ledger = PositionLedger(strategy_name)
+    ledger.record_trades(book_df)
+
+    resume_date = checkpoint.last_rebalance_date + pd.Timedelta(days=1)
+    alpha_scores_df = RebalanceUtil.get_alpha_scores(
+        strategy_name, resume_date, end_date
+    )
+    if alpha_scores_df.empty:
+        print(
+            f"{strategy_name} is up to date at "
+            f"{checkpoint.last_rebalance_date:%Y-%m-%d}"
+        )
+        return ledger
+
+    univ_spec = UniverseSpec("SP500", resume_date, end_date)
+    backtest_data = BackTestData(
+        strategy_name=strategy_name,
+        univ_spec=univ_spec,
+        start_date=checkpoint.start_date,
+        end_date=end_date,
+        # AUM flows are differenced over the whole run, as in the full backtest
+        aum_leverage_df=RebalanceUtil.get_aum_leverage_data(
+            strategy_name, checkpoint.start_date, end_date
+        ),
+        alpha_scores_df=alpha_scores_df,
+        price_history_df=PriceDataFetcher.get_price_data(univ_spec),
+    )
+    BackTest(
+        backtest_data,
+        ledger=ledger,
+        initial_rebalance_date=checkpoint.initial_rebalance_date,
+    ).run_backtest()
+    _refresh_after_incremental_run(ledger, end_date, aggregate)
+    return ledger
+
+
+def verify_incremental_backtest(strategy_name, end_date=None, rtol=1e-9):
+    """
+    Consistency check for incremental updates: replays the strategy from its
+    checkpoint's start date in memory and compares the result with the trades
+    stored in trade_booking.
+
+    Args:
+        strategy_name: Strategy to check
+        end_date: Last rebalance date (defaults to the checkpoint's)
+        rtol: Relative tolerance on shares and prices
+
+    Returns:
+        DataFrame of the trades that differ (empty when the stored trades match
+        the full rerun), with the replayed and stored values side by side
+    """
+    checkpoint = BackTestCheckpointUtil.load_checkpoint(strategy_name)
+    if checkpoint is None:
+        raise ValueError(f"No backtest checkpoint for {strategy_name}")
+    end_date = end_date or checkpoint.last_rebalance_date
+
+    backtest = BackTest(
+        create_backtest_data(strategy_name, checkpoint.start_date, end_date),
+        flush=False,
+    )
+    backtest.run_backtest()
+    replayed_df = backtest.ledger.trades
+    replayed_df = replayed_df[
+        replayed_df["trade_open_date"] >= checkpoint.initial_rebalance_date
+    ]
+
+    stored_df = pd.concat(
+        [
+            BackTestCheckpointUtil.get_book(strategy_name, open_date)
+            for open_date in replayed_df["trade_open_date"].unique()
+        ]
+        or [replayed_df.iloc[:0]],
+        ignore_index=True,
+    )
+    stored_df["trade_open_date"] = pd.to_datetime(stored_df["trade_open_date"])
+
+    compared = replayed_df.merge(
+        stored_df,
+        on=["trade_open_date", "ticker", "direction"],
+        how="outer",
+        suffixes=("_replayed", "_stored"),
+        indicator=True,
+    )
+    matches = compared["_merge"] == "both"
+    for column in ["shares", "trade_open_price", "trade_close_price"]:
+        matches &= np.isclose(
+            compared[f"{column}_replayed"].astype(float),
+            compared[f"{column}_stored"].astype(float),
+            rtol=rtol,
+            equal_nan=True,
+        )
+    matches &= pd.to_datetime(compared["trade_close_date_replayed"]).eq(
+        pd.to_datetime(compared["trade_close_date_stored"])
+    )
+    return compared[~matches].reset_index(drop=True)
@@ -0,0 +1,264 @@
+import itertools
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from src.analytics.back_test_summary import (BackTestSummaryAnalytics,
+                                             BackTestSummaryAnalyticsData)
+from src.analytics.trade_summary import get_pnl_time_series_from_trade_data
+from src.back_test.back_test import BackTestData
+from src.back_test.backtest_runner import run_backtest_batch
+from src.back_test.position_ledger import PositionLedger
+from src.data_access.price_matrix import PriceMatrix
+from src.data_access.prices import PriceDataFetcher
+from src.data_access.schemas import UniverseSpec
+from src.portfolio_construction.optimizers.create_portfolio_weights import \
+    construct_portfolio_weights
+from src.strategy.min_vol.min_vol import compute_min_vol_signal
+from src.strategy.momentum.roc_momentum import compute_roc_signal
+
+DEFAULT_RISK_FREE_RATE = 0.02
+# Prices loaded before the sweep start so the longest lookbacks are warmed up
+DEFAULT_HISTORY_MONTHS = 3
+
+# Tunable signal parameters per strategy (with the production defaults)
+SIGNAL_PARAMETERS = {
+    "Mom_RoC": {"ma_window": 5, "short_weeks": 1, "long_weeks": 3},
+    "MinVol": {"vol_window": 10},
+}
+CONSTRUCTION_PARAMETERS = {"top_n": 25}
+# Metrics of BackTestSummaryAnalytics.calculate_all_metrics, one sweep column each
+SUMMARY_METRICS = [
+    "Absolute Return",
+    "Annualized Return",
+    "Cumulative Return",
+    "Sharpe Ratio",
+    "Sortino Ratio",
+    "Information Ratio",
+    "Volatility",
+    "Beta",
+    "Alpha",
+    "Tracking Error",
+    "Maximum Drawdown",
+    "Calmar Ratio",
+]
+
+
+def _compute_signal(
+    strategy_name, stock_px_df, benchmark_px_df, signal_params, dates=None
+):
+    if strategy_name == "Mom_RoC":
+        return compute_roc_signal(stock_px_df, **signal_params, dates=dates)
+    return compute_min_vol_signal(
+        stock_px_df, benchmark_px_df, **signal_params, dates=dates
+    )
+
+
+def expand_param_grid(strategy_name: str, param_grid: Dict[str, list]) -> List[dict]:
+    """
+    Expands a grid ({parameter: [values]}) into one full parameter set per
+    combination; parameters not in the grid keep their production defaults.
+    """
+    if strategy_name not in SIGNAL_PARAMETERS:
+        raise ValueError(
+            f"Unknown strategy '{strategy_name}', expected one of {list(SIGNAL_PARAMETERS)}"
+        )
+    defaults = {**SIGNAL_PARAMETERS[strategy_name], **CONSTRUCTION_PARAMETERS}
+    unknown = set(param_grid) - set(defaults)
+    if unknown:
+        raise ValueError(
+            f"Unknown parameters for {strategy_name}: {sorted(unknown)}, "
+            f"expected some of {sorted(defaults)}"
+        )
+
+    names = list(param_grid)
+    return [
+        {**defaults, **dict(zip(names, values))}
+        for values in itertools.product(*(param_grid[name] for name in names))
+    ]
+
+
+def summarize_trades(trades_df, benchmark_px, risk_free_rate=DEFAULT_RISK_FREE_RATE):
+    """
+    BackTestSummaryAnalytics metrics for one backtest's trades.
+
+    Portfolio returns are the per-rebalance trade P&L over exposure (as on the
+    dashboards); the benchmark return is taken over the same holding period.
+
+    Returns:
+        dict of metric name -> value (NaN when there are fewer than two periods)
+    """
+    returns_df = get_pnl_time_series_from_trade_data(trades_df.copy())
+    if len(returns_df) < 2:
+        return dict.fromkeys(SUMMARY_METRICS, np.nan)
+
+    holding_periods = trades_df.groupby("trade_open_date")["trade_close_date"].first()
+    open_dates = pd.to_datetime(returns_df["trade_open_date"])
+    close_dates = pd.to_datetime(holding_periods.reindex(returns_df["trade_open_date"]))
+    benchmark_px = benchmark_px.sort_index()
+    benchmark_returns = (
+        benchmark_px.asof(close_dates).to_numpy()
+        / benchmark_px.asof(open_dates).to_numpy()
+        - 1
+    )
+
+    days_per_period = open_dates.diff().dt.days.median()
+    period_risk_free = (1 + risk_free_rate) ** (days_per_period / 365) - 1
+
+    summary_data = BackTestSummaryAnalyticsData(
+        pd.DataFrame(
+            {
+                "date": open_dates,
+                "portfolio_returns": returns_df["trade_pnl_pct"].to_numpy(),
+                "benchmark_returns": np.nan_to_num(benchmark_returns),
+                "risk_free_rate": period_risk_free,
+            }
+        )
+    )
+    metrics = BackTestSummaryAnalytics(summary_data).calculate_all_metrics()
+    return {
+        metric: value
+        for category in metrics.values()
+        for metric, value in category.items()
+    }
+
+
+def run_parameter_sweep(
+    strategy_name: str,
+    param_grid: Dict[str, list],
+    start_date,
+    end_date,
+    price_history_df: pd.DataFrame = None,
+    benchmark_df: pd.DataFrame = None,
+    aum_leverage_df: pd.DataFrame = None,
+    initial_aum: float = 1_000_000.0,
+    target_leverage: float = 2.0,
+    workers: int = None,
+) -> pd.DataFrame:
+    """
+    Backtests every parameter set of a grid without writing to the database.
+
+    Prices are loaded (or taken from the arguments) once; signals are computed
+    once per distinct set of signal parameters and shared by all construction
+    settings (top_n) that use them; the backtests run in a process pool on a
+    shared price panel with in-memory ledgers.
+
+    Args:
+        strategy_name: "Mom_RoC" or "MinVol"
+        param_grid: {parameter: [values]}, see SIGNAL_PARAMETERS and
+            CONSTRUCTION_PARAMETERS for the names
+        start_date: First rebalance date (signals use history before it)
+        end_date: Last rebalance date
+        price_history_df: Long (date, ticker, value) stock prices, loaded if None
+        benchmark_df: Long SP500 prices, loaded if None
+        aum_leverage_df: AUM/leverage schedule; by default a constant initial_aum
+            at target_leverage from the first rebalance
+        initial_aum: Starting AUM when aum_leverage_df is None
+        target_leverage: Leverage when aum_leverage_df is None
+        workers: Process pool size (see run_backtest_batch)
+
+    Returns:
+        DataFrame with one row per parameter set: the parameters followed by
+        the BackTestSummaryAnalytics metrics. df.attrs["signal_evaluations"]
+        holds the number of signal computations.
+    """
+    configs = expand_param_grid(strategy_name, param_grid)
+    signal_names = list(SIGNAL_PARAMETERS[strategy_name])
+
+    if price_history_df is None or benchmark_df is None:
+        history_spec = UniverseSpec(
+            "SP500",
+            (
+                pd.Timestamp(start_date) - pd.DateOffset(months=DEFAULT_HISTORY_MONTHS)
+            ).strftime("%Y-%m-%d"),
+            pd.Timestamp(end_date).strftime("%Y-%m-%d"),
+        )
+        price_history_df = PriceDataFetcher.get_price_data(history_spec)
+        benchmark_df = PriceDataFetcher.get_benchmark_data(history_spec)
+
+    price_matrix = PriceMatrix.from_long_frame(price_history_df, "px_last")
+    stock_px_df = price_matrix.to_frame()
+    benchmark_px_df = benchmark_df.pivot(index="date", columns="ticker", values="value")
+    benchmark_px_df.index = pd.to_datetime(benchmark_px_df.index)
+    rebalance_dates = pd.date_range(start_date, end_date, freq="W-FRI")
+
+    if aum_leverage_df is None:
+        aum_leverage_df = pd.DataFrame(
+            {
+                "date": rebalance_dates[:1],
+                "aum": initial_aum,
+                "target_leverage": target_leverage,
+            }
+        )
+
+    # One signal per distinct lookback setting, reused across construction params
+    signals = {}
+    backtest_data_list = []
+    for config_id, config in enumerate(configs):
+        signal_key = tuple(config[name] for name in signal_names)
+        if signal_key not in signals:
+            signal_df = _compute_signal(
+                strategy_name,
+                stock_px_df,
+                benchmark_px_df,
+                dict(zip(signal_names, signal_key)),
+                dates=rebalance_dates,
+            )
+            signals[signal_key] = signal_df[signal_df.index.isin(rebalance_dates)]
+
+        run_name = f"{strategy_name}_sweep_{config_id}"
+        alpha_scores_df = construct_portfolio_weights(
+            signals[signal_key], run_name, top_n=config["top_n"]
+        )
+        alpha_scores_df["date"] = pd.to_datetime(alpha_scores_df["date"])
+        backtest_data_list.append(
+            BackTestData(
+                strategy_name=run_name,
+                univ_spec=UniverseSpec("SP500", start_date, end_date),
+                start_date=start_date,
+                end_date=end_date,
+                aum_leverage_df=aum_leverage_df,
+                alpha_scores_df=alpha_scores_df,
+            )
+        )
+
+    ledgers = run_backtest_batch(
+        backtest_data_list,
+        price_matrix,
+        [PositionLedger(data.strategy_name) for data in backtest_data_list],
+        workers=workers,
+    )
+
+    benchmark_px = benchmark_px_df.iloc[:, 0].dropna()
+    rows = []
+    for config_id, (config, ledger) in enumerate(zip(configs, ledgers)):
+        trades_df = ledger.trades
+        metrics = (
+            summarize_trades(trades_df, benchmark_px)
+            if len(ledger)
+            else dict.fromkeys(SUMMARY_METRICS, np.nan)
+        )
+        rows.append(
+            {
+                "config_id": config_id,
+                "strategy_name": strategy_name,
+                **config,
+                "n_trades": len(trades_df),
+                **metrics,
+            }
+        )
+
+    results_df = pd.DataFrame(rows)
+    results_df.attrs["signal_evaluations"] = len(signals)
+    return results_df
+
+
+if __name__ == "__main__":
+    results = run_parameter_sweep(
+        "Mom_RoC",
+        {"ma_window": [3, 5, 10], "long_weeks": [3, 4, 6], "top_n": [10, 25, 50]},
+        "2024-01-01",
+        "2024-12-31",
+    )
+    print(results.sort_values("Sharpe Ratio", ascending=False).to_string())
@@ -0,0 +1,190 @@
+import bisect
+
+import pandas as pd
+from sqlalchemy import inspect, text
+
+from src.data_access.crud_util import DataAccessUtil
+from src.data_access.optimizer_log import write_optimizer_log
+from src.data_access.sqllite_db_manager import TableNames, get_db_engine
+
+TRADE_COLUMNS = [
+    "trade_open_date",
+    "ticker",
+    "shares",
+    "trade_open_price",
+    "direction",
+    "trade_close_date",
+    "trade_close_price",
+    "strategy_name",
+]
+# A trade_booking row is identified by these columns (the keys update_trades deletes on)
+TRADE_ID_COLUMNS = ["strategy_name", "trade_open_date", "ticker", "direction"]
+
+
+class PositionLedger:
+    """
+    In-memory trade book for one strategy, used by BackTest instead of reading and
+    rewriting trade_booking on every rebalance.
+
+    Trades are grouped by trade_open_date. Recording a trade that is already in the
+    book replaces it, mirroring the delete and re-insert done by update_trades, so
+    the ledger ends up holding exactly the rows the write-through path would have
+    left in the table. flush() writes them in one transaction.
+
+    The solver attempts of the rebalances (optimizer_log rows) are carried along
+    and written by flush() as well.
+    """
+
+    def __init__(self, strategy_name):
+        self.strategy_name = strategy_name
+        self._books = {}
+        self._open_dates = []
+        self.optimizer_log = []
+
+    def __len__(self):
+        return sum(len(book) for book in self._books.values())
+
+    @property
+    def open_dates(self):
+        return list(self._open_dates)
+
+    @property
+    def trades(self):
+        """All booked trades ordered by trade_open_date."""
+        if not self._books:
+            return pd.DataFrame(columns=TRADE_COLUMNS)
+        return pd.concat(
+            [self._books[open_date] for open_date in self._open_dates],
+            ignore_index=True,
+        )
+
+    def book(self, open_date):
+        """Trades opened on open_date (empty frame if nothing was opened then)."""
+        book = self._books.get(pd.Timestamp(open_date))
+        if book is None:
+            return pd.DataFrame(columns=TRADE_COLUMNS)
+        return book.copy()
+
+    def record_trades(self, trades_df):
+        """
+        Adds or replaces trades (new positions or positions closed at a rebalance).
+
+        Args:
+            trades_df: DataFrame with the trade_booking columns
+        """
+        if trades_df is None or trades_df.empty:
+            return
+
+        # Closing prices are merged in from the price history and carry its date column
+        trades_df = trades_df.drop(columns=["date"], errors="ignore").copy()
+        trades_df["trade_open_date"] = pd.to_datetime(trades_df["trade_open_date"])
+        if "strategy_name" not in trades_df.columns:
+            trades_df["strategy_name"] = self.strategy_name
+
+        for open_date, book in trades_df.groupby("trade_open_date", sort=False):
+            existing = self._books.get(open_date)
+            if existing is None:
+                bisect.insort(self._open_dates, open_date)
+            else:
+                book = book.drop_duplicates(subset=TRADE_ID_COLUMNS, keep="last")
+                replaced = pd.MultiIndex.from_frame(existing[TRADE_ID_COLUMNS]).isin(
+                    pd.MultiIndex.from_frame(book[TRADE_ID_COLUMNS])
+                )
+                if not replaced.all():
+                    book = pd.concat([existing[~replaced], book], ignore_index=True)
+            self._books[open_date] = book.reset_index(drop=True)
+
+    def record_optimizer_log(self, rows):
+        """Adds solver attempt rows (dicts with the optimizer_log columns)."""
+        self.optimizer_log.extend(rows)
+
+    def get_previous_rebalance_data(self, rebalance_date):
+        """
+        In-memory equivalent of BackTestUtil.get_previous_rebalance_data: the trades
+        opened on the latest open date strictly before rebalance_date.
+        """
+        pos = bisect.bisect_left(self._open_dates, pd.Timestamp(rebalance_date)) - 1
+        if pos < 0:
+            return pd.DataFrame(columns=TRADE_COLUMNS)
+        return self._books[self._open_dates[pos]].copy()
+
+    def get_open_trades(self, rebalance_date):
+        """
+        In-memory equivalent of BackTestUtil.get_open_trades: the trades opened
+        before rebalance_date that have not been closed.
+        """
+        pos = bisect.bisect_left(self._open_dates, pd.Timestamp(rebalance_date))
+        if pos == 0:
+            return pd.DataFrame(columns=TRADE_COLUMNS)
+        trades_df = pd.concat(
+            [self._books[open_date] for open_date in self._open_dates[:pos]],
+            ignore_index=True,
+        )
+        return trades_df[trades_df["trade_close_date"].isna()].reset_index(drop=True)
+
+    def flush(self, engine=None):
+        """
+        Writes every booked trade to trade_booking in a single transaction. Rows of
+        this strategy with the same trade_open_dates are replaced, so flushing the
+        same ledger twice leaves the table unchanged. The ledger therefore has to
+        hold the complete book of each of its open dates (see
+        BackTestUtil.get_open_books for seeding a delta run).
+
+        Args:
+            engine: SQLAlchemy database engine (optional, will use default if None)
+
+        Returns:
+            int: Number of rows written
+        """
+        return PositionLedger.flush_many([self], engine=engine)
+
+    @staticmethod
+    def flush_many(ledgers, engine=None):
+        """
+        Writes the trades of several ledgers (e.g. one per strategy), followed by
+        their optimizer logs, in a single transaction. See flush().
+
+        Args:
+            ledgers: Iterable of PositionLedger
+            engine: SQLAlchemy database engine (optional, will use default if None)
+
+        Returns:
+            int: Number of rows written
+        """
+        ledgers = list(ledgers)
+        if engine is None:
+            engine = get_db_engine()
+        log_df = pd.DataFrame(
+            [row for ledger in ledgers for row in ledger.optimizer_log]
+        )
+
+        ledgers = [ledger for ledger in ledgers if len(ledger)]
+        table_name = TableNames.TRADE_BOOKING.value
+        delete_stmt = text(
+            f"DELETE FROM {table_name} "
+            "WHERE strategy_name = :strategy_name AND trade_open_date = :trade_open_date"
+        )
+        delete_params = [
+            {
+                "strategy_name": ledger.strategy_name,
+                "trade_open_date": DataAccessUtil.to_db_date(open_date),
+            }
+            for ledger in ledgers
+            for open_date in ledger.open_dates
+        ]
+
+        rows_written = 0
+        with engine.begin() as conn:
+            if ledgers:
+                trades_df = DataAccessUtil.normalize_date_columns(
+                    pd.concat([ledger.trades for ledger in ledgers], ignore_index=True)
+                )
+                if inspect(conn).has_table(table_name):
+                    conn.execute(delete_stmt, delete_params)
+                trades_df.to_sql(
+                    table_name, conn, if_exists="append", index=False, chunksize=100_000
+                )
+                rows_written = len(trades_df)
+            # The solver attempts are only kept if their trades are stored
+            write_optimizer_log(conn, log_df)
+        return rows_written
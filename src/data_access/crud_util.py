@@ -3,7 +3,8 @@ import logging
 import pandas as pd
 from sqlalchemy import text
 
-from src.data_access.sqllite_db_manager import get_db_engine
+from src.data_access.sqllite_db_manager import (DATE_COLUMN_NAMES,
+                                                DB_DATE_FORMAT, get_db_engine)
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -11,6 +12,42 @@ logger = logging.getLogger(__name__)
 
 class DataAccessUtil:
 
+    @staticmethod
+    def to_db_date(date_value):
+        """
+        Converts a date-like value to the canonical database date string.
+
+        Args:
+            date_value: str, date, datetime, numpy datetime64 or pandas Timestamp
+
+        Returns:
+            str: Date formatted as YYYY-MM-DD (None if date_value is None)
+        """
+        if date_value is None:
+            return None
+        return pd.Timestamp(date_value).strftime(DB_DATE_FORMAT)
+
+    @staticmethod
+    def normalize_date_columns(dataframe):
+        """
+        Returns a copy of the DataFrame with its known date columns converted to
+        the canonical database date strings (missing dates stay null).
+
+        Args:
+            dataframe: pandas DataFrame to be written to the database
+
+        Returns:
+            pandas DataFrame
+        """
+        date_columns = [col for col in dataframe.columns if col in DATE_COLUMN_NAMES]
+        if not date_columns:
+            return dataframe
+
+        dataframe = dataframe.copy()
+        for col in date_columns:
+            dataframe[col] = pd.to_datetime(dataframe[col]).dt.strftime(DB_DATE_FORMAT)
+        return dataframe
+
     @staticmethod
     def execute_statement(sql_query, params=None, engine=None):
         """
@@ -93,6 +130,7 @@ class DataAccessUtil:
             if engine is None:
                 engine = get_db_engine()
 
+            dataframe = DataAccessUtil.normalize_date_columns(dataframe)
             dataframe.to_sql(
                 name=table_name,
                 con=engine,
@@ -0,0 +1,119 @@
+import logging
+
+import pandas as pd
+from sqlalchemy import inspect, text
+
+from src.data_access.crud_util import DataAccessUtil
+from src.data_access.sqllite_db_manager import TableNames, get_db_engine
+
+logger = logging.getLogger(__name__)
+
+# One row per solver attempt of a rebalance side (see allocate_with_fallback)
+OPTIMIZER_LOG_COLUMNS = [
+    "strategy_name",
+    "date",
+    "direction",
+    "n_names",
+    "solver",
+    "time_limit",
+    "status",
+    "solve_seconds",
+    "objective",
+    "cash_left",
+    "selected",
+]
+
+
+def store_optimizer_log(log_df, engine=None):
+    """
+    Writes solver attempts in one transaction, replacing the stored attempts of
+    each strategy on the rebalance dates being written.
+
+    Returns:
+        int: Number of rows written
+    """
+    if log_df is None or log_df.empty:
+        return 0
+    if engine is None:
+        engine = get_db_engine()
+
+    with engine.begin() as conn:
+        return write_optimizer_log(conn, log_df)
+
+
+def write_optimizer_log(conn, log_df):
+    """
+    store_optimizer_log on an open connection, so the attempts can be written in
+    the same transaction as the trades they belong to.
+
+    Returns:
+        int: Number of rows written
+    """
+    if log_df is None or log_df.empty:
+        return 0
+
+    table_name = TableNames.OPTIMIZER_LOG.value
+    log_df = DataAccessUtil.normalize_date_columns(log_df[OPTIMIZER_LOG_COLUMNS].copy())
+    delete_stmt = text(
+        f"DELETE FROM {table_name} WHERE strategy_name = :strategy_name AND date = :date"
+    )
+    delete_params = [
+        {"strategy_name": strategy_name, "date": date}
+        for strategy_name, date in log_df[["strategy_name", "date"]]
+        .drop_duplicates()
+        .itertuples(index=False)
+    ]
+
+    if inspect(conn).has_table(table_name):
+        conn.execute(delete_stmt, delete_params)
+    log_df.to_sql(table_name, conn, if_exists="append", index=False)
+    logger.info(f"Stored {len(log_df)} optimizer log rows")
+    return len(log_df)
+
+
+def fetch_optimizer_log(
+    strategy_name=None, start_date=None, end_date=None, engine=None
+):
+    """
+    Stored solver attempts, optionally for one strategy and a date range (empty
+    frame if nothing has been logged).
+    """
+    if engine is None:
+        engine = get_db_engine()
+    table_name = TableNames.OPTIMIZER_LOG.value
+    if not inspect(engine).has_table(table_name):
+        return pd.DataFrame(columns=OPTIMIZER_LOG_COLUMNS)
+
+    conditions, params = [], {}
+    if strategy_name:
+        conditions.append("strategy_name = :strategy_name")
+        params["strategy_name"] = strategy_name
+    if start_date:
+        conditions.append("date >= :start_date")
+        params["start_date"] = DataAccessUtil.to_db_date(start_date)
+    if end_date:
+        conditions.append("date <= :end_date")
+        params["end_date"] = DataAccessUtil.to_db_date(end_date)
+
+    query = f"SELECT * FROM {table_name}"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY strategy_name, date"
+    return DataAccessUtil.fetch_data_from_db(text(query), params, engine=engine)
+
+
+def summarize_optimizer_log(log_df):
+    """
+    Per solver: attempts, wins (attempts whose allocation was used), failures
+    and solve time statistics, to tune the chain order and time limits.
+    """
+    summary = log_df.groupby("solver").agg(
+        attempts=("status", "size"),
+        wins=("selected", "sum"),
+        mean_seconds=("solve_seconds", "mean"),
+        p95_seconds=("solve_seconds", lambda seconds: seconds.quantile(0.95)),
+        max_seconds=("solve_seconds", "max"),
+        mean_objective=("objective", "mean"),
+    )
+    summary["failures"] = summary["attempts"] - summary["wins"]
+    return summary.sort_values("attempts", ascending=False)
@@ -0,0 +1,337 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from src.data_access.crud_util import DataAccessUtil
+from src.data_access.sqllite_db_manager import SQLLITE_DB_PATH, TableNames
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Wide matrices live next to the database, one set of files per key
+PRICE_MATRIX_DIR = SQLLITE_DB_PATH.parent / "price_matrix"
+PRICE_MATRIX_KEYS = ("px_last", "mcap", "wgt_in_benchmark")
+
+
+class PriceMatrix:
+    """
+    Dates x tickers float64 panel for one sp500_ts_data key.
+
+    On disk each key is stored as three .npy files: ``{key}.{generation}.npy``
+    with the values, ``{key}_dates.{generation}.npy`` (datetime64[D], sorted) and
+    ``{key}_tickers.{generation}.npy``, plus ``{key}_manifest.json`` naming the
+    current generation with its shape and index checksum. Loading
+    memory-maps the values, so opening a panel costs a few milliseconds and only
+    the slices that are touched get read. Row, column and date-range selections
+    return NumPy views into the mapped array; only arbitrary ticker subsets copy.
+    Missing observations are NaN.
+    """
+
+    def __init__(self, key: str, values: np.ndarray, dates, tickers):
+        self.key = key
+        self.values = values
+        self.dates = np.asarray(dates, dtype="datetime64[D]")
+        self.tickers = np.asarray(tickers, dtype=str)
+        if self.values.shape != (len(self.dates), len(self.tickers)):
+            raise ValueError(
+                f"values shape {self.values.shape} does not match "
+                f"{len(self.dates)} dates x {len(self.tickers)} tickers"
+            )
+        self._date_pos = {date: i for i, date in enumerate(self.dates.tolist())}
+        self._ticker_pos = {ticker: i for i, ticker in enumerate(self.tickers)}
+
+    def __repr__(self):
+        return f"PriceMatrix(key={self.key!r}, shape={self.values.shape})"
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    # ------------------------------------------------------------------
+    # Construction and persistence
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _paths(key: str, directory: Path, generation: str = None) -> Dict[str, Path]:
+        suffix = f".{generation}.npy" if generation else ".npy"
+        return {
+            "values": directory / f"{key}{suffix}",
+            "dates": directory / f"{key}_dates{suffix}",
+            "tickers": directory / f"{key}_tickers{suffix}",
+        }
+
+    @staticmethod
+    def _manifest_path(key: str, directory: Path) -> Path:
+        return directory / f"{key}_manifest.json"
+
+    @staticmethod
+    def _index_checksum(dates: np.ndarray, tickers: np.ndarray) -> str:
+        digest = hashlib.sha256(np.ascontiguousarray(dates).tobytes())
+        digest.update("\0".join(tickers.tolist()).encode())
+        return digest.hexdigest()
+
+    @classmethod
+    def from_long_frame(cls, df: pd.DataFrame, key: str) -> "PriceMatrix":
+        """
+        Builds a matrix from long (date, ticker, value) rows.
+
+        Args:
+            df: DataFrame with date, ticker and value columns
+            key: sp500_ts_data key the rows belong to
+
+        Returns:
+            PriceMatrix held in memory
+        """
+        wide = df.pivot_table(
+            index="date", columns="ticker", values="value", aggfunc="last"
+        ).sort_index()
+        wide.index = pd.to_datetime(wide.index)
+        return cls(
+            key=key,
+            values=np.ascontiguousarray(wide.to_numpy(dtype=np.float64)),
+            dates=wide.index.values.astype("datetime64[D]"),
+            tickers=wide.columns.astype(str),
+        )
+
+    @classmethod
+    def from_db(cls, key: str, engine=None) -> "PriceMatrix":
+        """
+        Builds a matrix for one key from the sp500_ts_data table.
+
+        Args:
+            key: sp500_ts_data key (px_last, mcap, wgt_in_benchmark)
+            engine: SQLAlchemy database engine (optional, will use default if None)
+
+        Returns:
+            PriceMatrix held in memory
+        """
+        stmt = text(
+            f"SELECT date, ticker, value FROM {TableNames.TS_DATA.value} "
+            "WHERE key = :key"
+        )
+        df = DataAccessUtil.fetch_data_from_db(stmt, {"key": key}, engine=engine)
+        if df.empty:
+            return cls(key, np.empty((0, 0)), [], [])
+        return cls.from_long_frame(df, key)
+
+    def save(self, directory: Optional[Path] = None) -> Path:
+        """
+        Writes the matrix and its index sidecars under a new generation name,
+        then swaps in the manifest pointing at them. The manifest is replaced
+        atomically and written last, so a crash at any point leaves readers on
+        a complete earlier generation; the files it no longer names are removed.
+
+        Args:
+            directory: Target directory (defaults to PRICE_MATRIX_DIR)
+
+        Returns:
+            Path to the values file
+        """
+        directory = Path(directory or PRICE_MATRIX_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        arrays = {
+            "values": np.ascontiguousarray(self.values, dtype=np.float64),
+            "dates": self.dates,
+            "tickers": self.tickers,
+        }
+        generation = uuid.uuid4().hex
+        paths = self._paths(self.key, directory, generation)
+        for name, path in paths.items():
+            with open(path, "wb") as f:
+                np.save(f, arrays[name], allow_pickle=False)
+                f.flush()
+                os.fsync(f.fileno())
+
+        manifest = {
+            "generation": generation,
+            "shape": list(arrays["values"].shape),
+            "index_checksum": self._index_checksum(self.dates, self.tickers),
+        }
+        manifest_path = self._manifest_path(self.key, directory)
+        previous = self._read_manifest(self.key, directory)
+        tmp_path = manifest_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(manifest))
+        os.replace(tmp_path, manifest_path)
+
+        # Readers that opened the previous manifest may still be loading its files
+        keep = [generation] + ([previous["generation"]] if previous else [])
+        self._remove_stale_files(self.key, directory, keep)
+        return paths["values"]
+
+    @classmethod
+    def _read_manifest(cls, key: str, directory: Path) -> Optional[dict]:
+        manifest_path = cls._manifest_path(key, directory)
+        if not manifest_path.exists():
+            return None
+        return json.loads(manifest_path.read_text())
+
+    @classmethod
+    def _remove_stale_files(cls, key: str, directory: Path, generations: list):
+        current = {
+            path
+            for generation in generations
+            for path in cls._paths(key, directory, generation).values()
+        }
+        stale = re.compile(
+            rf"{re.escape(key)}(_dates|_tickers)?(\.[0-9a-f]{{32}})?\.npy"
+        )
+        for path in directory.iterdir():
+            if path not in current and stale.fullmatch(path.name):
+                try:
+                    path.unlink()
+                except OSError:
+                    # Still mapped by a reader (Windows); removed by a later save
+                    logger.debug(f"Could not remove stale price matrix file {path}")
+
+    @classmethod
+    def load(
+        cls, key: str, directory: Optional[Path] = None, mmap_mode: Optional[str] = "r"
+    ) -> "PriceMatrix":
+        """
+        Opens a stored matrix, memory-mapping the values by default. The files
+        are checked against the manifest's shape and index checksum.
+
+        Args:
+            key: sp500_ts_data key
+            directory: Directory holding the files (defaults to PRICE_MATRIX_DIR)
+            mmap_mode: numpy mmap mode, None to read the values into memory
+
+        Returns:
+            PriceMatrix backed by the file
+        """
+        directory = Path(directory or PRICE_MATRIX_DIR)
+        # Stores written before the manifest was introduced have no generation
+        manifest = cls._read_manifest(key, directory)
+        paths = cls._paths(key, directory, manifest and manifest["generation"])
+        matrix = cls(
+            key=key,
+            values=np.load(paths["values"], mmap_mode=mmap_mode, allow_pickle=False),
+            dates=np.load(paths["dates"], allow_pickle=False),
+            tickers=np.load(paths["tickers"], allow_pickle=False),
+        )
+        if manifest is not None and (
+            list(matrix.shape) != manifest["shape"]
+            or cls._index_checksum(matrix.dates, matrix.tickers)
+            != manifest["index_checksum"]
+        ):
+            raise ValueError(
+                f"{key} price matrix in {directory} does not match its manifest"
+            )
+        return matrix
+
+    @classmethod
+    def exists(cls, key: str, directory: Optional[Path] = None) -> bool:
+        directory = Path(directory or PRICE_MATRIX_DIR)
+        if cls._manifest_path(key, directory).exists():
+            return True
+        return all(path.exists() for path in cls._paths(key, directory).values())
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    def date_index(self, date) -> int:
+        """Row position of a date, O(1). Raises KeyError if the date is not stored."""
+        return self._date_pos[pd.Timestamp(date).date()]
+
+    def ticker_index(self, ticker: str) -> int:
+        """Column position of a ticker, O(1). Raises KeyError if unknown."""
+        return self._ticker_pos[ticker]
+
+    def row(self, date) -> np.ndarray:
+        """Values of all tickers on a date (view)."""
+        return self.values[self.date_index(date)]
+
+    def column(self, ticker: str) -> np.ndarray:
+        """Full history of one ticker (strided view)."""
+        return self.values[:, self.ticker_index(ticker)]
+
+    def date_slice(self, start_date=None, end_date=None) -> "PriceMatrix":
+        """
+        Rows with start_date <= date <= end_date. Both bounds are optional and do
+        not have to be stored dates. The result shares memory with this matrix.
+        """
+        start = 0
+        stop = len(self.dates)
+        if start_date is not None:
+            start = np.searchsorted(
+                self.dates, np.datetime64(pd.Timestamp(start_date).date(), "D"), "left"
+            )
+        if end_date is not None:
+            stop = np.searchsorted(
+                self.dates, np.datetime64(pd.Timestamp(end_date).date(), "D"), "right"
+            )
+        return PriceMatrix(
+            self.key, self.values[start:stop], self.dates[start:stop], self.tickers
+        )
+
+    def select(self, tickers: Iterable[str]) -> "PriceMatrix":
+        """Subset of tickers in the given order (copies the selected columns)."""
+        tickers = list(tickers)
+        positions = [self._ticker_pos[ticker] for ticker in tickers]
+        return PriceMatrix(self.key, self.values[:, positions], self.dates, tickers)
+
+    def drop(self, tickers: Iterable[str]) -> "PriceMatrix":
+        """All tickers except the given ones (e.g. the SP500 benchmark)."""
+        excluded = set(tickers)
+        return self.select(t for t in self.tickers if t not in excluded)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Wide DataFrame (date index, ticker columns) over the same values."""
+        return pd.DataFrame(
+            self.values,
+            index=pd.DatetimeIndex(self.dates.astype("datetime64[ns]"), name="date"),
+            columns=pd.Index(self.tickers, name="ticker"),
+            copy=False,
+        )
+
+
+def refresh_price_matrices(
+    keys: Iterable[str] = PRICE_MATRIX_KEYS,
+    directory: Optional[Path] = None,
+    engine=None,
+) -> Dict[str, PriceMatrix]:
+    """
+    Rebuilds the stored matrices from sp500_ts_data. Called by the store scripts
+    after new rows are written so the wide store never lags the table.
+
+    Args:
+        keys: sp500_ts_data keys to rebuild
+        directory: Target directory (defaults to PRICE_MATRIX_DIR)
+        engine: SQLAlchemy database engine (optional, will use default if None)
+
+    Returns:
+        dict of key -> memory-mapped PriceMatrix
+    """
+    matrices = {}
+    for key in keys:
+        matrix = PriceMatrix.from_db(key, engine=engine)
+        if matrix.values.size == 0:
+            logger.warning(f"No {key} rows in sp500_ts_data, price matrix not written")
+            continue
+        matrix.save(directory)
+        matrices[key] = PriceMatrix.load(key, directory)
+        logger.info(f"Stored {key} price matrix with shape {matrix.shape}")
+    return matrices
+
+
+def load_price_matrix(
+    key: str = "px_last", directory: Optional[Path] = None, engine=None
+) -> PriceMatrix:
+    """
+    Opens the stored matrix for a key, building it from the database first if it
+    has not been written yet.
+    """
+    if not PriceMatrix.exists(key, directory):
+        refreshed = refresh_price_matrices([key], directory, engine=engine)
+        if key not in refreshed:
+            raise KeyError(f"No {key} data available to build a price matrix")
+        return refreshed[key]
+    return PriceMatrix.load(key, directory)
@@ -56,7 +56,36 @@ class PriceDataFetcher:
         )
 
     @staticmethod
-    def _fetch_data(spec: UniverseSpec, engine, ticker_condition: str) -> pd.DataFrame:
+    def get_ts_data(
+        spec: UniverseSpec, key: str = "px_last", benchmark: bool = False, engine=None
+    ) -> pd.DataFrame:
+        """
+        Fetch one sp500_ts_data key (px_last, mcap, wgt_in_benchmark) for the
+        stocks or for the benchmark based on the given specification.
+
+        Args:
+            spec: Universe specification with date ranges
+            key: sp500_ts_data key
+            benchmark: Fetch the benchmark (SP500) instead of the stocks
+            engine: SQLAlchemy database engine (optional, will use default if None)
+
+        Returns:
+            DataFrame with date, ticker, and value columns
+        """
+        if engine is None:
+            engine = get_db_engine()
+
+        ticker_condition = (
+            "ticker IN ('SP500')" if benchmark else "ticker NOT IN ('SP500')"
+        )
+        return PriceDataFetcher._fetch_data(
+            spec=spec, engine=engine, ticker_condition=ticker_condition, key=key
+        )
+
+    @staticmethod
+    def _fetch_data(
+        spec: UniverseSpec, engine, ticker_condition: str, key: str = "px_last"
+    ) -> pd.DataFrame:
         """
         Internal method to fetch data based on ticker condition.
 
@@ -64,6 +93,7 @@ class PriceDataFetcher:
             spec: Universe specification with date ranges
             engine: SQLAlchemy database engine
             ticker_condition: SQL condition for filtering tickers
+            key: sp500_ts_data key
 
         Returns:
             DataFrame with date, ticker, and value columns
@@ -74,36 +104,37 @@ class PriceDataFetcher:
         base_query = f"""
         SELECT date, ticker, value
         FROM {table_name}
-        WHERE key = 'px_last'
+        WHERE key = :key
           AND {ticker_condition}
         """
 
-        params = {}
+        params = {"key": key}
         conditions = []
 
-        # Apply date conditions using SQLite's date() function
+        # Dates are stored as ISO text, so plain range predicates can use the index
         if spec.start_date:
-            conditions.append("date(date) >= date(:start_date)")
-            params["start_date"] = spec.start_date
+            conditions.append("date >= :start_date")
+            params["start_date"] = DataAccessUtil.to_db_date(spec.start_date)
         if spec.end_date:
-            conditions.append("date(date) <= date(:end_date)")
-            params["end_date"] = spec.end_date
+            conditions.append("date <= :end_date")
+            params["end_date"] = DataAccessUtil.to_db_date(spec.end_date)
 
         if conditions:
             base_query += " AND " + " AND ".join(conditions)
 
         stmt = text(base_query)
-        df = DataAccessUtil.fetch_data_from_db(stmt, params)
+        df = DataAccessUtil.fetch_data_from_db(stmt, params, engine=engine)
         return df
 
     @staticmethod
-    def get_ticker_prices(tickers_list, query_date):
+    def get_ticker_prices(tickers_list, query_date, engine=None):
         """
         Fetch price data for unique tickers in trade_data on the rebalance date
 
         Parameters:
         tickers_list: unique_tickers_list (np array)
         query_date (datetime or str): Date for which to retrieve prices
+        engine: SQLAlchemy database engine (optional, will use default if None)
 
         Returns:
         DataFrame: Price data for the tickers on the specified date
@@ -118,12 +149,12 @@ class PriceDataFetcher:
         SELECT ticker, value 
         FROM {table_name}
         WHERE key = 'px_last' 
-        AND date(date) = date(:query_date)
+        AND date = :query_date
         AND ticker IN ({tickers_str})
         """
 
         # Initialize parameters dictionary (only for query_date)
-        params = {"query_date": pd.Timestamp(query_date).date().isoformat()}
+        params = {"query_date": DataAccessUtil.to_db_date(query_date)}
 
         # No additional conditions for this specific use case
         conditions = []
@@ -136,11 +167,12 @@ class PriceDataFetcher:
         stmt = text(base_query)
 
         # Execute query and return results
-        db_engine = get_db_engine()
+        if engine is None:
+            engine = get_db_engine()
 
         # Use your existing DataAccessUtil if compatible with text() objects
         # Otherwise, execute directly:
-        with db_engine.connect() as connection:
+        with engine.connect() as connection:
             result = connection.execute(stmt, params)
             df_prices = pd.DataFrame(result.fetchall(), columns=result.keys())
 
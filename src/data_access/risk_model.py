@@ -1,71 +1,155 @@
+import logging
+
+import numpy as np
+import pandas as pd
 from sqlalchemy import text
 
 from src.data_access.crud_util import DataAccessUtil
-from src.data_access.schemas import RiskModel
+from src.data_access.schemas import RiskModelStack
 from src.data_access.sqllite_db_manager import TableNames
 
+# Configure logging
+logger = logging.getLogger(__name__)
+
 
 class RiskModelDataUtil:
 
     @staticmethod
-    def _fetch_factor_exposures(date_val):
+    def _range_params(dates):
+        return {
+            "start_date": DataAccessUtil.to_db_date(dates.min()),
+            "end_date": DataAccessUtil.to_db_date(dates.max()),
+        }
+
+    @staticmethod
+    def _fetch_factor_exposures(dates):
         tbl_name = TableNames.RISK_FACTOR_EXPOSURES.value
 
         industry_query = f"""
         SELECT ie.date, ie.ticker, ie.factor, ie.exposure
         FROM {tbl_name} ie
-        WHERE date(ie.date) = date('{date_val}')
+        WHERE ie.date >= :start_date AND ie.date <= :end_date
         """
         query_string = text(industry_query)
-        factor_exposures = DataAccessUtil.fetch_data_from_db(query_string)
-
-        pivoted_df = factor_exposures.pivot_table(
-            index=["date", "ticker"],
-            columns="factor",
-            values="exposure",
-            aggfunc="first",  # In case there are duplicates
-        ).reset_index()
-        return pivoted_df
+        return DataAccessUtil.fetch_data_from_db(
+            query_string, RiskModelDataUtil._range_params(dates)
+        )
 
     @staticmethod
-    def _fetch_factor_covariance(date_val):
+    def _fetch_factor_covariance(dates):
         tbl_name = TableNames.RISK_FACTOR_COVARIANCE.value
 
         covariance_query = f"""
         SELECT fc.date, fc.factor_1, fc.factor_2, fc.covariance
         FROM {tbl_name} fc
-        WHERE date(fc.date) = date('{date_val}')
+        WHERE fc.date >= :start_date AND fc.date <= :end_date
         """
         query_string = text(covariance_query)
-        factor_covariance = DataAccessUtil.fetch_data_from_db(query_string)
-        factor_covariance_pivoted = factor_covariance.pivot(
-            index="factor_1", columns="factor_2", values="covariance"
+        return DataAccessUtil.fetch_data_from_db(
+            query_string, RiskModelDataUtil._range_params(dates)
         )
-        return factor_covariance_pivoted
 
     @staticmethod
-    def _fetch_sp_risk_residuals(date_val):
+    def _fetch_sp_risk_residuals(dates):
         tbl_name = TableNames.RISK_SPRISK_RESIDUALS.value
 
         sprisk_residuals_query = f"""
         SELECT sr.date, sr.ticker, sr.specific_risk, sr.residual
         FROM {tbl_name} sr
-        WHERE date(sr.date) = date('{date_val}')
+        WHERE sr.date >= :start_date AND sr.date <= :end_date
         """
         query_string = text(sprisk_residuals_query)
-        sprisk_residuals_df = DataAccessUtil.fetch_data_from_db(query_string)
+        return DataAccessUtil.fetch_data_from_db(
+            query_string, RiskModelDataUtil._range_params(dates)
+        )
 
-        return sprisk_residuals_df
+    @staticmethod
+    def _requested_rows(df, dates):
+        """Keeps the rows of a range query that fall on one of the requested dates."""
+        if df.empty:
+            return df
+        return df[df["date"].isin(dates)]
 
-    def fetch_risk_model(date_val):
-        factor_exposures = RiskModelDataUtil._fetch_factor_exposures(date_val)
-        factor_covar = RiskModelDataUtil._fetch_factor_covariance(date_val)
-        sp_risk = RiskModelDataUtil._fetch_sp_risk_residuals(date_val)
-        list_factors = list(factor_covar.columns.unique())
-        risk_model_obj = RiskModel(
-            date_val, list_factors, factor_exposures, factor_covar, sp_risk
+    @staticmethod
+    def fetch_risk_models(dates) -> RiskModelStack:
+        """
+        Loads the risk models for several dates with one range query per table
+        and stacks them into aligned arrays.
+
+        Args:
+            dates: Iterable of date-like values
+
+        Returns:
+            RiskModelStack with dates x tickers x factors exposures, dates x factors
+            x factors covariances and dates x tickers specific risk and residuals
+        """
+        dates = pd.DatetimeIndex(pd.to_datetime(list(dates))).unique().sort_values()
+        if dates.empty:
+            raise ValueError("fetch_risk_models needs at least one date")
+
+        exposures = RiskModelDataUtil._requested_rows(
+            RiskModelDataUtil._fetch_factor_exposures(dates), dates
+        )
+        covariance = RiskModelDataUtil._requested_rows(
+            RiskModelDataUtil._fetch_factor_covariance(dates), dates
+        )
+        sp_risk = RiskModelDataUtil._requested_rows(
+            RiskModelDataUtil._fetch_sp_risk_residuals(dates), dates
         )
-        return risk_model_obj
+
+        factor_values = [
+            exposures.get("factor", pd.Series(dtype=object)),
+            covariance.get("factor_1", pd.Series(dtype=object)),
+            covariance.get("factor_2", pd.Series(dtype=object)),
+        ]
+        factors = pd.Index(sorted(set().union(*(set(v) for v in factor_values))))
+        ticker_values = [
+            exposures.get("ticker", pd.Series(dtype=object)),
+            sp_risk.get("ticker", pd.Series(dtype=object)),
+        ]
+        tickers = pd.Index(sorted(set().union(*(set(v) for v in ticker_values))))
+
+        n_dates, n_tickers, n_factors = len(dates), len(tickers), len(factors)
+        exposure_tensor = np.full((n_dates, n_tickers, n_factors), np.nan)
+        covariance_stack = np.full((n_dates, n_factors, n_factors), np.nan)
+        specific_risk = np.full((n_dates, n_tickers), np.nan)
+        residuals = np.full((n_dates, n_tickers), np.nan)
+
+        if not exposures.empty:
+            exposure_tensor[
+                dates.get_indexer(exposures["date"]),
+                tickers.get_indexer(exposures["ticker"]),
+                factors.get_indexer(exposures["factor"]),
+            ] = exposures["exposure"].to_numpy(dtype=float)
+        if not covariance.empty:
+            covariance_stack[
+                dates.get_indexer(covariance["date"]),
+                factors.get_indexer(covariance["factor_1"]),
+                factors.get_indexer(covariance["factor_2"]),
+            ] = covariance["covariance"].to_numpy(dtype=float)
+        if not sp_risk.empty:
+            rows = dates.get_indexer(sp_risk["date"])
+            cols = tickers.get_indexer(sp_risk["ticker"])
+            specific_risk[rows, cols] = sp_risk["specific_risk"].to_numpy(dtype=float)
+            residuals[rows, cols] = sp_risk["residual"].to_numpy(dtype=float)
+
+        missing = np.isnan(covariance_stack).all(axis=(1, 2))
+        if missing.any():
+            logger.warning(f"No risk model stored for dates: {list(dates[missing])}")
+
+        return RiskModelStack(
+            dates=dates,
+            tickers=tickers,
+            factor_names=list(factors),
+            factor_exposures=exposure_tensor,
+            factor_covariance=covariance_stack,
+            specific_risk=specific_risk,
+            residuals=residuals,
+        )
+
+    @staticmethod
+    def fetch_risk_model(date_val):
+        return RiskModelDataUtil.fetch_risk_models([date_val]).risk_model(date_val)
 
 
 if __name__ == "__main__":
@@ -1,8 +1,12 @@
 from dataclasses import dataclass
 from typing import List, Optional, Union
 
+import numpy as np
 import pandas as pd
 
+# Rebalance schedule when a UniverseSpec sets no day_frequency
+DEFAULT_DAY_FREQUENCY = "W-FRI"
+
 
 @dataclass
 class UniverseSpec:
@@ -11,6 +15,17 @@ class UniverseSpec:
     end_date: Optional[str] = None
     day_frequency: Optional[str] = None
 
+    def rebalance_dates(self) -> pd.DatetimeIndex:
+        """
+        Rebalance schedule: dates of day_frequency (weekly on Friday by
+        default) between start_date and end_date.
+        """
+        return pd.date_range(
+            self.start_date,
+            self.end_date,
+            freq=self.day_frequency or DEFAULT_DAY_FREQUENCY,
+        )
+
 
 @dataclass
 class RiskModel:
@@ -19,3 +34,67 @@ class RiskModel:
     factor_exposures: pd.DataFrame
     factor_covariance: pd.DataFrame
     sp_risk_residuals: pd.DataFrame
+
+
+@dataclass
+class RiskModelStack:
+    """
+    Risk models for several dates stacked into aligned arrays. Missing entries
+    (ticker not covered on a date, date without a model) are NaN.
+
+    factor_exposures: dates x tickers x factors
+    factor_covariance: dates x factors x factors
+    specific_risk, residuals: dates x tickers
+    """
+
+    dates: pd.DatetimeIndex
+    tickers: pd.Index
+    factor_names: List[str]
+    factor_exposures: np.ndarray
+    factor_covariance: np.ndarray
+    specific_risk: np.ndarray
+    residuals: np.ndarray
+
+    def date_position(self, date_val) -> int:
+        return self.dates.get_loc(pd.Timestamp(date_val))
+
+    def risk_model(self, date_val) -> RiskModel:
+        """
+        Per-date RiskModel view in the frame layout of RiskModelDataUtil.fetch_risk_model.
+        """
+        pos = self.date_position(date_val)
+        date_ts = self.dates[pos]
+
+        exposures = self.factor_exposures[pos]
+        covered = ~np.isnan(exposures).all(axis=1)
+        factor_exposures = pd.DataFrame(
+            exposures[covered], columns=pd.Index(self.factor_names, name="factor")
+        )
+        factor_exposures.insert(0, "ticker", self.tickers[covered])
+        factor_exposures.insert(0, "date", date_ts)
+
+        factor_covariance = pd.DataFrame(
+            self.factor_covariance[pos],
+            index=pd.Index(self.factor_names, name="factor_1"),
+            columns=pd.Index(self.factor_names, name="factor_2"),
+        )
+
+        sp_covered = ~(
+            np.isnan(self.specific_risk[pos]) & np.isnan(self.residuals[pos])
+        )
+        sp_risk_residuals = pd.DataFrame(
+            {
+                "date": date_ts,
+                "ticker": self.tickers[sp_covered],
+                "specific_risk": self.specific_risk[pos][sp_covered],
+                "residual": self.residuals[pos][sp_covered],
+            }
+        )
+
+        return RiskModel(
+            date_val,
+            list(self.factor_names),
+            factor_exposures,
+            factor_covariance,
+            sp_risk_residuals,
+        )
@@ -1,11 +1,16 @@
 import logging
+import sys
+import threading
+from contextlib import contextmanager
 from enum import Enum
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterator, Optional, Tuple
 
-from sqlalchemy import (Column, Date, Float, Integer, MetaData, String, Table,
-                        create_engine, text)
+from sqlalchemy import (Column, Float, Integer, MetaData, String, Table,
+                        create_engine, event, text)
 from sqlalchemy.engine import Engine
+from sqlalchemy.pool import (NullPool, QueuePool, SingletonThreadPool,
+                             StaticPool)
 
 # Database path configuration
 SQLLITE_DB_PATH = Path(r"C:\CaseStudy\dbs\sp500_data.db")
@@ -29,6 +34,395 @@ class TableNames(Enum):
     RISK_FACTOR_COVARIANCE = "factor_covariance"
     RISK_FACTOR_EXPOSURES = "factor_exposures"
     RISK_SPRISK_RESIDUALS = "sprisk_residuals"
+    BACKTEST_CHECKPOINTS = "backtest_checkpoints"
+    DAILY_PNL = "daily_pnl"
+    OPTIMIZER_LOG = "optimizer_log"
+
+
+# Canonical on-disk form of every date column: ISO "YYYY-MM-DD" text. It sorts
+# lexicographically, so fetchers can filter with plain (index friendly) range
+# predicates instead of wrapping the column in SQLite's date() function.
+DB_DATE_FORMAT = "%Y-%m-%d"
+
+DATE_COLUMNS = {
+    TableNames.TS_DATA: ["date"],
+    TableNames.ALPHA_SCORES: ["date"],
+    TableNames.TRADE_BOOKING: ["trade_open_date", "trade_close_date"],
+    TableNames.AUM_LEVERAGE: ["date"],
+    TableNames.RISK_FACTOR_COVARIANCE: ["date"],
+    TableNames.RISK_FACTOR_EXPOSURES: ["date"],
+    TableNames.RISK_SPRISK_RESIDUALS: ["date"],
+    TableNames.BACKTEST_CHECKPOINTS: [
+        "start_date",
+        "initial_rebalance_date",
+        "last_rebalance_date",
+    ],
+    TableNames.DAILY_PNL: ["date"],
+    TableNames.OPTIMIZER_LOG: ["date"],
+}
+DATE_COLUMN_NAMES = {col for cols in DATE_COLUMNS.values() for col in cols}
+
+# Composite indexes matching the WHERE clauses of the data access fetchers
+TABLE_INDEXES = {
+    "ix_sp500_ts_data_key_date_ticker": (
+        TableNames.TS_DATA,
+        ["key", "date", "ticker"],
+    ),
+    "ix_sp500_ts_data_key_ticker_date": (
+        TableNames.TS_DATA,
+        ["key", "ticker", "date"],
+    ),
+    "ix_alpha_history_strategy_date": (
+        TableNames.ALPHA_SCORES,
+        ["strategy_name", "date"],
+    ),
+    "ix_trade_booking_strategy_open_date": (
+        TableNames.TRADE_BOOKING,
+        ["strategy_name", "trade_open_date"],
+    ),
+    "ix_aum_and_leverage_strategy_date": (
+        TableNames.AUM_LEVERAGE,
+        ["strategy_name", "date"],
+    ),
+    "ix_factor_exposures_date": (TableNames.RISK_FACTOR_EXPOSURES, ["date"]),
+    "ix_factor_covariance_date": (TableNames.RISK_FACTOR_COVARIANCE, ["date"]),
+    "ix_sprisk_residuals_date": (TableNames.RISK_SPRISK_RESIDUALS, ["date"]),
+    "ix_daily_pnl_strategy_date": (TableNames.DAILY_PNL, ["strategy_name", "date"]),
+    "ix_optimizer_log_strategy_date": (
+        TableNames.OPTIMIZER_LOG,
+        ["strategy_name", "date"],
+    ),
+}
+
+
+def _existing_tables(conn) -> set:
+    rows = conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'"))
+    return {row[0] for row in rows}
+
+
+def _normalize_date_columns(conn) -> None:
+    existing_tables = _existing_tables(conn)
+    for table, columns in DATE_COLUMNS.items():
+        if table.value not in existing_tables:
+            continue
+        for col in columns:
+            conn.execute(
+                text(
+                    f"""
+                    UPDATE {table.value}
+                    SET {col} = date({col})
+                    WHERE {col} IS NOT NULL
+                      AND date({col}) IS NOT NULL
+                      AND {col} != date({col})
+                    """
+                )
+            )
+
+
+def _create_indexes(conn) -> None:
+    existing_tables = _existing_tables(conn)
+    for index_name, (table, columns) in TABLE_INDEXES.items():
+        if table.value not in existing_tables:
+            continue
+        conn.execute(
+            text(
+                f"CREATE INDEX IF NOT EXISTS {index_name} "
+                f"ON {table.value} ({', '.join(columns)})"
+            )
+        )
+
+
+def _create_indexes_and_analyze(conn) -> None:
+    _create_indexes(conn)
+    # Refresh planner statistics so SQLite picks the right composite index
+    conn.execute(text("ANALYZE"))
+
+
+# Versioned schema migrations, tracked through SQLite's PRAGMA user_version.
+# Append new steps with the next version number; never edit applied ones.
+SCHEMA_MIGRATIONS = [
+    (1, "Normalize date columns to ISO YYYY-MM-DD text", _normalize_date_columns),
+    (2, "Create composite indexes for the fetch paths", _create_indexes_and_analyze),
+]
+LATEST_SCHEMA_VERSION = SCHEMA_MIGRATIONS[-1][0]
+
+
+def get_schema_version(engine: Engine) -> int:
+    """
+    Get the schema version recorded in the database.
+
+    Args:
+        engine: SQLAlchemy engine
+
+    Returns:
+        int: Version of the last applied migration (0 for a new database)
+    """
+    with engine.connect() as conn:
+        return conn.execute(text("PRAGMA user_version")).scalar()
+
+
+MIGRATE_COMMAND = "python -m src.data_access.sqllite_db_manager migrate [db_path]"
+
+
+class SchemaVersionError(RuntimeError):
+    """Data was read from a database that has pending schema migrations."""
+
+
+def _reads_data(statement: str) -> bool:
+    # Catalog lookups (pandas/inspector table checks, the migrations) stay allowed
+    head = statement.lstrip()[:6].upper()
+    return head.startswith(("SELECT", "WITH")) and (
+        "sqlite_master" not in statement.lower()
+    )
+
+
+def _guard_schema_version(engine: Engine) -> Engine:
+    """
+    Makes data reads through the engine raise SchemaVersionError while the
+    database is behind LATEST_SCHEMA_VERSION. The fetchers compare canonical
+    "YYYY-MM-DD" strings, which on the dates of an unmigrated database would
+    silently match nothing (or drop the end of a range). Once a read finds the
+    schema current it is not checked again.
+    """
+    schema_current = threading.Event()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def check_schema_version(conn, cursor, statement, parameters, context, many):
+        if schema_current.is_set() or not _reads_data(statement):
+            return
+        version = cursor.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version >= LATEST_SCHEMA_VERSION:
+            schema_current.set()
+            return
+        raise SchemaVersionError(
+            f"{engine.url.database or 'in-memory database'} is at schema version "
+            f"{version} of {LATEST_SCHEMA_VERSION}; migrate it with "
+            f"DatabaseManager(db_path).migrate() or `{MIGRATE_COMMAND}`"
+        )
+
+    return engine
+
+
+def _stamp_new_databases(engine: Engine) -> Engine:
+    """
+    Starts databases created through the engine at the latest schema version:
+    a database without tables has nothing to migrate, and DataAccessUtil writes
+    canonical dates from the start.
+    """
+
+    @event.listens_for(engine, "connect")
+    def stamp_schema_version(dbapi_connection, connection_record):
+        version = dbapi_connection.execute("PRAGMA user_version").fetchone()[0]
+        n_tables = dbapi_connection.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table'"
+        ).fetchone()[0]
+        if version == 0 and n_tables == 0:
+            dbapi_connection.execute(f"PRAGMA user_version = {LATEST_SCHEMA_VERSION}")
+
+    return engine
+
+
+def apply_schema_migrations(engine: Engine) -> int:
+    """
+    Apply all pending schema migrations, each in its own transaction.
+
+    Migrations are an explicit step (DatabaseManager.migrate, the store scripts
+    or this module's command line); getting an engine never runs them.
+
+    Indexes are re-ensured on every call, since tables such as trade_booking may
+    only be created (by pandas.to_sql) after the index migration already ran.
+
+    Args:
+        engine: SQLAlchemy engine
+
+    Returns:
+        int: Schema version after the migrations
+    """
+    version = get_schema_version(engine)
+    for migration_version, description, migration_fn in SCHEMA_MIGRATIONS:
+        if migration_version <= version:
+            continue
+        with engine.begin() as conn:
+            migration_fn(conn)
+            conn.execute(text(f"PRAGMA user_version = {migration_version}"))
+        version = migration_version
+        logger.info(f"Applied schema migration {migration_version}: {description}")
+
+    with engine.begin() as conn:
+        _create_indexes(conn)
+    return version
+
+
+class PoolMode(Enum):
+    """Connection pooling strategies supported by the engine registry"""
+
+    QUEUE = "queue"  # Bounded pool shared by all threads (SQLAlchemy default)
+    THREAD_LOCAL = "thread_local"  # One connection per thread (Streamlit server)
+    NULL = "null"  # No pooling, a new connection per checkout
+
+
+class EngineRegistry:
+    """
+    Process-wide registry of SQLAlchemy engines keyed by database path.
+
+    Creating an engine is comparatively expensive, so every caller asking for the
+    same database (and access mode) shares a single pooled engine. The registry
+    can be configured once per process, e.g. read-only thread-local connections
+    for the dashboard, and tests can swap in an in-memory database with
+    ``use_engine``.
+    """
+
+    _engines: Dict[Tuple[str, bool], Engine] = {}
+    _lock = threading.RLock()
+    _override: Optional[Engine] = None
+    pool_mode: PoolMode = PoolMode.QUEUE
+    pool_size: int = 5
+    max_overflow: int = 10
+    read_only: bool = False
+
+    @classmethod
+    def configure(
+        cls,
+        pool_mode: Optional[PoolMode] = None,
+        pool_size: Optional[int] = None,
+        max_overflow: Optional[int] = None,
+        read_only: Optional[bool] = None,
+    ) -> None:
+        """
+        Set the process defaults used for engines created from now on.
+
+        Args:
+            pool_mode: Connection pooling strategy (PoolMode or its string value)
+            pool_size: Number of pooled connections kept open
+            max_overflow: Extra connections allowed beyond pool_size (queue mode)
+            read_only: Open databases through a read-only SQLite URI by default
+        """
+        with cls._lock:
+            if pool_mode is not None:
+                cls.pool_mode = PoolMode(pool_mode)
+            if pool_size is not None:
+                cls.pool_size = pool_size
+            if max_overflow is not None:
+                cls.max_overflow = max_overflow
+            if read_only is not None:
+                cls.read_only = read_only
+        logger.info(
+            f"Engine registry configured: pool_mode={cls.pool_mode.value}, "
+            f"pool_size={cls.pool_size}, read_only={cls.read_only}"
+        )
+
+    @classmethod
+    def get_engine(
+        cls, db_path: Optional[Path] = None, read_only: Optional[bool] = None
+    ) -> Engine:
+        """
+        Get the shared engine for a database, creating it on first use.
+
+        Args:
+            db_path: Path to the SQLite database file (defaults to SQLLITE_DB_PATH)
+            read_only: Override the registry default access mode
+
+        Returns:
+            SQLAlchemy engine
+        """
+        if cls._override is not None:
+            return cls._override
+
+        db_path = Path(db_path or SQLLITE_DB_PATH)
+        read_only = cls.read_only if read_only is None else read_only
+        key = (db_path.as_posix(), read_only)
+
+        engine = cls._engines.get(key)
+        if engine is not None:
+            return engine
+
+        with cls._lock:
+            engine = cls._engines.get(key)
+            if engine is None:
+                # Migrations of existing databases rewrite whole tables, so they
+                # are never run implicitly (see DatabaseManager.migrate); reads
+                # fail until they have been applied
+                engine = _guard_schema_version(cls._create_engine(db_path, read_only))
+                if not read_only:
+                    _stamp_new_databases(engine)
+                cls._engines[key] = engine
+        return engine
+
+    @classmethod
+    def _create_engine(cls, db_path: Path, read_only: bool) -> Engine:
+        if read_only:
+            url = f"sqlite:///file:{db_path.as_posix()}?mode=ro&uri=true"
+        else:
+            url = f"sqlite:///{db_path.as_posix()}"
+
+        if cls.pool_mode == PoolMode.QUEUE:
+            engine = create_engine(
+                url,
+                poolclass=QueuePool,
+                pool_size=cls.pool_size,
+                max_overflow=cls.max_overflow,
+                connect_args={"check_same_thread": False},
+            )
+        elif cls.pool_mode == PoolMode.THREAD_LOCAL:
+            engine = create_engine(
+                url, poolclass=SingletonThreadPool, pool_size=cls.pool_size
+            )
+        else:
+            engine = create_engine(url, poolclass=NullPool)
+
+        logger.info(
+            f"Created {'read-only ' if read_only else ''}engine for {db_path} "
+            f"({cls.pool_mode.value} pool)"
+        )
+        return engine
+
+    @staticmethod
+    def create_in_memory_engine() -> Engine:
+        """
+        Create an in-memory SQLite engine whose single connection is shared by all
+        callers, so tables created through one checkout are visible to the next.
+        The new database starts at the latest schema version.
+
+        Returns:
+            SQLAlchemy engine
+        """
+        engine = create_engine(
+            "sqlite://",
+            poolclass=StaticPool,
+            connect_args={"check_same_thread": False},
+        )
+        return _stamp_new_databases(_guard_schema_version(engine))
+
+    @classmethod
+    @contextmanager
+    def use_engine(cls, engine: Optional[Engine] = None) -> Iterator[Engine]:
+        """
+        Test hook: route every registry lookup to the given engine (a fresh
+        in-memory database by default) for the duration of the context.
+
+        Args:
+            engine: Engine to hand out instead of the registered ones
+
+        Yields:
+            The engine in use
+        """
+        engine = engine or cls.create_in_memory_engine()
+        with cls._lock:
+            previous = cls._override
+            cls._override = engine
+        try:
+            yield engine
+        finally:
+            with cls._lock:
+                cls._override = previous
+
+    @classmethod
+    def dispose_all(cls) -> None:
+        """Close all pooled connections and forget the registered engines."""
+        with cls._lock:
+            for engine in cls._engines.values():
+                engine.dispose()
+            cls._engines.clear()
 
 
 class DatabaseManager:
@@ -42,7 +436,7 @@ class DatabaseManager:
             db_path: Path to the SQLite database file
         """
         self.db_path = db_path or SQLLITE_DB_PATH
-        self.engine = create_engine(f"sqlite:///{self.db_path.as_posix()}")
+        self.engine = EngineRegistry.get_engine(self.db_path, read_only=False)
         self.metadata = MetaData()
         logger.info(f"Database manager initialized with database at {self.db_path}")
 
@@ -55,6 +449,40 @@ class DatabaseManager:
         """
         return self.engine
 
+    def get_schema_version(self) -> int:
+        """
+        Get the schema version recorded in the database.
+
+        Returns:
+            int: Version of the last applied migration (0 for a new database)
+        """
+        return get_schema_version(self.engine)
+
+    def migrate(self) -> int:
+        """
+        Apply pending schema migrations (date normalization, composite indexes).
+
+        Returns:
+            int: Schema version after the migrations
+        """
+        return apply_schema_migrations(self.engine)
+
+    def ensure_indexes(self) -> bool:
+        """
+        Create the fetch path indexes for all existing tables.
+
+        Returns:
+            bool: True if the indexes were created successfully or already exist
+        """
+        try:
+            with self.engine.begin() as conn:
+                _create_indexes(conn)
+            return True
+
+        except Exception as e:
+            logger.error(f"Error creating indexes: {str(e)}")
+            return False
+
     def create_table(self, table_name: str, columns_dict: dict) -> bool:
         """
         Generic method to create a table using SQLAlchemy ORM.
@@ -76,7 +504,7 @@ class DatabaseManager:
             # Create the table if it doesn't exist
             self.metadata.create_all(self.engine, tables=[table])
             logger.info(f"Table '{table_name}' successfully created or already exists")
-            return True
+            return self.ensure_indexes()
 
         except Exception as e:
             logger.error(f"Error creating table '{table_name}': {str(e)}")
@@ -99,7 +527,7 @@ class DatabaseManager:
                 conn.commit()
 
             logger.info(f"Table '{table_name}' created or already exists")
-            return True
+            return self.ensure_indexes()
 
         except Exception as e:
             logger.error(f"Error creating table '{table_name}': {str(e)}")
@@ -137,13 +565,13 @@ class DatabaseManager:
 
             # Define columns
             columns = {
-                "strategy": String,
-                "trade_open_date": Date,
+                "strategy_name": String,
+                "trade_open_date": String,
                 "ticker": String,
                 "shares": Integer,
                 "trade_open_price": Float,
                 "direction": String,
-                "trade_close_date": Date,
+                "trade_close_date": String,
                 "trade_close_price": Float,
             }
 
@@ -177,26 +605,56 @@ class DatabaseManager:
             logger.error(f"Error creating AUM and leverage table: {str(e)}")
             return False
 
+    def create_backtest_checkpoint_table(self) -> bool:
+        """
+        Create the backtest checkpoint table (one row per strategy).
+
+        Returns:
+            bool: True if table was created successfully or already exists
+        """
+        table_name = TableNames.BACKTEST_CHECKPOINTS.value
+        create_sql = f"""
+        CREATE TABLE IF NOT EXISTS {table_name} (
+            strategy_name TEXT PRIMARY KEY,
+            start_date TEXT,
+            initial_rebalance_date TEXT,
+            last_rebalance_date TEXT,
+            n_positions INTEGER,
+            gross_notional REAL,
+            updated_at TEXT
+        );
+        """
+        return self.create_table_sql(table_name, create_sql)
+
 
 # Utility function for backward compatibility
-def get_db_engine() -> Engine:
+def get_db_engine(
+    db_path: Optional[Path] = None, read_only: Optional[bool] = None
+) -> Engine:
     """
-    Get the default database engine.
+    Get the shared database engine from the process-wide registry.
+
+    Args:
+        db_path: Path to the SQLite database file (defaults to SQLLITE_DB_PATH)
+        read_only: Override the registry default access mode
 
     Returns:
         SQLAlchemy engine
     """
-    db_manager = DatabaseManager()
-    return db_manager.get_engine()
+    return EngineRegistry.get_engine(db_path, read_only=read_only)
 
 
-# Example usage
 if __name__ == "__main__":
-    db_manager = DatabaseManager()
-
-    # Create tables
-    alpha_success = db_manager.create_alpha_table()
-    # trade_success = db_manager.create_trade_booking_table()
-    success_flag = db_manager.create_aum_leverage_table()
-
-    print(f"Alpha table created: {success_flag}")
+    # python -m src.data_access.sqllite_db_manager [migrate] [db_path]
+    db_manager = DatabaseManager(Path(sys.argv[2]) if len(sys.argv) > 2 else None)
+    if len(sys.argv) > 1 and sys.argv[1] == "migrate":
+        print(f"Schema version: {db_manager.migrate()}")
+    else:
+        print(f"Schema version: {db_manager.get_schema_version()}")
+
+        # Create tables
+        alpha_success = db_manager.create_alpha_table()
+        # trade_success = db_manager.create_trade_booking_table()
+        success_flag = db_manager.create_aum_leverage_table()
+
+        print(f"Alpha table created: {success_flag}")
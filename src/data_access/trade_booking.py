@@ -20,12 +20,17 @@ def get_trade_and_sec_master_data(strategy_name, start_date, end_date):
         JOIN
             sp500_sec_master sm ON tb.ticker = sm.symbol
         WHERE
-            tb.strategy_name = "{strategy_name}"
-            AND date(tb.trade_open_date) {f"= date('{start_date}')" if end_date is None else f">= date('{start_date}') AND date(tb.trade_open_date) <= date('{end_date}')"}
+            tb.strategy_name = :strategy_name
+            AND {"tb.trade_open_date = :start_date" if end_date is None else "tb.trade_open_date >= :start_date AND tb.trade_open_date <= :end_date"}
     """
 
+    params = {
+        "strategy_name": strategy_name,
+        "start_date": DataAccessUtil.to_db_date(start_date),
+        "end_date": DataAccessUtil.to_db_date(end_date),
+    }
     query_string = text(sql_query)
-    trade_data_df = DataAccessUtil.fetch_data_from_db(query_string)
+    trade_data_df = DataAccessUtil.fetch_data_from_db(query_string, params)
     return trade_data_df
 
 
@@ -37,11 +42,8 @@ def update_trades(trades_df):
         # First rebalance, no previous trades to close.
         return
 
-    # needed to work with the date formatting's of sql alchemy. Can be improved later
-    if trades_df["trade_open_date"].dtype == "datetime64[ns]":
-        trades_df["trade_open_date"] = trades_df["trade_open_date"].dt.strftime(
-            "%Y-%m-%d %H:%M:%S"
-        )
+    # Dates are stored (and matched by the delete below) as ISO date strings
+    trades_df = DataAccessUtil.normalize_date_columns(trades_df)
 
     if "date" in trades_df.columns:
         trades_df = trades_df.drop("date", axis=1)
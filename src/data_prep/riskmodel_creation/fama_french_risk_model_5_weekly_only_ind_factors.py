@@ -1,25 +1,36 @@
+import multiprocessing
 import os
 import pickle
 import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
 
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-from sklearn.linear_model import LinearRegression
+
+from src.data_prep.riskmodel_creation.risk_model_artifacts import (
+    ARTIFACT_SUFFIX, LEGACY_SUFFIX, RiskModelArtifact)
 
 # Constants
 CACHE_DIR = "risk_model_cache"
 WEEKLY_MODELS_DIR = "weekly_risk_models_2024"
-FF12_CACHE_FILE = os.path.join(CACHE_DIR, "ff12_industries.pkl")
-SP500_CACHE_FILE = os.path.join(CACHE_DIR, "sp500_returns.pkl")
+# Formatted with the first and last date of the cached data
+FF12_CACHE_FILE = os.path.join(CACHE_DIR, "ff12_industries_{}_{}.pkl")
+SP500_CACHE_FILE = os.path.join(CACHE_DIR, "sp500_returns_{}_{}.pkl")
 DEFAULT_HALFLIFE = 60
-os.makedirs(CACHE_DIR, exist_ok=True)
-os.makedirs(WEEKLY_MODELS_DIR, exist_ok=True)
+WINDOW_DAYS = 252
+# Calendar days of returns each model is fitted on
+LOOKBACK_DAYS = WINDOW_DAYS + 30
+BUILD_MODES = ("serial", "parallel", "rolling")
+# Stocks missing more than this share of the window get no exposures
+MAX_MISSING_FRACTION = 0.25
 
 
 class RiskModelUtils:
     @staticmethod
     def save_as_pickle(data, filepath):
+        os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
         with open(filepath, "wb") as f:
             pickle.dump(data, f)
         print(f"Saved to {filepath}")
@@ -112,9 +123,13 @@ class IndustryFactorRiskModel:
 
     @classmethod
     def load(cls, filepath):
-        return RiskModelUtils.load_pickle(filepath)
+        data_dict = RiskModelUtils.load_pickle(filepath)
+        model = cls(as_of_date=data_dict["as_of_date"])
+        for name, value in data_dict.items():
+            setattr(model, name, value)
+        return model
 
-    def load_data(self, stock_returns, industry_factors, window_days=252):
+    def load_data(self, stock_returns, industry_factors, window_days=WINDOW_DAYS):
         start_date = self.as_of_date - pd.Timedelta(days=window_days + 30)
         self.stock_returns = stock_returns.loc[start_date : self.as_of_date]
         self.industry_factors = industry_factors.loc[start_date : self.as_of_date]
@@ -125,33 +140,54 @@ class IndustryFactorRiskModel:
         self.industry_factors = self.industry_factors.loc[common_dates]
 
     def estimate_exposures(self):
-        industry_exposures = pd.DataFrame(
-            index=self.stock_returns.columns, columns=self.industry_factors.columns
-        )
-        specific_risk = pd.Series(index=self.stock_returns.columns)
-        residuals = pd.DataFrame(
-            index=self.stock_returns.index, columns=self.stock_returns.columns
+        """
+        OLS of each stock's returns on an intercept and the industry factors
+        over the days it has returns. Stocks sharing the same missing days
+        (all of them, for stocks with a full history) are solved together in
+        one lstsq against the shared factor rows, so only stocks with a
+        ragged history are solved on their own.
+        """
+        returns = self.stock_returns.to_numpy(dtype=float)
+        n_days, n_stocks = returns.shape
+        X = np.column_stack(
+            [np.ones(n_days), self.industry_factors.to_numpy(dtype=float)]
         )
 
-        for stock in self.stock_returns.columns:
-            if self.stock_returns[stock].isna().sum() > len(self.stock_returns) * 0.25:
-                continue
-            y = self.stock_returns[stock].dropna()
-            X = self.industry_factors.loc[y.index].values
-            X = np.column_stack([np.ones(X.shape[0]), X])
-            model = LinearRegression(fit_intercept=False)
-            model.fit(X, y.values.reshape(-1, 1))
-            betas = model.coef_.flatten()[1:]
-            industry_exposures.loc[stock] = betas
-            pred = model.predict(X).flatten()
-            residuals.loc[y.index, stock] = y.values - pred
-            specific_risk[stock] = np.std(y.values - pred)
-
-        self.industry_exposures = industry_exposures
-        self.specific_risk = specific_risk
-        last_date = residuals.index[-1]
-        current_day_residuals = residuals.loc[[last_date]]
-        self.residuals = current_day_residuals
+        exposures = np.full((n_stocks, X.shape[1] - 1), np.nan)
+        specific_risk = np.full(n_stocks, np.nan)
+        residuals = np.full((n_days, n_stocks), np.nan)
+
+        has_return = ~np.isnan(returns)
+        fitted = np.flatnonzero(
+            (n_days - has_return.sum(axis=0)) <= n_days * MAX_MISSING_FRACTION
+        )
+        if len(fitted):
+            patterns, pattern_ids = np.unique(
+                has_return[:, fitted].T, axis=0, return_inverse=True
+            )
+            for pattern_id, rows in enumerate(patterns):
+                stocks = fitted[pattern_ids.ravel() == pattern_id]
+                y = returns[np.ix_(rows, stocks)]
+                betas = np.linalg.lstsq(X[rows], y, rcond=None)[0]
+                stock_residuals = y - X[rows] @ betas
+                exposures[stocks] = betas[1:].T
+                residuals[np.ix_(rows, stocks)] = stock_residuals
+                specific_risk[stocks] = stock_residuals.std(axis=0)
+
+        self.set_exposures(exposures, specific_risk, residuals[-1])
+
+    def set_exposures(self, exposures, specific_risk, last_residuals):
+        """Stores the (stocks x factors, stocks, stocks) estimates as frames."""
+        stocks = self.stock_returns.columns
+        self.industry_exposures = pd.DataFrame(
+            exposures, index=stocks, columns=self.industry_factors.columns
+        )
+        self.specific_risk = pd.Series(specific_risk, index=stocks)
+        self.residuals = pd.DataFrame(
+            last_residuals[None, :],
+            index=self.stock_returns.index[[-1]],
+            columns=stocks,
+        )
 
     def calculate_factor_covariance(self, half_life=DEFAULT_HALFLIFE):
         n = len(self.industry_factors)
@@ -172,65 +208,287 @@ class IndustryFactorRiskModel:
         self.calculate_factor_covariance(half_life=half_life)
 
 
-def generate_weekly_risk_models(start_date="2024-01-01", end_date="2024-12-31"):
-    sp500 = RiskModelUtils.get_or_cache_data(
-        SP500_CACHE_FILE, RiskModelDataFetcher.fetch_sp500_returns, start_date, end_date
-    )
-    ff12 = RiskModelUtils.get_or_cache_data(
-        FF12_CACHE_FILE,
-        RiskModelDataFetcher.fetch_ff12_industries,
-        start_date,
-        end_date,
-    )
+class RollingExposureMoments:
+    """
+    OLS sufficient statistics of every stock over a sliding window of days:
+    X'X, X'y, y'y and the day count, X being the intercept and the industry
+    factors on the days the stock has a return. Moving the window forward
+    adds the days entering it and subtracts the days leaving it, so a weekly
+    step costs O(days moved x stocks x factors^2) instead of a refit of the
+    whole window. The solve gives the same estimates as
+    IndustryFactorRiskModel.estimate_exposures on the window.
+    """
+
+    def __init__(self, stock_returns: np.ndarray, industry_factors: np.ndarray):
+        self.returns = stock_returns
+        self.X = np.column_stack([np.ones(len(industry_factors)), industry_factors])
+        n_stocks, n_coefs = stock_returns.shape[1], self.X.shape[1]
+        self.xtx = np.zeros((n_stocks, n_coefs, n_coefs))
+        self.xty = np.zeros((n_stocks, n_coefs))
+        self.yty = np.zeros(n_stocks)
+        self.count = np.zeros(n_stocks)
+        self.start = self.end = 0
+
+    def _accumulate(self, start, end, sign):
+        if end <= start:
+            return
+        y = self.returns[start:end]
+        has_return = ~np.isnan(y)
+        y = np.where(has_return, y, 0.0)
+        X = self.X[start:end]
+        outer = (X[:, :, None] * X[:, None, :]).reshape(end - start, -1)
+        self.xtx += sign * (has_return.T @ outer).reshape(self.xtx.shape)
+        self.xty += sign * (y.T @ X)
+        self.yty += sign * (y * y).sum(axis=0)
+        self.count += sign * has_return.sum(axis=0)
+
+    def move_to(self, start, end):
+        """Sets the window to rows [start, end) of the returns."""
+        if start < self.start or end < self.end or start >= self.end:
+            # Not a forward slide overlapping the current window: start over
+            self.xtx[:], self.xty[:], self.yty[:], self.count[:] = 0, 0, 0, 0
+            self._accumulate(start, end, 1)
+        else:
+            self._accumulate(self.end, end, 1)
+            self._accumulate(self.start, start, -1)
+        self.start, self.end = start, end
+
+    def solve(self):
+        """
+        Exposures (stocks x factors), specific risk and last-day residuals of
+        the window, NaN for stocks missing too many days.
+        """
+        n_days = self.end - self.start
+        n_stocks, n_coefs = self.xty.shape
+        exposures = np.full((n_stocks, n_coefs - 1), np.nan)
+        specific_risk = np.full(n_stocks, np.nan)
+        last_residuals = np.full(n_stocks, np.nan)
+
+        fitted = np.flatnonzero(n_days - self.count <= n_days * MAX_MISSING_FRACTION)
+        if len(fitted) == 0:
+            return exposures, specific_risk, last_residuals
+
+        xtx, xty, count = self.xtx[fitted], self.xty[fitted], self.count[fitted]
+        try:
+            betas = np.linalg.solve(xtx, xty[..., None])[..., 0]
+        except np.linalg.LinAlgError:
+            # Minimum-norm solutions, as lstsq gives on the window
+            betas = np.array(
+                [np.linalg.lstsq(a, b, rcond=None)[0] for a, b in zip(xtx, xty)]
+            )
+
+        # Residual sum of squares and mean from the moments
+        rss = self.yty[fitted] - np.einsum("ni,ni->n", betas, xty)
+        mean_residual = (xty[:, 0] - np.einsum("ni,ni->n", betas, xtx[:, 0])) / count
+        variance = np.clip(rss / count - mean_residual**2, 0, None)
+
+        exposures[fitted] = betas[:, 1:]
+        specific_risk[fitted] = np.sqrt(variance)
+        last_residuals[fitted] = (
+            self.returns[self.end - 1, fitted] - betas @ self.X[self.end - 1]
+        )
+        return exposures, specific_risk, last_residuals
 
-    fridays = RiskModelUtils.get_fridays_between_dates("2024-01-01", "2024-12-31")
-    summary = []
 
-    for date_str in fridays:
+def risk_model_dates(stock_returns_index, start_date, end_date) -> List[pd.Timestamp]:
+    """
+    Fridays between the dates, each moved back to the last day with returns.
+    Fridays after today are left out.
+    """
+    dates = []
+    for date_str in RiskModelUtils.get_fridays_between_dates(start_date, end_date):
         date = pd.Timestamp(date_str)
         if date > pd.Timestamp.now():
             continue
+        if date not in stock_returns_index:
+            earlier = stock_returns_index[stock_returns_index <= date]
+            if len(earlier) == 0:
+                continue
+            date = earlier[-1]
+        if date not in dates:
+            dates.append(date)
+    return dates
+
+
+def _build_model(as_of_date, stock_returns, industry_factors, half_life):
+    model = IndustryFactorRiskModel(as_of_date=as_of_date)
+    model.load_data(stock_returns, industry_factors)
+    model.build_complete_model(half_life=half_life)
+    return model
+
 
-        if date not in sp500.index:
-            date = sp500.index[sp500.index <= date][-1]
+# Returns histories of a process pool worker, set once by its initializer
+_worker_data = {}
 
-        model_path = os.path.join(
-            WEEKLY_MODELS_DIR, f"risk_model_{date.strftime('%Y-%m-%d')}.pkl"
+
+def _init_worker(stock_returns, industry_factors):
+    _worker_data["stock_returns"] = stock_returns
+    _worker_data["industry_factors"] = industry_factors
+
+
+def _build_model_in_worker(as_of_date, half_life):
+    return _build_model(
+        as_of_date,
+        _worker_data["stock_returns"],
+        _worker_data["industry_factors"],
+        half_life,
+    )
+
+
+def _build_rolling_models(stock_returns, industry_factors, as_of_dates, half_life):
+    common_dates = stock_returns.index.intersection(industry_factors.index)
+    moments = RollingExposureMoments(
+        stock_returns.loc[common_dates].to_numpy(dtype=float),
+        industry_factors.loc[common_dates].to_numpy(dtype=float),
+    )
+    models = {}
+    for as_of_date in sorted(as_of_dates):
+        model = IndustryFactorRiskModel(as_of_date=as_of_date)
+        model.load_data(stock_returns, industry_factors)
+        start = common_dates.searchsorted(model.stock_returns.index[0])
+        moments.move_to(start, start + len(model.stock_returns))
+        model.set_exposures(*moments.solve())
+        model.calculate_factor_covariance(half_life=half_life)
+        models[as_of_date] = model
+    return models
+
+
+def build_weekly_risk_models(
+    stock_returns,
+    industry_factors,
+    as_of_dates,
+    mode="rolling",
+    max_workers=None,
+    half_life=DEFAULT_HALFLIFE,
+) -> Dict[pd.Timestamp, IndustryFactorRiskModel]:
+    """
+    Builds one IndustryFactorRiskModel per date. All modes give the same
+    models (to floating-point rounding).
+
+    Args:
+        stock_returns: Daily stock returns (dates x tickers)
+        industry_factors: Daily industry factor returns (dates x factors)
+        as_of_dates: Model dates
+        mode: "serial" fits each model from scratch in turn, "parallel" fans
+            the dates out across a process pool, and "rolling" slides the
+            OLS sufficient statistics from one date to the next
+        max_workers: Worker processes of the parallel mode (defaults to the
+            CPU count)
+        half_life: Half-life, in days, of the factor covariance weights
+
+    Returns:
+        dict of as_of_date -> IndustryFactorRiskModel, in date order
+    """
+    if mode not in BUILD_MODES:
+        raise ValueError(f"mode must be one of {BUILD_MODES}, got {mode!r}")
+    as_of_dates = sorted(pd.Timestamp(date) for date in as_of_dates)
+
+    if mode == "rolling":
+        return _build_rolling_models(
+            stock_returns, industry_factors, as_of_dates, half_life
         )
-        if os.path.exists(model_path):
-            model = IndustryFactorRiskModel.load(model_path)
-        else:
-            model = IndustryFactorRiskModel(as_of_date=date)
-            model.load_data(sp500, ff12)
-            model.build_complete_model()
-            model.serialize_risk_model(model_path)
+    if mode == "serial" or len(as_of_dates) <= 1:
+        return {
+            date: _build_model(date, stock_returns, industry_factors, half_life)
+            for date in as_of_dates
+        }
+
+    workers = min(len(as_of_dates), max_workers or os.cpu_count() or 1)
+    # The histories are sent once per worker, not with every date
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(stock_returns, industry_factors),
+    ) as pool:
+        models = pool.map(
+            _build_model_in_worker,
+            as_of_dates,
+            [half_life] * len(as_of_dates),
+            chunksize=max(1, len(as_of_dates) // (4 * workers)),
+        )
+        return dict(zip(as_of_dates, models))
+
+
+def generate_weekly_risk_models(
+    start_date="2024-01-01",
+    end_date="2024-12-31",
+    mode="rolling",
+    max_workers=None,
+    models_dir=WEEKLY_MODELS_DIR,
+):
+    """
+    Builds the risk model of every Friday between the dates that models_dir
+    has no artifact for, saves it as a RiskModelArtifact (.npz) and writes a
+    summary of all of them to models_dir. Returns are fetched from
+    LOOKBACK_DAYS before start_date so the first models get a full window;
+    see build_weekly_risk_models for the modes.
+    """
+    data_start = (pd.Timestamp(start_date) - pd.Timedelta(days=LOOKBACK_DAYS)).strftime(
+        "%Y-%m-%d"
+    )
+    sp500 = RiskModelUtils.get_or_cache_data(
+        SP500_CACHE_FILE.format(data_start, end_date),
+        RiskModelDataFetcher.fetch_sp500_returns,
+        data_start,
+        end_date,
+    )
+    ff12 = RiskModelUtils.get_or_cache_data(
+        FF12_CACHE_FILE.format(data_start, end_date),
+        RiskModelDataFetcher.fetch_ff12_industries,
+        data_start,
+        end_date,
+    )
+
+    os.makedirs(models_dir, exist_ok=True)
+    artifact_paths = {
+        date: os.path.join(models_dir, f"risk_model_{date.strftime('%Y-%m-%d')}")
+        for date in risk_model_dates(sp500.index, start_date, end_date)
+    }
+    artifacts = {}
+    for date, path in artifact_paths.items():
+        # Models cached by earlier runs, as artifacts or legacy pickles
+        for cached_path in (path + ARTIFACT_SUFFIX, path + LEGACY_SUFFIX):
+            if os.path.exists(cached_path):
+                artifacts[date] = RiskModelArtifact.read(cached_path)
+                break
+    new_models = build_weekly_risk_models(
+        sp500,
+        ff12,
+        [date for date in artifact_paths if date not in artifacts],
+        mode=mode,
+        max_workers=max_workers,
+    )
+    for date, model in new_models.items():
+        artifacts[date] = RiskModelArtifact.from_model(model)
+        artifacts[date].save(artifact_paths[date] + ARTIFACT_SUFFIX)
 
+    summary = []
+    for date, artifact in sorted(artifacts.items()):
         stat = {
             "Date": date,
-            "Stocks_Count": model.stock_returns.shape[1],
-            "Valid_Stocks": model.industry_exposures.dropna(how="all").shape[0],
-            "Days_Used": len(model.stock_returns),
+            "Stocks_Count": len(artifact.tickers),
+            "Valid_Stocks": int(artifact.covered_tickers().sum()),
+            "Days_Used": artifact.n_days,
         }
 
         # Get industry correlations instead of market stats
-        if model.factor_covariance is not None:
-            corr = model.factor_covariance.corr().abs()
-            mask = ~np.eye(corr.shape[0], dtype=bool)
-            stat["Avg_Industry_Corr"] = corr.values[mask].mean()
-
-            # Get the industry with highest volatility
-            industry_vols = np.sqrt(np.diag(model.factor_covariance.values)) * np.sqrt(
-                252
-            )
-            max_vol_idx = np.argmax(industry_vols)
-            stat["Highest_Vol_Industry"] = model.factor_covariance.columns[max_vol_idx]
-            stat["Highest_Industry_Vol"] = industry_vols[max_vol_idx]
+        factor_covariance = artifact.factor_covariance_frame()
+        corr = factor_covariance.corr().abs()
+        mask = ~np.eye(corr.shape[0], dtype=bool)
+        stat["Avg_Industry_Corr"] = corr.values[mask].mean()
+
+        # Get the industry with highest volatility
+        industry_vols = np.sqrt(np.diag(factor_covariance.values)) * np.sqrt(252)
+        max_vol_idx = np.argmax(industry_vols)
+        stat["Highest_Vol_Industry"] = factor_covariance.columns[max_vol_idx]
+        stat["Highest_Industry_Vol"] = industry_vols[max_vol_idx]
 
         summary.append(stat)
 
     df_summary = pd.DataFrame(summary)
     df_summary.to_csv(
-        os.path.join(WEEKLY_MODELS_DIR, "weekly_models_summary.csv"), index=False
+        os.path.join(models_dir, "weekly_models_summary.csv"), index=False
     )
 
     plt.figure(figsize=(12, 8))
@@ -251,7 +509,7 @@ def generate_weekly_risk_models(start_date="2024-01-01", end_date="2024-12-31"):
         plt.grid(True)
 
     plt.tight_layout()
-    plt.savefig(os.path.join(WEEKLY_MODELS_DIR, "weekly_model_summary.png"))
+    plt.savefig(os.path.join(models_dir, "weekly_model_summary.png"))
     plt.show()
 
     return df_summary
@@ -0,0 +1,185 @@
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from src.data_access.crud_util import DataAccessUtil
+from src.data_access.sqllite_db_manager import TableNames
+
+ARTIFACT_SUFFIX = ".npz"
+LEGACY_SUFFIX = ".pkl"
+
+
+def infer_date_from_filename(filename):
+    """Date spelled by the digits of a risk_model_YYYY-MM-DD file name (or None)."""
+    digits = "".join(filter(str.isdigit, os.path.basename(filename)))
+    try:
+        return pd.Timestamp(datetime.strptime(digits, "%Y%m%d"))
+    except ValueError:
+        return None
+
+
+@dataclass
+class RiskModelArtifact:
+    """
+    Columnar form of one weekly IndustryFactorRiskModel: the arrays the
+    factor_exposures, factor_covariance and sprisk_residuals tables are
+    loaded from, stored in a single .npz file (plain arrays, no pickle).
+
+    exposures: tickers x factors (NaN rows for stocks without a fit)
+    factor_covariance: factors x factors
+    specific_risk, residuals: tickers (residuals of the as_of_date)
+    """
+
+    as_of_date: pd.Timestamp
+    tickers: np.ndarray
+    factors: np.ndarray
+    exposures: np.ndarray
+    factor_covariance: np.ndarray
+    specific_risk: np.ndarray
+    residuals: np.ndarray
+    n_days: int = 0
+
+    @classmethod
+    def from_frames(
+        cls,
+        as_of_date,
+        industry_exposures,
+        factor_covariance,
+        specific_risk,
+        residuals,
+        n_days=0,
+    ) -> "RiskModelArtifact":
+        """Aligns the frames of a model on its exposure tickers and factors."""
+        tickers = industry_exposures.index
+        factors = industry_exposures.columns
+        return cls(
+            as_of_date=pd.Timestamp(as_of_date),
+            tickers=tickers.to_numpy(dtype=str),
+            factors=factors.to_numpy(dtype=str),
+            exposures=industry_exposures.to_numpy(dtype=float),
+            factor_covariance=factor_covariance.reindex(
+                index=factors, columns=factors
+            ).to_numpy(dtype=float),
+            specific_risk=specific_risk.reindex(tickers).to_numpy(dtype=float),
+            residuals=residuals.iloc[-1].reindex(tickers).to_numpy(dtype=float),
+            n_days=n_days,
+        )
+
+    @classmethod
+    def from_model(cls, model) -> "RiskModelArtifact":
+        """Artifact of a built IndustryFactorRiskModel."""
+        return cls.from_frames(
+            model.as_of_date,
+            model.industry_exposures,
+            model.factor_covariance,
+            model.specific_risk,
+            model.residuals,
+            n_days=len(model.stock_returns),
+        )
+
+    @classmethod
+    def from_pickle(cls, filepath) -> "RiskModelArtifact":
+        """Artifact of a model pickled by IndustryFactorRiskModel.serialize_risk_model."""
+        data = pd.read_pickle(filepath)
+        as_of_date = data.get("as_of_date")
+        if as_of_date is None:
+            as_of_date = infer_date_from_filename(filepath)
+            if as_of_date is None:
+                raise ValueError(f"Date missing or unparseable for file: {filepath}")
+        stock_returns = data.get("stock_returns")
+        return cls.from_frames(
+            as_of_date,
+            data["industry_exposures"],
+            data["factor_covariance"],
+            data["specific_risk"],
+            data["residuals"],
+            n_days=0 if stock_returns is None else len(stock_returns),
+        )
+
+    def save(self, filepath) -> Path:
+        filepath = Path(filepath)
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(
+            filepath,
+            as_of_date=np.array(
+                self.as_of_date.to_datetime64(), dtype="datetime64[ns]"
+            ),
+            tickers=self.tickers,
+            factors=self.factors,
+            exposures=self.exposures,
+            factor_covariance=self.factor_covariance,
+            specific_risk=self.specific_risk,
+            residuals=self.residuals,
+            n_days=np.array(self.n_days),
+        )
+        return filepath
+
+    @classmethod
+    def load(cls, filepath) -> "RiskModelArtifact":
+        with np.load(filepath, allow_pickle=False) as npz:
+            return cls(
+                as_of_date=pd.Timestamp(npz["as_of_date"][()]),
+                tickers=npz["tickers"],
+                factors=npz["factors"],
+                exposures=npz["exposures"],
+                factor_covariance=npz["factor_covariance"],
+                specific_risk=npz["specific_risk"],
+                residuals=npz["residuals"],
+                n_days=int(npz["n_days"]),
+            )
+
+    @classmethod
+    def read(cls, filepath) -> "RiskModelArtifact":
+        """Loads an .npz artifact, or converts a legacy .pkl model."""
+        if Path(filepath).suffix == LEGACY_SUFFIX:
+            return cls.from_pickle(filepath)
+        return cls.load(filepath)
+
+    def covered_tickers(self) -> np.ndarray:
+        """Mask of the tickers with exposures."""
+        return ~np.isnan(self.exposures).all(axis=1)
+
+    def factor_covariance_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            self.factor_covariance, index=self.factors, columns=self.factors
+        )
+
+    def table_rows(self) -> Dict[str, list]:
+        """
+        Rows of the three risk model tables as tuples in table column order.
+        Tickers without exposures, or without specific risk and residual, get
+        no rows (the readers treat both the same as NULL rows).
+        """
+        date = DataAccessUtil.to_db_date(self.as_of_date)
+        n_factors = len(self.factors)
+
+        covered = self.covered_tickers()
+        exposure_rows = zip(
+            [date] * (int(covered.sum()) * n_factors),
+            np.repeat(self.tickers[covered], n_factors).tolist(),
+            np.tile(self.factors, int(covered.sum())).tolist(),
+            self.exposures[covered].ravel().tolist(),
+        )
+        covariance_rows = zip(
+            [date] * (n_factors * n_factors),
+            np.repeat(self.factors, n_factors).tolist(),
+            np.tile(self.factors, n_factors).tolist(),
+            self.factor_covariance.ravel().tolist(),
+        )
+        has_sp_risk = ~(np.isnan(self.specific_risk) & np.isnan(self.residuals))
+        sp_risk_rows = zip(
+            [date] * int(has_sp_risk.sum()),
+            self.tickers[has_sp_risk].tolist(),
+            self.specific_risk[has_sp_risk].tolist(),
+            self.residuals[has_sp_risk].tolist(),
+        )
+        return {
+            TableNames.RISK_FACTOR_EXPOSURES.value: list(exposure_rows),
+            TableNames.RISK_FACTOR_COVARIANCE.value: list(covariance_rows),
+            TableNames.RISK_SPRISK_RESIDUALS.value: list(sp_risk_rows),
+        }
@@ -0,0 +1,210 @@
+import logging
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from sqlalchemy import text
+
+from src.data_access.crud_util import DataAccessUtil
+from src.data_access.sqllite_db_manager import (TableNames,
+                                                apply_schema_migrations,
+                                                get_db_engine)
+from src.data_prep.riskmodel_creation.risk_model_artifacts import (
+    ARTIFACT_SUFFIX, LEGACY_SUFFIX, RiskModelArtifact)
+
+logger = logging.getLogger(__name__)
+
+RISK_MODEL_TABLES = {
+    TableNames.RISK_FACTOR_EXPOSURES.value: ("date", "ticker", "factor", "exposure"),
+    TableNames.RISK_FACTOR_COVARIANCE.value: (
+        "date",
+        "factor_1",
+        "factor_2",
+        "covariance",
+    ),
+    TableNames.RISK_SPRISK_RESIDUALS.value: (
+        "date",
+        "ticker",
+        "specific_risk",
+        "residual",
+    ),
+}
+
+RISK_MODEL_TABLE_DDL = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {TableNames.RISK_FACTOR_EXPOSURES.value} (
+        date TEXT,
+        ticker TEXT,
+        factor TEXT,
+        exposure REAL,
+        PRIMARY KEY (date, ticker, factor)
+    )
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS {TableNames.RISK_FACTOR_COVARIANCE.value} (
+        date TEXT,
+        factor_1 TEXT,
+        factor_2 TEXT,
+        covariance REAL,
+        PRIMARY KEY (date, factor_1, factor_2)
+    )
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS {TableNames.RISK_SPRISK_RESIDUALS.value} (
+        date TEXT,
+        ticker TEXT,
+        specific_risk REAL,
+        residual REAL,
+        PRIMARY KEY (date, ticker)
+    )
+    """,
+]
+
+
+@dataclass
+class RiskModelLoadReport:
+    files: int = 0
+    dates: int = 0
+    rows: Dict[str, int] = field(
+        default_factory=lambda: {table: 0 for table in RISK_MODEL_TABLES}
+    )
+    failed: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def total_rows(self) -> int:
+        return sum(self.rows.values())
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.total_rows / self.seconds if self.seconds else 0.0
+
+
+def find_risk_model_files(folder) -> List[Path]:
+    """
+    The .npz artifacts of a folder, plus the legacy .pkl models that have no
+    artifact of the same name.
+    """
+    folder = Path(folder)
+    artifacts = sorted(folder.glob(f"*{ARTIFACT_SUFFIX}"))
+    stems = {path.stem for path in artifacts}
+    legacy = [
+        path
+        for path in sorted(folder.glob(f"*{LEGACY_SUFFIX}"))
+        if path.stem not in stems
+    ]
+    return sorted(artifacts + legacy)
+
+
+def _read_rows(path) -> Tuple[Path, object]:
+    """(path, (as_of_date, table rows)) or (path, the exception raised)."""
+    try:
+        artifact = RiskModelArtifact.read(path)
+        return path, (artifact.as_of_date, artifact.table_rows())
+    except Exception as e:
+        return path, e
+
+
+def _read_all(paths, workers) -> Iterator[Tuple[Path, object]]:
+    """Read results in file order, decoded up to 2 x workers files ahead."""
+    if workers <= 1:
+        yield from map(_read_rows, paths)
+        return
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="read-risk-model"
+    ) as pool:
+        pending = deque()
+        for path in paths:
+            pending.append(pool.submit(_read_rows, path))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def store_risk_models(
+    paths: Iterable, engine=None, workers: int = 4
+) -> RiskModelLoadReport:
+    """
+    Loads risk model files (.npz artifacts or legacy .pkl models) into the
+    factor_exposures, factor_covariance and sprisk_residuals tables. Each
+    file is read once for all three tables, the rows already stored for its
+    date are replaced (reruns leave the tables unchanged), and everything is
+    written in a single transaction. Files that cannot be read are logged
+    and skipped.
+
+    Args:
+        paths: Risk model files
+        engine: Engine to write to (defaults to the shared database engine)
+        workers: Threads reading and decoding the files ahead of the writes
+
+    Returns:
+        RiskModelLoadReport with the row counts and rows per second
+    """
+    if engine is None:
+        engine = get_db_engine()
+    paths = list(paths)
+    report = RiskModelLoadReport()
+    start = time.perf_counter()
+
+    delete_sql = {
+        table: f"DELETE FROM {table} WHERE date = ?" for table in RISK_MODEL_TABLES
+    }
+    insert_sql = {
+        table: f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"VALUES ({', '.join('?' * len(columns))})"
+        for table, columns in RISK_MODEL_TABLES.items()
+    }
+    loaded_dates = set()
+    with engine.begin() as conn:
+        for ddl in RISK_MODEL_TABLE_DDL:
+            conn.execute(text(ddl))
+        for path, result in _read_all(paths, workers):
+            if isinstance(result, Exception):
+                logger.error(f"Skipping {path}: {result}")
+                report.failed.append(str(path))
+                continue
+            as_of_date, table_rows = result
+            db_date = DataAccessUtil.to_db_date(as_of_date)
+            for table, rows in table_rows.items():
+                conn.exec_driver_sql(delete_sql[table], (db_date,))
+                if rows:
+                    conn.exec_driver_sql(insert_sql[table], rows)
+                report.rows[table] += len(rows)
+            loaded_dates.add(as_of_date)
+            report.files += 1
+
+    # Indexes for tables created by this load
+    apply_schema_migrations(engine)
+
+    report.dates = len(loaded_dates)
+    report.seconds = time.perf_counter() - start
+    logger.info(
+        f"Stored {report.total_rows} risk model rows from {report.files} files "
+        f"({report.dates} dates) in {report.seconds:.2f}s, "
+        f"{report.rows_per_second:,.0f} rows/s; {len(report.failed)} files failed"
+    )
+    return report
+
+
+def store_risk_model_folder(folder, engine=None, workers=4) -> RiskModelLoadReport:
+    """Loads every risk model file of a folder (see store_risk_models)."""
+    return store_risk_models(find_risk_model_files(folder), engine, workers)
+
+
+if __name__ == "__main__":
+    # python -m src.data_prep.riskmodel_creation.store_risk_models_in_database
+    #     [models_folder] [db_path] [workers]
+    from src.data_prep.riskmodel_creation.fama_french_risk_model_5_weekly_only_ind_factors import \
+        WEEKLY_MODELS_DIR
+
+    models_folder = sys.argv[1] if len(sys.argv) > 1 else WEEKLY_MODELS_DIR
+    db_path = Path(sys.argv[2]) if len(sys.argv) > 2 else None
+    n_workers = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    store_risk_model_folder(
+        models_folder, engine=get_db_engine(db_path, read_only=False), workers=n_workers
+    )
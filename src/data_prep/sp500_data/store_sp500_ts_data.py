@@ -1,7 +1,13 @@
 import sqlite3
+from pathlib import Path
 
 import pandas as pd
 
+from src.data_access.price_matrix import refresh_price_matrices
+from src.data_access.sqllite_db_manager import (DB_DATE_FORMAT,
+                                                apply_schema_migrations,
+                                                get_db_engine)
+
 SQLITE_DB = r"C:\CaseStudy\dbs\sp500_data.db"
 SECURITY_TS_DATA = "sp500_ts_data"
 
@@ -33,8 +39,20 @@ def transform_csv_to_long_format(csv_file: str, key: str) -> pd.DataFrame:
 def store_dataframe_in_db(
     df: pd.DataFrame, db_file: str, table_name: str, mode: str = "replace"
 ):
+    # Store dates in the canonical ISO form used by the data access fetchers
+    df = df.assign(date=pd.to_datetime(df["date"]).dt.strftime(DB_DATE_FORMAT))
     with sqlite3.connect(db_file) as conn:
         df.to_sql(table_name, conn, if_exists=mode, index=False)
+    # Replaced tables lose their indexes, and older databases need migrating
+    apply_schema_migrations(get_db_engine(Path(db_file), read_only=False))
+
+    # Keep the memory-mapped wide matrices in sync with the long table
+    if table_name == SECURITY_TS_DATA:
+        refresh_price_matrices(
+            keys=df["key"].unique(),
+            directory=Path(db_file).parent / "price_matrix",
+            engine=get_db_engine(Path(db_file)),
+        )
 
 
 def store_benchmark_constituents_weights_in_db():
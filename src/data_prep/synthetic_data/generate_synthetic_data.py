@@ -0,0 +1,363 @@
+"""
+Deterministic synthetic market data for scale tests and benchmarks.
+
+Prices follow a K-factor model (industry loadings plus specific noise), so the
+stored risk model describes the generated returns. Everything is driven by one
+seed: the same SyntheticDataSpec always produces the same tables.
+
+Usage: python -m src.data_prep.synthetic_data.generate_synthetic_data
+           [n_tickers] [n_years] [db_path]
+"""
+
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data_access.crud_util import DataAccessUtil
+from src.data_access.sqllite_db_manager import (DatabaseManager,
+                                                EngineRegistry, TableNames)
+
+# Fama-French 12 industry names, as used by the production risk model
+FF12_INDUSTRIES = [
+    "NoDur",
+    "Durbl",
+    "Manuf",
+    "Enrgy",
+    "Chems",
+    "BusEq",
+    "Telcm",
+    "Utils",
+    "Shops",
+    "Hlth",
+    "Money",
+    "Other",
+]
+SEC_MASTER_TABLE = "sp500_sec_master"
+BENCHMARK_TICKER = "SP500"
+TRADING_DAYS_PER_YEAR = 252
+
+
+@dataclass(frozen=True)
+class SyntheticDataSpec:
+    """
+    Size and shape of a synthetic dataset.
+
+    Attributes:
+        n_tickers: Number of stocks (the SP500 benchmark is added on top)
+        n_years: History length in years of business days
+        n_factors: Number of risk model factors (at most 12, FF12 names)
+        strategies: Strategies to generate alpha scores and AUM for
+        top_n: Names per side in each strategy's weekly book
+        score_persistence: Week-on-week autocorrelation of the alpha scores
+            (0 draws independent books every week)
+        risk_model_weeks: Most recent weeks with a stored risk model (None for
+            every Friday of the history)
+        start_date: First business day
+        seed: Random seed
+    """
+
+    n_tickers: int = 500
+    n_years: float = 1.0
+    n_factors: int = 12
+    strategies: Tuple[str, ...] = ("Mom_RoC", "MinVol")
+    top_n: int = 25
+    score_persistence: float = 0.0
+    risk_model_weeks: Optional[int] = 52
+    start_date: str = "2020-01-01"
+    seed: int = 0
+
+    @property
+    def n_days(self) -> int:
+        return max(int(round(self.n_years * TRADING_DAYS_PER_YEAR)), 2)
+
+
+@dataclass
+class SyntheticMarketData:
+    """Generated tables in the layout of the production database."""
+
+    spec: SyntheticDataSpec
+    prices: pd.DataFrame
+    sec_master: pd.DataFrame
+    alpha_scores: pd.DataFrame
+    aum_leverage: pd.DataFrame
+    factor_exposures: pd.DataFrame
+    factor_covariance: pd.DataFrame
+    sprisk_residuals: pd.DataFrame
+
+    @property
+    def tickers(self):
+        return self.sec_master["symbol"].tolist()
+
+    @property
+    def rebalance_dates(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(self.alpha_scores["date"].unique()).sort_values()
+
+    @property
+    def start_date(self) -> pd.Timestamp:
+        return self.prices["date"].min()
+
+    @property
+    def end_date(self) -> pd.Timestamp:
+        return self.prices["date"].max()
+
+    def aum_leverage_changes(self, strategy_name) -> pd.DataFrame:
+        """
+        AUM/leverage rows of a strategy with the in_out_flows and leverage_change
+        columns added, as returned by RebalanceUtil.get_aum_leverage_data.
+        """
+        df = self.aum_leverage[self.aum_leverage["strategy_name"] == strategy_name]
+        return df.assign(
+            in_out_flows=df["aum"].diff(),
+            leverage_change=df["target_leverage"].diff(),
+        ).reset_index(drop=True)
+
+    def tables(self):
+        """Table name -> frame, in the order they are written."""
+        return {
+            TableNames.TS_DATA.value: self.prices,
+            SEC_MASTER_TABLE: self.sec_master,
+            TableNames.ALPHA_SCORES.value: self.alpha_scores,
+            TableNames.AUM_LEVERAGE.value: self.aum_leverage,
+            TableNames.RISK_FACTOR_EXPOSURES.value: self.factor_exposures,
+            TableNames.RISK_FACTOR_COVARIANCE.value: self.factor_covariance,
+            TableNames.RISK_SPRISK_RESIDUALS.value: self.sprisk_residuals,
+        }
+
+
+def _long_frame(dates, tickers, values, **columns):
+    return pd.DataFrame(
+        {
+            "date": np.repeat(dates, len(tickers)),
+            "ticker": np.tile(tickers, len(dates)),
+            **columns,
+            "value": values.ravel(),
+        }
+    )
+
+
+def _alpha_scores(rng, rebalance_dates, tickers, strategy_name, top_n, persistence=0.0):
+    """Weekly long/short books in the construct_portfolio_weights layout."""
+    n_side = min(top_n, len(tickers) // 2)
+    n_dates = len(rebalance_dates)
+    scores = rng.standard_normal((n_dates, len(tickers)))
+    if persistence:
+        # AR(1) scores with unit variance
+        innovation = np.sqrt(1 - persistence**2)
+        for t in range(1, n_dates):
+            scores[t] = persistence * scores[t - 1] + innovation * scores[t]
+    order = np.argsort(-scores, axis=1)
+    rows = np.arange(n_dates)[:, None]
+    long_pos, short_pos = order[:, :n_side], order[:, -n_side:]
+
+    frames = []
+    for direction, positions in (("Long", long_pos), ("Short", short_pos)):
+        side_scores = scores[rows, positions]
+        weights = np.abs(side_scores) / np.abs(side_scores).sum(axis=1, keepdims=True)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "date": np.repeat(rebalance_dates, n_side),
+                    "trade_direction": direction,
+                    "ticker": np.asarray(tickers)[positions].ravel(),
+                    "alpha_score": side_scores.ravel(),
+                    "weight": weights.ravel(),
+                    "strategy_name": strategy_name,
+                }
+            )
+        )
+    return (
+        pd.concat(frames, ignore_index=True)
+        .sort_values(["date", "trade_direction", "ticker"])
+        .reset_index(drop=True)
+    )
+
+
+def _aum_leverage(rng, rebalance_dates, strategy_name):
+    """Weekly AUM with occasional flows and a few leverage steps."""
+    flows = np.where(
+        rng.random(len(rebalance_dates)) < 0.1,
+        rng.choice([-5_000_000.0, 10_000_000.0], len(rebalance_dates)),
+        0.0,
+    )
+    flows[0] = 0.0
+    aum = np.maximum(50_000_000.0 + np.cumsum(flows), 10_000_000.0)
+    leverage = 2 + np.cumsum(rng.random(len(rebalance_dates)) < 0.02)
+    return pd.DataFrame(
+        {
+            "date": rebalance_dates,
+            "strategy_name": strategy_name,
+            "aum": aum,
+            "target_leverage": np.minimum(leverage, 4),
+        }
+    )
+
+
+def generate_synthetic_data(spec: SyntheticDataSpec) -> SyntheticMarketData:
+    """
+    Generates prices, security master, alpha scores, AUM/leverage and a weekly
+    risk model for the given spec.
+
+    Returns:
+        SyntheticMarketData with one frame per database table
+    """
+    if not 1 <= spec.n_factors <= len(FF12_INDUSTRIES):
+        raise ValueError(f"n_factors must be between 1 and {len(FF12_INDUSTRIES)}")
+
+    rng = np.random.default_rng(spec.seed)
+    n_tickers, n_days, n_factors = spec.n_tickers, spec.n_days, spec.n_factors
+    factors = FF12_INDUSTRIES[:n_factors]
+    tickers = [f"T{i:05d}" for i in range(n_tickers)]
+    dates = pd.bdate_range(spec.start_date, periods=n_days)
+
+    # Industry membership plus small cross loadings
+    industry = rng.integers(0, n_factors, n_tickers)
+    exposures = rng.normal(0, 0.2, (n_tickers, n_factors))
+    exposures[np.arange(n_tickers), industry] += 1.0
+
+    # Daily factor covariance with ~15-25% annualized factor volatility
+    mixing = rng.normal(0, 1, (n_factors, n_factors))
+    correlation = mixing @ mixing.T + n_factors * np.eye(n_factors)
+    scale = 1 / np.sqrt(np.diag(correlation))
+    factor_vol = rng.uniform(0.15, 0.25, n_factors) / np.sqrt(TRADING_DAYS_PER_YEAR)
+    factor_cov = (correlation * np.outer(scale, scale)) * np.outer(
+        factor_vol, factor_vol
+    )
+    specific_vol = rng.uniform(0.15, 0.45, n_tickers) / np.sqrt(TRADING_DAYS_PER_YEAR)
+
+    factor_returns = rng.multivariate_normal(np.zeros(n_factors), factor_cov, n_days)
+    specific_returns = rng.standard_normal((n_days, n_tickers)) * specific_vol
+    returns = factor_returns @ exposures.T + specific_returns
+    returns[0] = 0.0
+    prices = rng.uniform(10, 500, n_tickers) * np.exp(np.cumsum(returns, axis=0))
+
+    # Cap weighted benchmark
+    shares_outstanding = rng.lognormal(18, 1, n_tickers)
+    market_caps = prices * shares_outstanding
+    benchmark = 3000 * market_caps.sum(axis=1) / market_caps[0].sum()
+
+    price_df = pd.concat(
+        [
+            _long_frame(dates, tickers, prices, key="px_last"),
+            _long_frame(dates, [BENCHMARK_TICKER], benchmark[:, None], key="px_last"),
+        ],
+        ignore_index=True,
+    )[["date", "ticker", "key", "value"]]
+
+    sec_master = pd.DataFrame(
+        {
+            "symbol": tickers,
+            "security": [f"Synthetic {ticker}" for ticker in tickers],
+            "gics_sector": np.asarray(factors)[industry],
+            "ff12industry": np.asarray(factors)[industry],
+        }
+    )
+
+    fridays = dates[dates.dayofweek == 4]
+    alpha_scores = pd.concat(
+        [
+            _alpha_scores(
+                rng, fridays, tickers, strategy, spec.top_n, spec.score_persistence
+            )
+            for strategy in spec.strategies
+        ],
+        ignore_index=True,
+    )
+    aum_leverage = pd.concat(
+        [_aum_leverage(rng, fridays, strategy) for strategy in spec.strategies],
+        ignore_index=True,
+    )
+
+    # Weekly risk model: constant loadings, weekly scaled covariance
+    n_rm = len(fridays) if spec.risk_model_weeks is None else spec.risk_model_weeks
+    rm_dates = fridays[max(len(fridays) - n_rm, 0) :]
+    n_rm = len(rm_dates)
+    factor_exposures = pd.DataFrame(
+        {
+            "date": np.repeat(rm_dates, n_tickers * n_factors),
+            "ticker": np.tile(np.repeat(tickers, n_factors), n_rm),
+            "factor": np.tile(factors, n_tickers * n_rm),
+            "exposure": np.tile(exposures.ravel(), n_rm),
+        }
+    )
+    weekly_cov = factor_cov * 5
+    factor_covariance = pd.DataFrame(
+        {
+            "date": np.repeat(rm_dates, n_factors * n_factors),
+            "factor_1": np.tile(np.repeat(factors, n_factors), n_rm),
+            "factor_2": np.tile(np.tile(factors, n_factors), n_rm),
+            "covariance": np.tile(weekly_cov.ravel(), n_rm),
+        }
+    )
+    weekly_specific = specific_vol * np.sqrt(5)
+    sprisk_residuals = pd.DataFrame(
+        {
+            "date": np.repeat(rm_dates, n_tickers),
+            "ticker": np.tile(tickers, n_rm),
+            "specific_risk": np.tile(weekly_specific, n_rm),
+            "residual": (
+                rng.standard_normal((n_rm, n_tickers)) * weekly_specific
+            ).ravel(),
+        }
+    )
+
+    return SyntheticMarketData(
+        spec=spec,
+        prices=price_df,
+        sec_master=sec_master,
+        alpha_scores=alpha_scores,
+        aum_leverage=aum_leverage,
+        factor_exposures=factor_exposures,
+        factor_covariance=factor_covariance,
+        sprisk_residuals=sprisk_residuals,
+    )
+
+
+def write_synthetic_db(data: SyntheticMarketData, db_path=None, engine=None):
+    """
+    Writes the generated tables (replacing existing ones) and brings the schema
+    up to date (date normalization, indexes).
+
+    Args:
+        data: Output of generate_synthetic_data
+        db_path: Scratch SQLite file to fill
+        engine: Engine to write to instead of db_path (e.g. an in-memory engine)
+
+    Returns:
+        SQLAlchemy engine of the filled database
+    """
+    if engine is None:
+        db_path = Path(db_path)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        engine = EngineRegistry.get_engine(db_path, read_only=False)
+
+    with engine.begin() as conn:
+        for table_name, df in data.tables().items():
+            DataAccessUtil.normalize_date_columns(df.copy()).to_sql(
+                table_name, conn, if_exists="replace", index=False, chunksize=100_000
+            )
+
+    with EngineRegistry.use_engine(engine):
+        manager = DatabaseManager(db_path)
+        manager.create_trade_booking_table()
+        manager.migrate()
+    return engine
+
+
+def create_synthetic_db(spec: SyntheticDataSpec, db_path=None, engine=None):
+    """Generates a dataset and writes it; returns (data, engine)."""
+    data = generate_synthetic_data(spec)
+    return data, write_synthetic_db(data, db_path=db_path, engine=engine)
+
+
+if __name__ == "__main__":
+    n_tickers = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    n_years = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    db_file = sys.argv[3] if len(sys.argv) > 3 else "synthetic_data.db"
+    spec = SyntheticDataSpec(n_tickers=n_tickers, n_years=n_years)
+    synthetic, _ = create_synthetic_db(spec, db_path=db_file)
+    for name, table in synthetic.tables().items():
+        print(f"{name:20s} {len(table):>12,d} rows")
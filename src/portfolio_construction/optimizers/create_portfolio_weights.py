@@ -1,8 +1,64 @@
-from typing import List
+import logging
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
+from src.data_access.schemas import RiskModelStack
+from src.portfolio_construction.optimizers.factor_mv_optimizer import (
+    FactoredCovariance, factor_mv_optimizer)
+
+logger = logging.getLogger(__name__)
+
+ALPHA_SCORES_COLUMNS = [
+    "date",
+    "trade_direction",
+    "ticker",
+    "alpha_score",
+    "weight",
+    "strategy_name",
+]
+
+
+# Rows of the score matrix ranked at once, to bound the temporary arrays
+_RANK_BLOCK_CELLS = 4_000_000
+
+
+def _k_largest(values: np.ndarray, k: int, ties_right: bool = False) -> np.ndarray:
+    """
+    Mask of the k largest values of each row. Ties at the cut go to the
+    leftmost columns, the order a stable descending sort gives them, or to the
+    rightmost with ties_right.
+    """
+    n_cols = values.shape[1]
+    if k >= n_cols:
+        return np.ones(values.shape, dtype=bool)
+    cut = np.partition(values, n_cols - k, axis=1)[:, [n_cols - k]]
+    selected = values > cut
+    at_cut = values == cut
+    needed = k - selected.sum(axis=1)
+    tied = np.flatnonzero(at_cut.sum(axis=1) > needed)
+    selected |= at_cut
+    if len(tied):
+        ties = at_cut[tied, ::-1] if ties_right else at_cut[tied]
+        rank = np.cumsum(ties, axis=1)
+        if ties_right:
+            rank = rank[:, ::-1]
+        selected[tied] &= ~at_cut[tied] | (rank <= needed[tied, None])
+    return selected
+
+
+def _book_frame(signal_df, scores, rows, cols, direction, weights) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "date": signal_df.index[rows],
+            "trade_direction": direction,
+            "ticker": signal_df.columns[cols],
+            "alpha_score": scores[rows, cols],
+            "weight": weights,
+        }
+    )
+
 
 def construct_portfolio_weights(
     signal_df: pd.DataFrame, strategy_name: str, top_n: int = 25
@@ -10,6 +66,13 @@ def construct_portfolio_weights(
     """
     Construct portfolio weights from signal data.
 
+    Each date longs the top_n scores by absolute value and shorts the top_n
+    smallest by absolute value (the other way round when every score of the
+    date is negative), weighted by absolute score. A date with a single score
+    goes long that name; dates with fewer than max(2, top_n) scores are skipped
+    and top_n shrinks to half the scores available. All dates are ranked at
+    once on the score matrix.
+
     Parameters:
     signal_df (pd.DataFrame): DataFrame with signals, index as dates and columns as tickers
     strategy_name (str): Name of the strategy
@@ -18,104 +81,157 @@ def construct_portfolio_weights(
     Returns:
     pd.DataFrame: DataFrame with weights and trade directions
     """
-    ls_trade_list: List[pd.DataFrame] = []
+    scores: np.ndarray = signal_df.to_numpy(dtype=float)
+    n_dates = scores.shape[0]
+    valid: np.ndarray = ~np.isnan(scores)
+    n_valid: np.ndarray = valid.sum(axis=1)
 
     # Ensure we have enough assets for meaningful long/short positions
-    min_assets: int = max(2, top_n)
+    n_assets: np.ndarray = np.where(
+        n_valid >= max(2, top_n), np.minimum(top_n, n_valid // 2), 0
+    )
+
+    # Top and bottom names by absolute score; scores missing on a date are
+    # never selected
+    top: np.ndarray = np.zeros(scores.shape, dtype=bool)
+    bottom: np.ndarray = np.zeros(scores.shape, dtype=bool)
+    block_rows = max(1, _RANK_BLOCK_CELLS // max(scores.shape[1], 1))
+    for k in np.unique(n_assets[n_assets > 0]):
+        rows = np.flatnonzero(n_assets == k)
+        for start in range(0, len(rows), block_rows):
+            block = rows[start : start + block_rows]
+            abs_block = np.abs(scores[block])
+            missing = ~valid[block]
+            abs_block[missing] = -np.inf
+            top[block] = _k_largest(abs_block, k)
+            np.negative(abs_block, out=abs_block)
+            abs_block[missing] = -np.inf
+            bottom[block] = _k_largest(abs_block, k, ties_right=True)
+
+    # For all negative scores, reverse the direction
+    all_negative = np.flatnonzero(((scores < 0) | ~valid).all(axis=1))
+    top[all_negative], bottom[all_negative] = bottom[all_negative], top[all_negative]
+
+    # Weights sum to 1 per side; zero when a side's scores are all zero
+    sides = []
+    for mask in (top, bottom):
+        rows, cols = np.nonzero(mask)
+        abs_selected = np.abs(scores[rows, cols])
+        side_sum = np.bincount(rows, weights=abs_selected, minlength=n_dates)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weights = np.where(side_sum[rows] != 0, abs_selected / side_sum[rows], 0.0)
+        sides.append((rows, cols, weights, side_sum))
+
+    # Skip dates where all selected scores are zero
+    traded = (sides[0][3] != 0) | (sides[1][3] != 0)
+    sides = [
+        (rows[traded[rows]], cols[traded[rows]], weights[traded[rows]])
+        for rows, cols, weights, _ in sides
+    ]
+
+    # For single asset case, just go long
+    single_rows, single_cols = np.nonzero(valid & (n_valid == 1)[:, None])
+    long_rows, long_cols, long_weights = sides[0]
+    sides[0] = (
+        np.concatenate([long_rows, single_rows]),
+        np.concatenate([long_cols, single_cols]),
+        np.concatenate([long_weights, np.ones(len(single_rows))]),
+    )
+
+    if not any(len(rows) for rows, _, _ in sides):
+        return pd.DataFrame(columns=ALPHA_SCORES_COLUMNS)
+
+    ls_trades_df: pd.DataFrame = pd.concat(
+        [
+            _book_frame(signal_df, scores, rows, cols, direction, weights)
+            for direction, (rows, cols, weights) in zip(("Long", "Short"), sides)
+        ],
+        ignore_index=True,
+    )
+    ls_trades_df.sort_values(by=["date", "trade_direction", "ticker"], inplace=True)
+    ls_trades_df["strategy_name"] = strategy_name
+    ls_trades_df.reset_index(drop=True, inplace=True)
 
-    for date, row in signal_df.iterrows():
-        valid_scores: pd.Series = row.dropna()
+    return ls_trades_df
 
-        # For single asset case, just go long
-        if len(valid_scores) == 1:
-            df_long: pd.DataFrame = pd.DataFrame(
-                {
-                    "date": date,
-                    "trade_direction": "Long",
-                    "ticker": valid_scores.index,
-                    "alpha_score": valid_scores.values,
-                    "weight": [1.0],
-                }
-            )
-            ls_trade_list.append(df_long)
-            continue
 
-        # Skip if we don't have enough valid scores for balanced long/short
-        if len(valid_scores) < min_assets:
-            continue
+def construct_mv_portfolio_weights(
+    signal_df: pd.DataFrame,
+    strategy_name: str,
+    risk_models: RiskModelStack,
+    risk_aversion: float = 1.0,
+    exposure_bounds: Optional[
+        Dict[str, Tuple[Optional[float], Optional[float]]]
+    ] = None,
+    max_weight: float = 0.05,
+    min_weight: float = 1e-4,
+) -> pd.DataFrame:
+    """
+    Construct long/short portfolio weights with the factor mean-variance
+    optimizer instead of ranking the signal.
 
-        # Sort by absolute values but keep original signs
-        abs_scores: pd.Series = valid_scores.abs()
-        sorted_indices: pd.Index = abs_scores.sort_values(ascending=False).index
-        sorted_scores: pd.Series = valid_scores[sorted_indices]
+    Each date's signal is z-scored across tickers and used as the expected
+    return of a dollar neutral book (gross exposure 2) priced with the latest
+    risk model on or before the date. Names below min_weight are dropped and
+    each side's weights are scaled to sum to 1, as in construct_portfolio_weights.
 
-        n_assets: int = min(
-            top_n, len(sorted_scores) // 2
-        )  # Ensure balanced long/short
+    Parameters:
+    signal_df (pd.DataFrame): DataFrame with signals, index as dates and columns as tickers
+    strategy_name (str): Name of the strategy
+    risk_models (RiskModelStack): Risk models, e.g. from RiskModelDataUtil.fetch_risk_models
+    risk_aversion (float): Weight of the weekly variance against the z-scored signal
+    exposure_bounds (dict): factor -> (lower, upper) bound on the book's net factor exposure
+    max_weight (float): Largest weight of a name as a fraction of one side
+    min_weight (float): Smallest weight of a name kept in the book
 
-        if n_assets == 0:
-            continue
+    Returns:
+    pd.DataFrame: DataFrame with weights and trade directions
+    """
+    ls_trade_list: List[pd.DataFrame] = []
 
-        # Select top and bottom assets by absolute value
-        top_scores: pd.Series = sorted_scores.iloc[:n_assets]
-        bottom_scores: pd.Series = sorted_scores.iloc[-n_assets:]
-
-        # Determine which scores go to long and short based on sign
-        if all(sorted_scores < 0):
-            # For all negative scores, reverse the direction
-            long_scores: pd.Series = bottom_scores
-            short_scores: pd.Series = top_scores
-        else:
-            long_scores = top_scores
-            short_scores = bottom_scores
-
-        # Skip if all scores are zero
-        if long_scores.abs().sum() == 0 and short_scores.abs().sum() == 0:
+    for date, row in signal_df.iterrows():
+        valid_scores: pd.Series = row.dropna()
+        if len(valid_scores) < 2 or valid_scores.std() == 0:
             continue
+        alpha = (valid_scores - valid_scores.mean()) / valid_scores.std()
 
-        # Calculate weights ensuring they sum to 1
-        long_weights: np.ndarray = np.zeros(len(long_scores))
-        short_weights: np.ndarray = np.zeros(len(short_scores))
-
-        if long_scores.abs().sum() != 0:
-            long_weights = np.abs(long_scores.values) / np.abs(long_scores).sum()
-        if short_scores.abs().sum() != 0:
-            short_weights = np.abs(short_scores.values) / np.abs(short_scores).sum()
-
-        df_long: pd.DataFrame = pd.DataFrame(
-            {
-                "date": date,
-                "trade_direction": "Long",
-                "ticker": long_scores.index,
-                "alpha_score": long_scores.values,
-                "weight": long_weights,
-            }
-        )
-
-        df_short: pd.DataFrame = pd.DataFrame(
-            {
-                "date": date,
-                "trade_direction": "Short",
-                "ticker": short_scores.index,
-                "alpha_score": short_scores.values,
-                "weight": short_weights,
-            }
+        try:
+            covariance = FactoredCovariance.from_stack(
+                risk_models, date, valid_scores.index
+            )
+        except ValueError as e:
+            logger.warning(f"Skipping {date}: {e}")
+            continue
+        result_df = factor_mv_optimizer(
+            alpha.to_numpy(),
+            covariance,
+            risk_aversion=risk_aversion,
+            exposure_bounds=exposure_bounds,
+            max_weight=max_weight,
+            long_short=True,
         )
+        if result_df.empty:
+            continue
 
-        ls_trade_list.append(df_long)
-        ls_trade_list.append(df_short)
+        weights = result_df.set_index("ticker")["weight"]
+        for direction, side in (("Long", weights), ("Short", -weights)):
+            side = side[side > min_weight]
+            if side.empty:
+                continue
+            ls_trade_list.append(
+                pd.DataFrame(
+                    {
+                        "date": date,
+                        "trade_direction": direction,
+                        "ticker": side.index,
+                        "alpha_score": valid_scores[side.index].values,
+                        "weight": (side / side.sum()).values,
+                    }
+                )
+            )
 
     if not ls_trade_list:
-        return pd.DataFrame(
-            columns=[
-                "date",
-                "trade_direction",
-                "ticker",
-                "alpha_score",
-                "weight",
-                "strategy_name",
-            ]
-        )
+        return pd.DataFrame(columns=ALPHA_SCORES_COLUMNS)
 
     ls_trades_df: pd.DataFrame = pd.concat(ls_trade_list, ignore_index=True)
     ls_trades_df.sort_values(by=["date", "trade_direction", "ticker"], inplace=True)
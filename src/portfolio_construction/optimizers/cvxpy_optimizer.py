@@ -1,9 +1,33 @@
+import threading
+
 import cvxpy as cp
 import numpy as np
 import pandas as pd
 
+# cvxpy's GLPK interfaces write their options (msg_lev, tm_lim) into the
+# process-global cvxopt.glpk.options dict for the duration of a solve and delete
+# them afterwards, so two GLPK solves on different threads (the concurrent side
+# mode) would overwrite and leak each other's options. They are serialized.
+GLPK_SOLVERS = (cp.GLPK, cp.GLPK_MI)
+_GLPK_LOCK = threading.Lock()
+
+
+def solve_problem(problem, solver, **solver_options):
+    """problem.solve, holding the GLPK lock for the GLPK solvers."""
+    if solver in GLPK_SOLVERS:
+        with _GLPK_LOCK:
+            return problem.solve(solver=solver, **solver_options)
+    return problem.solve(solver=solver, **solver_options)
+
 
-def cvx_optimizer(tickers, prices, weights_target, capital=1_000_000):
+def cvx_optimizer(
+    tickers,
+    prices,
+    weights_target,
+    capital=1_000_000,
+    solver=cp.GLPK_MI,
+    **solver_options,
+):
     """
     Optimize portfolio allocation based on target weights.
 
@@ -12,9 +36,12 @@ def cvx_optimizer(tickers, prices, weights_target, capital=1_000_000):
     prices: Array of prices for each ticker
     weights_target: Target portfolio weights
     capital: Total capital to invest
+    solver: cvxpy MILP solver
+    solver_options: Passed to the solver (e.g. a time limit)
 
     Returns:
-    DataFrame with optimization results
+    DataFrame with optimization results; attrs["status"] holds the solver
+    status ("error" if the solve raised)
     """
     # Convert inputs to numpy arrays
     prices = np.array(prices, dtype=float)
@@ -61,25 +88,36 @@ def cvx_optimizer(tickers, prices, weights_target, capital=1_000_000):
 
         try:
             valid_result = _optimize_portfolio(
-                valid_tickers, valid_prices, valid_weights, capital
+                valid_tickers,
+                valid_prices,
+                valid_weights,
+                capital,
+                solver,
+                **solver_options,
             )
+            result_df.attrs["status"] = valid_result.attrs["status"]
+            if valid_result.empty:
+                return result_df
 
             # Update result DataFrame with optimized values
             for col in valid_result.columns:
-                result_df.loc[valid_indices, col] = valid_result[col]
+                result_df.loc[valid_indices, col] = valid_result[col].to_numpy()
 
             return result_df
 
         except Exception as e:
             print(f"Error in optimization: {str(e)}")
+            result_df.attrs["status"] = "error"
             return result_df
 
     # If no zero prices, optimize normally
     try:
-        return _optimize_portfolio(tickers, prices, weights_target, capital)
+        return _optimize_portfolio(
+            tickers, prices, weights_target, capital, solver, **solver_options
+        )
     except Exception as e:
         print(f"Error in optimization: {str(e)}")
-        return pd.DataFrame(
+        result_df = pd.DataFrame(
             columns=[
                 "ticker",
                 "shares",
@@ -89,29 +127,397 @@ def cvx_optimizer(tickers, prices, weights_target, capital=1_000_000):
                 "actual_weight",
             ]
         )
+        result_df.attrs["status"] = "error"
+        return result_df
 
 
-def _optimize_portfolio(tickers, prices, weights_target, capital):
-    """Internal function to perform the optimization."""
-    n = len(tickers)
-    x = cp.Variable(n, integer=True)
+class CvxAllocationProblem:
+    """
+    Integer share allocation for a fixed number of names, built once with the
+    prices, dollar targets and capital as cp.Parameter values.
 
-    # Calculate dollar value target for each position
-    dollar_target = capital * weights_target
+    The problem follows the DPP rules (the variable is only multiplied by
+    parameters), so cvxpy caches its canonicalization after the first solve and
+    later solves only substitute the new parameter values.
+    """
 
-    # Define the objective - minimize the absolute difference between actual dollar values and target dollar values
-    objective = cp.Minimize(cp.sum(cp.abs(cp.multiply(x, prices) - dollar_target)))
+    def __init__(self, n):
+        self.n = n
+        self.shares = cp.Variable(n, integer=True)
+        self.prices = cp.Parameter(n, nonneg=True)
+        self.dollar_target = cp.Parameter(n)
+        self.capital = cp.Parameter(nonneg=True)
 
-    constraints = [x >= 0, cp.sum(cp.multiply(x, prices)) <= capital]
+        position_value = cp.multiply(self.shares, self.prices)
+        # Minimize the absolute difference between actual and target dollar values
+        objective = cp.Minimize(cp.sum(cp.abs(position_value - self.dollar_target)))
+        constraints = [self.shares >= 0, cp.sum(position_value) <= self.capital]
+        self.problem = cp.Problem(objective, constraints)
 
-    prob = cp.Problem(objective, constraints)
-    prob.solve(solver=cp.GLPK_MI)
+    def solve(
+        self, prices, dollar_target, capital, solver=cp.GLPK_MI, **solver_options
+    ):
+        """
+        Solves with new parameter values; solver_options are passed to the solver
+        (e.g. tm_lim in milliseconds for GLPK_MI).
 
-    if prob.status != "optimal":
-        print(
-            f"Warning: Optimization did not converge to optimal solution. Status: {prob.status}"
+        Returns:
+            Tuple of (solver status, share values or None)
+        """
+        self.prices.value = prices
+        self.dollar_target.value = dollar_target
+        self.capital.value = capital
+        solve_problem(self.problem, solver, **solver_options)
+        return self.problem.status, self.shares.value
+
+
+class JointAllocationProblem:
+    """
+    Long and short books allocated in one problem: the summed L1 distance of
+    both sides to their dollar targets, with the gross notional capped and the
+    net (long minus short) notional kept within a band around zero.
+
+    Each name holds the floor of its target shares or one more (the
+    candidates of lot_allocation; an unrestricted integer optimum occasionally
+    sells a name below its floor to fund extra shares elsewhere). With a
+    boolean round-up per name the L1 error is linear, which gives branch and
+    bound a much tighter relaxation than the absolute-value form. Built once per
+    (n_long, n_short) with parameters, like CvxAllocationProblem.
+    """
+
+    def __init__(self, n_long, n_short):
+        self.long_round_up = cp.Variable(n_long, boolean=True)
+        self.short_round_up = cp.Variable(n_short, boolean=True)
+        self.long_prices = cp.Parameter(n_long, nonneg=True)
+        self.short_prices = cp.Parameter(n_short, nonneg=True)
+        # Change of a name's error when rounding up: price - 2 * shortfall
+        self.long_round_up_cost = cp.Parameter(n_long)
+        self.short_round_up_cost = cp.Parameter(n_short)
+        self.long_floor_value = cp.Parameter(nonneg=True)
+        self.short_floor_value = cp.Parameter(nonneg=True)
+        self.gross_capital = cp.Parameter(nonneg=True)
+        self.net_limit = cp.Parameter(nonneg=True)
+
+        long_value = self.long_floor_value + self.long_prices @ self.long_round_up
+        short_value = self.short_floor_value + self.short_prices @ self.short_round_up
+        objective = cp.Minimize(
+            self.long_round_up_cost @ self.long_round_up
+            + self.short_round_up_cost @ self.short_round_up
+        )
+        constraints = [
+            long_value + short_value <= self.gross_capital,
+            cp.abs(long_value - short_value) <= self.net_limit,
+        ]
+        self.problem = cp.Problem(objective, constraints)
+
+    def solve(
+        self, long_side, short_side, gross_capital, net_limit, solver, **solver_options
+    ):
+        """
+        Solves for two _BookSides.
+
+        Returns:
+            Tuple of (solver status, long round-ups, short round-ups)
+        """
+        for side, prices, cost, floor_value in (
+            (
+                long_side,
+                self.long_prices,
+                self.long_round_up_cost,
+                self.long_floor_value,
+            ),
+            (
+                short_side,
+                self.short_prices,
+                self.short_round_up_cost,
+                self.short_floor_value,
+            ),
+        ):
+            prices.value = side.valid_prices
+            cost.value = side.valid_prices - 2 * side.shortfall
+            floor_value.value = side.floor_shares @ side.valid_prices
+        self.gross_capital.value = gross_capital
+        self.net_limit.value = net_limit
+        solve_problem(self.problem, solver, **solver_options)
+        return (
+            self.problem.status,
+            self.long_round_up.value,
+            self.short_round_up.value,
         )
+
+
+class TurnoverAllocationProblem:
+    """
+    Allocation that starts from the previous book: each name either keeps its
+    previous shares or trades to the floor or floor+1 of its target shares.
+    Every option has a dollar value and a cost (its L1 error to the target plus
+    the cost of trading to it), and one option per name is chosen to minimize
+    the total cost with the summed value within the capital. Built once per
+    number of names with parameters, like CvxAllocationProblem.
+    """
+
+    n_options = 3
+
+    def __init__(self, n):
+        self.choice = cp.Variable((n, self.n_options), boolean=True)
+        self.option_values = cp.Parameter((n, self.n_options), nonneg=True)
+        self.option_costs = cp.Parameter((n, self.n_options), nonneg=True)
+        self.capital = cp.Parameter(nonneg=True)
+
+        objective = cp.Minimize(cp.sum(cp.multiply(self.option_costs, self.choice)))
+        constraints = [
+            cp.sum(self.choice, axis=1) == 1,
+            cp.sum(cp.multiply(self.option_values, self.choice)) <= self.capital,
+        ]
+        self.problem = cp.Problem(objective, constraints)
+
+    def solve(self, option_values, option_costs, capital, solver, **solver_options):
+        """
+        Returns:
+            Tuple of (solver status, chosen option index per name or None)
+        """
+        self.option_values.value = option_values
+        self.option_costs.value = option_costs
+        self.capital.value = capital
+        solve_problem(self.problem, solver, **solver_options)
+        if self.choice.value is None:
+            return self.problem.status, None
+        return self.problem.status, self.choice.value.argmax(axis=1)
+
+
+# Compiled problems by size, reused across rebalances. A problem holds its
+# parameter values, so each thread (see the concurrent side mode) has its own.
+_ALLOCATION_PROBLEMS = threading.local()
+
+
+def _cached_problem(key, build):
+    problems = getattr(_ALLOCATION_PROBLEMS, "by_size", None)
+    if problems is None:
+        problems = _ALLOCATION_PROBLEMS.by_size = {}
+    if key not in problems:
+        problems[key] = build()
+    return problems[key]
+
+
+def get_allocation_problem(n):
+    """Returns the cached allocation problem for n names, building it on first use."""
+    return _cached_problem(n, lambda: CvxAllocationProblem(n))
+
+
+def get_joint_allocation_problem(n_long, n_short):
+    """Returns the cached joint problem for the book sizes, building it on first use."""
+    return _cached_problem(
+        ("joint", n_long, n_short),
+        lambda: JointAllocationProblem(n_long, n_short),
+    )
+
+
+def get_turnover_allocation_problem(n):
+    """Returns the cached turnover-aware problem for n names, building it on first use."""
+    return _cached_problem(("turnover", n), lambda: TurnoverAllocationProblem(n))
+
+
+class _BookSide:
+    """One side's inputs, with the zero-price names set aside."""
+
+    def __init__(self, tickers, prices, weights_target, capital):
+        self.tickers = tickers
+        self.prices = np.array(prices, dtype=float)
+        self.weights_target = np.array(weights_target, dtype=float)
+        self.valid = self.prices > 0
+        self.valid_prices = self.prices[self.valid]
+        valid_weights = self.weights_target[self.valid]
+        if valid_weights.sum() > 0:
+            valid_weights = valid_weights / valid_weights.sum()
+        dollar_target = capital * valid_weights
+        self.floor_shares = np.floor(dollar_target / self.valid_prices)
+        self.shortfall = dollar_target - self.floor_shares * self.valid_prices
+
+    def to_frame(self, valid_shares):
+        """cvx_optimizer style result (empty when valid_shares is None)."""
+        if valid_shares is None:
+            return pd.DataFrame(
+                columns=[
+                    "ticker",
+                    "shares",
+                    "price",
+                    "value",
+                    "target_weight",
+                    "actual_weight",
+                ]
+            )
+        shares = np.zeros(len(self.prices), dtype=int)
+        shares[self.valid] = np.rint(valid_shares).astype(int)
+        value = shares * self.prices
+        total_invested = value.sum()
         return pd.DataFrame(
+            {
+                "ticker": self.tickers,
+                "shares": shares,
+                "price": self.prices,
+                "value": value,
+                "target_weight": self.weights_target,
+                "actual_weight": value / total_invested if total_invested > 0 else 0.0,
+            }
+        )
+
+
+def joint_cvx_optimizer(
+    long_book,
+    short_book,
+    gross_capital,
+    net_tolerance=0.01,
+    solver=cp.GLPK_MI,
+    **solver_options,
+):
+    """
+    Allocates the long and short books together (see JointAllocationProblem).
+    Each side targets half the gross capital, as when the sides are solved
+    separately; zero-price names get no shares and the other names' weights
+    are renormalized, as in cvx_optimizer.
+
+    Parameters:
+    long_book, short_book: (tickers, prices, weights_target) of each side
+    gross_capital: Cap on long plus short notional
+    net_tolerance: Largest |long - short| notional as a fraction of gross_capital
+
+    Returns:
+    Tuple of (long DataFrame, short DataFrame) with the cvx_optimizer columns
+    (positive shares on both sides); attrs["status"] holds the solver status.
+    Both are empty when the solve fails.
+    """
+    long_side = _BookSide(*long_book, gross_capital / 2)
+    short_side = _BookSide(*short_book, gross_capital / 2)
+    status, long_round_up, short_round_up = get_joint_allocation_problem(
+        long_side.valid.sum(), short_side.valid.sum()
+    ).solve(
+        long_side,
+        short_side,
+        gross_capital,
+        net_tolerance * gross_capital,
+        solver,
+        **solver_options,
+    )
+
+    solved = status in (cp.OPTIMAL, cp.OPTIMAL_INACCURATE) and long_round_up is not None
+    results = []
+    for side, round_up in ((long_side, long_round_up), (short_side, short_round_up)):
+        result_df = side.to_frame(side.floor_shares + round_up if solved else None)
+        result_df.attrs["status"] = status
+        results.append(result_df)
+
+    if not solved:
+        print(
+            f"Warning: Joint optimization did not converge to optimal solution. Status: {status}"
+        )
+    return tuple(results)
+
+
+def turnover_cvx_optimizer(
+    tickers,
+    prices,
+    weights_target,
+    capital,
+    previous_shares,
+    turnover_penalty=0.0,
+    trade_cost=0.0,
+    solver=cp.GLPK_MI,
+    **solver_options,
+):
+    """
+    Allocates a book starting from the shares it already holds (see
+    TurnoverAllocationProblem). Names leaving the book are passed with a zero
+    target weight so they can be sold.
+
+    Names where one option is at least as cheap and uses no more capital than
+    the others (typically a position already close to its target) are fixed
+    before the solve, so only the names worth trading reach the solver.
+
+    Parameters:
+    previous_shares: Shares held per ticker before the rebalance (0 if none)
+    turnover_penalty: Cost per dollar traded
+    trade_cost: Fixed cost (dollars) of trading a name at all
+
+    Returns:
+    DataFrame with the cvx_optimizer columns; attrs["status"] holds the solver
+    status ("presolved" if every name was fixed) and attrs["n_traded"] the
+    number of names whose shares change. Empty when the solve fails.
+    """
+    side = _BookSide(tickers, prices, weights_target, capital)
+    dollar_target = side.floor_shares * side.valid_prices + side.shortfall
+    previous = np.asarray(previous_shares, dtype=float)[side.valid]
+
+    option_shares = np.column_stack(
+        [previous, side.floor_shares, side.floor_shares + 1]
+    )
+    option_values = option_shares * side.valid_prices[:, None]
+    traded = option_shares != previous[:, None]
+    option_costs = (
+        np.abs(option_values - dollar_target[:, None])
+        + turnover_penalty
+        * np.abs(option_values - (previous * side.valid_prices)[:, None])
+        + trade_cost * traded
+    )
+
+    # An option dominates when no other option is cheaper or uses less capital
+    dominates = (
+        (option_costs[:, :, None] <= option_costs[:, None, :])
+        & (option_values[:, :, None] <= option_values[:, None, :])
+    ).all(axis=2)
+    fixed = dominates.any(axis=1)
+    choice = dominates.argmax(axis=1)
+
+    status = "presolved"
+    open_names = np.flatnonzero(~fixed)
+    if len(open_names):
+        fixed_value = option_values[fixed, choice[fixed]].sum()
+        try:
+            status, open_choice = get_turnover_allocation_problem(
+                len(open_names)
+            ).solve(
+                option_values[open_names],
+                option_costs[open_names],
+                max(capital - fixed_value, 0.0),
+                solver,
+                **solver_options,
+            )
+        except Exception as e:
+            print(f"Error in optimization: {str(e)}")
+            status, open_choice = "error", None
+        if status not in (cp.OPTIMAL, cp.OPTIMAL_INACCURATE) or open_choice is None:
+            print(
+                f"Warning: Optimization did not converge to optimal solution. Status: {status}"
+            )
+            result_df = side.to_frame(None)
+            result_df.attrs["status"] = status
+            return result_df
+        choice[open_names] = open_choice
+
+    result_df = side.to_frame(option_shares[np.arange(len(choice)), choice])
+    result_df.attrs["status"] = status
+    result_df.attrs["n_traded"] = int(
+        (result_df["shares"].to_numpy() != np.asarray(previous_shares)).sum()
+    )
+    return result_df
+
+
+def _optimize_portfolio(
+    tickers, prices, weights_target, capital, solver=cp.GLPK_MI, **solver_options
+):
+    """Internal function to perform the optimization."""
+    # Calculate dollar value target for each position
+    dollar_target = capital * weights_target
+
+    status, shares = get_allocation_problem(len(tickers)).solve(
+        prices, dollar_target, capital, solver, **solver_options
+    )
+
+    # optimal_inaccurate: a time-limited solve stopped with an integer solution
+    if status not in (cp.OPTIMAL, cp.OPTIMAL_INACCURATE) or shares is None:
+        print(
+            f"Warning: Optimization did not converge to optimal solution. Status: {status}"
+        )
+        result_df = pd.DataFrame(
             columns=[
                 "ticker",
                 "shares",
@@ -121,9 +527,11 @@ def _optimize_portfolio(tickers, prices, weights_target, capital):
                 "actual_weight",
             ]
         )
+        result_df.attrs["status"] = status
+        return result_df
 
     # Output results
-    x_opt = np.floor(x.value).astype(int)  # convert to integer
+    x_opt = np.floor(shares).astype(int)  # convert to integer
     total_invested = np.dot(x_opt, prices)
     cash_left = capital - total_invested
     print(f"Cash left uninvested: {cash_left}")
@@ -140,5 +548,6 @@ def _optimize_portfolio(tickers, prices, weights_target, capital):
             ),
         }
     )
+    result_df.attrs["status"] = status
 
     return result_df
@@ -0,0 +1,220 @@
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import cvxpy as cp
+import numpy as np
+import pandas as pd
+
+from src.data_access.schemas import RiskModel, RiskModelStack
+from src.portfolio_construction.optimizers.cvxpy_optimizer import solve_problem
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FactoredCovariance:
+    """
+    Asset covariance of a factor risk model kept in factored form,
+    B·F·Bᵀ + D, for a fixed list of tickers. Storage and products with a
+    weight vector are O(n·k); the n x n matrix is never formed.
+
+    exposures: tickers x factors (B)
+    factor_covariance: factors x factors (F)
+    specific_variance: per ticker (the diagonal of D, specific_risk squared)
+    """
+
+    tickers: pd.Index
+    factor_names: List[str]
+    exposures: np.ndarray
+    factor_covariance: np.ndarray
+    specific_variance: np.ndarray
+
+    @classmethod
+    def from_risk_model(cls, risk_model: RiskModel, tickers=None):
+        """
+        Aligns a RiskModel to tickers (default: every ticker with exposures).
+        Tickers without exposures get zero loadings and tickers without a
+        specific risk the cross-sectional median, both with a warning.
+        """
+        factor_names = list(risk_model.factor_names)
+        exposures_df = risk_model.factor_exposures.set_index("ticker")[factor_names]
+        tickers = pd.Index(exposures_df.index if tickers is None else tickers)
+        specific_risk = risk_model.sp_risk_residuals.set_index("ticker")[
+            "specific_risk"
+        ]
+        return cls._aligned(
+            tickers,
+            factor_names,
+            exposures_df.reindex(tickers).to_numpy(dtype=float),
+            risk_model.factor_covariance.loc[factor_names, factor_names].to_numpy(
+                dtype=float
+            ),
+            specific_risk.reindex(tickers).to_numpy(dtype=float),
+        )
+
+    @classmethod
+    def from_stack(cls, stack: RiskModelStack, date_val, tickers=None):
+        """
+        The latest risk model of the stack on or before date_val, sliced from
+        the stacked arrays without building the per-date frames.
+        """
+        pos = stack.dates.searchsorted(pd.Timestamp(date_val), side="right") - 1
+        if pos < 0:
+            raise ValueError(f"No risk model on or before {date_val}")
+        exposures = stack.factor_exposures[pos]
+        if tickers is None:
+            tickers = stack.tickers[~np.isnan(exposures).all(axis=1)]
+        tickers = pd.Index(tickers)
+        positions = stack.tickers.get_indexer(tickers)
+        found = positions >= 0
+
+        aligned_exposures = np.full((len(tickers), len(stack.factor_names)), np.nan)
+        aligned_exposures[found] = exposures[positions[found]]
+        specific_risk = np.full(len(tickers), np.nan)
+        specific_risk[found] = stack.specific_risk[pos][positions[found]]
+        return cls._aligned(
+            tickers,
+            list(stack.factor_names),
+            aligned_exposures,
+            stack.factor_covariance[pos],
+            specific_risk,
+        )
+
+    @classmethod
+    def _aligned(
+        cls, tickers, factor_names, exposures, factor_covariance, specific_risk
+    ):
+        missing = np.isnan(exposures).all(axis=1)
+        if missing.any():
+            logger.warning(
+                f"No factor exposures for {list(tickers[missing])}, using zero loadings"
+            )
+        specific_variance = specific_risk**2
+        missing_specific = np.isnan(specific_variance)
+        if missing_specific.all():
+            raise ValueError("No specific risk for any of the tickers")
+        if missing_specific.any():
+            logger.warning(
+                f"No specific risk for {list(tickers[missing_specific])}, using the median"
+            )
+            specific_variance[missing_specific] = np.nanmedian(specific_variance)
+        return cls(
+            tickers=tickers,
+            factor_names=factor_names,
+            exposures=np.nan_to_num(exposures),
+            factor_covariance=np.asarray(factor_covariance, dtype=float),
+            specific_variance=specific_variance,
+        )
+
+    @property
+    def n_bytes(self):
+        return (
+            self.exposures.nbytes
+            + self.factor_covariance.nbytes
+            + self.specific_variance.nbytes
+        )
+
+    def factor_exposures(self, weights):
+        """Portfolio factor exposures Bᵀw."""
+        return self.exposures.T @ np.asarray(weights, dtype=float)
+
+    def variance(self, weights):
+        """Portfolio variance wᵀ(B·F·Bᵀ + D)w, in O(n·k)."""
+        weights = np.asarray(weights, dtype=float)
+        factor_exposures = self.factor_exposures(weights)
+        return float(
+            factor_exposures @ self.factor_covariance @ factor_exposures
+            + (self.specific_variance * weights**2).sum()
+        )
+
+    def factor_cholesky(self):
+        """L with F = L·Lᵀ; a covariance that is not positive definite is repaired."""
+        try:
+            return np.linalg.cholesky(self.factor_covariance)
+        except np.linalg.LinAlgError:
+            eigenvalues, eigenvectors = np.linalg.eigh(self.factor_covariance)
+            return eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))
+
+
+def factor_mv_optimizer(
+    alpha,
+    covariance: FactoredCovariance,
+    risk_aversion=1.0,
+    exposure_bounds: Optional[
+        Dict[str, Tuple[Optional[float], Optional[float]]]
+    ] = None,
+    max_weight=None,
+    long_short=False,
+    solver=cp.CLARABEL,
+    **solver_options,
+):
+    """
+    Mean-variance weights: maximizes alphaᵀw - risk_aversion · wᵀΣw with the
+    covariance Σ = B·F·Bᵀ + D in factored form. The factor exposures y = Bᵀw
+    are variables of their own, so the risk term is |Lᵀy|² + Σ d·w² (F = L·Lᵀ)
+    and the problem has O(n·k) non-zeros.
+
+    Parameters:
+    alpha: Expected return per ticker of covariance.tickers
+    risk_aversion: Weight of the variance against the expected return
+    exposure_bounds: factor -> (lower, upper) bound on the portfolio's factor
+        exposure; None leaves a side unbounded
+    max_weight: Largest absolute weight of a name
+    long_short: Dollar neutral with gross exposure at most 2 (one per side)
+        instead of fully invested long only
+
+    Returns:
+    DataFrame with ticker, weight and alpha; attrs hold the solver status,
+    expected_return, variance and the portfolio factor_exposures (Series).
+    Empty when the solve fails.
+    """
+    alpha = np.asarray(alpha, dtype=float)
+    n, k = covariance.exposures.shape
+    weights = cp.Variable(n)
+    factor_exposures = cp.Variable(k)
+
+    risk = cp.sum_squares(
+        covariance.factor_cholesky().T @ factor_exposures
+    ) + cp.sum_squares(cp.multiply(np.sqrt(covariance.specific_variance), weights))
+    constraints = [factor_exposures == covariance.exposures.T @ weights]
+    if long_short:
+        constraints += [cp.sum(weights) == 0, cp.norm1(weights) <= 2]
+    else:
+        constraints += [cp.sum(weights) == 1, weights >= 0]
+    if max_weight is not None:
+        constraints.append(cp.abs(weights) <= max_weight)
+    for factor, (lower, upper) in (exposure_bounds or {}).items():
+        j = covariance.factor_names.index(factor)
+        if lower is not None:
+            constraints.append(factor_exposures[j] >= lower)
+        if upper is not None:
+            constraints.append(factor_exposures[j] <= upper)
+
+    problem = cp.Problem(
+        cp.Maximize(alpha @ weights - risk_aversion * risk), constraints
+    )
+    try:
+        solve_problem(problem, solver, **solver_options)
+    except cp.error.SolverError as e:
+        print(f"Error in optimization: {str(e)}")
+    status = problem.status
+
+    if status not in (cp.OPTIMAL, cp.OPTIMAL_INACCURATE) or weights.value is None:
+        print(f"Warning: Mean-variance optimization did not solve. Status: {status}")
+        result_df = pd.DataFrame(columns=["ticker", "weight", "alpha"])
+        result_df.attrs["status"] = status
+        return result_df
+
+    result_df = pd.DataFrame(
+        {"ticker": covariance.tickers, "weight": weights.value, "alpha": alpha}
+    )
+    result_df.attrs.update(
+        status=status,
+        expected_return=float(alpha @ weights.value),
+        variance=covariance.variance(weights.value),
+        factor_exposures=pd.Series(
+            covariance.factor_exposures(weights.value), index=covariance.factor_names
+        ),
+    )
+    return result_df
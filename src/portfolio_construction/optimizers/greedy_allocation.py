@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 
@@ -14,52 +15,38 @@ def greedy_allocation(tickers, prices, weights_target, capital=1000000):
     Returns:
     DataFrame with allocation results
     """
-    # Create dataframe from inputs
-    allocation_data = {
-        "ticker": tickers,
-        "price": prices,
-        "target_weight": weights_target,
-    }
-    df = pd.DataFrame(allocation_data)
-    df = df.sort_values("target_weight", ascending=False)
-    remaining_capital = capital
-    df["target_dollars"] = capital * df["target_weight"]
-
-    # Greedy allocation - calculate integer shares
-    df["shares"] = df.apply(
-        lambda row: (
-            int(
-                min(
-                    row["target_dollars"] // row["price"],
-                    remaining_capital // row["price"],
-                )
-            )
-            if row["price"] > 0
-            else 0
-        ),
-        axis=1,
+    prices = np.asarray(prices, dtype=float)
+    weights_target = np.asarray(weights_target, dtype=float)
+
+    # Largest target weights first
+    order = np.argsort(-weights_target, kind="stable")
+    prices = prices[order]
+    target_dollars = capital * weights_target[order]
+
+    # Integer shares of each target, capped by the capital left after the larger
+    # positions: the running total of the uncapped values replaces the loop
+    valid = prices > 0
+    safe_prices = np.where(valid, prices, 1.0)
+    shares = np.where(valid, target_dollars // safe_prices, 0.0)
+    spent_before = np.cumsum(shares * prices) - shares * prices
+    capital_left = np.maximum(capital - spent_before, 0.0)
+    shares = np.minimum(shares, capital_left // safe_prices).astype(int)
+    shares[~valid] = 0
+    value = shares * prices
+
+    total_invested = value.sum()
+    df = pd.DataFrame(
+        {
+            "ticker": np.asarray(tickers)[order],
+            "shares": shares,
+            "price": prices,
+            "value": value,
+            "target_weight": weights_target[order],
+            "ActualWeight": value / total_invested if total_invested > 0 else 0.0,
+        },
+        index=order,
     )
-
-    # Update remaining capital after each allocation
-    for idx, row in df.iterrows():
-        shares = row["shares"]
-        price = row["price"]
-        value = shares * price
-        remaining_capital -= value
-        df.at[idx, "value"] = value
-
-    # Calculate actual weights
-    total_invested = df["value"].sum()
-    if total_invested > 0:
-        df["ActualWeight"] = df["value"] / total_invested
-    else:
-        df["ActualWeight"] = 0
-
-    # Return results
-    result_df = df[
-        ["ticker", "shares", "price", "value", "target_weight", "ActualWeight"]
-    ]
-    return result_df
+    return df
 
 
 def linear_optimization(tickers, prices, weights_target, capital=1000000):
@@ -83,24 +70,30 @@ def linear_optimization(tickers, prices, weights_target, capital=1000000):
     total_invested = df["value"].sum()
     remaining_capital = capital - total_invested
 
-    # Second pass: Distribute remaining capital
+    # Second pass: one more share for the largest fractional remainders of the
+    # target shares, in that order, while the remaining capital covers them
     if remaining_capital > 0:
         # Calculate weight error (target - actual)
         df["WeightError"] = df["target_weight"] - df["ActualWeight"]
 
-        # Sort by weight error (underweight positions first)
-        df = df.sort_values("WeightError", ascending=False)
-
-        # Allocate remaining capital to reduce errors
-        for idx, row in df.iterrows():
-            if remaining_capital < row["price"] or row["price"] <= 0:
-                continue
-
-            additional_shares = int(remaining_capital // row["price"])
-            if additional_shares > 0:
-                df.at[idx, "shares"] += additional_shares
-                df.at[idx, "value"] = df.at[idx, "shares"] * row["price"]
-                remaining_capital -= additional_shares * row["price"]
+        prices = df["price"].to_numpy()
+        valid = prices > 0
+        target_shares = np.divide(
+            capital * df["target_weight"].to_numpy(),
+            prices,
+            out=np.zeros(len(df)),
+            where=valid,
+        )
+        remainders = np.where(valid, target_shares - df["shares"].to_numpy(), -np.inf)
+        order = np.argsort(-remainders, kind="stable")
+        order = order[valid[order]]
+        affordable = np.cumsum(prices[order]) <= remaining_capital
+        extra = order[affordable]
+
+        shares = df["shares"].to_numpy().copy()
+        shares[extra] += 1
+        df["shares"] = shares
+        df["value"] = shares * prices
 
     # Recalculate actual weights
     total_invested = df["value"].sum()
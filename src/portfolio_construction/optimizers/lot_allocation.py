@@ -0,0 +1,101 @@
+import heapq
+
+import numpy as np
+import pandas as pd
+
+
+def lot_allocation(tickers, prices, weights_target, capital=1_000_000):
+    """
+    Integer share allocation minimizing the L1 distance to the dollar targets
+    (the cvx_optimizer problem) without a MILP solver.
+
+    The continuous relaxation buys exactly target / price shares; flooring it
+    leaves every name short by less than one share. A name is worth one more
+    share when that shortfall is more than half its price, and the leftover
+    capital buys those extra shares from a priority queue ordered by L1
+    reduction per dollar. In the LP relaxation, buying fewer shares than the
+    floor or more than one extra never helps, so the LP of the knapsack over
+    the extra shares gives a lower bound on the optimal objective. (An integer
+    optimum can still sell a name below its floor to make room for extra
+    shares elsewhere; the gap covers that.)
+
+    Parameters:
+    tickers: List of ticker symbols
+    prices: Array of prices for each ticker
+    weights_target: Target portfolio weights (adding up to at most one)
+    capital: Total capital to invest
+
+    Returns:
+    DataFrame with the cvx_optimizer columns; attrs["objective"] holds the L1
+    distance to the dollar targets, attrs["lower_bound"] the LP bound and
+    attrs["optimality_gap"] their difference (in dollars)
+    """
+    prices = np.asarray(prices, dtype=float)
+    weights_target = np.asarray(weights_target, dtype=float)
+    if weights_target.sum() > 1 + 1e-9:
+        raise ValueError(
+            f"Target weights add up to {weights_target.sum():.6f}, more than one"
+        )
+
+    dollar_target = capital * weights_target
+    valid = prices > 0
+    safe_prices = np.where(valid, prices, 1.0)
+
+    # Floor of the continuous relaxation, and how far each name is below target
+    shares = np.where(valid, np.floor(dollar_target / safe_prices), 0).astype(int)
+    shortfall = dollar_target - shares * prices
+    residual_capital = capital - (shares * prices).sum()
+
+    # One more share changes the error from shortfall to price - shortfall
+    gain = np.where(valid, 2 * shortfall - prices, 0.0)
+    candidates = np.flatnonzero(gain > 0)
+    ratio = gain[candidates] / prices[candidates]
+
+    lower_bound = shortfall.sum() - _knapsack_lp_gain(
+        gain[candidates], prices[candidates], ratio, residual_capital
+    )
+
+    queue = list(zip(-ratio, candidates))
+    heapq.heapify(queue)
+    while queue and residual_capital > 0:
+        _, i = heapq.heappop(queue)
+        if prices[i] <= residual_capital:
+            shares[i] += 1
+            residual_capital -= prices[i]
+
+    value = shares * prices
+    total_invested = value.sum()
+    objective = np.abs(value - dollar_target).sum()
+    print(f"Cash left uninvested: {residual_capital}")
+
+    result_df = pd.DataFrame(
+        {
+            "ticker": tickers,
+            "shares": shares,
+            "price": prices,
+            "value": value,
+            "target_weight": weights_target,
+            "actual_weight": value / total_invested if total_invested > 0 else 0.0,
+        }
+    )
+    result_df.attrs["objective"] = objective
+    result_df.attrs["lower_bound"] = min(lower_bound, objective)
+    result_df.attrs["optimality_gap"] = objective - result_df.attrs["lower_bound"]
+    return result_df
+
+
+def _knapsack_lp_gain(gain, cost, ratio, budget):
+    """
+    Largest error reduction of the LP relaxation of the extra-share knapsack:
+    items by decreasing gain per dollar, the first one that does not fit taken
+    fractionally.
+    """
+    order = np.argsort(-ratio, kind="stable")
+    gain, cost = gain[order], cost[order]
+    spent = np.cumsum(cost)
+    n_fit = np.searchsorted(spent, budget, side="right")
+    lp_gain = gain[:n_fit].sum()
+    if n_fit < len(gain):
+        left = budget - (spent[n_fit - 1] if n_fit else 0.0)
+        lp_gain += gain[n_fit] * left / cost[n_fit]
+    return lp_gain
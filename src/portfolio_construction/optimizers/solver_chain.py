@@ -0,0 +1,342 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.portfolio_construction.optimizers.cvxpy_optimizer import (
+    cvx_optimizer, joint_cvx_optimizer, turnover_cvx_optimizer)
+from src.portfolio_construction.optimizers.greedy_allocation import \
+    greedy_allocation
+from src.portfolio_construction.optimizers.lot_allocation import lot_allocation
+
+# Share allocators selectable per strategy; "cvx" runs the MILP solver chain
+ALLOCATORS = {
+    "cvx": cvx_optimizer,
+    "lot": lot_allocation,
+    "greedy": greedy_allocation,
+}
+DEFAULT_ALLOCATOR = "cvx"
+
+# cvxpy solve() options that cap a MILP solver's run time (seconds)
+TIME_LIMIT_OPTIONS = {
+    "GLPK_MI": lambda seconds: {"tm_lim": int(seconds * 1000)},
+    "SCIP": lambda seconds: {"scip_params": {"limits/time": seconds}},
+}
+# A time-limited solve stopped early keeps its best integer solution
+SOLVED_STATUSES = {"optimal", "optimal_inaccurate", "completed"}
+
+# How the long and short books of a rebalance are allocated: one after the
+# other, on two threads, or as one problem with cross-side constraints
+SIDE_MODES = ("sequential", "concurrent", "joint")
+DEFAULT_SIDE_MODE = "sequential"
+# Largest |long - short| notional of the joint mode, as a fraction of gross
+DEFAULT_NET_TOLERANCE = 0.01
+
+
+@dataclass(frozen=True)
+class SolverStep:
+    """
+    One step of a solver chain: a cvxpy MILP solver for cvx_optimizer (e.g.
+    "GLPK_MI", "SCIP") or the name of a non-MILP allocator ("lot", "greedy").
+    time_limit (seconds) only applies to the MILP solvers.
+    """
+
+    solver: str
+    time_limit: float = None
+
+
+DEFAULT_SOLVER_CHAIN = (
+    SolverStep("GLPK_MI", 10.0),
+    SolverStep("SCIP", 10.0),
+    SolverStep("greedy"),
+)
+
+
+@dataclass(frozen=True)
+class TurnoverCosts:
+    """
+    Trading costs weighed against the tracking error when a book is allocated
+    from its previous holdings (turnover_cvx_optimizer): per_dollar is charged
+    on the traded notional and per_trade, a fraction of the side capital, on
+    every name traded at all.
+    """
+
+    per_dollar: float = 0.001
+    per_trade: float = 0.0005
+
+
+DEFAULT_TURNOVER_COSTS = TurnoverCosts()
+
+
+def solver_chain_for(allocator):
+    """
+    The solver chain of an allocator name: the MILP chain for "cvx", otherwise
+    the allocator followed by the greedy fallback.
+    """
+    if allocator not in ALLOCATORS:
+        raise ValueError(
+            f"Unknown allocator '{allocator}', expected one of {list(ALLOCATORS)}"
+        )
+    if allocator == "cvx":
+        return DEFAULT_SOLVER_CHAIN
+    if allocator == "greedy":
+        return (SolverStep("greedy"),)
+    return (SolverStep(allocator), SolverStep("greedy"))
+
+
+def _run_step(
+    step, tickers, prices, weights_target, capital, previous_shares, turnover_costs
+):
+    if step.solver in ALLOCATORS and step.solver != "cvx":
+        result_df = ALLOCATORS[step.solver](tickers, prices, weights_target, capital)
+        return result_df, result_df.attrs.get("status", "completed")
+
+    solver_options = {}
+    if step.time_limit is not None and step.solver in TIME_LIMIT_OPTIONS:
+        solver_options = TIME_LIMIT_OPTIONS[step.solver](step.time_limit)
+    if previous_shares is not None:
+        result_df = turnover_cvx_optimizer(
+            tickers,
+            prices,
+            weights_target,
+            capital,
+            previous_shares,
+            turnover_costs.per_dollar,
+            turnover_costs.per_trade * capital,
+            solver="GLPK_MI" if step.solver == "cvx" else step.solver,
+            **solver_options,
+        )
+        return result_df, result_df.attrs.get("status", "completed")
+    result_df = cvx_optimizer(
+        tickers,
+        prices,
+        weights_target,
+        capital,
+        solver="GLPK_MI" if step.solver == "cvx" else step.solver,
+        **solver_options,
+    )
+    return result_df, result_df.attrs.get("status", "completed")
+
+
+def _attempt_record(step, status, solve_seconds, result_df, dollar_target, capital):
+    solved = result_df is not None and status in SOLVED_STATUSES
+    attempt = {
+        "solver": step.solver,
+        "time_limit": step.time_limit,
+        "status": status,
+        "solve_seconds": solve_seconds,
+        "objective": np.nan,
+        "cash_left": np.nan,
+        "selected": solved,
+    }
+    if solved:
+        value = result_df["value"].to_numpy(dtype=float)
+        attempt["objective"] = np.abs(value - dollar_target).sum()
+        attempt["cash_left"] = capital - value.sum()
+    return attempt
+
+
+def allocate_with_fallback(
+    tickers,
+    prices,
+    weights_target,
+    capital,
+    solver_chain=DEFAULT_SOLVER_CHAIN,
+    previous_shares=None,
+    turnover_costs=DEFAULT_TURNOVER_COSTS,
+):
+    """
+    Tries the steps of the chain in order until one returns an allocation for
+    every ticker.
+
+    With previous_shares (the shares held per ticker) the MILP steps allocate
+    from the held book, weighing turnover_costs against the tracking error
+    (turnover_cvx_optimizer); the other allocators size the book from scratch.
+
+    Returns:
+        Tuple of (allocation DataFrame, list of one telemetry dict per attempt
+        with solver, time_limit, status, solve_seconds, objective (L1 distance
+        to the dollar targets), cash_left and selected)
+    """
+    prices = np.asarray(prices, dtype=float)
+    dollar_target = capital * np.asarray(weights_target, dtype=float)
+    attempts = []
+    for step in solver_chain:
+        start = time.perf_counter()
+        try:
+            result_df, status = _run_step(
+                step,
+                tickers,
+                prices,
+                weights_target,
+                capital,
+                previous_shares,
+                turnover_costs,
+            )
+        except Exception as e:
+            print(f"Error occurred in {step.solver} allocation: {e}")
+            result_df, status = None, "error"
+        solve_seconds = time.perf_counter() - start
+
+        if result_df is not None and len(result_df) != len(tickers):
+            result_df = None
+        attempt = _attempt_record(
+            step, status, solve_seconds, result_df, dollar_target, capital
+        )
+        attempts.append(attempt)
+        if attempt["selected"]:
+            return result_df, attempts
+        print(f"{step.solver} did not solve (status {status}), trying the next solver")
+
+    raise RuntimeError(
+        f"No solver in the chain {[step.solver for step in solver_chain]} "
+        "produced an allocation"
+    )
+
+
+# Persistent so its threads, and their compiled problems, outlive a rebalance
+_SIDE_EXECUTOR = None
+_SIDE_EXECUTOR_LOCK = threading.Lock()
+
+
+def _side_executor():
+    global _SIDE_EXECUTOR
+    with _SIDE_EXECUTOR_LOCK:
+        if _SIDE_EXECUTOR is None:
+            _SIDE_EXECUTOR = ThreadPoolExecutor(
+                max_workers=2, thread_name_prefix="allocate-side"
+            )
+    return _SIDE_EXECUTOR
+
+
+def _allocate_joint(books, side_capital, solver_chain, net_tolerance):
+    """
+    Tries the MILP steps of the chain on the joint problem. Returns the per-side
+    results and attempts, or (None, attempts) when none of them solves.
+    """
+    long_book, short_book = books["Long"], books["Short"]
+    attempts = {"Long": [], "Short": []}
+    for step in solver_chain:
+        if step.solver in ALLOCATORS:
+            continue
+        solver_options = {}
+        if step.time_limit is not None and step.solver in TIME_LIMIT_OPTIONS:
+            solver_options = TIME_LIMIT_OPTIONS[step.solver](step.time_limit)
+
+        start = time.perf_counter()
+        try:
+            results = joint_cvx_optimizer(
+                long_book,
+                short_book,
+                2 * side_capital,
+                net_tolerance,
+                solver=step.solver,
+                **solver_options,
+            )
+            status = results[0].attrs.get("status", "error")
+        except Exception as e:
+            print(f"Error occurred in joint {step.solver} allocation: {e}")
+            results, status = (None, None), "error"
+        solve_seconds = time.perf_counter() - start
+
+        joint_step = SolverStep(f"joint {step.solver}", step.time_limit)
+        solved = status in SOLVED_STATUSES and all(
+            result_df is not None and len(result_df) == len(book[0])
+            for result_df, book in zip(results, (long_book, short_book))
+        )
+        for direction, result_df, book in zip(
+            ("Long", "Short"), results, (long_book, short_book)
+        ):
+            attempts[direction].append(
+                _attempt_record(
+                    joint_step,
+                    status,
+                    solve_seconds,
+                    result_df if solved else None,
+                    side_capital * np.asarray(book[2], dtype=float),
+                    side_capital,
+                )
+            )
+        if solved:
+            return dict(zip(("Long", "Short"), results)), attempts
+        print(
+            f"Joint {step.solver} did not solve (status {status}), trying the next solver"
+        )
+    return None, attempts
+
+
+def allocate_sides(
+    books,
+    side_capital,
+    solver_chain=DEFAULT_SOLVER_CHAIN,
+    side_mode=DEFAULT_SIDE_MODE,
+    net_tolerance=DEFAULT_NET_TOLERANCE,
+    previous_shares=None,
+    turnover_costs=DEFAULT_TURNOVER_COSTS,
+):
+    """
+    Allocates the books of a rebalance, each side targeting side_capital.
+
+    "sequential" runs allocate_with_fallback per side in turn and "concurrent"
+    runs them on two threads. GLPK solves are serialized (see
+    cvxpy_optimizer.solve_problem), so the sides only overlap in their problem
+    setup and in other solvers' steps. "joint" solves both sides in one problem (joint_cvx_optimizer) with
+    the gross notional capped at twice side_capital and |long - short| within
+    net_tolerance of it, falling back to the per-side chain if no MILP step of
+    the chain solves it or the rebalance does not have both a Long and a Short
+    book.
+
+    Parameters:
+    books: dict of direction -> (tickers, prices, weights_target)
+    previous_shares: Optional dict of direction -> shares held per ticker of
+        its book, to allocate from the held positions (see
+        allocate_with_fallback); not supported by the joint mode
+
+    Returns:
+        dict of direction -> (allocation DataFrame, attempts), in the order of books
+    """
+    if side_mode not in SIDE_MODES:
+        raise ValueError(
+            f"Unknown side mode '{side_mode}', expected one of {SIDE_MODES}"
+        )
+
+    if side_mode == "joint" and previous_shares is not None:
+        raise ValueError("The joint side mode does not allocate from previous holdings")
+
+    def allocate(direction):
+        return allocate_with_fallback(
+            *books[direction],
+            side_capital,
+            solver_chain,
+            None if previous_shares is None else previous_shares[direction],
+            turnover_costs,
+        )
+
+    if side_mode == "concurrent" and len(books) > 1:
+        futures = {
+            direction: _side_executor().submit(allocate, direction)
+            for direction in books
+        }
+        return {direction: future.result() for direction, future in futures.items()}
+
+    joint_attempts = {}
+    if side_mode == "joint" and set(books) == {"Long", "Short"}:
+        results, joint_attempts = _allocate_joint(
+            books, side_capital, solver_chain, net_tolerance
+        )
+        if results is not None:
+            return {
+                direction: (results[direction], joint_attempts[direction])
+                for direction in books
+            }
+
+    allocations = {}
+    for direction in books:
+        result_df, attempts = allocate(direction)
+        allocations[direction] = (
+            result_df,
+            joint_attempts.get(direction, []) + attempts,
+        )
+    return allocations
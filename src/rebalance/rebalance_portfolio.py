@@ -7,9 +7,14 @@ from sqlalchemy import text
 
 from src.data_access.crud_util import DataAccessUtil
 from src.data_access.sqllite_db_manager import TableNames
-from src.portfolio_construction.optimizers.cvxpy_optimizer import cvx_optimizer
-from src.portfolio_construction.optimizers.greedy_allocation import \
-    greedy_allocation
+from src.portfolio_construction.optimizers.solver_chain import (
+    DEFAULT_ALLOCATOR, DEFAULT_SIDE_MODE, DEFAULT_TURNOVER_COSTS,
+    TurnoverCosts, allocate_sides, solver_chain_for)
+
+# "full" closes every position at each rebalance and opens the new book;
+# "delta" allocates from the open positions and only books the changes
+REBALANCE_MODES = ("full", "delta")
+DEFAULT_REBALANCE_MODE = "full"
 
 
 @dataclass
@@ -19,10 +24,28 @@ class RebalanceData:
     alpha_df: pd.DataFrame = None
     prices_df: pd.DataFrame = None
     rebalance_target_value: float = None
+    allocator: str = DEFAULT_ALLOCATOR
+    # Explicit SolverStep chain; None uses solver_chain_for(allocator)
+    solver_chain: tuple = None
+    # How the Long and Short books are solved, one of solver_chain.SIDE_MODES
+    side_mode: str = DEFAULT_SIDE_MODE
+    # Open positions (trade_booking rows) to allocate from in the delta mode;
+    # their names leaving the book are sold down
+    previous_book: pd.DataFrame = None
+    turnover_costs: TurnoverCosts = DEFAULT_TURNOVER_COSTS
 
 
 def create_rebalance_data(
-    strategy_name, rebalance_date, alpha_df, prices_df, rebalance_target_value
+    strategy_name,
+    rebalance_date,
+    alpha_df,
+    prices_df,
+    rebalance_target_value,
+    allocator=DEFAULT_ALLOCATOR,
+    solver_chain=None,
+    side_mode=DEFAULT_SIDE_MODE,
+    previous_book=None,
+    turnover_costs=DEFAULT_TURNOVER_COSTS,
 ):
     return RebalanceData(
         strategy_name=strategy_name,
@@ -30,6 +53,11 @@ def create_rebalance_data(
         alpha_df=alpha_df,
         prices_df=prices_df,
         rebalance_target_value=rebalance_target_value,
+        allocator=allocator,
+        solver_chain=solver_chain,
+        side_mode=side_mode,
+        previous_book=previous_book,
+        turnover_costs=turnover_costs,
     )
 
 
@@ -49,11 +77,11 @@ class RebalanceUtil:
         conditions = []
 
         if start_date:
-            conditions.append("date(date) >= date(:start_date)")
-            params["start_date"] = start_date
+            conditions.append("date >= :start_date")
+            params["start_date"] = DataAccessUtil.to_db_date(start_date)
         if end_date:
-            conditions.append("date(date) <= date(:end_date)")
-            params["end_date"] = end_date
+            conditions.append("date <= :end_date")
+            params["end_date"] = DataAccessUtil.to_db_date(end_date)
 
         if conditions:
             base_query += " AND " + " AND ".join(conditions)
@@ -77,11 +105,11 @@ class RebalanceUtil:
         conditions = []
 
         if start_date:
-            conditions.append("date(date) >= date(:start_date)")
-            params["start_date"] = start_date
+            conditions.append("date >= :start_date")
+            params["start_date"] = DataAccessUtil.to_db_date(start_date)
         if end_date:
-            conditions.append("date(date) <= date(:end_date)")
-            params["end_date"] = end_date
+            conditions.append("date <= :end_date")
+            params["end_date"] = DataAccessUtil.to_db_date(end_date)
 
         if conditions:
             base_query += " AND " + " AND ".join(conditions)
@@ -90,38 +118,65 @@ class RebalanceUtil:
         df = DataAccessUtil.fetch_data_from_db(stmt, params)
         return df
 
+    @staticmethod
+    def build_capital_schedule(aum_leverage_df):
+        """
+        Precomputes the per-date inputs of get_new_portfolio_notional so each
+        rebalance is a dict lookup instead of a scan of the AUM/leverage frame.
+
+        Returns:
+            dict of normalized Timestamp -> (aum, target_leverage, in_out_flows,
+            leverage_change); flows and leverage changes are numeric with NaN as 0.
+        """
+        if aum_leverage_df is None or aum_leverage_df.empty:
+            return {}
+
+        def numeric(column):
+            if column not in aum_leverage_df.columns:
+                return np.zeros(len(aum_leverage_df))
+            return (
+                pd.to_numeric(aum_leverage_df[column], errors="coerce")
+                .fillna(0)
+                .to_numpy()
+            )
+
+        schedule = {}
+        for entry in zip(
+            pd.to_datetime(aum_leverage_df["date"]).dt.normalize(),
+            aum_leverage_df["aum"].to_numpy(),
+            aum_leverage_df["target_leverage"].to_numpy(),
+            numeric("in_out_flows"),
+            numeric("leverage_change"),
+        ):
+            # The first row of a date wins, as in the original frame lookup
+            schedule.setdefault(entry[0], entry[1:])
+        return schedule
+
     @staticmethod
     def get_new_portfolio_notional(
-        aum_leverage_df, rebalance_date, current_pf_value, is_initial_rebalance=False
+        capital_schedule, rebalance_date, current_pf_value, is_initial_rebalance=False
     ):
-        """Calculates new portfolio value based on AUM and leverage changes."""
-        if not isinstance(rebalance_date, str):
-            rebalance_date = pd.to_datetime(rebalance_date).strftime("%Y-%m-%d")
+        """
+        Calculates new portfolio value based on AUM and leverage changes.
 
-        aum_data = aum_leverage_df[aum_leverage_df["date"] == rebalance_date]
+        capital_schedule is the dict from build_capital_schedule; an AUM/leverage
+        DataFrame is also accepted and converted on the fly.
+        """
+        if not isinstance(capital_schedule, dict):
+            capital_schedule = RebalanceUtil.build_capital_schedule(capital_schedule)
 
-        if aum_data.empty:
+        aum_data = capital_schedule.get(pd.Timestamp(rebalance_date).normalize())
+        if aum_data is None:
             return current_pf_value
 
-        current_leverage = aum_data["target_leverage"].values[0]
+        aum, current_leverage, in_out_flows, leverage_change = aum_data
         if is_initial_rebalance:
-            aum = aum_data["aum"].values[0]
             return aum * current_leverage
         else:
             # There are two components capital increase from second period onwards,
             # 1. First the leverage can be increased (or decreased)
             # 2. Second, new capital can be added (which in turn requires to be adjusted current target leverage)
-            in_out_flows = (
-                pd.to_numeric(aum_data["in_out_flows"], errors="coerce")
-                .fillna(0)
-                .values[0]
-            )
             new_capital_inflows = current_leverage * in_out_flows
-            leverage_change = (
-                pd.to_numeric(aum_data["leverage_change"], errors="coerce")
-                .fillna(0)
-                .values[0]
-            )
 
             current_portfolio_value_with_out_leverage = current_pf_value / (
                 current_leverage - leverage_change
@@ -137,6 +192,8 @@ class RebalancePortfolio:
 
     def __init__(self, rebalance_data):
         self.rebalance_data = rebalance_data
+        # One row per solver attempt of the last rebalance_portfolio() call
+        self.optimizer_log = []
 
     def rebalance_portfolio(self):
         """Rebalances portfolio using alpha scores and target values."""
@@ -145,6 +202,10 @@ class RebalancePortfolio:
         rebalance_date = self.rebalance_data.rebalance_date
         rebalance_target_value = self.rebalance_data.rebalance_target_value
         strategy_name = self.rebalance_data.strategy_name
+        solver_chain = self.rebalance_data.solver_chain or solver_chain_for(
+            self.rebalance_data.allocator
+        )
+        self.optimizer_log = []
 
         if prices_df.empty or all(prices_df["value"] == 0):
             # No price data for the rebalance
@@ -152,32 +213,66 @@ class RebalancePortfolio:
 
         # Get unique trade directions(L/S) and get optimized portfolio.
         trade_directions = alpha_scores_df["trade_direction"].unique()
-        results = []
+        previous_book = self.rebalance_data.previous_book
+        held_shares = None
+        if previous_book is not None:
+            # Shares held per (direction, ticker), over all open lots
+            held_shares = (
+                previous_book.groupby(["direction", "ticker"], sort=False)["shares"]
+                .sum()
+                .abs()
+            )
+            trade_directions = pd.unique(
+                np.concatenate(
+                    [trade_directions, held_shares.index.get_level_values(0)]
+                )
+            )
 
+        directional_target_value = rebalance_target_value / 2
+        price_series = prices_df.set_index("ticker")["value"]
+        books, previous_shares = {}, {}
         for direction in trade_directions:
-            directional_target_value = rebalance_target_value / 2
-            print(f"Optimizing {direction} positions...")
             direction_df = alpha_scores_df[
                 alpha_scores_df["trade_direction"] == direction
-            ].copy()
-
+            ]
             tickers = direction_df["ticker"].values
             weights_target = direction_df["weight"].values
-            price_series = prices_df.set_index("ticker")["value"]
+            if held_shares is not None:
+                held = held_shares.get(direction, pd.Series(dtype=float))
+                # Held names leaving the book are allocated with a zero weight
+                exiting = held.index[~held.index.isin(tickers)].to_numpy()
+                tickers = np.concatenate([tickers, exiting])
+                weights_target = np.concatenate(
+                    [weights_target, np.zeros(len(exiting))]
+                )
+                previous_shares[direction] = held.reindex(tickers).fillna(0).to_numpy()
             prices = price_series.reindex(tickers).fillna(0).values
+            books[direction] = (tickers, prices, weights_target)
+
+        print(
+            f"Optimizing {', '.join(books)} positions ({self.rebalance_data.side_mode})..."
+        )
+        allocations = allocate_sides(
+            books,
+            directional_target_value,
+            solver_chain,
+            self.rebalance_data.side_mode,
+            previous_shares=None if held_shares is None else previous_shares,
+            turnover_costs=self.rebalance_data.turnover_costs,
+        )
 
-            try:
-                result_df = cvx_optimizer(
-                    tickers, prices, weights_target, directional_target_value
-                )
-            except Exception as e:
-                print(
-                    "Error occurred in CVX based optimization. Now trying the simple greedy approach."
-                )
-                print(f"The error is {str(e)}")
-                result_df = greedy_allocation(
-                    tickers, prices, weights_target, directional_target_value
-                )
+        results = []
+        for direction, (result_df, attempts) in allocations.items():
+            self.optimizer_log.extend(
+                {
+                    "strategy_name": strategy_name,
+                    "date": rebalance_date,
+                    "direction": direction,
+                    "n_names": len(books[direction][0]),
+                    **attempt,
+                }
+                for attempt in attempts
+            )
             result_df["direction"] = direction
             if direction == "Short":
                 result_df["shares"] = -1 * result_df["shares"]
@@ -1,4 +1,5 @@
 from src.data_access.schemas import UniverseSpec
+from src.strategy.data_dependencies import DataResolver
 from src.strategy.min_vol.min_vol import MinVolSignal
 from src.strategy.momentum.roc_momentum import RocSignal
 from src.strategy.strategy_utils import build_and_store_signal
@@ -8,6 +9,8 @@ if __name__ == "__main__":
     end_date = "2025-01-31"
     spec = UniverseSpec(universe="sp500", start_date=start_date, end_date=end_date)
 
-    strategies = [RocSignal(spec), MinVolSignal(spec)]
+    # Both strategies read px_last from one shared panel
+    resolver = DataResolver()
+    strategies = [RocSignal(spec, resolver), MinVolSignal(spec, resolver)]
     for strategy in strategies:
         build_and_store_signal(strategy)
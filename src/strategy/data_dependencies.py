@@ -0,0 +1,98 @@
+import logging
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data_access.prices import PriceDataFetcher
+from src.data_access.schemas import UniverseSpec
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DataDependency:
+    """
+    A named strategy input: one sp500_ts_data key for the stocks (or for the
+    benchmark), resolved into a business-day aligned dates x tickers panel.
+    """
+
+    name: str
+    key: str = "px_last"
+    benchmark: bool = False
+
+
+PX_LAST = DataDependency("px_last")
+BENCHMARK_PX_LAST = DataDependency("benchmark_px_last", benchmark=True)
+MCAP = DataDependency("mcap", key="mcap")
+
+
+def _read_only_panel(long_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Wide dates x tickers panel on every business day between the first and
+    last date (days without data are NaN), over a read-only array.
+    """
+    if long_df.empty:
+        return pd.DataFrame(index=pd.DatetimeIndex([], name="date"))
+    wide = long_df.pivot(index="date", columns="ticker", values="value")
+    wide.index = pd.to_datetime(wide.index)
+    wide = wide.sort_index().asfreq("B")
+
+    values = np.ascontiguousarray(wide.to_numpy(dtype=np.float64))
+    values.flags.writeable = False
+    return pd.DataFrame(values, index=wide.index, columns=wide.columns, copy=False)
+
+
+class DataResolver:
+    """
+    Fetches each strategy dependency once per UniverseSpec and shares the
+    panel between strategies: running several strategies over the same spec
+    reads and pivots each sp500_ts_data key once. Strategies get read-only
+    views (writes to the values raise), so one cannot alter another's inputs.
+    """
+
+    def __init__(self, engine=None) -> None:
+        self.engine = engine
+        self._panels: Dict[Tuple, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _cache_key(spec: UniverseSpec, dependency: DataDependency) -> Tuple:
+        return (
+            spec.universe,
+            spec.start_date,
+            spec.end_date,
+            dependency.key,
+            dependency.benchmark,
+        )
+
+    def panel(self, spec: UniverseSpec, dependency: DataDependency) -> pd.DataFrame:
+        """The shared panel of one dependency, fetched on first use."""
+        cache_key = self._cache_key(spec, dependency)
+        with self._lock:
+            if cache_key not in self._panels:
+                long_df = PriceDataFetcher.get_ts_data(
+                    spec, dependency.key, dependency.benchmark, engine=self.engine
+                )
+                self._panels[cache_key] = _read_only_panel(long_df)
+                logger.info(
+                    f"Resolved {dependency.name} panel with shape "
+                    f"{self._panels[cache_key].shape}"
+                )
+            panel = self._panels[cache_key]
+        # Shallow copy: shares the values, but index/column changes stay local
+        return panel.copy(deep=False)
+
+    def resolve(
+        self, spec: UniverseSpec, dependencies: Iterable[DataDependency]
+    ) -> Mapping[str, pd.DataFrame]:
+        """Read-only mapping of dependency name -> panel."""
+        return MappingProxyType(
+            {
+                dependency.name: self.panel(spec, dependency)
+                for dependency in dependencies
+            }
+        )
@@ -1,72 +1,171 @@
-from dataclasses import dataclass, field
+from typing import Dict, Optional
 
+import numpy as np
 import pandas as pd
 
-from src.data_access.prices import PriceDataFetcher
 from src.data_access.schemas import UniverseSpec
-from src.data_access.sqllite_db_manager import get_db_engine
+from src.strategy.data_dependencies import (BENCHMARK_PX_LAST, PX_LAST,
+                                            DataResolver)
+from src.strategy.online_state import OnlineSignalState, RollingMoments
 from src.strategy.strategy import Strategy
 from src.strategy.strategy_utils import build_and_store_signal
 
 SIGNAL_NAME = "MinVol"
 
+# Dates whose return windows are gathered at once
+_DATE_BLOCK = 64
+
+
+def rolling_vol_on_dates(
+    px_df: pd.DataFrame, dates: pd.DatetimeIndex, vol_window: int
+) -> pd.DataFrame:
+    """
+    px_df.pct_change().rolling(vol_window).std() evaluated only on dates:
+    each date's window of returns is gathered from the vol_window + 1 prices
+    ending on it, and no history before the first window is touched. Dates
+    not in px_df's index, or without a full window, are left out.
+    """
+    positions = px_df.index.get_indexer(dates)
+    positions = positions[positions >= vol_window]
+    if len(positions) == 0:
+        return pd.DataFrame(columns=px_df.columns, index=pd.DatetimeIndex([]))
+
+    start = positions.min() - vol_window
+    returns = px_df.iloc[start : positions.max() + 1].pct_change().to_numpy()
+    offsets = positions - start
+    window = np.arange(1 - vol_window, 1)
+    vol = np.empty((len(positions), px_df.shape[1]))
+    for block in range(0, len(positions), _DATE_BLOCK):
+        rows = offsets[block : block + _DATE_BLOCK, None] + window
+        vol[block : block + _DATE_BLOCK] = returns[rows].std(axis=1, ddof=1)
+    return pd.DataFrame(vol, index=px_df.index[positions], columns=px_df.columns)
+
+
+def compute_min_vol_signal(
+    stock_px_df: pd.DataFrame,
+    benchmark_px_df: pd.DataFrame,
+    vol_window: int = 10,
+    dates: Optional[pd.DatetimeIndex] = None,
+) -> pd.DataFrame:
+    """
+    Negative rolling volatility of each stock relative to the benchmark's (lower
+    relative volatility scores higher).
+
+    Args:
+        stock_px_df: Wide stock prices (dates x tickers)
+        benchmark_px_df: Wide benchmark prices with a single column
+        vol_window: Rolling window, in business days, of the return volatility
+        dates: Only evaluate the signal on these dates (every business day if None)
+
+    Returns:
+        Daily signal (or the signal on dates), dates x tickers
+    """
+    stock_px_df = stock_px_df.asfreq("B").ffill()
+    benchmark_px_df = benchmark_px_df.asfreq("B").ffill()
+
+    if dates is None:
+        stock_returns = stock_px_df.pct_change()
+        benchmark_returns = benchmark_px_df.pct_change()
 
-@dataclass
-class MinVolSignalData:
-    spec: UniverseSpec
-    price_data: pd.DataFrame = field(init=False)
-    benchmark_data: pd.DataFrame = field(init=False)
-
-    def __post_init__(self) -> None:
-        self.price_data = PriceDataFetcher.get_price_data(
-            spec=self.spec, engine=get_db_engine()
-        )
-        self.benchmark_data = PriceDataFetcher.get_benchmark_data(
-            spec=self.spec, engine=get_db_engine()
+        stock_vol = stock_returns.rolling(window=vol_window).std()
+        benchmark_vol = benchmark_returns.rolling(window=vol_window).std()
+    else:
+        dates = pd.DatetimeIndex(dates)
+        stock_vol = rolling_vol_on_dates(stock_px_df, dates, vol_window)
+        benchmark_vol = rolling_vol_on_dates(benchmark_px_df, dates, vol_window)
+
+    # Ensure single benchmark and broadcast to match stock universe
+    if benchmark_vol.shape[1] != 1:
+        raise ValueError("Expected exactly one benchmark ticker.")
+    benchmark_vol_series = benchmark_vol.iloc[:, 0]
+
+    benchmark_vol_aligned = pd.concat(
+        [benchmark_vol_series] * stock_vol.shape[1], axis=1
+    )
+    benchmark_vol_aligned.columns = stock_vol.columns
+
+    # Relative volatility: lower stock volatility relative to benchmark
+    relative_vol = stock_vol / benchmark_vol_aligned
+
+    # Invert: lower relative volatility → better stock
+    signal_df = -relative_vol
+    signal_df = signal_df.dropna(how="all")
+
+    return signal_df
+
+
+class MinVolSignalState(OnlineSignalState):
+    """
+    compute_min_vol_signal one business day at a time: windowed Welford
+    moments of the last vol_window returns of each stock and of the
+    benchmark. The benchmark's prices are passed under benchmark_ticker in
+    the same price vector, and each update returns the signal row of that
+    day over the stocks.
+    """
+
+    def __init__(self, benchmark_ticker: str, vol_window: int = 10) -> None:
+        super().__init__()
+        self.benchmark_ticker = benchmark_ticker
+        self.moments = RollingMoments(vol_window)
+        self.previous_price = np.empty(0)
+
+    def _extend(self, n_new: int) -> None:
+        self.moments.extend(n_new)
+        self.previous_price = np.concatenate(
+            [self.previous_price, np.full(n_new, np.nan)]
         )
 
+    def update(self, date, prices: pd.Series) -> pd.Series:
+        if self.benchmark_ticker not in prices.index:
+            raise ValueError(f"No {self.benchmark_ticker} benchmark price")
+        return super().update(date, prices).drop(self.benchmark_ticker)
 
-class MinVolSignal(Strategy):
-    def __init__(self, spec: UniverseSpec) -> None:
-        super().__init__(spec, SIGNAL_NAME)
-        self.min_vol_data = MinVolSignalData(spec)
+    def _step(self, date: pd.Timestamp, price: np.ndarray) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.moments.push(price / self.previous_price - 1)
+            self.previous_price = price
+            vol = self.moments.std()
+            return -(vol / vol[self.tickers.get_loc(self.benchmark_ticker)])
 
-    def calculate_signal_scores(self) -> pd.DataFrame:
-        stock_df_raw = self.min_vol_data.price_data
-        benchmark_df_raw = self.min_vol_data.benchmark_data
+    def _state_dict(self) -> Dict[str, np.ndarray]:
+        return {
+            "benchmark_ticker": np.array(self.benchmark_ticker),
+            "previous_price": self.previous_price,
+            **self.moments.state_dict("vol_"),
+        }
 
-        stock_px_df = stock_df_raw.pivot(index="date", columns="ticker", values="value")
-        benchmark_px_df = benchmark_df_raw.pivot(
-            index="date", columns="ticker", values="value"
-        )
+    def _load_state_dict(self, arrays) -> None:
+        self.benchmark_ticker = str(arrays["benchmark_ticker"])
+        self.previous_price = arrays["previous_price"]
+        self.moments = RollingMoments(1)
+        self.moments.load_state_dict(arrays, "vol_")
 
-        stock_px_df = stock_px_df.asfreq("B").ffill()
-        benchmark_px_df = benchmark_px_df.asfreq("B").ffill()
 
-        stock_returns = stock_px_df.pct_change()
-        benchmark_returns = benchmark_px_df.pct_change()
-
-        stock_vol_10d = stock_returns.rolling(window=10).std()
-        benchmark_vol_10d = benchmark_returns.rolling(window=10).std()
-
-        # Ensure single benchmark and broadcast to match stock universe
-        if benchmark_vol_10d.shape[1] != 1:
-            raise ValueError("Expected exactly one benchmark ticker.")
-        benchmark_vol_series = benchmark_vol_10d.iloc[:, 0]
-
-        benchmark_vol_aligned = pd.concat(
-            [benchmark_vol_series] * stock_vol_10d.shape[1], axis=1
+class MinVolSignal(Strategy):
+    dependencies = (PX_LAST, BENCHMARK_PX_LAST)
+
+    def __init__(
+        self, spec: UniverseSpec, resolver: Optional[DataResolver] = None
+    ) -> None:
+        super().__init__(spec, SIGNAL_NAME, resolver)
+
+    def calculate_signal_scores(
+        self, dates: Optional[pd.DatetimeIndex] = None
+    ) -> pd.DataFrame:
+        data = self.data
+        return compute_min_vol_signal(
+            data[PX_LAST.name], data[BENCHMARK_PX_LAST.name], vol_window=10, dates=dates
         )
-        benchmark_vol_aligned.columns = stock_vol_10d.columns
 
-        # Relative volatility: lower stock volatility relative to benchmark
-        relative_vol = stock_vol_10d / benchmark_vol_aligned
-
-        # Invert: lower relative volatility → better stock
-        signal_df = -relative_vol
-        signal_df = signal_df.dropna(how="all")
-
-        return signal_df
+    def signal_state(self) -> MinVolSignalState:
+        """Online state after the strategy's price history, for daily updates."""
+        data = self.data
+        benchmark_px_df = data[BENCHMARK_PX_LAST.name]
+        return MinVolSignalState.from_history(
+            pd.concat([data[PX_LAST.name], benchmark_px_df], axis=1),
+            benchmark_ticker=benchmark_px_df.columns[0],
+            vol_window=10,
+        )
 
 
 if __name__ == "__main__":
@@ -1,60 +1,189 @@
-from dataclasses import dataclass, field
+from typing import Dict, Optional
 
+import numpy as np
 import pandas as pd
 
-from src.data_access.prices import PriceDataFetcher
 from src.data_access.schemas import UniverseSpec
-from src.data_access.sqllite_db_manager import get_db_engine
+from src.strategy.data_dependencies import PX_LAST, DataResolver
+from src.strategy.online_state import OnlineSignalState, RollingWindow
 from src.strategy.strategy import Strategy
 from src.strategy.strategy_utils import build_and_store_signal
 
 SIGNAL_NAME = "Mom_RoC"
 
 
-@dataclass
-class RoCSignalData:
-    spec: UniverseSpec
-    price_data: pd.DataFrame = field(init=False)
-
-    def __post_init__(self) -> None:
-        self.price_data = PriceDataFetcher.get_price_data(
-            spec=self.spec, engine=get_db_engine()
+def compute_roc_signal(
+    px_last_df: pd.DataFrame,
+    ma_window: int = 5,
+    short_weeks: int = 1,
+    long_weeks: int = 3,
+    dates: Optional[pd.DatetimeIndex] = None,
+) -> pd.DataFrame:
+    """
+    Momentum acceleration: average weekly rate of change over short_weeks minus
+    the average weekly rate of change over long_weeks, on smoothed prices.
+
+    Args:
+        px_last_df: Wide prices (dates x tickers)
+        ma_window: Daily moving average window applied before resampling
+        short_weeks: Short RoC horizon in weeks
+        long_weeks: Long RoC horizon in weeks
+        dates: Only evaluate the signal on these dates, each taking the latest
+            weekly value (every Friday if None)
+
+    Returns:
+        Weekly (Friday) signal, or the signal on dates, dates x tickers
+    """
+    # Sort index and columns
+    px_last_df = px_last_df.sort_index()
+    px_last_df = px_last_df[sorted(px_last_df.columns)]
+
+    # Fill missing weekdays
+    px_last_df = px_last_df.asfreq("B").ffill()
+    if dates is not None:
+        # Keep the lookback of the first date: the long RoC's weeks before its
+        # latest Friday plus the moving average window before them
+        dates = pd.DatetimeIndex(dates)
+        lookback_start = (
+            dates.min()
+            - pd.offsets.Week(long_weeks + 1, weekday=4)
+            - pd.offsets.BDay(ma_window)
+        )
+        px_last_df = px_last_df[
+            (px_last_df.index >= lookback_start) & (px_last_df.index <= dates.max())
+        ]
+
+    # Apply the moving average
+    df_daily_ma = px_last_df.rolling(window=ma_window, min_periods=1).mean()
+
+    # Resample to weekly (Friday close)
+    df_weekly = df_daily_ma.resample("W-FRI").last()
+
+    # Average weekly RoC over the short and long horizons
+    roc_short = df_weekly.pct_change(periods=short_weeks) / short_weeks
+    roc_long = df_weekly.pct_change(periods=long_weeks) / long_weeks
+
+    # Momentum acceleration
+    roc_diff = roc_short - roc_long
+    roc_diff = roc_diff[sorted(roc_diff.columns)]
+    roc_diff.sort_index(inplace=True)
+
+    if dates is not None and len(roc_diff):
+        roc_diff = roc_diff.reindex(dates[dates <= roc_diff.index[-1]], method="ffill")
+
+    return roc_diff
+
+
+class RocSignalState(OnlineSignalState):
+    """
+    compute_roc_signal one business day at a time: a ring buffer holds the
+    last ma_window prices of each ticker for the moving average, and a second
+    one the moving average at the end of the last max(short_weeks,
+    long_weeks) completed weeks. Each update returns the signal row of the
+    current week's Friday label, i.e. the last row compute_roc_signal gives
+    on the prices up to that day.
+    """
+
+    def __init__(
+        self, ma_window: int = 5, short_weeks: int = 1, long_weeks: int = 3
+    ) -> None:
+        super().__init__()
+        self.short_weeks = short_weeks
+        self.long_weeks = long_weeks
+        self.moving_average = RollingWindow(ma_window)
+        self.weekly_ma = np.full((max(short_weeks, long_weeks), 0), np.nan)
+        self.n_weeks = 0
+        self.current_label: Optional[pd.Timestamp] = None
+        self.current_ma = np.empty(0)
+
+    def _label(self, date: pd.Timestamp) -> pd.Timestamp:
+        return pd.offsets.Week(weekday=4).rollforward(date)
+
+    def _extend(self, n_new: int) -> None:
+        self.moving_average.extend(n_new)
+        self.weekly_ma = np.hstack(
+            [self.weekly_ma, np.full((self.weekly_ma.shape[0], n_new), np.nan)]
+        )
+        self.current_ma = np.concatenate([self.current_ma, np.full(n_new, np.nan)])
+
+    def _weeks_back(self, weeks: int) -> np.ndarray:
+        """Moving average at the end of the week `weeks` weeks before the current one."""
+        if self.n_weeks < weeks:
+            return np.full(len(self.tickers), np.nan)
+        return self.weekly_ma[(self.n_weeks - weeks) % self.weekly_ma.shape[0]]
+
+    def _step(self, date: pd.Timestamp, price: np.ndarray) -> np.ndarray:
+        self.moving_average.push(price)
+        label = self._label(date)
+        if self.current_label is not None and label != self.current_label:
+            # The current week is complete
+            self.weekly_ma[self.n_weeks % self.weekly_ma.shape[0]] = self.current_ma
+            self.n_weeks += 1
+        self.current_label = label
+        self.current_ma = self.moving_average.mean()
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            roc_short = (
+                self.current_ma / self._weeks_back(self.short_weeks) - 1
+            ) / self.short_weeks
+            roc_long = (
+                self.current_ma / self._weeks_back(self.long_weeks) - 1
+            ) / self.long_weeks
+        return roc_short - roc_long
+
+    def _state_dict(self) -> Dict[str, np.ndarray]:
+        return {
+            "short_weeks": np.array(self.short_weeks),
+            "long_weeks": np.array(self.long_weeks),
+            "weekly_ma": self.weekly_ma,
+            "n_weeks": np.array(self.n_weeks),
+            "current_label": np.array(
+                "NaT" if self.current_label is None else self.current_label,
+                dtype="datetime64[ns]",
+            ),
+            "current_ma": self.current_ma,
+            **self.moving_average.state_dict("ma_"),
+        }
+
+    def _load_state_dict(self, arrays) -> None:
+        self.short_weeks = int(arrays["short_weeks"])
+        self.long_weeks = int(arrays["long_weeks"])
+        self.weekly_ma = arrays["weekly_ma"]
+        self.n_weeks = int(arrays["n_weeks"])
+        current_label = arrays["current_label"]
+        self.current_label = (
+            None if np.isnat(current_label) else pd.Timestamp(current_label[()])
         )
+        self.current_ma = arrays["current_ma"]
+        self.moving_average = RollingWindow(1)
+        self.moving_average.load_state_dict(arrays, "ma_")
 
 
 class RocSignal(Strategy):
-    def __init__(self, spec: UniverseSpec) -> None:
-        super().__init__(spec, SIGNAL_NAME)
-        self.roc_data = RoCSignalData(spec)
-
-    def calculate_signal_scores(self) -> pd.DataFrame:
-        df_raw = self.roc_data.price_data
-
-        # Step 2: Pivot to wide format with dates as rows, tickers as columns
-        px_last_df = df_raw.pivot(index="date", columns="ticker", values="value")
-
-        # Step 3: Sort index and columns
-        px_last_df.sort_index(inplace=True)
-        px_last_df = px_last_df[sorted(px_last_df.columns)]
-
-        # Step 4: Fill missing weekdays, apply 5-day moving average
-        df_daily_5d = (
-            px_last_df.asfreq("B").ffill().rolling(window=5, min_periods=1).mean()
+    dependencies = (PX_LAST,)
+
+    def __init__(
+        self, spec: UniverseSpec, resolver: Optional[DataResolver] = None
+    ) -> None:
+        super().__init__(spec, SIGNAL_NAME, resolver)
+
+    def calculate_signal_scores(
+        self, dates: Optional[pd.DatetimeIndex] = None
+    ) -> pd.DataFrame:
+        # 5-day moving average, 1w and 3w average RoC
+        return compute_roc_signal(
+            self.data[PX_LAST.name],
+            ma_window=5,
+            short_weeks=1,
+            long_weeks=3,
+            dates=dates,
         )
 
-        # Step 5: Resample to weekly (Friday close)
-        df_weekly = df_daily_5d.resample("W-FRI").last()
-
-        # Step 6: Calculate 1w and 3w average RoC
-        roc_1w = df_weekly.pct_change(periods=1)
-        roc_3w = df_weekly.pct_change(periods=3) / 3
-
-        # Step 7: Compute momentum acceleration
-        roc_diff = roc_1w - roc_3w
-        roc_diff = roc_diff[sorted(roc_diff.columns)]
-        roc_diff.sort_index(inplace=True)
-
-        return roc_diff
+    def signal_state(self) -> RocSignalState:
+        """Online state after the strategy's price history, for daily updates."""
+        return RocSignalState.from_history(
+            self.data[PX_LAST.name], ma_window=5, short_weeks=1, long_weeks=3
+        )
 
 
 if __name__ == "__main__":
@@ -63,4 +192,4 @@ if __name__ == "__main__":
     spec = UniverseSpec(universe="sp500", start_date=start_date, end_date=end_date)
 
     strategy = RocSignal(spec)
-    build_and_store_signal(strategy, start_date, end_date)
+    build_and_store_signal(strategy)
@@ -0,0 +1,243 @@
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class RollingWindow:
+    """
+    Ring buffer of the last `window` rows per column with a running sum and
+    count of the non-NaN entries: rolling(window, min_periods=1).mean() one
+    row at a time in O(columns). The sums are rebuilt from the buffer every
+    time it wraps, so rounding errors do not accumulate.
+    """
+
+    def __init__(self, window: int, n_columns: int = 0) -> None:
+        self.window = window
+        self.buffer = np.full((window, n_columns), np.nan)
+        self.pos = 0
+        self.total = np.zeros(n_columns)
+        self.count = np.zeros(n_columns)
+
+    def extend(self, n_new: int) -> None:
+        """Adds columns without history."""
+        self.buffer = np.hstack([self.buffer, np.full((self.window, n_new), np.nan)])
+        self.total = np.concatenate([self.total, np.zeros(n_new)])
+        self.count = np.concatenate([self.count, np.zeros(n_new)])
+
+    def push(self, row: np.ndarray) -> None:
+        oldest = self.buffer[self.pos]
+        self.total -= np.where(np.isnan(oldest), 0.0, oldest)
+        self.count -= ~np.isnan(oldest)
+        self.total += np.where(np.isnan(row), 0.0, row)
+        self.count += ~np.isnan(row)
+
+        self.buffer[self.pos] = row
+        self.pos = (self.pos + 1) % self.window
+        if self.pos == 0:
+            self.total = np.nansum(self.buffer, axis=0)
+            self.count = (~np.isnan(self.buffer)).sum(axis=0).astype(float)
+
+    def mean(self) -> np.ndarray:
+        """Mean of the non-NaN values in the window (NaN if there are none)."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.count > 0, self.total / self.count, np.nan)
+
+    def state_dict(self, prefix: str) -> Dict[str, np.ndarray]:
+        return {
+            f"{prefix}buffer": self.buffer,
+            f"{prefix}pos": np.array(self.pos),
+            f"{prefix}total": self.total,
+            f"{prefix}count": self.count,
+        }
+
+    def load_state_dict(self, arrays, prefix: str) -> None:
+        self.buffer = arrays[f"{prefix}buffer"]
+        self.window = self.buffer.shape[0]
+        self.pos = int(arrays[f"{prefix}pos"])
+        self.total = arrays[f"{prefix}total"]
+        self.count = arrays[f"{prefix}count"]
+
+
+class RollingMoments(RollingWindow):
+    """
+    Windowed Welford mean and sum of squared deviations (M2) per column: each
+    row is added and the row leaving the window removed in O(columns). Like
+    rolling(window).std(), the standard deviation needs a full window of
+    non-NaN values. The moments are recomputed from the buffer every time it
+    wraps.
+    """
+
+    def __init__(self, window: int, n_columns: int = 0) -> None:
+        super().__init__(window, n_columns)
+        self.mean_ = np.zeros(n_columns)
+        self.m2 = np.zeros(n_columns)
+
+    def extend(self, n_new: int) -> None:
+        super().extend(n_new)
+        self.mean_ = np.concatenate([self.mean_, np.zeros(n_new)])
+        self.m2 = np.concatenate([self.m2, np.zeros(n_new)])
+
+    def push(self, row: np.ndarray) -> None:
+        oldest = self.buffer[self.pos]
+
+        # Remove the oldest value
+        removed = ~np.isnan(oldest)
+        count = self.count - removed
+        with np.errstate(invalid="ignore", divide="ignore"):
+            delta = oldest - self.mean_
+            mean = np.where(count > 0, self.mean_ - delta / count, 0.0)
+        self.m2 = np.where(
+            removed,
+            np.where(count > 0, self.m2 - delta * (oldest - mean), 0.0),
+            self.m2,
+        )
+        self.mean_ = np.where(removed, mean, self.mean_)
+        self.count = count
+
+        # Add the new value
+        added = ~np.isnan(row)
+        self.count = self.count + added
+        with np.errstate(invalid="ignore", divide="ignore"):
+            delta = row - self.mean_
+            mean = self.mean_ + delta / self.count
+        self.m2 = np.where(added, self.m2 + delta * (row - mean), self.m2)
+        self.mean_ = np.where(added, mean, self.mean_)
+
+        self.buffer[self.pos] = row
+        self.pos = (self.pos + 1) % self.window
+        if self.pos == 0:
+            self._recompute()
+
+    def _recompute(self) -> None:
+        valid = ~np.isnan(self.buffer)
+        self.count = valid.sum(axis=0).astype(float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.mean_ = np.where(
+                self.count > 0, np.nansum(self.buffer, axis=0) / self.count, 0.0
+            )
+        self.m2 = np.where(valid, (self.buffer - self.mean_) ** 2, 0.0).sum(axis=0)
+
+    def std(self) -> np.ndarray:
+        """Sample standard deviation over a full window (NaN otherwise)."""
+        full = self.count == self.window
+        with np.errstate(invalid="ignore", divide="ignore"):
+            variance = np.clip(self.m2, 0, None) / (self.window - 1)
+        return np.where(full, np.sqrt(variance), np.nan)
+
+    def state_dict(self, prefix: str) -> Dict[str, np.ndarray]:
+        return {
+            **super().state_dict(prefix),
+            f"{prefix}mean": self.mean_,
+            f"{prefix}m2": self.m2,
+        }
+
+    def load_state_dict(self, arrays, prefix: str) -> None:
+        super().load_state_dict(arrays, prefix)
+        self.mean_ = arrays[f"{prefix}mean"]
+        self.m2 = arrays[f"{prefix}m2"]
+
+
+class OnlineSignalState(ABC):
+    """
+    Compact rolling state of a signal, updated with one day of prices at a
+    time in O(tickers) instead of recomputing the signal over the full
+    history. Missing prices repeat the ticker's last price and business days
+    skipped between two updates are replayed with the last prices, as the
+    batch signals' asfreq("B").ffill() does. Tickers seen for the first time
+    join with an empty history.
+
+    The state is saved to and loaded from a single .npz file.
+    """
+
+    def __init__(self) -> None:
+        self.tickers = pd.Index([], dtype=object)
+        self.last_date: Optional[pd.Timestamp] = None
+        self.last_price = np.empty(0)
+
+    @abstractmethod
+    def _extend(self, n_new: int) -> None:
+        """Grows the per-ticker state by n_new tickers."""
+
+    @abstractmethod
+    def _step(self, date: pd.Timestamp, price: np.ndarray) -> np.ndarray:
+        """Advances one business day and returns the signal row."""
+
+    def _label(self, date: pd.Timestamp) -> pd.Timestamp:
+        """Date the signal row of date is labelled with."""
+        return date
+
+    def update(self, date, prices: pd.Series) -> pd.Series:
+        """
+        Adds one day of prices (ticker -> price) and returns the signal row,
+        indexed by the tickers seen so far and named after its date label.
+        """
+        date = pd.Timestamp(date)
+        if self.last_date is not None and date <= self.last_date:
+            raise ValueError(f"{date} is not after the last update {self.last_date}")
+
+        new_tickers = prices.index.difference(self.tickers)
+        if len(new_tickers):
+            self.tickers = self.tickers.append(new_tickers)
+            self.last_price = np.concatenate(
+                [self.last_price, np.full(len(new_tickers), np.nan)]
+            )
+            self._extend(len(new_tickers))
+
+        if self.last_date is not None:
+            for gap_date in pd.bdate_range(self.last_date, date)[1:-1]:
+                self._step(gap_date, self.last_price)
+
+        row = prices.reindex(self.tickers).to_numpy(dtype=float)
+        self.last_price = np.where(np.isnan(row), self.last_price, row)
+        self.last_date = date
+        signal = self._step(date, self.last_price)
+        return pd.Series(signal, index=self.tickers, name=self._label(date))
+
+    @classmethod
+    def from_history(cls, px_df: pd.DataFrame, **params) -> "OnlineSignalState":
+        """State after replaying a wide (dates x tickers) price history."""
+        state = cls(**params)
+        for date, prices in px_df.sort_index().iterrows():
+            state.update(date, prices)
+        return state
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    @abstractmethod
+    def _state_dict(self) -> Dict[str, np.ndarray]:
+        """Subclass arrays, including its parameters."""
+
+    @abstractmethod
+    def _load_state_dict(self, arrays) -> None:
+        pass
+
+    def save(self, path) -> Path:
+        """Writes the state to path (.npz)."""
+        path = Path(path)
+        np.savez(
+            path,
+            tickers=self.tickers.to_numpy(dtype=str),
+            last_date=np.array(
+                "NaT" if self.last_date is None else self.last_date.to_datetime64(),
+                dtype="datetime64[ns]",
+            ),
+            last_price=self.last_price,
+            **self._state_dict(),
+        )
+        return path
+
+    @classmethod
+    def load(cls, path) -> "OnlineSignalState":
+        with np.load(path, allow_pickle=False) as npz:
+            arrays = {name: npz[name] for name in npz.files}
+        state = cls.__new__(cls)
+        state.tickers = pd.Index(arrays["tickers"].astype(object))
+        last_date = arrays["last_date"]
+        state.last_date = None if np.isnat(last_date) else pd.Timestamp(last_date[()])
+        state.last_price = arrays["last_price"]
+        state._load_state_dict(arrays)
+        return state
@@ -1,16 +1,45 @@
 from abc import ABC, abstractmethod
+from typing import Mapping, Optional, Tuple
 
 import pandas as pd
 
 from src.data_access.schemas import UniverseSpec
+from src.strategy.data_dependencies import DataDependency, DataResolver
 
 
 class Strategy(ABC):
-    def __init__(self, spec: UniverseSpec, strategy_name: str) -> None:
+    # Named inputs the signal reads; strategies sharing a DataResolver fetch
+    # each of them once per UniverseSpec
+    dependencies: Tuple[DataDependency, ...] = ()
+
+    def __init__(
+        self,
+        spec: UniverseSpec,
+        strategy_name: str,
+        resolver: Optional[DataResolver] = None,
+    ) -> None:
         self.spec = spec
         self.strategy_name = strategy_name
+        self.resolver = resolver or DataResolver()
+
+    @property
+    def data(self) -> Mapping[str, pd.DataFrame]:
+        """Read-only business-day panels of the dependencies, by name"""
+        return self.resolver.resolve(self.spec, self.dependencies)
+
+    @property
+    def rebalance_dates(self) -> pd.DatetimeIndex:
+        """Dates the strategy's signal is stored for (spec.day_frequency)"""
+        return self.spec.rebalance_dates()
 
     @abstractmethod
-    def calculate_signal_scores(self) -> pd.DataFrame:
-        """Calculate signal scores for the strategy"""
+    def calculate_signal_scores(
+        self, dates: Optional[pd.DatetimeIndex] = None
+    ) -> pd.DataFrame:
+        """
+        Calculate signal scores for the strategy (dates x tickers). With dates
+        the signal is only evaluated on those dates, using just the price
+        history its lookback needs; dates without a signal may be missing or
+        all NaN.
+        """
         pass
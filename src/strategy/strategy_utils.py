@@ -11,12 +11,15 @@ from src.strategy.strategy import Strategy
 
 def build_and_store_signal(strategy: Strategy) -> NoReturn:
     """
-    Build and store signal for any strategy that implements the Strategy interface
+    Build and store signal for any strategy that implements the Strategy interface.
+    The signal and weights are only computed on the strategy's rebalance dates
+    (spec.day_frequency, weekly on Friday by default).
 
     Args:
         strategy: Instance of a class implementing Strategy interface
     """
-    signal_df = strategy.calculate_signal_scores()
+    rebalance_dates = strategy.rebalance_dates
+    signal_df = strategy.calculate_signal_scores(rebalance_dates)
     portfolio_weights_df = construct_portfolio_weights(
         signal_df, strategy.strategy_name
     )
@@ -26,29 +29,25 @@ def build_and_store_signal(strategy: Strategy) -> NoReturn:
 
     alpha_scores_tbl = TableNames.ALPHA_SCORES.value
 
-    all_fridays = pd.date_range(
-        start=strategy.spec.start_date,
-        end=strategy.spec.end_date,
-        freq="W-FRI",  # Weekly frequency on Friday
-    )
-
     portfolio_weights_df["date"] = pd.to_datetime(portfolio_weights_df["date"])
-    resampled_df = portfolio_weights_df[portfolio_weights_df["date"].isin(all_fridays)]
+    resampled_df = portfolio_weights_df[
+        portfolio_weights_df["date"].isin(rebalance_dates)
+    ]
 
     # Delete existing records using parameterized query
     delete_query = """
         DELETE FROM {table_name} 
         WHERE strategy_name = :strategy_name 
-        AND date >= date(:start_date) 
-        AND date <= date(:end_date)
+        AND date >= :start_date
+        AND date <= :end_date
     """.format(
         table_name=alpha_scores_tbl
     )
 
     params = {
         "strategy_name": strategy.strategy_name,
-        "start_date": strategy.spec.start_date,
-        "end_date": strategy.spec.end_date,
+        "start_date": DataAccessUtil.to_db_date(strategy.spec.start_date),
+        "end_date": DataAccessUtil.to_db_date(strategy.spec.end_date),
     }
 
     DataAccessUtil.execute_statement(delete_query, params=params)
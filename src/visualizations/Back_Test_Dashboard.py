@@ -4,6 +4,8 @@ import sys
 import streamlit as st
 from streamlit_tree_select import tree_select
 
+import src.visualizations.dashboard_bootstrap  # noqa: F401
+
 # Append project root to sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
@@ -0,0 +1,7 @@
+from src.data_access.sqllite_db_manager import EngineRegistry, PoolMode
+
+# Dashboard processes only read from the database: open it through a read-only
+# URI and keep one pooled connection per Streamlit session thread.
+# Streamlit can start a session on any page, so the entry script and every page
+# import this module before touching the database (it runs once per process).
+EngineRegistry.configure(pool_mode=PoolMode.THREAD_LOCAL, read_only=True)
@@ -3,6 +3,7 @@ from sqlalchemy import text
 
 from src.analytics.back_test_summary import (BackTestSummaryAnalytics,
                                              BackTestSummaryAnalyticsData)
+from src.analytics.daily_pnl import fetch_daily_pnl
 from src.analytics.trade_summary import get_pnl_time_series_from_trade_data
 from src.data_access.crud_util import DataAccessUtil
 from src.data_access.prices import PriceDataFetcher
@@ -19,7 +20,29 @@ def get_bm_data():
     return bm_data
 
 
+def get_daily_backtest_data(strategy_name, trade_direction, start_date, end_date):
+    """Daily mark-to-market returns, or an empty frame if they are not stored."""
+    daily_pnl_df = fetch_daily_pnl(strategy_name, start_date, end_date)
+    if daily_pnl_df.empty:
+        return daily_pnl_df
+
+    return_column = {"Long": "long_return", "Short": "short_return"}.get(
+        trade_direction.capitalize(), "net_return"
+    )
+    back_test_returns = daily_pnl_df[["date", return_column]].rename(
+        columns={return_column: "portfolio_returns"}
+    )
+    back_test_returns["date"] = pd.to_datetime(back_test_returns["date"])
+    return back_test_returns
+
+
 def get_backtest_data(strategy_name, trade_direction, start_date, end_date):
+    daily_returns = get_daily_backtest_data(
+        strategy_name, trade_direction, start_date, end_date
+    )
+    if not daily_returns.empty:
+        return daily_returns
+
     sql_query = f""" SELECT * FROM trade_booking tb where 
                     tb.strategy_name  = "{strategy_name}"
                     and tb.trade_open_date >= date('{start_date}')
@@ -1,10 +1,17 @@
 from sqlalchemy import text
 
+from src.analytics.daily_pnl import (fetch_daily_pnl,
+                                     get_daily_pnl_exposure_time_series)
 from src.analytics.trade_summary import get_pnl_exposure_time_series
 from src.data_access.crud_util import DataAccessUtil
 
 
 def get_exposures_time_series(strategy_name, start_date, end_date):
+    # Daily mark-to-market series when it has been computed, else per rebalance
+    daily_pnl_df = fetch_daily_pnl(strategy_name, start_date, end_date)
+    if not daily_pnl_df.empty:
+        return get_daily_pnl_exposure_time_series(daily_pnl_df)
+
     sql_query = f""" SELECT strategy_name, trade_open_date, ticker, shares, trade_open_price, 
                     direction, trade_close_date, trade_close_price 
                     FROM trade_booking tb where 
@@ -1,5 +1,7 @@
 from sqlalchemy import text
 
+from src.analytics.daily_pnl import (fetch_daily_pnl,
+                                     get_daily_pnl_exposure_time_series)
 from src.analytics.trade_summary import (get_pnl_exposure_by_gics_sector,
                                          get_pnl_exposure_time_series)
 from src.data_access.crud_util import DataAccessUtil
@@ -13,6 +15,10 @@ def fetch_pnl_by_gics_groups(strategy_name, start_date, end_date):
 
 
 def fetch_pnl_exposures_ts(strategy_name, start_date, end_date):
+    daily_pnl_df = fetch_daily_pnl(strategy_name, start_date, end_date)
+    if not daily_pnl_df.empty:
+        return get_daily_pnl_exposure_time_series(daily_pnl_df)
+
     sql_query = f""" SELECT * FROM trade_booking tb where 
                     tb.strategy_name  = "{strategy_name}"
                     and tb.trade_open_date >= date('{start_date}')
@@ -9,6 +9,7 @@ st.set_page_config(layout="wide")
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+import src.visualizations.dashboard_bootstrap  # noqa: F401
 from src.visualizations.data_preparation.backtest_summary import \
     create_back_test_summary
 from src.visualizations.ui_elements.side_bar_user_selections import \
@@ -3,6 +3,7 @@ import os
 import streamlit as st
 from st_aggrid import AgGrid, GridOptionsBuilder
 
+import src.visualizations.dashboard_bootstrap  # noqa: F401
 from src.visualizations.charts.ts_exposures_plots import (
     render_exposure_time_series, render_leverage_time_series)
 from src.visualizations.data_preparation.exposures_anlaysis import (
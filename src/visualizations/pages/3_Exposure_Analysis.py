@@ -4,6 +4,7 @@ import os
 import streamlit as st
 from st_aggrid import AgGrid, GridOptionsBuilder
 
+import src.visualizations.dashboard_bootstrap  # noqa: F401
 from src.visualizations.charts.trade_summary_by_direction_plot import \
     plot_exposures_by_direction
 from src.visualizations.charts.trade_summary_by_net_total import \
@@ -3,6 +3,7 @@ import os
 import streamlit as st
 from st_aggrid import AgGrid, GridOptionsBuilder
 
+import src.visualizations.dashboard_bootstrap  # noqa: F401
 from src.visualizations.charts.pnl_ts_chart_by_gics_sector import \
     plot_ts_gics_sector_pnl
 from src.visualizations.charts.pnl_ts_chart_by_trade_type import \
@@ -3,6 +3,7 @@ import os
 import streamlit as st
 from st_aggrid import AgGrid, GridOptionsBuilder
 
+import src.visualizations.dashboard_bootstrap  # noqa: F401
 from src.analytics.risk_attributions import RiskFactorAttributions
 from src.data_access.risk_model import RiskModelDataUtil
 from src.data_access.trade_booking import get_trade_and_sec_master_data
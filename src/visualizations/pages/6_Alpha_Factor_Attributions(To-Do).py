@@ -1,5 +1,7 @@
 import streamlit as st
 
+import src.visualizations.dashboard_bootstrap  # noqa: F401
+
 # =============================================================================
 # Alpha Factor Attributions (To-Do)
 # This page will provide analytics and visualizations for alpha factor attributions:
@@ -2,6 +2,8 @@ import os
 
 import streamlit as st
 
+import src.visualizations.dashboard_bootstrap  # noqa: F401
+
 # =============================================================================
 # Delta Trade Analysis (To-Do)
 # This page will provide analytics and visualizations for delta trade analysis:
@@ -2,6 +2,8 @@ import os
 
 import streamlit as st
 
+import src.visualizations.dashboard_bootstrap  # noqa: F401
+
 # =============================================================================
 # UX & General Improvements (To-Do List)
 # This page will track and display planned user experience and general improvements:
@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analytics.daily_pnl import (compute_daily_pnl, fetch_daily_pnl,
+                                     get_daily_pnl_exposure_time_series,
+                                     store_daily_pnl)
+from src.analytics.trade_summary import get_pnl_exposure_time_series
+from src.data_access.price_matrix import PriceMatrix
+from src.data_access.sqllite_db_manager import EngineRegistry
+
+TICKERS = ["AAA", "BBB", "CCC", "DDD"]
+
+
+@pytest.fixture
+def price_matrix():
+    rng = np.random.default_rng(3)
+    dates = pd.bdate_range("2024-01-01", periods=16)
+    values = 100 * np.cumprod(1 + rng.normal(0, 0.02, (len(dates), len(TICKERS))), 0)
+    return PriceMatrix("px_last", values, dates.values, TICKERS)
+
+
+def book_trades(price_matrix, strategy_name, seed):
+    """Three weekly books of two longs and two shorts, the last closed on its open date."""
+    rng = np.random.default_rng(seed)
+    prices = price_matrix.to_frame()
+    rebalances = prices.index[[0, 5, 10]]
+    closes = prices.index[[5, 10, 10]]
+    rows = []
+    for open_date, close_date in zip(rebalances, closes):
+        picks = rng.permutation(TICKERS)
+        for ticker, sign in zip(picks, [1, 1, -1, -1]):
+            rows.append(
+                {
+                    "strategy_name": strategy_name,
+                    "trade_open_date": open_date,
+                    "ticker": ticker,
+                    "shares": sign * int(rng.integers(10, 100)),
+                    "trade_open_price": prices.at[open_date, ticker],
+                    "direction": "Long" if sign > 0 else "Short",
+                    "trade_close_date": close_date,
+                    "trade_close_price": prices.at[close_date, ticker],
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+def reference_daily_pnl(trades_df, price_matrix):
+    """Day by day, trade by trade mark to market."""
+    prices = price_matrix.to_frame()
+    pnl = pd.DataFrame(0.0, index=prices.index, columns=["long", "short"])
+    for trade in trades_df.itertuples():
+        held = prices.loc[trade.trade_open_date : trade.trade_close_date, trade.ticker]
+        side = "long" if trade.shares > 0 else "short"
+        pnl.loc[held.index[1:], side] += trade.shares * held.diff().iloc[1:]
+    return pnl
+
+
+def test_daily_pnl_matches_day_by_day_marking(price_matrix):
+    trades_df = book_trades(price_matrix, "S1", seed=0)
+    daily = compute_daily_pnl(trades_df, price_matrix)
+    expected = reference_daily_pnl(trades_df, price_matrix)
+
+    assert len(daily) == 11
+    np.testing.assert_allclose(daily["long_pnl"], expected["long"].iloc[:11])
+    np.testing.assert_allclose(daily["short_pnl"], expected["short"].iloc[:11])
+    # Daily P&L adds up to the booked trade P&L
+    booked = trades_df["shares"] * (
+        trades_df["trade_close_price"] - trades_df["trade_open_price"]
+    )
+    assert daily["net_pnl"].sum() == pytest.approx(booked.sum())
+
+    # End of day exposure of the first book, returns against the previous day's
+    first_book = trades_df[
+        trades_df["trade_open_date"] == trades_df["trade_open_date"].min()
+    ]
+    prices = price_matrix.to_frame().iloc[2]
+    long_book = first_book[first_book["shares"] > 0]
+    assert daily["long_exposure"].iloc[2] == pytest.approx(
+        (long_book["shares"] * prices[long_book["ticker"]].to_numpy()).sum()
+    )
+    assert daily["net_return"].iloc[3] == pytest.approx(
+        daily["net_pnl"].iloc[3] / daily["gross_exposure"].iloc[2]
+    )
+    # Nothing is held after the last book is closed
+    assert daily["gross_exposure"].iloc[-1] == 0
+
+
+def test_booked_prices_differing_from_panel_are_adjusted(price_matrix):
+    trades_df = book_trades(price_matrix, "S1", seed=1)
+    trades_df["trade_open_price"] *= 1.01
+    daily = compute_daily_pnl(trades_df, price_matrix)
+
+    booked = trades_df["shares"] * (
+        trades_df["trade_close_price"] - trades_df["trade_open_price"]
+    )
+    assert daily["net_pnl"].sum() == pytest.approx(booked.sum())
+
+
+def test_store_and_fetch_daily_pnl(price_matrix):
+    trades_df = pd.concat(
+        [book_trades(price_matrix, "S1", seed=0), book_trades(price_matrix, "S2", 1)]
+    )
+    daily = compute_daily_pnl(trades_df, price_matrix)
+    assert sorted(daily["strategy_name"].unique()) == ["S1", "S2"]
+
+    with EngineRegistry.use_engine():
+        assert fetch_daily_pnl("S1").empty
+        store_daily_pnl(daily)
+        # Rewriting the same dates replaces them
+        store_daily_pnl(daily)
+        stored = fetch_daily_pnl("S1", "2024-01-02", "2024-01-10")
+
+    s1 = daily[daily["strategy_name"] == "S1"]
+    expected = s1[(s1["date"] >= "2024-01-02") & (s1["date"] <= "2024-01-10")]
+    assert len(stored) == len(expected)
+    np.testing.assert_allclose(stored["net_pnl"], expected["net_pnl"])
+
+    # The dashboards get the same columns as from the per-rebalance series
+    time_series = get_daily_pnl_exposure_time_series(stored)
+    per_rebalance = get_pnl_exposure_time_series(
+        trades_df[trades_df["strategy_name"] == "S1"].copy()
+    )
+    assert set(per_rebalance.columns) <= set(time_series.columns)
+    assert time_series["cumulative_total_pnl"].iloc[-1] == pytest.approx(
+        stored["net_pnl"].sum()
+    )
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.back_test.back_test import BackTestData
+from src.data_access.schemas import UniverseSpec
+
+TICKERS = ["AAA", "BBB", "CCC", "DDD", "EEE", "FFF"]
+
+
+def _make_backtest_data(strategy_name, seed=7):
+    rng = np.random.default_rng(seed)
+    price_dates = pd.bdate_range("2024-01-01", "2024-02-02")
+    price_history = pd.DataFrame(
+        {
+            "date": np.repeat(price_dates, len(TICKERS)),
+            "ticker": np.tile(TICKERS, len(price_dates)),
+            "value": rng.uniform(20, 200, len(price_dates) * len(TICKERS)).round(2),
+        }
+    )
+
+    rebalance_dates = pd.date_range("2024-01-05", periods=4, freq="W-FRI")
+    alpha_rows = []
+    for date in rebalance_dates:
+        picks = rng.permutation(TICKERS)
+        for direction, names in (("Long", picks[:3]), ("Short", picks[3:])):
+            weights = rng.dirichlet(np.ones(3))
+            for ticker, weight in zip(names, weights):
+                alpha_rows.append(
+                    (date, direction, ticker, weight, weight, strategy_name)
+                )
+    alpha_scores = pd.DataFrame(
+        alpha_rows,
+        columns=[
+            "date",
+            "trade_direction",
+            "ticker",
+            "alpha_score",
+            "weight",
+            "strategy_name",
+        ],
+    )
+
+    aum_leverage = pd.DataFrame(
+        {
+            "date": rebalance_dates,
+            "strategy_name": strategy_name,
+            "aum": [100_000.0, 100_000.0, 120_000.0, 120_000.0],
+            "target_leverage": [2, 2, 2, 3],
+            "in_out_flows": [np.nan, 0.0, 20_000.0, 0.0],
+            "leverage_change": [np.nan, 0.0, 0.0, 1.0],
+        }
+    )
+
+    return BackTestData(
+        strategy_name=strategy_name,
+        univ_spec=UniverseSpec("SP500", "2024-01-01", "2024-02-02"),
+        start_date="2024-01-01",
+        end_date="2024-02-02",
+        aum_leverage_df=aum_leverage,
+        alpha_scores_df=alpha_scores,
+        price_history_df=price_history,
+    )
+
+
+@pytest.fixture
+def make_backtest_data():
+    """Factory for a small four-rebalance long/short backtest over six tickers."""
+    return _make_backtest_data
@@ -112,3 +112,76 @@ def test_fill_trade_closing_prices(test_data):
     assert "trade_close_date" in result.columns
     assert result["trade_close_price"].iloc[0] == 160.0
     assert result["trade_close_date"].iloc[0].date() == date(2024, 1, 2)
+
+
+def test_select_date_tickers(test_data):
+    """Test per-date price lookup used by the rebalance loop"""
+    price_history = test_data["price_history"]
+    prices_by_date = BackTestUtil.group_by_date(price_history)
+
+    assert set(prices_by_date) == {
+        pd.Timestamp("2024-01-01"),
+        pd.Timestamp("2024-01-02"),
+    }
+
+    result = BackTestUtil.select_date_tickers(
+        prices_by_date, date(2024, 1, 2), ["MSFT", "GOOG"], price_history.columns
+    )
+    assert list(result["ticker"]) == ["MSFT"]
+    assert result["value"].iloc[0] == 200.0
+
+    missing = BackTestUtil.select_date_tickers(
+        prices_by_date, date(2024, 1, 3), ["MSFT"], price_history.columns
+    )
+    assert missing.empty
+    assert list(missing.columns) == list(price_history.columns)
+
+
+def test_book_delta_trades():
+    rebalance_date = pd.Timestamp("2024-01-12")
+    marked_trades = pd.DataFrame(
+        {
+            "trade_open_date": pd.to_datetime(
+                ["2024-01-05", "2024-01-05", "2024-01-05", "2024-01-05"]
+            ),
+            "ticker": ["AAA", "BBB", "CCC", "DDD"],
+            "shares": [10, 20, -30, 40],
+            "trade_open_price": [10.0, 20.0, 30.0, 40.0],
+            "direction": ["Long", "Long", "Short", "Long"],
+            "trade_close_date": rebalance_date,
+            "trade_close_price": [11.0, 21.0, 31.0, 41.0],
+            "strategy_name": "TestStrategy",
+        }
+    )
+    target = pd.DataFrame(
+        {
+            "trade_open_date": rebalance_date,
+            "ticker": ["AAA", "BBB", "CCC", "EEE", "DDD"],
+            "shares": [10, 25, -12, -7, 0],
+            "trade_open_price": [11.0, 21.0, 31.0, 51.0, 41.0],
+            "direction": ["Long", "Long", "Short", "Short", "Long"],
+            "trade_close_date": pd.NaT,
+            "trade_close_price": float("nan"),
+            "strategy_name": "TestStrategy",
+        }
+    )
+
+    closed, opened, still_open = BackTestUtil.book_delta_trades(marked_trades, target)
+
+    # AAA is unchanged, BBB grows, CCC shrinks, DDD is sold and EEE is new
+    assert still_open["ticker"].tolist() == ["AAA", "BBB"]
+    assert still_open["trade_close_date"].isna().all()
+    assert closed["ticker"].tolist() == ["CCC", "DDD"]
+    assert closed["trade_close_price"].tolist() == [31.0, 41.0]
+    assert opened.set_index("ticker")["shares"].to_dict() == {
+        "BBB": 5,
+        "CCC": -12,
+        "EEE": -7,
+    }
+    assert list(opened.columns) == list(target.columns)
+    assert (opened["trade_open_date"] == rebalance_date).all()
+
+    closed, opened, still_open = BackTestUtil.book_delta_trades(
+        marked_trades, pd.DataFrame()
+    )
+    assert len(closed) == 4 and opened.empty and still_open.empty
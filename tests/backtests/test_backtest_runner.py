@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+from src.back_test.back_test import BackTest
+from src.back_test.backtest_runner import run_backtest_batch
+from src.back_test.position_ledger import PositionLedger
+from src.data_access.price_matrix import PriceMatrix
+
+
+@pytest.mark.parametrize("rebalance_mode", ["full", "delta"])
+def test_batch_matches_sequential_runs(make_backtest_data, rebalance_mode):
+    strategies = {"StratA": 1, "StratB": 2, "StratC": 3}
+    backtest_data_list = [
+        make_backtest_data(name, seed=seed) for name, seed in strategies.items()
+    ]
+    for backtest_data in backtest_data_list:
+        backtest_data.rebalance_mode = rebalance_mode
+    # All strategies trade off the same price history
+    price_history_df = backtest_data_list[0].price_history_df
+    price_matrix = PriceMatrix.from_long_frame(price_history_df, "px_last")
+
+    sequential = {}
+    for backtest_data in backtest_data_list:
+        backtest_data.price_history_df = price_history_df
+        bt = BackTest(
+            backtest_data,
+            ledger=PositionLedger(backtest_data.strategy_name),
+            flush=False,
+        )
+        bt.run_backtest()
+        sequential[backtest_data.strategy_name] = bt.ledger.trades
+
+    ledgers = run_backtest_batch(
+        backtest_data_list,
+        price_matrix,
+        [PositionLedger(name) for name in strategies],
+        workers=2,
+    )
+
+    assert [ledger.strategy_name for ledger in ledgers] == list(strategies)
+    for ledger in ledgers:
+        expected = sequential[ledger.strategy_name]
+        assert len(ledger) == len(expected) > 0
+        pd.testing.assert_frame_equal(
+            ledger.trades.drop(columns="date", errors="ignore"),
+            expected.drop(columns="date", errors="ignore"),
+            check_dtype=False,
+        )
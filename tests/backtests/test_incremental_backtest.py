@@ -0,0 +1,113 @@
+import pandas as pd
+from sqlalchemy import text
+
+from src.analytics.daily_pnl import fetch_daily_pnl
+from src.back_test.backtest_checkpoint import BackTestCheckpointUtil
+from src.back_test.backtest_runner import (run_incremental_backtest,
+                                           verify_incremental_backtest)
+from src.data_access.crud_util import DataAccessUtil
+from src.data_access.sqllite_db_manager import DatabaseManager, EngineRegistry
+
+STRATEGY = "TestStrategy"
+
+
+def seed_inputs(engine, backtest_data):
+    """Stores the fixture's prices, alpha scores and AUM schedule in the database."""
+    DatabaseManager().create_trade_booking_table()
+    tables = {
+        "sp500_ts_data": backtest_data.price_history_df.assign(key="px_last"),
+        "alpha_history": backtest_data.alpha_scores_df,
+        "aum_and_leverage": backtest_data.aum_leverage_df[
+            ["date", "strategy_name", "aum", "target_leverage"]
+        ],
+    }
+    for table_name, df in tables.items():
+        DataAccessUtil.normalize_date_columns(df.copy()).to_sql(
+            table_name, engine, index=False
+        )
+
+
+def read_trade_booking(engine):
+    with engine.connect() as conn:
+        df = pd.read_sql(text("SELECT * FROM trade_booking"), conn)
+    return df.sort_values(["trade_open_date", "direction", "ticker"]).reset_index(
+        drop=True
+    )
+
+
+def test_incremental_update_matches_full_run(make_backtest_data):
+    backtest_data = make_backtest_data(STRATEGY)
+
+    with EngineRegistry.use_engine() as engine:
+        seed_inputs(engine, backtest_data)
+        run_incremental_backtest(STRATEGY, "2024-02-02", start_date="2024-01-01")
+        full_run = read_trade_booking(engine)
+
+    with EngineRegistry.use_engine() as engine:
+        seed_inputs(engine, backtest_data)
+        # No checkpoint yet: a full run over the first three rebalances
+        first = run_incremental_backtest(STRATEGY, "2024-01-19", "2024-01-01")
+        assert len(first.open_dates) == 3
+
+        resumed = run_incremental_backtest(STRATEGY, "2024-02-02")
+        # Only the restored book and the new rebalance are touched
+        assert resumed.open_dates == [
+            pd.Timestamp("2024-01-19"),
+            pd.Timestamp("2024-01-26"),
+        ]
+        incremental = read_trade_booking(engine)
+
+        checkpoint = BackTestCheckpointUtil.load_checkpoint(STRATEGY)
+        assert checkpoint.last_rebalance_date == pd.Timestamp("2024-01-26")
+        assert checkpoint.initial_rebalance_date == pd.Timestamp("2024-01-05")
+        assert verify_incremental_backtest(STRATEGY).empty
+
+        # Nothing new to process
+        assert run_incremental_backtest(STRATEGY, "2024-02-02").open_dates == [
+            pd.Timestamp("2024-01-26")
+        ]
+        pd.testing.assert_frame_equal(read_trade_booking(engine), incremental)
+
+    pd.testing.assert_frame_equal(incremental, full_run, check_dtype=False)
+
+
+def test_incremental_update_refreshes_daily_pnl(make_backtest_data):
+    backtest_data = make_backtest_data(STRATEGY)
+
+    with EngineRegistry.use_engine() as engine:
+        seed_inputs(engine, backtest_data)
+        run_incremental_backtest(STRATEGY, "2024-02-02", start_date="2024-01-01")
+        full_run = {
+            strategy: fetch_daily_pnl(strategy)
+            for strategy in [STRATEGY, "AggregatedFund"]
+        }
+
+    with EngineRegistry.use_engine() as engine:
+        seed_inputs(engine, backtest_data)
+        run_incremental_backtest(STRATEGY, "2024-01-19", "2024-01-01")
+        stale_end = fetch_daily_pnl(STRATEGY)["date"].max()
+
+        run_incremental_backtest(STRATEGY, "2024-02-02")
+        for strategy, expected in full_run.items():
+            daily = fetch_daily_pnl(strategy)
+            assert daily["date"].max() > stale_end
+            pd.testing.assert_frame_equal(daily, expected)
+
+
+def test_stale_checkpoint_is_not_restored(make_backtest_data):
+    with EngineRegistry.use_engine() as engine:
+        seed_inputs(engine, make_backtest_data(STRATEGY))
+        run_incremental_backtest(STRATEGY, "2024-01-19", start_date="2024-01-01")
+        assert BackTestCheckpointUtil.restore_book(STRATEGY) is not None
+
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    "UPDATE trade_booking SET shares = shares + 1 "
+                    "WHERE trade_open_date = '2024-01-19' AND ticker = "
+                    "(SELECT MIN(ticker) FROM trade_booking "
+                    "WHERE trade_open_date = '2024-01-19')"
+                )
+            )
+        assert BackTestCheckpointUtil.restore_book(STRATEGY) is None
+        assert not verify_incremental_backtest(STRATEGY).empty
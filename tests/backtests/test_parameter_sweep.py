@@ -0,0 +1,104 @@
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import inspect
+
+from src.back_test import parameter_sweep
+from src.back_test.parameter_sweep import (SUMMARY_METRICS, expand_param_grid,
+                                           run_parameter_sweep,
+                                           summarize_trades)
+from src.data_access.sqllite_db_manager import EngineRegistry
+
+
+@pytest.fixture
+def sweep_prices():
+    rng = np.random.default_rng(11)
+    dates = pd.bdate_range("2023-10-02", "2024-03-29")
+    tickers = [f"T{i:02d}" for i in range(12)]
+    log_returns = rng.normal(0.0003, 0.015, (len(dates), len(tickers) + 1))
+    prices = 100 * np.exp(np.cumsum(log_returns, axis=0))
+
+    def long_frame(values, names):
+        return pd.DataFrame(
+            {
+                "date": np.repeat(dates, len(names)),
+                "ticker": np.tile(names, len(dates)),
+                "value": values.ravel(),
+            }
+        )
+
+    return long_frame(prices[:, :-1], tickers), long_frame(prices[:, -1:], ["SP500"])
+
+
+def test_expand_param_grid_fills_defaults():
+    configs = expand_param_grid("MinVol", {"top_n": [5, 10]})
+    assert configs == [
+        {"vol_window": 10, "top_n": 5},
+        {"vol_window": 10, "top_n": 10},
+    ]
+
+    with pytest.raises(ValueError):
+        expand_param_grid("MinVol", {"short_weeks": [1]})
+
+
+def test_sweep_reuses_signals_and_skips_db(sweep_prices):
+    price_history_df, benchmark_df = sweep_prices
+
+    with EngineRegistry.use_engine() as engine, patch.object(
+        parameter_sweep,
+        "compute_roc_signal",
+        wraps=parameter_sweep.compute_roc_signal,
+    ) as signal_spy:
+        results = run_parameter_sweep(
+            "Mom_RoC",
+            {"long_weeks": [2, 3], "top_n": [2, 4]},
+            "2024-01-01",
+            "2024-03-29",
+            price_history_df=price_history_df,
+            benchmark_df=benchmark_df,
+            workers=2,
+        )
+        assert inspect(engine).get_table_names() == []
+
+    # Two lookback settings -> two signal computations for four backtests
+    assert signal_spy.call_count == 2
+    assert results.attrs["signal_evaluations"] == 2
+
+    assert len(results) == 4
+    assert list(results[["long_weeks", "top_n"]].itertuples(index=False)) == [
+        (2, 2),
+        (2, 4),
+        (3, 2),
+        (3, 4),
+    ]
+    assert (results["n_trades"] > 0).all()
+    assert results.columns[-len(SUMMARY_METRICS) :].tolist() == SUMMARY_METRICS
+    for metric in ["Annualized Return", "Sharpe Ratio", "Maximum Drawdown"]:
+        assert results[metric].notna().all()
+
+
+def test_summarize_trades_single_period_is_nan(sweep_prices):
+    _, benchmark_df = sweep_prices
+    benchmark_px = benchmark_df.set_index("date")["value"]
+    trades_df = pd.DataFrame(
+        {
+            "trade_open_date": pd.Timestamp("2024-01-05"),
+            "ticker": ["T00", "T01"],
+            "shares": [10, -5],
+            "trade_open_price": [100.0, 50.0],
+            "direction": ["Long", "Short"],
+            "trade_close_date": pd.Timestamp("2024-01-12"),
+            "trade_close_price": [101.0, 49.0],
+        }
+    )
+
+    metrics = summarize_trades(trades_df, benchmark_px)
+    assert list(metrics) == SUMMARY_METRICS
+    assert all(np.isnan(value) for value in metrics.values())
+    # Sweep rows built from it keep every metric column
+    assert pd.DataFrame([{"n_trades": 2, **metrics}]).columns.tolist() == [
+        "n_trades",
+        *SUMMARY_METRICS,
+    ]
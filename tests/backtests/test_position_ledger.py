@@ -0,0 +1,233 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError
+
+from src.back_test.back_test import BackTest
+from src.back_test.position_ledger import PositionLedger
+from src.data_access.optimizer_log import (fetch_optimizer_log,
+                                           summarize_optimizer_log)
+from src.data_access.sqllite_db_manager import DatabaseManager, EngineRegistry
+
+STRATEGY = "TestStrategy"
+
+
+def seed_trade_booking(engine):
+    DatabaseManager().create_trade_booking_table()
+    # A book opened before the backtest window, closed by the first rebalance
+    pd.DataFrame(
+        {
+            "strategy_name": STRATEGY,
+            "trade_open_date": "2023-12-29",
+            "ticker": ["AAA", "BBB"],
+            "shares": [10, -5],
+            "trade_open_price": [50.0, 60.0],
+            "direction": ["Long", "Short"],
+            "trade_close_date": None,
+            "trade_close_price": None,
+        }
+    ).to_sql("trade_booking", engine, if_exists="append", index=False)
+
+
+def read_trade_booking(engine):
+    with engine.connect() as conn:
+        df = pd.read_sql(text("SELECT * FROM trade_booking"), conn)
+    return df.sort_values(["trade_open_date", "direction", "ticker"]).reset_index(
+        drop=True
+    )
+
+
+def run_mode(backtest_data, write_through):
+    with EngineRegistry.use_engine() as engine:
+        seed_trade_booking(engine)
+        BackTest(backtest_data, write_through=write_through).run_backtest()
+        return read_trade_booking(engine)
+
+
+def test_ledger_matches_write_through(make_backtest_data):
+    write_through = run_mode(make_backtest_data(STRATEGY), write_through=True)
+    ledger = run_mode(make_backtest_data(STRATEGY), write_through=False)
+
+    assert len(ledger) == len(write_through) > 2
+    pd.testing.assert_frame_equal(ledger, write_through, check_dtype=False)
+    # Every trade, including the seeded book, is closed by the end of the run
+    assert ledger["trade_close_price"].notna().all()
+    assert ledger["trade_close_date"].notna().all()
+
+
+def test_ledger_replaces_trades_and_flush_is_idempotent():
+    ledger = PositionLedger(STRATEGY)
+    assert ledger.get_previous_rebalance_data("2024-01-05").empty
+
+    opened = pd.DataFrame(
+        {
+            "trade_open_date": pd.Timestamp("2024-01-05"),
+            "ticker": ["AAA", "BBB"],
+            "shares": [10, -4],
+            "trade_open_price": [10.0, 20.0],
+            "direction": ["Long", "Short"],
+            "trade_close_date": pd.NaT,
+            "trade_close_price": np.nan,
+            "strategy_name": STRATEGY,
+        }
+    )
+    ledger.record_trades(opened)
+    closed = opened.assign(
+        trade_close_date=pd.Timestamp("2024-01-12"), trade_close_price=[11.0, 19.0]
+    )
+    ledger.record_trades(closed)
+
+    assert len(ledger) == 2
+    previous = ledger.get_previous_rebalance_data("2024-01-12")
+    assert list(previous["trade_close_price"]) == [11.0, 19.0]
+    assert ledger.get_previous_rebalance_data("2024-01-05").empty
+
+    with EngineRegistry.use_engine() as engine:
+        assert ledger.flush() == 2
+        assert ledger.flush() == 2
+        stored = read_trade_booking(engine)
+    assert len(stored) == 2
+    assert list(stored["trade_open_date"]) == ["2024-01-05", "2024-01-05"]
+    assert list(stored["trade_close_date"]) == ["2024-01-12", "2024-01-12"]
+
+
+def test_optimizer_log_is_written_in_both_modes(make_backtest_data):
+    logs = {}
+    for write_through in (True, False):
+        with EngineRegistry.use_engine() as engine:
+            seed_trade_booking(engine)
+            BackTest(
+                make_backtest_data(STRATEGY), write_through=write_through
+            ).run_backtest()
+            logs[write_through] = fetch_optimizer_log(STRATEGY)
+
+    columns = ["date", "direction", "n_names", "solver", "status", "selected"]
+    pd.testing.assert_frame_equal(
+        logs[True][columns], logs[False][columns], check_dtype=False
+    )
+    log = logs[False]
+    # One winning GLPK_MI solve per side of each of the four rebalances
+    assert len(log) == 8
+    assert (log["solver"] == "GLPK_MI").all() and log["selected"].all()
+    assert (log["cash_left"] >= 0).all()
+    assert summarize_optimizer_log(log).loc["GLPK_MI", "wins"] == 8
+
+
+def test_optimizer_log_is_not_kept_when_the_trade_write_fails():
+    ledger = PositionLedger(STRATEGY)
+    ledger.record_trades(
+        pd.DataFrame(
+            {
+                "trade_open_date": pd.Timestamp("2024-01-05"),
+                "ticker": ["AAA"],
+                "shares": [10],
+                "trade_open_price": [10.0],
+                "direction": ["Long"],
+                "trade_close_date": pd.NaT,
+                "trade_close_price": np.nan,
+            }
+        )
+    )
+    ledger.record_optimizer_log(
+        [
+            {
+                "strategy_name": STRATEGY,
+                "date": pd.Timestamp("2024-01-05"),
+                "direction": "Long",
+                "n_names": 1,
+                "solver": "GLPK_MI",
+                "time_limit": None,
+                "status": "optimal",
+                "solve_seconds": 0.01,
+                "objective": 1.0,
+                "cash_left": 0.0,
+                "selected": True,
+            }
+        ]
+    )
+
+    with EngineRegistry.use_engine() as engine:
+        with engine.begin() as conn:
+            # A trade_booking table the trades can not be written to
+            conn.execute(text("CREATE TABLE trade_booking (id INTEGER)"))
+        with pytest.raises(OperationalError):
+            ledger.flush()
+        assert not inspect(engine).has_table("optimizer_log")
+
+
+def run_rebalance_mode(backtest_data, write_through, rebalance_mode):
+    backtest_data.rebalance_mode = rebalance_mode
+    with EngineRegistry.use_engine() as engine:
+        seed_trade_booking(engine)
+        BackTest(backtest_data, write_through=write_through).run_backtest()
+        return read_trade_booking(engine), fetch_optimizer_log(STRATEGY)
+
+
+def test_delta_mode_ledger_matches_write_through(make_backtest_data):
+    write_through, _ = run_rebalance_mode(make_backtest_data(STRATEGY), True, "delta")
+    ledger, _ = run_rebalance_mode(make_backtest_data(STRATEGY), False, "delta")
+
+    pd.testing.assert_frame_equal(ledger, write_through, check_dtype=False)
+    assert ledger["trade_close_date"].notna().all()
+
+
+def test_delta_mode_holds_the_rebalance_books(make_backtest_data):
+    backtest_data = make_backtest_data(STRATEGY)
+    alpha_scores = backtest_data.alpha_scores_df
+    trades, log = run_rebalance_mode(backtest_data, False, "delta")
+    full_trades, _ = run_rebalance_mode(make_backtest_data(STRATEGY), False, "full")
+
+    trades["trade_open_date"] = pd.to_datetime(trades["trade_open_date"])
+    trades["trade_close_date"] = pd.to_datetime(trades["trade_close_date"])
+    rebalance_dates = sorted(alpha_scores["date"].unique())
+    for rebalance_date in rebalance_dates[:-1]:
+        held = trades[
+            (trades["trade_open_date"] <= rebalance_date)
+            & (trades["trade_close_date"] > rebalance_date)
+        ]
+        positions = held.groupby(["direction", "ticker"])["shares"].sum()
+        book = alpha_scores[alpha_scores["date"] == rebalance_date]
+        # Names leaving the book (including the seeded one) have been sold
+        assert set(positions[positions != 0].index) <= set(
+            zip(book["trade_direction"], book["ticker"])
+        )
+        long_shares = positions.xs("Long", level="direction")
+        short_shares = positions.xs("Short", level="direction")
+        assert (long_shares > 0).all() and (short_shares < 0).all()
+
+    # Positions carried between rebalances are not rebooked
+    assert len(trades) < len(full_trades)
+    assert log["selected"].sum() == 8
+
+
+def test_delta_mode_keeps_trades_closed_before_the_window(make_backtest_data):
+    closed_lot = pd.DataFrame(
+        {
+            "strategy_name": STRATEGY,
+            "trade_open_date": "2023-12-29",
+            "ticker": ["CCC"],
+            "shares": [7],
+            "trade_open_price": [40.0],
+            "direction": ["Long"],
+            "trade_close_date": "2024-01-02",
+            "trade_close_price": [41.0],
+        }
+    )
+    stored = {}
+    for write_through in (True, False):
+        backtest_data = make_backtest_data(STRATEGY)
+        backtest_data.rebalance_mode = "delta"
+        with EngineRegistry.use_engine() as engine:
+            # 2023-12-29 holds open lots and a lot closed before the window
+            seed_trade_booking(engine)
+            closed_lot.to_sql("trade_booking", engine, if_exists="append", index=False)
+            BackTest(backtest_data, write_through=write_through).run_backtest()
+            stored[write_through] = read_trade_booking(engine)
+
+    pd.testing.assert_frame_equal(stored[False], stored[True], check_dtype=False)
+    kept = stored[False][stored[False]["ticker"].eq("CCC")]
+    kept = kept[kept["trade_open_date"].eq("2023-12-29")]
+    assert len(kept) == 1
+    assert kept["trade_close_date"].iloc[0] == "2024-01-02"
+    assert kept["trade_close_price"].iloc[0] == 41.0
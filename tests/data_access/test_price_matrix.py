@@ -0,0 +1,145 @@
+import json
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_access.price_matrix import (PriceMatrix, load_price_matrix,
+                                          refresh_price_matrices)
+from src.data_access.sqllite_db_manager import EngineRegistry
+
+
+@pytest.fixture
+def ts_engine():
+    dates = pd.bdate_range("2024-01-01", periods=10)
+    rows = []
+    for i, date in enumerate(dates):
+        for j, ticker in enumerate(["AAPL", "MSFT", "SP500"]):
+            # MSFT is missing on the third day
+            if ticker == "MSFT" and i == 2:
+                continue
+            rows.append((date.strftime("%Y-%m-%d"), ticker, "px_last", 100.0 * j + i))
+            rows.append((date.strftime("%Y-%m-%d"), ticker, "mcap", 1e9 * (j + 1)))
+    df = pd.DataFrame(rows, columns=["date", "ticker", "key", "value"])
+    with EngineRegistry.use_engine() as engine:
+        df.to_sql("sp500_ts_data", engine, index=False)
+        yield engine, df
+
+
+def test_matrix_matches_pivot(ts_engine, tmp_path):
+    engine, df = ts_engine
+    matrices = refresh_price_matrices(directory=tmp_path, engine=engine)
+
+    # wgt_in_benchmark has no rows, so nothing is written for it
+    assert set(matrices) == {"px_last", "mcap"}
+
+    px = matrices["px_last"]
+    assert isinstance(px.values, np.memmap)
+    expected = (
+        df[df["key"] == "px_last"]
+        .assign(date=lambda d: pd.to_datetime(d["date"]))
+        .pivot(index="date", columns="ticker", values="value")
+    )
+    pd.testing.assert_frame_equal(
+        px.to_frame(), expected, check_names=False, check_freq=False
+    )
+    assert np.isnan(px.row("2024-01-03")[px.ticker_index("MSFT")])
+
+
+def test_slices_are_zero_copy_views(ts_engine, tmp_path):
+    engine, _ = ts_engine
+    refresh_price_matrices(["px_last"], directory=tmp_path, engine=engine)
+    px = PriceMatrix.load("px_last", tmp_path)
+
+    window = px.date_slice("2023-12-30", "2024-01-05")
+    assert window.dates[0] == np.datetime64("2024-01-01")
+    assert window.dates[-1] == np.datetime64("2024-01-05")
+    assert np.shares_memory(window.values, px.values)
+    assert np.shares_memory(px.row("2024-01-04"), px.values)
+    assert np.shares_memory(px.column("AAPL"), px.values)
+    np.testing.assert_array_equal(px.column("AAPL"), np.arange(10.0))
+
+    stocks = px.drop(["SP500"])
+    assert list(stocks.tickers) == ["AAPL", "MSFT"]
+
+
+def test_load_builds_missing_matrix(ts_engine, tmp_path):
+    engine, _ = ts_engine
+    assert not PriceMatrix.exists("mcap", tmp_path)
+
+    mcap = load_price_matrix("mcap", directory=tmp_path, engine=engine)
+    assert PriceMatrix.exists("mcap", tmp_path)
+    assert mcap.shape == (10, 3)
+
+    with pytest.raises(KeyError):
+        load_price_matrix("wgt_in_benchmark", directory=tmp_path, engine=engine)
+
+
+def small_matrix(dates, offset=0.0):
+    return PriceMatrix(
+        "px_last",
+        np.arange(len(dates) * 2, dtype=float).reshape(len(dates), 2) + offset,
+        dates,
+        ["AAPL", "MSFT"],
+    )
+
+
+def test_interrupted_save_keeps_the_previous_matrix(tmp_path):
+    first = small_matrix(pd.bdate_range("2024-01-01", periods=3))
+    first.save(tmp_path)
+
+    # Same shape, shifted dates: a mix of the two saves would still load
+    second = small_matrix(pd.bdate_range("2024-02-01", periods=3), offset=100.0)
+    real_save = np.save
+
+    def crash_on_tickers(file, arr, *args, **kwargs):
+        if arr.dtype.kind == "U":
+            raise OSError("disk full")
+        return real_save(file, arr, *args, **kwargs)
+
+    with patch.object(np, "save", side_effect=crash_on_tickers):
+        with pytest.raises(OSError):
+            second.save(tmp_path)
+
+    loaded = PriceMatrix.load("px_last", tmp_path)
+    np.testing.assert_array_equal(loaded.values, first.values)
+    np.testing.assert_array_equal(loaded.dates, first.dates)
+
+    second.save(tmp_path)
+    loaded = PriceMatrix.load("px_last", tmp_path)
+    np.testing.assert_array_equal(loaded.values, second.values)
+    np.testing.assert_array_equal(loaded.dates, second.dates)
+
+
+def test_load_checks_the_manifest(tmp_path):
+    matrix = small_matrix(pd.bdate_range("2024-01-01", periods=3))
+    for _ in range(3):
+        matrix.save(tmp_path)
+    # The current and the previous generation are kept
+    assert len(list(tmp_path.glob("px_last.*.npy"))) == 2
+
+    manifest_path = tmp_path / "px_last_manifest.json"
+    manifest = json.loads(manifest_path.read_text())
+    manifest_path.write_text(json.dumps({**manifest, "shape": [4, 2]}))
+    with pytest.raises(ValueError):
+        PriceMatrix.load("px_last", tmp_path)
+
+
+def test_load_reads_stores_without_manifest(tmp_path):
+    matrix = small_matrix(pd.bdate_range("2024-01-01", periods=3))
+    np.save(tmp_path / "px_last.npy", matrix.values)
+    np.save(tmp_path / "px_last_dates.npy", matrix.dates)
+    np.save(tmp_path / "px_last_tickers.npy", matrix.tickers)
+
+    assert PriceMatrix.exists("px_last", tmp_path)
+    np.testing.assert_array_equal(
+        PriceMatrix.load("px_last", tmp_path).values, matrix.values
+    )
+
+    # Saving switches to the manifest layout and removes the old files
+    matrix.save(tmp_path)
+    assert not (tmp_path / "px_last.npy").exists()
+    np.testing.assert_array_equal(
+        PriceMatrix.load("px_last", tmp_path).values, matrix.values
+    )
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_access.risk_model import RiskModelDataUtil
+from src.data_access.sqllite_db_manager import EngineRegistry
+
+DATES = ["2024-01-05", "2024-01-12", "2024-01-19"]
+FACTORS = ["Manuf", "Money"]
+
+
+@pytest.fixture
+def risk_engine():
+    exposures, covariances, residuals = [], [], []
+    for d, date in enumerate(DATES):
+        # GOOG only enters the model on the second date
+        tickers = ["AAPL", "MSFT"] if d == 0 else ["AAPL", "GOOG", "MSFT"]
+        for t, ticker in enumerate(tickers):
+            for f, factor in enumerate(FACTORS):
+                exposures.append((date, ticker, factor, d + 0.1 * t + 0.01 * f))
+            residuals.append((date, ticker, 0.2 + d + t, 0.01 * t))
+        for i, f1 in enumerate(FACTORS):
+            for j, f2 in enumerate(FACTORS):
+                covariances.append((date, f1, f2, (d + 1) * (0.04 if i == j else 0.01)))
+
+    with EngineRegistry.use_engine() as engine:
+        pd.DataFrame(
+            exposures, columns=["date", "ticker", "factor", "exposure"]
+        ).to_sql("factor_exposures", engine, index=False)
+        pd.DataFrame(
+            covariances, columns=["date", "factor_1", "factor_2", "covariance"]
+        ).to_sql("factor_covariance", engine, index=False)
+        pd.DataFrame(
+            residuals, columns=["date", "ticker", "specific_risk", "residual"]
+        ).to_sql("sprisk_residuals", engine, index=False)
+        yield engine
+
+
+def test_fetch_risk_models_stacks_requested_dates(risk_engine):
+    stack = RiskModelDataUtil.fetch_risk_models(["2024-01-19", "2024-01-05"])
+
+    assert list(stack.dates.strftime("%Y-%m-%d")) == ["2024-01-05", "2024-01-19"]
+    assert list(stack.tickers) == ["AAPL", "GOOG", "MSFT"]
+    assert stack.factor_names == FACTORS
+    assert stack.factor_exposures.shape == (2, 3, 2)
+    assert stack.factor_covariance.shape == (2, 2, 2)
+    assert stack.specific_risk.shape == (2, 3)
+
+    # GOOG is not covered on the first date
+    assert np.isnan(stack.factor_exposures[0, 1]).all()
+    np.testing.assert_allclose(stack.factor_exposures[1, 1], [2.1, 2.11])
+    np.testing.assert_allclose(stack.factor_covariance[1], [[0.12, 0.03], [0.03, 0.12]])
+    np.testing.assert_allclose(stack.specific_risk[1], [2.2, 3.2, 4.2])
+
+
+def test_risk_model_view_matches_single_date_layout(risk_engine):
+    risk_model = RiskModelDataUtil.fetch_risk_model("2024-01-05")
+
+    assert risk_model.date == "2024-01-05"
+    assert risk_model.factor_names == FACTORS
+    assert list(risk_model.factor_exposures.columns) == ["date", "ticker"] + FACTORS
+    assert list(risk_model.factor_exposures["ticker"]) == ["AAPL", "MSFT"]
+    assert (risk_model.factor_exposures["date"] == pd.Timestamp("2024-01-05")).all()
+    assert risk_model.factor_covariance.loc["Manuf", "Money"] == pytest.approx(0.01)
+    assert list(risk_model.sp_risk_residuals.columns) == [
+        "date",
+        "ticker",
+        "specific_risk",
+        "residual",
+    ]
+    assert list(risk_model.sp_risk_residuals["specific_risk"]) == [0.2, 1.2]
@@ -0,0 +1,265 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+from sqlalchemy import event, text
+
+from src.back_test.back_test import BackTestUtil
+from src.data_access.crud_util import DataAccessUtil
+from src.data_access.prices import PriceDataFetcher
+from src.data_access.risk_model import RiskModelDataUtil
+from src.data_access.schemas import UniverseSpec
+from src.data_access.sqllite_db_manager import (LATEST_SCHEMA_VERSION,
+                                                DatabaseManager,
+                                                EngineRegistry,
+                                                SchemaVersionError)
+from src.data_access.trade_booking import get_trade_and_sec_master_data
+from src.rebalance.rebalance_portfolio import RebalanceUtil
+
+# The security master is a small lookup table and subqueries are
+# materialized results; scanning either is expected.
+SCAN_EXEMPT = ("sm", "(subquery-2)")
+TS_INDEXES = ("ix_sp500_ts_data_key_date_ticker", "ix_sp500_ts_data_key_ticker_date")
+
+
+@pytest.fixture
+def legacy_db():
+    """In-memory database with the pre-migration layout (timestamp-like dates, no indexes)."""
+    dates = pd.to_datetime(["2024-01-04", "2024-01-05", "2024-01-12"])
+    tables = {
+        "sp500_ts_data": pd.DataFrame(
+            {
+                "date": dates.repeat(3),
+                "ticker": ["AAPL", "MSFT", "SP500"] * 3,
+                "key": "px_last",
+                "value": range(9),
+            }
+        ),
+        "alpha_history": pd.DataFrame(
+            {
+                "date": dates,
+                "trade_direction": "Long",
+                "ticker": "AAPL",
+                "alpha_score": 1.0,
+                "weight": 1.0,
+                "strategy_name": "MinVol",
+            }
+        ),
+        "trade_booking": pd.DataFrame(
+            {
+                "trade_open_date": dates.strftime("%Y-%m-%d %H:%M:%S"),
+                "ticker": "AAPL",
+                "shares": 10,
+                "trade_open_price": 1.0,
+                "direction": "Long",
+                "trade_close_date": pd.NaT,
+                "trade_close_price": None,
+                "strategy_name": "MinVol",
+            }
+        ),
+        "aum_and_leverage": pd.DataFrame(
+            {"date": dates, "strategy_name": "MinVol", "aum": 1.0, "target_leverage": 2}
+        ),
+        "sp500_sec_master": pd.DataFrame(
+            {
+                "symbol": ["AAPL"],
+                "security": ["Apple"],
+                "gics_sector": ["IT"],
+                "ff12industry": ["BusEq"],
+            }
+        ),
+        "factor_exposures": pd.DataFrame(
+            {"date": dates, "ticker": "AAPL", "factor": "f1", "exposure": 0.5}
+        ),
+        "factor_covariance": pd.DataFrame(
+            {"date": dates, "factor_1": "f1", "factor_2": "f1", "covariance": 0.1}
+        ),
+        "sprisk_residuals": pd.DataFrame(
+            {"date": dates, "ticker": "AAPL", "specific_risk": 0.2, "residual": 0.0}
+        ),
+    }
+    # Older history for other strategies gives ANALYZE a realistic selectivity
+    # picture; on a handful of rows SQLite would rightly prefer a full scan.
+    history_dates = pd.date_range("2020-01-01", periods=200, freq="D")
+    with EngineRegistry.use_engine() as engine:
+        for table_name, df in tables.items():
+            df.to_sql(table_name, engine, index=False)
+            if table_name == "sp500_sec_master":
+                continue
+            filler = pd.concat([df.iloc[[0]]] * len(history_dates), ignore_index=True)
+            date_column = "trade_open_date" if table_name == "trade_booking" else "date"
+            filler[date_column] = history_dates
+            if "strategy_name" in filler:
+                filler["strategy_name"] = [f"Other{i % 20}" for i in range(len(filler))]
+            filler.to_sql(table_name, engine, index=False, if_exists="append")
+        with engine.begin() as conn:
+            conn.execute(text("PRAGMA user_version = 0"))
+        yield engine
+
+
+def _explain_fetchers(engine, fetchers):
+    """Run each fetcher, capture its SELECT and return the EXPLAIN QUERY PLAN details."""
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    plans = {}
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        for name, fetch in fetchers.items():
+            captured.clear()
+            fetch()
+            statements = list(captured)
+            with engine.connect() as conn:
+                plans[name] = [
+                    row[3]
+                    for statement, parameters in statements
+                    for row in conn.exec_driver_sql(
+                        "EXPLAIN QUERY PLAN " + statement, parameters
+                    )
+                ]
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return plans
+
+
+def test_migration_normalizes_dates_and_is_idempotent(legacy_db):
+    db_manager = DatabaseManager()
+    assert db_manager.get_schema_version() == 0
+
+    assert db_manager.migrate() == LATEST_SCHEMA_VERSION
+    assert db_manager.migrate() == LATEST_SCHEMA_VERSION
+
+    with legacy_db.connect() as conn:
+        ts_dates = conn.execute(
+            text("SELECT DISTINCT date FROM sp500_ts_data WHERE date >= '2024-01-01'")
+        ).scalars()
+        open_dates = conn.execute(
+            text(
+                "SELECT trade_open_date FROM trade_booking"
+                " WHERE strategy_name = 'MinVol'"
+            )
+        ).scalars()
+        assert sorted(ts_dates) == [
+            "2024-01-04",
+            "2024-01-05",
+            "2024-01-12",
+        ]
+        assert list(open_dates) == [
+            "2024-01-04",
+            "2024-01-05",
+            "2024-01-12",
+        ]
+
+
+def test_range_fetch_includes_end_date(legacy_db):
+    DatabaseManager().migrate()
+
+    spec = UniverseSpec(start_date="2024-01-05", end_date="2024-01-12")
+    prices = PriceDataFetcher.get_price_data(spec)
+    assert sorted(prices["date"].dt.strftime("%Y-%m-%d").unique()) == [
+        "2024-01-05",
+        "2024-01-12",
+    ]
+    assert set(prices["ticker"]) == {"AAPL", "MSFT"}
+
+    trades = get_trade_and_sec_master_data("MinVol", "2024-01-12", "2024-01-12")
+    assert len(trades) == 1
+
+
+def test_store_dataframe_writes_canonical_dates(legacy_db):
+    DataAccessUtil.store_dataframe_to_table(
+        pd.DataFrame(
+            {
+                "date": [pd.Timestamp("2024-01-19")],
+                "strategy_name": ["MinVol"],
+                "aum": [1.0],
+                "target_leverage": [2],
+            }
+        ),
+        "aum_and_leverage",
+    )
+    # Raw connection: reads through the engine wait for the migration
+    conn = legacy_db.raw_connection()
+    try:
+        stored = conn.execute(
+            "SELECT date FROM aum_and_leverage ORDER BY date DESC LIMIT 1"
+        ).fetchone()[0]
+    finally:
+        conn.close()
+    assert stored == "2024-01-19"
+
+
+def test_fetching_before_migrating_fails(legacy_db):
+    with pytest.raises(SchemaVersionError, match="migrate"):
+        PriceDataFetcher.get_ticker_prices(["AAPL", "MSFT"], date(2024, 1, 5))
+    with pytest.raises(SchemaVersionError):
+        RebalanceUtil.get_alpha_scores("MinVol", "2024-01-01", "2024-01-12")
+
+    DatabaseManager().migrate()
+    prices = PriceDataFetcher.get_ticker_prices(["AAPL", "MSFT"], date(2024, 1, 5))
+    assert set(prices["ticker"]) == {"AAPL", "MSFT"}
+
+
+def test_fetchers_use_indexes(legacy_db):
+    DatabaseManager().migrate()
+
+    spec = UniverseSpec(start_date="2024-01-01", end_date="2024-01-31")
+    fetchers = {
+        "prices": lambda: PriceDataFetcher.get_price_data(spec),
+        "benchmark": lambda: PriceDataFetcher.get_benchmark_data(spec),
+        "ticker_prices": lambda: PriceDataFetcher.get_ticker_prices(
+            ["AAPL", "MSFT"], date(2024, 1, 5)
+        ),
+        "alpha_scores": lambda: RebalanceUtil.get_alpha_scores(
+            "MinVol", "2024-01-01", "2024-01-31"
+        ),
+        "aum_leverage": lambda: RebalanceUtil.get_aum_leverage_data(
+            "MinVol", "2024-01-01", "2024-01-31"
+        ),
+        "previous_rebalance": lambda: BackTestUtil.get_previous_rebalance_data(
+            "MinVol", date(2024, 1, 12)
+        ),
+        "trades_with_sec_master": lambda: get_trade_and_sec_master_data(
+            "MinVol", "2024-01-01", "2024-01-31"
+        ),
+        "factor_exposures": lambda: RiskModelDataUtil._fetch_factor_exposures(
+            pd.DatetimeIndex(["2024-01-05"])
+        ),
+        "factor_covariance": lambda: RiskModelDataUtil._fetch_factor_covariance(
+            pd.DatetimeIndex(["2024-01-05"])
+        ),
+        "sprisk_residuals": lambda: RiskModelDataUtil._fetch_sp_risk_residuals(
+            pd.DatetimeIndex(["2024-01-05"])
+        ),
+    }
+    expected_indexes = {
+        "prices": TS_INDEXES,
+        "benchmark": TS_INDEXES,
+        "ticker_prices": TS_INDEXES,
+        "alpha_scores": ("ix_alpha_history_strategy_date",),
+        "aum_leverage": ("ix_aum_and_leverage_strategy_date",),
+        "previous_rebalance": ("ix_trade_booking_strategy_open_date",),
+        "trades_with_sec_master": ("ix_trade_booking_strategy_open_date",),
+        "factor_exposures": ("ix_factor_exposures_date",),
+        "factor_covariance": ("ix_factor_covariance_date",),
+        "sprisk_residuals": ("ix_sprisk_residuals_date",),
+    }
+
+    plans = _explain_fetchers(legacy_db, fetchers)
+
+    for name, indexes in expected_indexes.items():
+        details = plans[name]
+        assert details, f"{name} issued no SELECT"
+        assert any(
+            detail.startswith("SEARCH") and any(ix in detail for ix in indexes)
+            for detail in details
+        ), f"{name} does not use an index: {details}"
+        main_table_scans = [
+            detail
+            for detail in details
+            if detail.startswith("SCAN") and detail.split()[1] not in SCAN_EXEMPT
+        ]
+        assert not main_table_scans, f"{name} scans a table: {details}"
@@ -0,0 +1,123 @@
+import sqlite3
+import threading
+
+import pandas as pd
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import SingletonThreadPool
+
+from src.data_access.crud_util import DataAccessUtil
+from src.data_access.sqllite_db_manager import (LATEST_SCHEMA_VERSION,
+                                                DatabaseManager,
+                                                EngineRegistry, PoolMode,
+                                                SchemaVersionError,
+                                                get_db_engine,
+                                                get_schema_version)
+
+
+@pytest.fixture
+def registry():
+    """Restore the registry defaults and drop cached engines after each test."""
+    defaults = (
+        EngineRegistry.pool_mode,
+        EngineRegistry.pool_size,
+        EngineRegistry.max_overflow,
+        EngineRegistry.read_only,
+    )
+    yield EngineRegistry
+    EngineRegistry.dispose_all()
+    EngineRegistry.configure(*defaults)
+
+
+def test_get_db_engine_is_cached_per_path(registry, tmp_path):
+    db_a = tmp_path / "a.db"
+    db_b = tmp_path / "b.db"
+
+    engine_a = get_db_engine(db_a)
+    assert get_db_engine(db_a) is engine_a
+    assert DatabaseManager(db_a).get_engine() is engine_a
+    assert get_db_engine(db_b) is not engine_a
+
+
+def test_read_only_engine_rejects_writes(registry, tmp_path):
+    db_path = tmp_path / "ro.db"
+    DataAccessUtil.store_dataframe_to_table(
+        pd.DataFrame({"x": [1, 2]}), "numbers", engine=get_db_engine(db_path)
+    )
+
+    read_only_engine = get_db_engine(db_path, read_only=True)
+    assert read_only_engine is not get_db_engine(db_path)
+
+    df = DataAccessUtil.fetch_data_from_db(
+        text("SELECT x FROM numbers"), engine=read_only_engine
+    )
+    assert list(df["x"]) == [1, 2]
+
+    with pytest.raises(OperationalError):
+        with read_only_engine.connect() as conn:
+            conn.execute(text("INSERT INTO numbers (x) VALUES (3)"))
+
+
+def test_thread_local_pool_mode(registry, tmp_path):
+    registry.configure(pool_mode=PoolMode.THREAD_LOCAL)
+    engine = get_db_engine(tmp_path / "tl.db")
+    assert isinstance(engine.pool, SingletonThreadPool)
+
+    connection_ids = {}
+
+    def checkout(name):
+        with engine.connect() as conn:
+            connection_ids[name] = id(conn.connection.dbapi_connection)
+
+    checkout("main_1")
+    checkout("main_2")
+    worker = threading.Thread(target=checkout, args=("worker",))
+    worker.start()
+    worker.join()
+
+    assert connection_ids["main_1"] == connection_ids["main_2"]
+    assert connection_ids["worker"] != connection_ids["main_1"]
+
+
+def test_use_engine_routes_default_lookups_to_in_memory_db(registry):
+    with EngineRegistry.use_engine() as engine:
+        assert get_db_engine() is engine
+        DataAccessUtil.store_dataframe_to_table(
+            pd.DataFrame({"ticker": ["AAPL"], "value": [1.0]}), "prices"
+        )
+        df = DataAccessUtil.fetch_data_from_db(text("SELECT * FROM prices"))
+        assert df["ticker"].tolist() == ["AAPL"]
+
+    assert get_db_engine() is not engine
+
+
+def test_getting_an_engine_does_not_migrate(registry, tmp_path):
+    db_path = tmp_path / "legacy.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE alpha_history (date TEXT, strategy_name TEXT)")
+        conn.execute("INSERT INTO alpha_history VALUES ('2024-01-05 00:00:00', 'A')")
+
+    engine = get_db_engine(db_path, read_only=False)
+    assert get_schema_version(engine) == 0
+    with sqlite3.connect(db_path) as conn:
+        stored = conn.execute("SELECT date FROM alpha_history").fetchone()[0]
+    assert stored == "2024-01-05 00:00:00"
+    with pytest.raises(SchemaVersionError):
+        DataAccessUtil.fetch_data_from_db(
+            text("SELECT date FROM alpha_history"), engine=engine
+        )
+
+    assert DatabaseManager(db_path).migrate() == LATEST_SCHEMA_VERSION
+    df = DataAccessUtil.fetch_data_from_db(
+        text("SELECT date FROM alpha_history"), engine=engine
+    )
+    assert df["date"].tolist() == [pd.Timestamp("2024-01-05")]
+
+
+def test_new_databases_start_at_the_latest_schema_version(registry, tmp_path):
+    engine = get_db_engine(tmp_path / "new.db", read_only=False)
+    assert get_schema_version(engine) == LATEST_SCHEMA_VERSION
+    assert get_schema_version(EngineRegistry.create_in_memory_engine()) == (
+        LATEST_SCHEMA_VERSION
+    )
@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from src.data_prep.riskmodel_creation.fama_french_risk_model_5_weekly_only_ind_factors import (
+    IndustryFactorRiskModel, build_weekly_risk_models, risk_model_dates)
+
+N_FACTORS = 12
+
+
+def reference_exposures(stock_returns, industry_factors):
+    """The per-stock LinearRegression loop estimate_exposures replaced."""
+    industry_exposures = pd.DataFrame(
+        index=stock_returns.columns, columns=industry_factors.columns
+    )
+    specific_risk = pd.Series(index=stock_returns.columns)
+    residuals = pd.DataFrame(index=stock_returns.index, columns=stock_returns.columns)
+
+    for stock in stock_returns.columns:
+        if stock_returns[stock].isna().sum() > len(stock_returns) * 0.25:
+            continue
+        y = stock_returns[stock].dropna()
+        X = industry_factors.loc[y.index].values
+        X = np.column_stack([np.ones(X.shape[0]), X])
+        model = LinearRegression(fit_intercept=False)
+        model.fit(X, y.values.reshape(-1, 1))
+        betas = model.coef_.flatten()[1:]
+        industry_exposures.loc[stock] = betas
+        pred = model.predict(X).flatten()
+        residuals.loc[y.index, stock] = y.values - pred
+        specific_risk[stock] = np.std(y.values - pred)
+
+    return industry_exposures, specific_risk, residuals.loc[[residuals.index[-1]]]
+
+
+def make_returns(n_days=300, n_stocks=80, seed=0):
+    """Full histories, late listings, scattered gaps and mostly missing stocks."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2023-01-02", periods=n_days, name="Date")
+    industry_factors = pd.DataFrame(
+        rng.normal(0, 0.01, (n_days, N_FACTORS)),
+        index=dates,
+        columns=[f"Ind{i}" for i in range(N_FACTORS)],
+    )
+    betas = rng.normal(1, 0.5, (N_FACTORS, n_stocks))
+    returns = industry_factors.to_numpy() @ betas / N_FACTORS + rng.normal(
+        0, 0.02, (n_days, n_stocks)
+    )
+    returns[:30, :10] = np.nan
+    returns[: n_days // 2, 10:13] = np.nan
+    returns[:, 13:25][rng.random((n_days, 12)) < 0.05] = np.nan
+    returns[-1, 25] = np.nan
+    stock_returns = pd.DataFrame(
+        returns,
+        index=dates,
+        columns=pd.Index([f"S{i:03d}" for i in range(n_stocks)], name="Ticker"),
+    )
+    return stock_returns, industry_factors
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_batched_exposures_match_per_stock_regressions(seed):
+    stock_returns, industry_factors = make_returns(seed=seed)
+    model = IndustryFactorRiskModel(as_of_date=stock_returns.index[-1])
+    model.load_data(stock_returns, industry_factors)
+    model.estimate_exposures()
+
+    exposures, specific_risk, residuals = reference_exposures(
+        model.stock_returns, model.industry_factors
+    )
+    pd.testing.assert_frame_equal(
+        model.industry_exposures, exposures.astype(float), rtol=1e-10
+    )
+    pd.testing.assert_series_equal(
+        model.specific_risk, specific_risk.astype(float), rtol=1e-10
+    )
+    pd.testing.assert_frame_equal(model.residuals, residuals.astype(float), rtol=1e-10)
+
+    # Mostly missing stocks are left out
+    assert model.industry_exposures.loc[["S010", "S011", "S012"]].isna().all(axis=None)
+    assert (
+        model.industry_exposures.drop(["S010", "S011", "S012"]).notna().all(axis=None)
+    )
+
+
+def test_build_complete_model_with_no_fitted_stocks():
+    stock_returns, industry_factors = make_returns()
+    stock_returns = stock_returns.iloc[:, :3]
+    stock_returns.iloc[:200] = np.nan
+    model = IndustryFactorRiskModel(as_of_date=stock_returns.index[-1])
+    model.load_data(stock_returns, industry_factors)
+    model.build_complete_model()
+
+    assert model.industry_exposures.isna().all(axis=None)
+    assert model.factor_covariance.shape == (N_FACTORS, N_FACTORS)
+
+
+def assert_models_match(model, expected):
+    assert model.as_of_date == expected.as_of_date
+    pd.testing.assert_frame_equal(model.stock_returns, expected.stock_returns)
+    pd.testing.assert_frame_equal(
+        model.industry_exposures, expected.industry_exposures, rtol=1e-8
+    )
+    pd.testing.assert_series_equal(
+        model.specific_risk, expected.specific_risk, rtol=1e-8
+    )
+    pd.testing.assert_frame_equal(
+        model.residuals, expected.residuals, rtol=1e-8, atol=1e-12
+    )
+    pd.testing.assert_frame_equal(model.factor_covariance, expected.factor_covariance)
+
+
+@pytest.mark.parametrize("mode", ["rolling", "parallel"])
+def test_build_modes_match_serial_models(mode):
+    stock_returns, industry_factors = make_returns(n_days=700, n_stocks=40)
+    fridays = risk_model_dates(stock_returns.index, "2023-12-01", "2024-04-30")
+    # A gap longer than the window makes the rolling mode start over
+    as_of_dates = fridays[:-2] + [stock_returns.index[-1]]
+
+    expected = build_weekly_risk_models(
+        stock_returns, industry_factors, as_of_dates, mode="serial"
+    )
+    models = build_weekly_risk_models(
+        stock_returns, industry_factors, as_of_dates, mode=mode, max_workers=2
+    )
+
+    assert list(models) == list(expected) == sorted(as_of_dates)
+    for date, model in models.items():
+        assert_models_match(model, expected[date])
+
+
+def test_risk_model_dates_fall_back_to_the_last_trading_day():
+    index = pd.bdate_range("2024-01-01", "2024-02-29").drop(pd.Timestamp("2024-01-12"))
+    dates = risk_model_dates(index, "2024-01-01", "2024-01-31")
+    assert dates == list(
+        pd.to_datetime(["2024-01-05", "2024-01-11", "2024-01-19", "2024-01-26"])
+    )
+
+    with pytest.raises(ValueError):
+        build_weekly_risk_models(index, index, dates, mode="threads")
+
+
+def test_load_returns_a_model(tmp_path):
+    stock_returns, industry_factors = make_returns()
+    model = build_weekly_risk_models(
+        stock_returns, industry_factors, [stock_returns.index[-1]]
+    )[stock_returns.index[-1]]
+    path = tmp_path / "models" / "risk_model.pkl"
+    model.serialize_risk_model(str(path))
+
+    loaded = IndustryFactorRiskModel.load(str(path))
+    assert isinstance(loaded, IndustryFactorRiskModel)
+    assert_models_match(loaded, model)
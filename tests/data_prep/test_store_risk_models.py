@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from src.data_access.risk_model import RiskModelDataUtil
+from src.data_access.sqllite_db_manager import EngineRegistry
+from src.data_prep.riskmodel_creation.fama_french_risk_model_5_weekly_only_ind_factors import (
+    build_weekly_risk_models, risk_model_dates)
+from src.data_prep.riskmodel_creation.risk_model_artifacts import \
+    RiskModelArtifact
+from src.data_prep.riskmodel_creation.store_risk_models_in_database import (
+    find_risk_model_files, store_risk_model_folder, store_risk_models)
+
+N_FACTORS = 4
+
+
+@pytest.fixture(scope="module")
+def models():
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2023-01-02", periods=320, name="Date")
+    industry_factors = pd.DataFrame(
+        rng.normal(0, 0.01, (len(dates), N_FACTORS)),
+        index=dates,
+        columns=[f"Ind{i}" for i in range(N_FACTORS)],
+    )
+    returns = rng.normal(0, 0.02, (len(dates), 12))
+    returns[:200, 0] = np.nan  # never fitted
+    returns[-1, 1] = np.nan  # no residual on the as_of_date
+    stock_returns = pd.DataFrame(
+        returns,
+        index=dates,
+        columns=pd.Index([f"S{i:02d}" for i in range(12)], name="Ticker"),
+    )
+    as_of_dates = risk_model_dates(dates, "2024-02-01", "2024-03-01")
+    return build_weekly_risk_models(stock_returns, industry_factors, as_of_dates)
+
+
+@pytest.fixture
+def engine():
+    with EngineRegistry.use_engine() as engine:
+        yield engine
+
+
+def write_artifacts(models, folder, legacy_dates=()):
+    for date, model in models.items():
+        path = folder / f"risk_model_{date:%Y-%m-%d}"
+        if date in legacy_dates:
+            model.serialize_risk_model(f"{path}.pkl")
+        else:
+            RiskModelArtifact.from_model(model).save(f"{path}.npz")
+
+
+def table_counts(engine):
+    with engine.connect() as conn:
+        return {
+            table: conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+            for table in ("factor_exposures", "factor_covariance", "sprisk_residuals")
+        }
+
+
+def test_artifact_round_trip(models, tmp_path):
+    model = next(iter(models.values()))
+    artifact = RiskModelArtifact.from_model(model)
+    model.serialize_risk_model(str(tmp_path / "model.pkl"))
+
+    for loaded in (
+        RiskModelArtifact.load(artifact.save(tmp_path / "model.npz")),
+        RiskModelArtifact.read(tmp_path / "model.pkl"),
+    ):
+        assert loaded.as_of_date == model.as_of_date
+        assert loaded.n_days == len(model.stock_returns)
+        np.testing.assert_array_equal(loaded.tickers, model.stock_returns.columns)
+        np.testing.assert_array_equal(loaded.exposures, model.industry_exposures)
+        np.testing.assert_array_equal(loaded.factor_covariance, model.factor_covariance)
+        np.testing.assert_array_equal(loaded.specific_risk, model.specific_risk)
+        np.testing.assert_array_equal(loaded.residuals, model.residuals.iloc[0])
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_stored_models_read_back(models, tmp_path, engine, workers):
+    last_date = list(models)[-1]
+    write_artifacts(models, tmp_path, legacy_dates=[last_date])
+
+    report = store_risk_model_folder(tmp_path, workers=workers)
+
+    assert report.files == report.dates == len(models)
+    assert report.failed == []
+    assert report.rows == table_counts(engine)
+    assert report.rows_per_second > 0
+
+    stack = RiskModelDataUtil.fetch_risk_models(list(models))
+    tickers = list(stack.tickers)
+    assert "S00" not in tickers
+    for pos, (date, model) in enumerate(models.items()):
+        exposures = model.industry_exposures.drop("S00")
+        np.testing.assert_array_equal(
+            stack.factor_exposures[pos], exposures.loc[tickers, stack.factor_names]
+        )
+        np.testing.assert_array_equal(
+            stack.factor_covariance[pos],
+            model.factor_covariance.loc[stack.factor_names, stack.factor_names],
+        )
+        np.testing.assert_array_equal(
+            stack.specific_risk[pos], model.specific_risk[tickers]
+        )
+        np.testing.assert_array_equal(
+            stack.residuals[pos], model.residuals.iloc[0][tickers]
+        )
+
+
+def test_reruns_are_idempotent(models, tmp_path, engine):
+    write_artifacts(models, tmp_path)
+    first = store_risk_model_folder(tmp_path)
+    counts = table_counts(engine)
+
+    # Reloading replaces each date's rows instead of adding to them
+    second = store_risk_model_folder(tmp_path)
+    assert second.rows == first.rows
+    assert table_counts(engine) == counts
+
+
+def test_unreadable_files_are_skipped(models, tmp_path, engine):
+    write_artifacts(models, tmp_path)
+    broken = tmp_path / "risk_model_2024-12-27.npz"
+    broken.write_bytes(b"not an artifact")
+
+    paths = find_risk_model_files(tmp_path)
+    assert broken in paths
+    report = store_risk_models(paths, workers=2)
+
+    assert report.failed == [str(broken)]
+    assert report.files == len(models)
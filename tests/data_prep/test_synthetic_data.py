@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_access.prices import PriceDataFetcher
+from src.data_access.risk_model import RiskModelDataUtil
+from src.data_access.schemas import UniverseSpec
+from src.data_access.sqllite_db_manager import EngineRegistry
+from src.data_prep.synthetic_data.generate_synthetic_data import (
+    SyntheticDataSpec, create_synthetic_db, generate_synthetic_data)
+from src.rebalance.rebalance_portfolio import RebalanceUtil
+
+SPEC = SyntheticDataSpec(n_tickers=40, n_years=0.25, n_factors=4, top_n=5)
+
+
+def test_generator_is_deterministic():
+    first = generate_synthetic_data(SPEC)
+    second = generate_synthetic_data(SPEC)
+    for name, table in first.tables().items():
+        pd.testing.assert_frame_equal(table, second.tables()[name])
+
+    other_seed = generate_synthetic_data(SyntheticDataSpec(n_tickers=40, seed=1))
+    assert not np.allclose(
+        other_seed.prices["value"].to_numpy()[:40],
+        first.prices["value"].to_numpy()[:40],
+    )
+
+
+def test_generated_shapes():
+    data = generate_synthetic_data(SPEC)
+    n_days = SPEC.n_days
+    # Stocks plus the SP500 benchmark
+    assert len(data.prices) == n_days * (SPEC.n_tickers + 1)
+    assert (data.prices["value"] > 0).all()
+
+    books = data.alpha_scores.groupby(["strategy_name", "date", "trade_direction"])
+    assert (books.size() == SPEC.top_n).all()
+    np.testing.assert_allclose(books["weight"].sum(), 1.0)
+    assert (
+        len(data.rebalance_dates)
+        == (pd.DatetimeIndex(data.prices["date"].unique()).dayofweek == 4).sum()
+    )
+
+    covariance = data.factor_covariance[
+        data.factor_covariance["date"] == data.rebalance_dates[-1]
+    ].pivot(index="factor_1", columns="factor_2", values="covariance")
+    np.testing.assert_allclose(covariance, covariance.T)
+    assert np.linalg.eigvalsh(covariance.to_numpy()).min() > 0
+
+
+def test_synthetic_db_serves_the_fetchers():
+    with EngineRegistry.use_engine(EngineRegistry.create_in_memory_engine()) as engine:
+        data, _ = create_synthetic_db(SPEC, engine=engine)
+        last_friday = data.rebalance_dates[-1]
+
+        prices = PriceDataFetcher.get_price_data(
+            UniverseSpec("SP500", "2020-01-01", "2020-12-31")
+        )
+        alpha_scores = RebalanceUtil.get_alpha_scores("Mom_RoC", "2020-01-01")
+        aum_leverage = RebalanceUtil.get_aum_leverage_data("MinVol", "2020-01-01")
+        risk_model = RiskModelDataUtil.fetch_risk_model(last_friday)
+
+    assert prices["ticker"].nunique() == SPEC.n_tickers
+    assert len(alpha_scores) == 2 * SPEC.top_n * len(data.rebalance_dates)
+    pd.testing.assert_series_equal(
+        aum_leverage["in_out_flows"].iloc[1:].reset_index(drop=True),
+        data.aum_leverage_changes("MinVol")["in_out_flows"]
+        .iloc[1:]
+        .reset_index(drop=True),
+        check_names=False,
+    )
+    assert risk_model.factor_covariance.shape == (SPEC.n_factors, SPEC.n_factors)
+    assert len(risk_model.factor_exposures) == SPEC.n_tickers
+
+
+def test_rejects_too_many_factors():
+    with pytest.raises(ValueError):
+        generate_synthetic_data(SyntheticDataSpec(n_tickers=10, n_factors=13))
@@ -1,8 +1,9 @@
+import numpy as np
 import pandas as pd
+import pytest
 
-from src.portfolio_construction.optimizers.create_portfolio_weights import (
-    construct_portfolio_weights,
-)
+from src.portfolio_construction.optimizers.create_portfolio_weights import \
+    construct_portfolio_weights
 
 
 def test_construct_portfolio_weights_basic():
@@ -95,3 +96,77 @@ def test_construct_portfolio_weights_single_asset():
     assert all(result["trade_direction"] == "Long")
     assert all(result["ticker"] == "AAPL")
     assert all(result["weight"] == 1.0)
+
+
+def reference_portfolio_weights(signal_df, strategy_name, top_n=25):
+    """The previous row-by-row implementation, with a stable sort for ties."""
+    frames = []
+    for date, row in signal_df.iterrows():
+        valid = row.dropna()
+        if len(valid) == 1:
+            books = [("Long", valid, np.ones(1))]
+        elif len(valid) < max(2, top_n):
+            continue
+        else:
+            ordered = valid[
+                valid.abs().sort_values(ascending=False, kind="stable").index
+            ]
+            n = min(top_n, len(ordered) // 2)
+            top, bottom = ordered.iloc[:n], ordered.iloc[-n:]
+            long, short = (bottom, top) if (ordered < 0).all() else (top, bottom)
+            if long.abs().sum() == 0 and short.abs().sum() == 0:
+                continue
+            books = [
+                (
+                    direction,
+                    side,
+                    (
+                        side.abs().values / side.abs().sum()
+                        if side.abs().sum()
+                        else np.zeros(n)
+                    ),
+                )
+                for direction, side in (("Long", long), ("Short", short))
+            ]
+        for direction, side, weights in books:
+            frames.append(
+                pd.DataFrame(
+                    {
+                        "date": date,
+                        "trade_direction": direction,
+                        "ticker": side.index,
+                        "alpha_score": side.values,
+                        "weight": weights,
+                    }
+                )
+            )
+    result = pd.concat(frames, ignore_index=True)
+    result.sort_values(by=["date", "trade_direction", "ticker"], inplace=True)
+    result["strategy_name"] = strategy_name
+    return result.reset_index(drop=True)
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("top_n", [1, 3, 5])
+def test_construct_portfolio_weights_matches_row_by_row(seed, top_n):
+    rng = np.random.default_rng(seed)
+    n_dates, n_tickers = 30, 12
+    # Rounded scores give ties, including at the top/bottom cut
+    scores = np.round(rng.normal(0, 1, (n_dates, n_tickers)), 1)
+    scores[rng.random(scores.shape) < 0.2] = np.nan
+    scores[0] = -np.abs(scores[0])  # all negative
+    scores[1, 1:] = np.nan  # single asset
+    scores[2, 3:] = np.nan  # fewer names than 2 * top_n
+    scores[3] = 0.0  # all zero
+    scores[4, :6] = 0.0  # one side all zero
+    scores[5] = np.nan  # no scores
+    signal_df = pd.DataFrame(
+        scores,
+        index=pd.date_range("2023-01-02", periods=n_dates, freq="B"),
+        columns=[f"T{i:02d}" for i in rng.permutation(n_tickers)],
+    )
+
+    pd.testing.assert_frame_equal(
+        construct_portfolio_weights(signal_df, "test_strategy", top_n),
+        reference_portfolio_weights(signal_df, "test_strategy", top_n),
+    )
@@ -1,7 +1,11 @@
 import numpy as np
 import pandas as pd
+import pytest
 
-from src.portfolio_construction.optimizers.cvxpy_optimizer import cvx_optimizer
+from src.portfolio_construction.optimizers.cvxpy_optimizer import (
+    CvxAllocationProblem, cvx_optimizer, get_allocation_problem,
+    turnover_cvx_optimizer)
+from src.portfolio_construction.optimizers.lot_allocation import lot_allocation
 
 
 def test_cvx_optimizer_basic():
@@ -68,3 +72,72 @@ def test_cvx_optimizer_single_asset():
     assert result["ticker"].iloc[0] == "AAPL"
     assert result["shares"].iloc[0] > 0
     assert result["actual_weight"].iloc[0] == 1.0
+
+
+def test_cached_problem_matches_a_new_problem():
+    rng = np.random.default_rng(0)
+    problem = get_allocation_problem(8)
+    assert problem.problem.is_dpp()
+    for _ in range(3):
+        prices = rng.uniform(10, 500, 8)
+        dollar_target = 100_000 * rng.dirichlet(np.ones(8))
+        status, shares = problem.solve(prices, dollar_target, 100_000)
+        _, expected = CvxAllocationProblem(8).solve(prices, dollar_target, 100_000)
+        assert status == "optimal"
+        # Same objective value (ties between share vectors are possible)
+        np.testing.assert_allclose(
+            np.abs(shares * prices - dollar_target).sum(),
+            np.abs(expected * prices - dollar_target).sum(),
+        )
+    # The same compiled problem is reused by cvx_optimizer
+    cvx_optimizer([f"T{i}" for i in range(8)], prices, dollar_target / 100_000, 100_000)
+    assert get_allocation_problem(8) is problem
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_turnover_optimizer_without_costs_is_between_milp_and_lot(seed):
+    rng = np.random.default_rng(seed)
+    n, capital = 8, 50_000.0
+    tickers = [f"T{i}" for i in range(n)]
+    prices = rng.uniform(5, 800, n)
+    weights = rng.dirichlet(np.ones(n))
+    previous = rng.integers(0, 30, n)
+
+    result = turnover_cvx_optimizer(tickers, prices, weights, capital, previous)
+    error = np.abs(result["value"] - capital * weights).sum()
+    status, shares = get_allocation_problem(n).solve(prices, capital * weights, capital)
+    milp_error = np.abs(np.round(shares) * prices - capital * weights).sum()
+    # The floor/floor+1 candidates include the lot_allocation solution
+    lot = lot_allocation(tickers, prices, weights, capital)
+
+    assert result["value"].sum() <= capital
+    assert milp_error - 1e-6 <= error <= lot.attrs["objective"] + 1e-6
+    assert result.attrs["n_traded"] == (result["shares"] != previous).sum()
+
+
+def test_turnover_optimizer_keeps_positions_not_worth_trading():
+    tickers = ["A", "B", "C"]
+    prices = np.array([100.0, 50.0, 20.0])
+    weights = np.array([0.5, 0.3, 0.2])
+    # A is 2 shares short of its target, B on target, C is leaving the book
+    previous = np.array([48, 60, 0])
+    weights_with_exit = np.append(weights, 0.0)
+    capital = 10_000.0
+
+    result = turnover_cvx_optimizer(
+        tickers + ["D"],
+        np.append(prices, 40.0),
+        weights_with_exit,
+        capital,
+        np.append(previous, 25),
+        turnover_penalty=0.001,
+        trade_cost=250.0,
+    )
+    # Buying 2 A (error 200) is not worth the trade cost; selling D (1,000) is
+    assert result["shares"].tolist() == [48, 60, 100, 0]
+    assert result.attrs["n_traded"] == 2
+
+    cheap = turnover_cvx_optimizer(
+        tickers, prices, weights, capital, previous, trade_cost=1.0
+    )
+    assert cheap["shares"].tolist() == [50, 60, 100]
@@ -0,0 +1,140 @@
+import cvxpy as cp
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_access.schemas import RiskModelStack
+from src.portfolio_construction.optimizers.create_portfolio_weights import \
+    construct_mv_portfolio_weights
+from src.portfolio_construction.optimizers.factor_mv_optimizer import (
+    FactoredCovariance, factor_mv_optimizer)
+
+FACTORS = ["Manuf", "Money", "Hlth"]
+
+
+def make_stack(n_tickers=40, dates=("2024-01-05", "2024-01-12"), seed=0):
+    rng = np.random.default_rng(seed)
+    n_dates, k = len(dates), len(FACTORS)
+    factor_covariance = np.empty((n_dates, k, k))
+    for d in range(n_dates):
+        m = rng.normal(0, 0.02, (k, k))
+        factor_covariance[d] = m @ m.T + 1e-4 * np.eye(k)
+    return RiskModelStack(
+        dates=pd.DatetimeIndex(dates),
+        tickers=pd.Index([f"T{i:02d}" for i in range(n_tickers)]),
+        factor_names=FACTORS,
+        factor_exposures=rng.normal(0, 1, (n_dates, n_tickers, k)),
+        factor_covariance=factor_covariance,
+        specific_risk=rng.uniform(0.02, 0.06, (n_dates, n_tickers)),
+        residuals=np.zeros((n_dates, n_tickers)),
+    )
+
+
+def dense_covariance(covariance):
+    return (
+        covariance.exposures @ covariance.factor_covariance @ covariance.exposures.T
+        + np.diag(covariance.specific_variance)
+    )
+
+
+@pytest.mark.parametrize("long_short", [False, True])
+def test_factored_solve_matches_dense_covariance(long_short):
+    stack = make_stack()
+    covariance = FactoredCovariance.from_stack(stack, "2024-01-05")
+    alpha = np.random.default_rng(1).normal(0, 0.01, len(covariance.tickers))
+
+    result_df = factor_mv_optimizer(
+        alpha, covariance, risk_aversion=2.0, max_weight=0.2, long_short=long_short
+    )
+
+    sigma = dense_covariance(covariance)
+    w = cp.Variable(len(alpha))
+    constraints = [cp.abs(w) <= 0.2]
+    if long_short:
+        constraints += [cp.sum(w) == 0, cp.norm1(w) <= 2]
+    else:
+        constraints += [cp.sum(w) == 1, w >= 0]
+    cp.Problem(
+        cp.Maximize(alpha @ w - 2.0 * cp.quad_form(w, cp.psd_wrap(sigma))),
+        constraints,
+    ).solve(solver=cp.CLARABEL)
+
+    assert result_df.attrs["status"] == cp.OPTIMAL
+    assert result_df["ticker"].tolist() == covariance.tickers.tolist()
+    np.testing.assert_allclose(result_df["weight"], w.value, atol=1e-5)
+    weights = result_df["weight"].to_numpy()
+    assert result_df.attrs["variance"] == pytest.approx(weights @ sigma @ weights)
+
+
+def test_exposure_bounds_and_risk_aversion():
+    covariance = FactoredCovariance.from_stack(make_stack(), "2024-01-12")
+    alpha = np.random.default_rng(2).normal(0, 0.01, len(covariance.tickers))
+
+    bounded_df = factor_mv_optimizer(
+        alpha,
+        covariance,
+        exposure_bounds={"Manuf": (-0.05, 0.05), "Hlth": (0.1, None)},
+        long_short=True,
+    )
+    exposures = bounded_df.attrs["factor_exposures"]
+    assert -0.05 - 1e-6 <= exposures["Manuf"] <= 0.05 + 1e-6
+    assert exposures["Hlth"] >= 0.1 - 1e-6
+
+    variances = [
+        factor_mv_optimizer(
+            alpha, covariance, risk_aversion=risk_aversion, long_short=True
+        ).attrs["variance"]
+        for risk_aversion in (0.1, 1.0, 10.0)
+    ]
+    assert variances[0] > variances[1] > variances[2]
+
+
+def test_from_stack_alignment():
+    stack = make_stack()
+    # A date between models uses the earlier one
+    covariance = FactoredCovariance.from_stack(
+        stack, "2024-01-10", ["T03", "NEW", "T01"]
+    )
+    np.testing.assert_array_equal(
+        covariance.exposures[[0, 2]], stack.factor_exposures[0][[3, 1]]
+    )
+    np.testing.assert_array_equal(covariance.exposures[1], 0.0)
+    assert covariance.specific_variance[1] == pytest.approx(
+        np.median(stack.specific_risk[0][[3, 1]] ** 2)
+    )
+
+    view = FactoredCovariance.from_risk_model(
+        stack.risk_model("2024-01-05"), ["T03", "NEW", "T01"]
+    )
+    np.testing.assert_allclose(view.exposures, covariance.exposures)
+    np.testing.assert_allclose(view.specific_variance, covariance.specific_variance)
+
+    with pytest.raises(ValueError):
+        FactoredCovariance.from_stack(stack, "2024-01-01")
+
+
+def test_construct_mv_portfolio_weights():
+    stack = make_stack()
+    dates = pd.DatetimeIndex(["2024-01-01", "2024-01-05", "2024-01-12"])
+    signal_df = pd.DataFrame(
+        np.random.default_rng(3).normal(0, 1, (len(dates), len(stack.tickers))),
+        index=dates,
+        columns=stack.tickers,
+    )
+
+    result = construct_mv_portfolio_weights(
+        signal_df, "mv", stack, risk_aversion=10.0, max_weight=0.1
+    )
+
+    # No risk model before 2024-01-05
+    assert sorted(result["date"].unique()) == list(dates[1:])
+    assert all(result["strategy_name"] == "mv")
+    sums = result.groupby(["date", "trade_direction"])["weight"].sum()
+    np.testing.assert_allclose(sums, 1.0)
+    for date, books in result.groupby("date"):
+        assert set(books["trade_direction"]) == {"Long", "Short"}
+        assert not set(books["ticker"][books["trade_direction"] == "Long"]) & set(
+            books["ticker"][books["trade_direction"] == "Short"]
+        )
+        mean_scores = books.groupby("trade_direction")["alpha_score"].mean()
+        assert mean_scores["Long"] > 0 > mean_scores["Short"]
@@ -1,9 +1,9 @@
+import numpy as np
 import pandas as pd
+import pytest
 
 from src.portfolio_construction.optimizers.greedy_allocation import (
-    greedy_allocation,
-    linear_optimization,
-)
+    greedy_allocation, linear_optimization)
 
 
 def test_greedy_allocation_basic():
@@ -95,3 +95,72 @@ def test_linear_optimization_improvement():
     # Both algorithms should have reasonable weight errors
     assert greedy_errors.sum() < 0.1  # Less than 10% total error
     assert linear_errors.sum() < 0.1  # Less than 10% total error
+
+
+def reference_greedy_allocation(prices, weights_target, capital):
+    """Row by row greedy: largest weights first, each capped by the capital left."""
+    shares = np.zeros(len(prices), dtype=int)
+    remaining_capital = capital
+    for i in np.argsort(-np.asarray(weights_target), kind="stable"):
+        if prices[i] > 0:
+            shares[i] = int(
+                min(capital * weights_target[i], remaining_capital) // prices[i]
+            )
+            remaining_capital -= shares[i] * prices[i]
+    return shares
+
+
+def random_book(seed, n, weight_total=1.0):
+    rng = np.random.default_rng(seed)
+    prices = rng.uniform(1, 1_000, n)
+    prices[rng.random(n) < 0.1] = 0.0
+    weights = weight_total * rng.dirichlet(np.ones(n))
+    capital = float(rng.choice([1e4, 1e6, 1e8]))
+    return [f"T{i}" for i in range(n)], prices, weights, capital
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_greedy_allocation_matches_row_by_row(seed):
+    tickers, prices, weights, capital = random_book(seed, n=1 + seed * 7)
+    result = greedy_allocation(tickers, prices, weights, capital).sort_index()
+
+    np.testing.assert_array_equal(
+        result["shares"], reference_greedy_allocation(prices, weights, capital)
+    )
+    assert result["ticker"].tolist() == tickers
+    np.testing.assert_allclose(result["value"], result["shares"] * prices)
+    assert result["value"].sum() <= capital
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_greedy_allocation_caps_overweight_books(seed):
+    # Weights adding up to more than one are cut off once the capital runs out
+    tickers, prices, weights, capital = random_book(seed, n=50, weight_total=1.5)
+    result = greedy_allocation(tickers, prices, weights, capital)
+
+    assert result["value"].sum() <= capital
+    assert (result["shares"] >= 0).all()
+    # The largest positions are filled first
+    filled = result["shares"] == (capital * result["target_weight"]) // np.where(
+        result["price"] > 0, result["price"], np.inf
+    )
+    assert filled.iloc[0]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_linear_optimization_largest_remainder(seed):
+    tickers, prices, weights, capital = random_book(seed, n=5 + seed * 5)
+    greedy = greedy_allocation(tickers, prices, weights, capital).sort_index()
+    linear = linear_optimization(tickers, prices, weights, capital).sort_index()
+
+    extra = linear["shares"] - greedy["shares"]
+    assert set(extra.unique()) <= {0, 1}
+    assert linear["value"].sum() <= capital
+    assert (extra[prices == 0] == 0).all()
+    # The names topped up have the largest fractional target shares
+    valid = prices > 0
+    remainders = capital * weights[valid] / prices[valid] - greedy["shares"][valid]
+    if extra.sum() and (extra[valid] == 0).any():
+        assert (
+            remainders[extra[valid] == 1].min() >= remainders[extra[valid] == 0].max()
+        )
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from src.portfolio_construction.optimizers.cvxpy_optimizer import \
+    get_allocation_problem
+from src.portfolio_construction.optimizers.lot_allocation import lot_allocation
+
+
+def random_book(seed, n):
+    rng = np.random.default_rng(seed)
+    prices = rng.uniform(5, 800, n)
+    weights = rng.dirichlet(np.ones(n))
+    capital = float(rng.choice([2e4, 1e5, 1e6]))
+    return [f"T{i}" for i in range(n)], prices, weights, capital
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_lot_allocation_is_bounded_by_the_milp(seed):
+    tickers, prices, weights, capital = random_book(seed, n=6 + seed)
+    result = lot_allocation(tickers, prices, weights, capital)
+
+    status, milp_shares = get_allocation_problem(len(tickers)).solve(
+        prices, capital * weights, capital
+    )
+    assert status == "optimal"
+    milp_objective = np.abs(np.round(milp_shares) * prices - capital * weights).sum()
+
+    assert result["value"].sum() <= capital
+    assert (result["shares"] >= 0).all()
+    np.testing.assert_allclose(
+        result.attrs["objective"],
+        np.abs(result["value"] - capital * weights).sum(),
+    )
+    # The LP bound is below the MILP optimum, which is below the heuristic
+    assert result.attrs["lower_bound"] <= milp_objective + 1e-6
+    assert milp_objective <= result.attrs["objective"] + 1e-6
+    assert result.attrs["optimality_gap"] == pytest.approx(
+        result.attrs["objective"] - result.attrs["lower_bound"]
+    )
+
+
+def test_lot_allocation_rounds_up_within_capital():
+    # After flooring (5 and 10 shares) 100 is left, enough for one more share of
+    # either name: B reduces the error more per dollar, after which A no longer
+    # fits. Buying A instead would be optimal (error 60 vs 80), within the gap.
+    result = lot_allocation(["A", "B"], [100.0, 40.0], [0.57, 0.43], 1000)
+
+    assert result["shares"].tolist() == [5, 11]
+    assert result.attrs["objective"] == pytest.approx(80)
+    # B fully (gain 20) and 60% of A (gain 40) off the floored error of 100
+    assert result.attrs["lower_bound"] == pytest.approx(56)
+    assert result.attrs["optimality_gap"] == pytest.approx(24)
+
+
+def test_lot_allocation_zero_prices_and_overweight():
+    result = lot_allocation(["A", "B", "C"], [150.0, 0.0, 100.0], [0.4, 0.3, 0.3], 1e4)
+    assert result.loc[result["ticker"] == "B", "shares"].iloc[0] == 0
+    assert result.loc[result["ticker"] == "B", "value"].iloc[0] == 0
+    assert result["value"].sum() <= 1e4
+
+    with pytest.raises(ValueError):
+        lot_allocation(["A", "B"], [10.0, 20.0], [0.7, 0.6], 1e4)
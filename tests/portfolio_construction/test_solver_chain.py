@@ -0,0 +1,175 @@
+import itertools
+import time
+from unittest.mock import patch
+
+import cvxopt.glpk
+import numpy as np
+import pytest
+from cvxpy.reductions.solvers.conic_solvers.glpk_mi_conif import GLPK_MI
+
+from src.portfolio_construction.optimizers.solver_chain import (
+    DEFAULT_SOLVER_CHAIN, SolverStep, allocate_sides, allocate_with_fallback,
+    solver_chain_for)
+
+TICKERS = ["AAPL", "MSFT", "GOOGL", "AMZN"]
+PRICES = np.array([150.0, 250.0, 100.0, 180.0])
+WEIGHTS = np.array([0.4, 0.3, 0.2, 0.1])
+
+
+def test_first_solver_that_solves_wins():
+    chain = (
+        SolverStep("NOT_A_SOLVER", 1.0),
+        SolverStep("GLPK_MI", 5.0),
+        SolverStep("greedy"),
+    )
+    result_df, attempts = allocate_with_fallback(
+        TICKERS, PRICES, WEIGHTS, 10_000, chain
+    )
+
+    assert [attempt["solver"] for attempt in attempts] == ["NOT_A_SOLVER", "GLPK_MI"]
+    failed, solved = attempts
+    assert failed["status"] == "error" and not failed["selected"]
+    assert np.isnan(failed["objective"])
+    assert solved["status"] == "optimal" and solved["selected"]
+    assert solved["time_limit"] == 5.0
+    assert solved["solve_seconds"] > 0
+    assert solved["cash_left"] == pytest.approx(10_000 - result_df["value"].sum())
+    assert solved["objective"] == pytest.approx(
+        np.abs(result_df["value"] - 10_000 * WEIGHTS).sum()
+    )
+
+
+def test_falls_back_to_greedy_and_raises_when_nothing_solves():
+    chain = (SolverStep("NOT_A_SOLVER"), SolverStep("greedy"))
+    result_df, attempts = allocate_with_fallback(
+        TICKERS, PRICES, WEIGHTS, 10_000, chain
+    )
+    assert attempts[-1]["solver"] == "greedy" and attempts[-1]["selected"]
+    assert attempts[-1]["status"] == "completed"
+    assert result_df["value"].sum() <= 10_000
+
+    with pytest.raises(RuntimeError):
+        allocate_with_fallback(
+            TICKERS, PRICES, WEIGHTS, 10_000, (SolverStep("NOT_A_SOLVER"),)
+        )
+
+
+def test_solver_chain_for_allocator():
+    assert solver_chain_for("cvx") == DEFAULT_SOLVER_CHAIN
+    assert [step.solver for step in solver_chain_for("lot")] == ["lot", "greedy"]
+    assert [step.solver for step in solver_chain_for("greedy")] == ["greedy"]
+    with pytest.raises(ValueError):
+        solver_chain_for("simplex")
+
+
+def brute_force_joint(long_book, short_book, side_capital, net_limit):
+    """Best floor/floor+1 shares of both sides by enumeration."""
+    books = (long_book, short_book)
+    targets = [side_capital * np.asarray(book[2]) for book in books]
+    floors = [np.floor(target / book[1]) for target, book in zip(targets, books)]
+    n_long = len(long_book[0])
+    best = np.inf
+    for round_up in itertools.product((0, 1), repeat=n_long + len(short_book[0])):
+        round_up = np.array(round_up)
+        long_value = (floors[0] + round_up[:n_long]) * long_book[1]
+        short_value = (floors[1] + round_up[n_long:]) * short_book[1]
+        gross = long_value.sum() + short_value.sum()
+        net = long_value.sum() - short_value.sum()
+        if gross <= 2 * side_capital and abs(net) <= net_limit:
+            error = (
+                np.abs(long_value - targets[0]).sum()
+                + np.abs(short_value - targets[1]).sum()
+            )
+            best = min(best, error)
+    return best
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_joint_side_mode_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    books = {
+        direction: (
+            [f"{direction}{i}" for i in range(4)],
+            rng.uniform(20, 400, 4),
+            rng.dirichlet(np.ones(4)),
+        )
+        for direction in ("Long", "Short")
+    }
+    side_capital = 5_000.0
+    allocations = allocate_sides(
+        books, side_capital, side_mode="joint", net_tolerance=0.005
+    )
+
+    values = {
+        direction: result_df["value"].sum()
+        for direction, (result_df, _) in allocations.items()
+    }
+    assert values["Long"] + values["Short"] <= 2 * side_capital
+    assert abs(values["Long"] - values["Short"]) <= 0.005 * 2 * side_capital
+    for direction, (_, attempts) in allocations.items():
+        assert [attempt["solver"] for attempt in attempts] == ["joint GLPK_MI"]
+        assert attempts[0]["selected"]
+
+    objective = sum(attempts[0]["objective"] for _, attempts in allocations.values())
+    assert objective == pytest.approx(
+        brute_force_joint(books["Long"], books["Short"], side_capital, 50.0)
+    )
+
+
+def test_joint_side_mode_falls_back_to_per_side_chain():
+    books = {
+        "Long": (["A", "B"], np.array([70.0, 130.0]), np.array([0.5, 0.5])),
+        "Short": (["C", "D"], np.array([90.0, 110.0]), np.array([0.5, 0.5])),
+    }
+    # No floor/floor+1 allocation is exactly dollar neutral
+    allocations = allocate_sides(
+        books, 1_000.0, (SolverStep("GLPK_MI", 5.0),), "joint", net_tolerance=0.0
+    )
+    for direction, (result_df, attempts) in allocations.items():
+        assert [attempt["solver"] for attempt in attempts] == [
+            "joint GLPK_MI",
+            "GLPK_MI",
+        ]
+        assert not attempts[0]["selected"] and attempts[1]["selected"]
+        assert result_df["ticker"].tolist() == books[direction][0]
+
+    with pytest.raises(ValueError):
+        allocate_sides(books, 1_000.0, side_mode="parallel")
+
+
+def test_concurrent_side_mode_leaves_glpk_options_unchanged():
+    rng = np.random.default_rng(0)
+    books = {
+        direction: (
+            [f"{direction}{i}" for i in range(25)],
+            rng.uniform(20, 400, 25),
+            rng.dirichlet(np.ones(25)),
+        )
+        for direction in ("Long", "Short")
+    }
+    options = dict(cvxopt.glpk.options)
+    sequential = allocate_sides(books, 100_000.0, side_mode="sequential")
+
+    running, overlaps = [0], []
+    solve_via_data = GLPK_MI.solve_via_data
+
+    def tracked_solve(self, *args, **kwargs):
+        running[0] += 1
+        overlaps.append(running[0])
+        time.sleep(0.01)
+        try:
+            return solve_via_data(self, *args, **kwargs)
+        finally:
+            running[0] -= 1
+
+    # GLPK_MI keeps its options in a process-global dict during a solve
+    with patch.object(GLPK_MI, "solve_via_data", tracked_solve):
+        for _ in range(10):
+            allocations = allocate_sides(books, 100_000.0, side_mode="concurrent")
+            assert cvxopt.glpk.options == options
+    assert max(overlaps) == 1
+    for direction, (result_df, attempts) in allocations.items():
+        assert attempts[0]["solver"] == "GLPK_MI" and attempts[0]["selected"]
+        np.testing.assert_array_equal(
+            result_df["shares"], sequential[direction][0]["shares"]
+        )
@@ -1,13 +1,12 @@
 from datetime import date
 
 import pandas as pd
+import pytest
 
-from src.rebalance.rebalance_portfolio import (
-    RebalanceData,
-    RebalancePortfolio,
-    RebalanceUtil,
-    create_rebalance_data,
-)
+from src.rebalance.rebalance_portfolio import (RebalanceData,
+                                               RebalancePortfolio,
+                                               RebalanceUtil,
+                                               create_rebalance_data)
 
 
 def test_create_rebalance_data():
@@ -236,3 +235,115 @@ def test_get_new_portfolio_notional_subsequent():
     # new_capital_inflows = 2.0 * 100000 = 200000
     # total = 2200000
     assert abs(result - 2200000.0) < 1e-10
+
+
+def test_build_capital_schedule_matches_frame_lookup():
+    aum_leverage_df = pd.DataFrame(
+        {
+            "date": pd.to_datetime(["2023-01-06", "2023-01-13"]),
+            "aum": [1000000.0, 1100000.0],
+            "target_leverage": [2.0, 2.5],
+            "in_out_flows": [None, 100000.0],
+            "leverage_change": [None, 0.5],
+        }
+    )
+
+    schedule = RebalanceUtil.build_capital_schedule(aum_leverage_df)
+
+    assert list(schedule) == [pd.Timestamp("2023-01-06"), pd.Timestamp("2023-01-13")]
+    assert schedule[pd.Timestamp("2023-01-06")] == (1000000.0, 2.0, 0.0, 0.0)
+    for rebalance_date, pf_value, initial in [
+        ("2023-01-06", 0.0, True),
+        (pd.Timestamp("2023-01-13"), 2000000.0, False),
+        ("2023-01-20", 123.0, False),
+    ]:
+        assert RebalanceUtil.get_new_portfolio_notional(
+            schedule, rebalance_date, pf_value, initial
+        ) == RebalanceUtil.get_new_portfolio_notional(
+            aum_leverage_df, rebalance_date, pf_value, initial
+        )
+
+
+def test_rebalance_portfolio_allocator_option():
+    alpha_df = pd.DataFrame(
+        {
+            "ticker": ["AAPL", "MSFT", "GOOGL", "AMZN"],
+            "weight": [0.6, 0.4, 0.5, 0.5],
+            "trade_direction": ["Long", "Long", "Short", "Short"],
+        }
+    )
+    prices_df = pd.DataFrame(
+        {
+            "ticker": ["AAPL", "MSFT", "GOOGL", "AMZN"],
+            "value": [150.0, 250.0, 100.0, 180.0],
+        }
+    )
+    results = {}
+    for allocator in ["cvx", "lot", "greedy"]:
+        rebalance_data = create_rebalance_data(
+            "test_strategy", date(2023, 1, 1), alpha_df, prices_df, 20000.0, allocator
+        )
+        results[allocator] = RebalancePortfolio(rebalance_data).rebalance_portfolio()
+
+    for result in results.values():
+        assert result["ticker"].tolist() == alpha_df["ticker"].tolist()
+        gross = (result["shares"].abs() * result["trade_open_price"]).sum()
+        assert gross <= 20000.0
+    # Same L1 error to the targets for the exact and the specialized allocator
+    targets = 10000.0 * alpha_df["weight"].to_numpy()
+
+    def l1_error(result):
+        value = result["shares"].abs() * result["trade_open_price"]
+        return abs(value.to_numpy() - targets).sum()
+
+    assert l1_error(results["lot"]) == pytest.approx(l1_error(results["cvx"]))
+
+    rebalance_data = create_rebalance_data(
+        "test_strategy", date(2023, 1, 1), alpha_df, prices_df, 20000.0, "simplex"
+    )
+    with pytest.raises(ValueError):
+        RebalancePortfolio(rebalance_data).rebalance_portfolio()
+
+
+def test_rebalance_portfolio_side_modes():
+    alpha_df = pd.DataFrame(
+        {
+            "ticker": ["AAPL", "MSFT", "GOOGL", "AMZN", "META"],
+            "weight": [0.6, 0.4, 0.5, 0.3, 0.2],
+            "trade_direction": ["Long", "Long", "Short", "Short", "Short"],
+        }
+    )
+    prices_df = pd.DataFrame(
+        {
+            "ticker": ["AAPL", "MSFT", "GOOGL", "AMZN", "META"],
+            "value": [150.0, 250.0, 100.0, 180.0, 320.0],
+        }
+    )
+    results, logs = {}, {}
+    for side_mode in ["sequential", "concurrent", "joint"]:
+        rebalance_data = create_rebalance_data(
+            "test_strategy",
+            date(2023, 1, 1),
+            alpha_df,
+            prices_df,
+            20000.0,
+            side_mode=side_mode,
+        )
+        rb = RebalancePortfolio(rebalance_data)
+        results[side_mode] = rb.rebalance_portfolio()
+        logs[side_mode] = pd.DataFrame(rb.optimizer_log)
+
+    pd.testing.assert_frame_equal(results["concurrent"], results["sequential"])
+    pd.testing.assert_frame_equal(
+        logs["concurrent"].drop(columns="solve_seconds"),
+        logs["sequential"].drop(columns="solve_seconds"),
+    )
+
+    joint = results["joint"]
+    assert joint["ticker"].tolist() == alpha_df["ticker"].tolist()
+    assert (joint.loc[joint["direction"] == "Short", "shares"] <= 0).all()
+    notional = joint["shares"] * joint["trade_open_price"]
+    assert notional.abs().sum() <= 20000.0
+    assert abs(notional.sum()) <= 0.01 * 20000.0
+    assert logs["joint"]["solver"].unique().tolist() == ["joint GLPK_MI"]
+    assert logs["joint"]["direction"].tolist() == ["Long", "Short"]
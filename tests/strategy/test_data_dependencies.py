@@ -0,0 +1,87 @@
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_access.prices import PriceDataFetcher
+from src.data_access.schemas import UniverseSpec
+from src.data_access.sqllite_db_manager import EngineRegistry
+from src.data_prep.synthetic_data.generate_synthetic_data import (
+    SyntheticDataSpec, create_synthetic_db)
+from src.strategy.data_dependencies import (BENCHMARK_PX_LAST, PX_LAST,
+                                            DataDependency, DataResolver)
+from src.strategy.min_vol.min_vol import MinVolSignal, compute_min_vol_signal
+from src.strategy.momentum.roc_momentum import RocSignal, compute_roc_signal
+
+SPEC = SyntheticDataSpec(n_tickers=30, n_years=0.5, n_factors=4, risk_model_weeks=0)
+UNIVERSE = UniverseSpec("sp500", "2020-01-01", "2020-06-30")
+
+
+@pytest.fixture
+def synthetic_engine():
+    with EngineRegistry.use_engine() as engine:
+        create_synthetic_db(SPEC, engine=engine)
+        yield engine
+
+
+def pivoted(long_df):
+    return long_df.pivot(index="date", columns="ticker", values="value")
+
+
+def test_strategies_share_each_dependency(synthetic_engine):
+    resolver = DataResolver()
+    strategies = [RocSignal(UNIVERSE, resolver), MinVolSignal(UNIVERSE, resolver)]
+
+    with patch.object(
+        PriceDataFetcher, "get_ts_data", wraps=PriceDataFetcher.get_ts_data
+    ) as fetch_spy:
+        scores = [strategy.calculate_signal_scores() for strategy in strategies]
+        strategies[0].calculate_signal_scores()
+
+    # px_last once for both strategies, the benchmark once for MinVol
+    assert sorted(call.args[2] for call in fetch_spy.call_args_list) == [False, True]
+
+    # Same signals as pivoting each strategy's own fetch
+    stock_px_df = pivoted(PriceDataFetcher.get_price_data(UNIVERSE))
+    benchmark_px_df = pivoted(PriceDataFetcher.get_benchmark_data(UNIVERSE))
+    pd.testing.assert_frame_equal(scores[0], compute_roc_signal(stock_px_df))
+    pd.testing.assert_frame_equal(
+        scores[1], compute_min_vol_signal(stock_px_df, benchmark_px_df)
+    )
+
+
+def test_panels_are_read_only_business_day_views(synthetic_engine):
+    resolver = DataResolver()
+    data = resolver.resolve(UNIVERSE, (PX_LAST, BENCHMARK_PX_LAST))
+    px_last_df = data["px_last"]
+
+    assert px_last_df.index.freqstr == "B"
+    assert list(data["benchmark_px_last"].columns) == ["SP500"]
+    assert "SP500" not in px_last_df.columns
+
+    with pytest.raises(ValueError):
+        px_last_df.iloc[0, 0] = 0.0
+    with pytest.raises(TypeError):
+        data["px_last"] = px_last_df
+
+    # Relabelling a view leaves the shared panel alone
+    px_last_df.columns = [f"X{i}" for i in range(px_last_df.shape[1])]
+    assert resolver.panel(UNIVERSE, PX_LAST).columns[0].startswith("T")
+
+
+def test_missing_business_days_are_nan_rows():
+    long_df = pd.DataFrame(
+        {
+            "date": pd.to_datetime(["2024-01-02", "2024-01-02", "2024-01-04"]),
+            "ticker": ["AAA", "BBB", "AAA"],
+            "value": [1.0, 2.0, 3.0],
+        }
+    )
+    with patch.object(PriceDataFetcher, "get_ts_data", return_value=long_df):
+        mcap_df = DataResolver().panel(UNIVERSE, DataDependency("mcap", key="mcap"))
+
+    assert list(mcap_df.index) == list(pd.bdate_range("2024-01-02", "2024-01-04"))
+    np.testing.assert_array_equal(
+        mcap_df.to_numpy(), [[1.0, 2.0], [np.nan, np.nan], [3.0, np.nan]]
+    )
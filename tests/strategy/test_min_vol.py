@@ -1,11 +1,12 @@
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
 import numpy as np
 import pandas as pd
 import pytest
 
 from src.data_access.schemas import UniverseSpec
-from src.strategy.min_vol.min_vol import MinVolSignal, MinVolSignalData
+from src.strategy.data_dependencies import BENCHMARK_PX_LAST, PX_LAST
+from src.strategy.min_vol.min_vol import MinVolSignal
 
 
 @pytest.fixture
@@ -61,43 +62,41 @@ def universe_spec():
     )
 
 
+def mock_ts_data(price_data, benchmark_data):
+    """PriceDataFetcher.get_ts_data stand-in serving the stocks or the benchmark"""
+
+    def get_ts_data(spec, key="px_last", benchmark=False, engine=None):
+        return benchmark_data if benchmark else price_data
+
+    return get_ts_data
+
+
 def test_min_vol_signal_initialization(
     universe_spec, mock_price_data, mock_benchmark_data
 ):
     """Test that MinVolSignal initializes correctly with valid UniverseSpec"""
-    # Create a mock MinVolSignalData instance
-    mock_min_vol_data = MagicMock(spec=MinVolSignalData)
-    mock_min_vol_data.price_data = mock_price_data
-    mock_min_vol_data.benchmark_data = mock_benchmark_data
-
-    # Patch both the PriceDataFetcher and MinVolSignalData
     with patch(
-        "src.data_access.prices.PriceDataFetcher.get_price_data"
-    ) as mock_get_price_data, patch(
-        "src.strategy.min_vol.min_vol.MinVolSignalData", return_value=mock_min_vol_data
-    ):
-        mock_get_price_data.return_value = mock_price_data
+        "src.data_access.prices.PriceDataFetcher.get_ts_data",
+        side_effect=mock_ts_data(mock_price_data, mock_benchmark_data),
+    ) as mock_get_ts_data:
         signal = MinVolSignal(universe_spec)
         assert signal.spec == universe_spec
-        assert isinstance(signal.min_vol_data, MagicMock)
-        assert signal.min_vol_data.price_data.equals(mock_price_data)
-        assert signal.min_vol_data.benchmark_data.equals(mock_benchmark_data)
+        assert signal.dependencies == (PX_LAST, BENCHMARK_PX_LAST)
+        # Prices are only fetched when the signal reads them
+        mock_get_ts_data.assert_not_called()
+
+        data = signal.data
+        assert mock_get_ts_data.call_count == 2
+        assert list(data["px_last"].columns) == ["AAPL", "GOOGL", "MSFT"]
+        assert list(data["benchmark_px_last"].columns) == ["SPY"]
 
 
 def test_calculate_signal_scores(universe_spec, mock_price_data, mock_benchmark_data):
     """Test the calculate_signal_scores function with mock data"""
-    # Create a mock MinVolSignalData instance
-    mock_min_vol_data = MagicMock(spec=MinVolSignalData)
-    mock_min_vol_data.price_data = mock_price_data
-    mock_min_vol_data.benchmark_data = mock_benchmark_data
-
-    # Patch both the PriceDataFetcher and MinVolSignalData
     with patch(
-        "src.data_access.prices.PriceDataFetcher.get_price_data"
-    ) as mock_get_price_data, patch(
-        "src.strategy.min_vol.min_vol.MinVolSignalData", return_value=mock_min_vol_data
+        "src.data_access.prices.PriceDataFetcher.get_ts_data",
+        side_effect=mock_ts_data(mock_price_data, mock_benchmark_data),
     ):
-        mock_get_price_data.return_value = mock_price_data
         signal = MinVolSignal(universe_spec)
         min_vol_scores = signal.calculate_signal_scores()
 
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.strategy.min_vol.min_vol import (MinVolSignalState,
+                                          compute_min_vol_signal)
+from src.strategy.momentum.roc_momentum import (RocSignalState,
+                                                compute_roc_signal)
+from src.strategy.online_state import RollingMoments, RollingWindow
+
+
+def make_prices(n_days=260, n_tickers=15, seed=0):
+    """Prices with a late listing, missing values and skipped business days."""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2020-01-01", periods=n_days)
+    px_df = pd.DataFrame(
+        100 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_days, n_tickers)), axis=0)),
+        index=index,
+        columns=[f"T{i:02d}" for i in range(n_tickers)],
+    )
+    px_df.iloc[:40, 2] = np.nan
+    px_df[rng.random(px_df.shape) < 0.05] = np.nan
+    benchmark_px_df = pd.DataFrame(
+        {"SP500": 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_days)))}, index=index
+    )
+    skipped = index[[day for day in (7, 8, 30, 101) if day < n_days]]
+    return px_df.drop(skipped), benchmark_px_df.drop(skipped)
+
+
+def assert_rows_match(online_df, batch_df):
+    online_df = online_df.reindex(columns=batch_df.columns)
+    np.testing.assert_array_equal(online_df.isna(), batch_df.isna())
+    np.testing.assert_allclose(online_df, batch_df, rtol=1e-10, atol=1e-12)
+
+
+@pytest.mark.parametrize("window", [1, 5, 10])
+def test_rolling_buffers_match_pandas(window):
+    rng = np.random.default_rng(window)
+    values = rng.normal(1, 0.3, (300, 6))
+    values[:25, 1] = np.nan
+    values[rng.random(values.shape) < 0.05] = np.nan
+
+    ring, moments = RollingWindow(window, 6), RollingMoments(window, 6)
+    means, stds = [], []
+    for row in values:
+        ring.push(row)
+        moments.push(row)
+        means.append(ring.mean())
+        stds.append(moments.std())
+
+    frame = pd.DataFrame(values).rolling(window, min_periods=1)
+    np.testing.assert_allclose(means, frame.mean(), rtol=1e-12)
+    if window > 1:
+        expected = pd.DataFrame(values).rolling(window).std()
+        np.testing.assert_allclose(stds, expected, rtol=1e-9, atol=1e-14)
+
+
+def test_roc_state_matches_batch_signal():
+    px_df, _ = make_prices()
+    state = RocSignalState(ma_window=5, short_weeks=1, long_weeks=3)
+
+    # Each update gives the row of its Friday label, the last one of the week wins
+    rows = {}
+    for date, prices in px_df.iterrows():
+        row = state.update(date, prices.dropna())
+        rows[row.name] = row
+
+    assert_rows_match(pd.DataFrame(rows).T, compute_roc_signal(px_df))
+
+
+def test_min_vol_state_matches_batch_signal():
+    px_df, benchmark_px_df = make_prices()
+    state = MinVolSignalState("SP500", vol_window=10)
+
+    rows = [
+        state.update(date, prices)
+        for date, prices in pd.concat([px_df, benchmark_px_df], axis=1).iterrows()
+    ]
+
+    online_df = pd.DataFrame(rows).dropna(how="all")
+    batch_df = compute_min_vol_signal(px_df, benchmark_px_df)
+    assert "SP500" not in online_df.columns
+    assert_rows_match(online_df, batch_df.loc[online_df.index])
+
+
+@pytest.mark.parametrize(
+    "state", [RocSignalState(), MinVolSignalState("SP500")], ids=["roc", "min_vol"]
+)
+def test_saved_state_resumes_the_stream(state, tmp_path):
+    px_df, benchmark_px_df = make_prices(n_days=80)
+    if isinstance(state, MinVolSignalState):
+        px_df = pd.concat([px_df, benchmark_px_df], axis=1)
+    history, new_days = px_df.iloc[:60], px_df.iloc[60:]
+
+    for date, prices in history.iterrows():
+        state.update(date, prices)
+    path = state.save(tmp_path / "state.npz")
+    restored = type(state).load(path)
+
+    for date, prices in new_days.iterrows():
+        pd.testing.assert_series_equal(
+            restored.update(date, prices), state.update(date, prices)
+        )
+
+
+def test_updates_must_move_forward():
+    px_df, _ = make_prices(n_days=10)
+    state = RocSignalState.from_history(px_df)
+    with pytest.raises(ValueError):
+        state.update(px_df.index[-1], px_df.iloc[-1])
+
+
+def test_long_streams_do_not_drift():
+    # Large, nearly constant prices: naive running sums lose precision
+    rng = np.random.default_rng(1)
+    values = 1e6 + rng.normal(0, 1e-3, (5000, 3))
+    moments = RollingMoments(10, 3)
+    for row in values:
+        moments.push(row)
+    np.testing.assert_allclose(
+        moments.std(), values[-10:].std(axis=0, ddof=1), rtol=1e-6
+    )
@@ -4,7 +4,8 @@ import numpy as np
 import pandas as pd
 import pytest
 
-from src.strategy.momentum.roc_momentum import RocSignal, RoCSignalData, UniverseSpec
+from src.strategy.data_dependencies import PX_LAST
+from src.strategy.momentum.roc_momentum import RocSignal, UniverseSpec
 
 
 @pytest.fixture
@@ -45,20 +46,31 @@ def universe_spec():
 def test_roc_signal_initialization(universe_spec, mock_price_data):
     """Test that RocSignal initializes correctly with valid UniverseSpec"""
     with patch(
-        "src.data_access.prices.PriceDataFetcher.get_price_data"
-    ) as mock_get_price_data:
-        mock_get_price_data.return_value = mock_price_data
+        "src.data_access.prices.PriceDataFetcher.get_ts_data"
+    ) as mock_get_ts_data:
+        mock_get_ts_data.return_value = mock_price_data
         signal = RocSignal(universe_spec)
         assert signal.spec == universe_spec
-        assert isinstance(signal.roc_data, RoCSignalData)
+        assert signal.dependencies == (PX_LAST,)
+        # Prices are only fetched when the signal reads them
+        mock_get_ts_data.assert_not_called()
+
+        px_last_df = signal.data["px_last"]
+        mock_get_ts_data.assert_called_once_with(
+            universe_spec, "px_last", False, engine=None
+        )
+        assert px_last_df.shape == (
+            mock_price_data["date"].nunique(),
+            mock_price_data["ticker"].nunique(),
+        )
 
 
 def test_calculate_signal_scores(universe_spec, mock_price_data):
     """Test the calculate_signal_scores function with mock data"""
     with patch(
-        "src.data_access.prices.PriceDataFetcher.get_price_data"
-    ) as mock_get_price_data:
-        mock_get_price_data.return_value = mock_price_data
+        "src.data_access.prices.PriceDataFetcher.get_ts_data"
+    ) as mock_get_ts_data:
+        mock_get_ts_data.return_value = mock_price_data
         signal = RocSignal(universe_spec)
         roc_diff = signal.calculate_signal_scores()
 
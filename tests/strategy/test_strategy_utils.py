@@ -0,0 +1,73 @@
+import pandas as pd
+import pytest
+
+from src.data_access.schemas import UniverseSpec
+from src.data_access.sqllite_db_manager import EngineRegistry
+from src.data_prep.synthetic_data.generate_synthetic_data import (
+    SyntheticDataSpec, create_synthetic_db)
+from src.portfolio_construction.optimizers.create_portfolio_weights import \
+    construct_portfolio_weights
+from src.strategy.min_vol.min_vol import MinVolSignal
+from src.strategy.momentum.roc_momentum import RocSignal
+from src.strategy.strategy_utils import build_and_store_signal
+
+# The generated alpha_history rows are replaced by build_and_store_signal
+SPEC = SyntheticDataSpec(n_tickers=60, n_years=0.5, n_factors=4, risk_model_weeks=0)
+
+
+@pytest.fixture
+def synthetic_engine():
+    with EngineRegistry.use_engine() as engine:
+        create_synthetic_db(SPEC, engine=engine)
+        yield engine
+
+
+def stored_alpha_history(engine, strategy_name):
+    stored = pd.read_sql(
+        "SELECT date, trade_direction, ticker, alpha_score, weight, strategy_name"
+        " FROM alpha_history WHERE strategy_name = :strategy_name",
+        engine,
+        params={"strategy_name": strategy_name},
+    )
+    stored["date"] = pd.to_datetime(stored["date"])
+    return stored.sort_values(["date", "trade_direction", "ticker"]).reset_index(
+        drop=True
+    )
+
+
+def every_day_alpha_history(strategy):
+    """Signal and weights on every date, then filtered to the Fridays."""
+    signal_df = strategy.calculate_signal_scores()
+    weights_df = construct_portfolio_weights(signal_df, strategy.strategy_name)
+    fridays = pd.date_range(
+        strategy.spec.start_date, strategy.spec.end_date, freq="W-FRI"
+    )
+    return weights_df[weights_df["date"].isin(fridays)].reset_index(drop=True)
+
+
+@pytest.mark.parametrize("strategy_class", [RocSignal, MinVolSignal])
+def test_rebalance_date_signals_store_the_same_alpha_history(
+    synthetic_engine, strategy_class
+):
+    spec = UniverseSpec("sp500", "2020-01-01", "2020-06-30")
+    strategy = strategy_class(spec)
+
+    build_and_store_signal(strategy)
+
+    stored = stored_alpha_history(synthetic_engine, strategy.strategy_name)
+    expected = every_day_alpha_history(strategy)
+    assert stored["date"].nunique() > 20
+    pd.testing.assert_frame_equal(stored, expected)
+
+
+def test_day_frequency_sets_the_rebalance_dates(synthetic_engine):
+    spec = UniverseSpec("sp500", "2020-01-01", "2020-06-30", day_frequency="W-WED")
+    strategy = MinVolSignal(spec)
+    assert (strategy.rebalance_dates.dayofweek == 2).all()
+
+    signal_df = strategy.calculate_signal_scores(strategy.rebalance_dates)
+    assert signal_df.index.isin(strategy.rebalance_dates).all()
+
+    build_and_store_signal(strategy)
+    stored = stored_alpha_history(synthetic_engine, strategy.strategy_name)
+    assert set(stored["date"]) == set(signal_df.index)